@@ -0,0 +1,216 @@
+"""
+Static Assets
+-------------
+Serves the frontend (HTML, CSS and JS under app/static) from memory.
+
+Every file is read, hashed and compressed once when the app starts:
+
+- CSS/JS are served under content-hash fingerprinted URLs
+  (/static/css/styles.3f9c0a1b2d4e.css) with Cache-Control: immutable, so
+  browsers never revalidate them until a deploy changes their content.
+- The page itself references those URLs and is served with a strong ETag
+  and Cache-Control: no-cache, so repeat visits get a 304 for the cost of
+  a header comparison.
+- Gzip (and brotli, when the optional 'brotli' package is installed)
+  variants are prebuilt and picked from Accept-Encoding.
+"""
+
+import os
+import re
+import gzip
+import hashlib
+import logging
+import mimetypes
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from app.middleware.compression import choose_encoding
+
+logger = logging.getLogger(__name__)
+
+# Brotli is optional: pip install brotli
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+
+# Fingerprinted URLs change whenever the content does
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# The page keeps a stable URL, so browsers revalidate it with If-None-Match
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+# Placeholder in HTML files for the fingerprinted URL of another asset
+ASSET_PLACEHOLDER = re.compile(r"\{\{\s*asset:([\w./-]+)\s*\}\}")
+
+
+# -----------------------------------------------
+# Asset Model
+# -----------------------------------------------
+@dataclass
+class StaticAsset:
+    """
+    One file held in memory with its precompressed variants.
+
+    ``bodies`` maps a content coding ("identity", "gzip", "br") to the
+    bytes to send for it.
+    """
+    path: str
+    url: str
+    media_type: str
+    digest: str
+    bodies: Dict[str, bytes] = field(default_factory=dict)
+
+    def etag(self, encoding: str = "identity") -> str:
+        """Strong ETag for one representation of the asset."""
+        if encoding == "identity":
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether an If-None-Match header names any representation of the asset."""
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        return any(self.etag(encoding) in tags for encoding in self.bodies)
+
+
+def _compress(content: bytes) -> Dict[str, bytes]:
+    """Build the identity, gzip and (if available) brotli variants of content."""
+    bodies = {"identity": content}
+    if len(content) < MIN_COMPRESS_SIZE:
+        return bodies
+    bodies["gzip"] = gzip.compress(content, compresslevel=9, mtime=0)
+    if brotli is not None:
+        bodies["br"] = brotli.compress(content, quality=11)
+    return bodies
+
+
+def _fingerprinted(path: str, digest: str) -> str:
+    """css/styles.css -> css/styles.<digest>.css"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest}{ext}"
+
+
+# -----------------------------------------------
+# Asset Registry
+# -----------------------------------------------
+class StaticAssets:
+    """
+    All frontend assets, loaded and compressed once.
+
+    Usage:
+        assets = StaticAssets(STATIC_DIR)
+        return assets.response(assets.page("index.html"), request)
+    """
+
+    def __init__(self, directory: str = STATIC_DIR, prefix: str = "/static"):
+        """
+        Args:
+            directory: Directory containing the frontend files
+            prefix: URL prefix the assets are mounted under
+        """
+        self.directory = directory
+        self.prefix = prefix.rstrip("/")
+        self._by_path: Dict[str, StaticAsset] = {}
+        self._by_url: Dict[str, StaticAsset] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Read every file, fingerprinting HTML pages last so they can link the rest."""
+        pages = []
+        for root, _, files in os.walk(self.directory):
+            for name in sorted(files):
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    content = f.read()
+                if path.endswith(".html"):
+                    pages.append((path, content))
+                else:
+                    self._add(path, content)
+
+        for path, content in pages:
+            html = ASSET_PLACEHOLDER.sub(
+                lambda m: self.url_for(m.group(1)), content.decode("utf-8")
+            )
+            self._add(path, html.encode("utf-8"))
+
+        logger.info(
+            f"Loaded {len(self._by_path)} static assets "
+            f"(brotli {'enabled' if brotli is not None else 'unavailable'})"
+        )
+
+    def _add(self, path: str, content: bytes) -> None:
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+        asset = StaticAsset(
+            path=path,
+            url=f"{self.prefix}/{_fingerprinted(path, digest)}",
+            media_type=media_type,
+            digest=digest,
+            bodies=_compress(content),
+        )
+        self._by_path[path] = asset
+        self._by_url[asset.url] = asset
+
+    def url_for(self, path: str) -> str:
+        """
+        Fingerprinted URL of an asset.
+
+        Raises:
+            KeyError: If there is no such asset
+        """
+        return self._by_path[path].url
+
+    def page(self, path: str) -> StaticAsset:
+        """An asset by its path relative to the static directory."""
+        return self._by_path[path]
+
+    def lookup(self, url: str) -> Optional[StaticAsset]:
+        """An asset by its fingerprinted URL, or None."""
+        return self._by_url.get(url)
+
+    def response(
+        self,
+        asset: StaticAsset,
+        request: Request,
+        cache_control: str = IMMUTABLE_CACHE_CONTROL,
+    ) -> Response:
+        """
+        Serve an asset, answering 304 when the client already has it.
+
+        Args:
+            asset: Asset to serve
+            request: Incoming request (If-None-Match, Accept-Encoding)
+            cache_control: Cache-Control header value
+
+        Returns:
+            200 with the negotiated representation, or 304 without a body
+        """
+        encoding = choose_encoding(
+            request.headers.get("accept-encoding", ""),
+            [coding for coding in asset.bodies if coding != "identity"],
+        ) or "identity"
+        headers = {
+            "ETag": asset.etag(encoding),
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and asset.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+
+        headers["Content-Type"] = asset.media_type
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=asset.bodies[encoding], headers=headers)
@@ -1,11 +1,18 @@
 import os
 import re
+import json
+import math
+import time
+import hashlib
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException, Query, Path
-from fastapi.responses import HTMLResponse, JSONResponse
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncIterator, List, Optional, Union
+from fastapi import FastAPI, HTTPException, Query, Path, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-import httpx
 
 # Load environment variables from .env file (for local development)
 from dotenv import load_dotenv
@@ -15,10 +22,27 @@ load_dotenv()
 from app.services.weather_service import (
     WeatherService,
     WeatherData,
+    ForecastData,
+    GeoLocation,
     CityNotFoundError,
     WeatherAPIError,
     APIKeyMissingError,
+    UpstreamUnavailableError,
+    DeadlineExceededError,
+    CityView,
 )
+from app.assets import REVALIDATE_CACHE_CONTROL, STATIC_DIR, StaticAssets
+from app.middleware.compression import (
+    CompressionMiddleware,
+    CompressionStats,
+    strip_encoding_suffix,
+)
+from app.middleware.rate_limiting import RateLimitMiddleware, RateLimitStats
+from app.services.cache import normalize_text
+from app.services.cache_backends import create_cache_backend
+from app.services.config import env_bool, env_int
+from app.services.deadline import ROUTE_DEADLINES, deadline_scope, route_deadline
+from app.services.hot_cities import CityPrefetcher
 
 # -----------------------------------------------
 # Application Insights (OpenCensus)
@@ -170,7 +194,30 @@ def track_weather_search(logger, city: str, success: bool, temperature: int = No
 # -----------------------------------------------
 # FastAPI App
 # -----------------------------------------------
-app = FastAPI(title="Weather Watcher", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open shared upstream resources and start warming the hottest cities on
+    startup; stop and release them on shutdown.
+    """
+    await weather_service.start()
+    await city_prefetcher.start()
+    try:
+        yield
+    finally:
+        await city_prefetcher.stop()
+        await weather_service.aclose()
+        if rate_limit_backend is not None:
+            await rate_limit_backend.aclose()
+
+
+app = FastAPI(title="Weather Watcher", version="0.1.0", lifespan=lifespan)
+
+# Per-client budgets for the upstream-backed endpoints, enforced before
+# routing. Shared through the cache backend across workers when enabled.
+rate_limit_stats = RateLimitStats()
+rate_limit_backend = create_cache_backend() if env_bool("RATE_LIMIT_SHARED", False) else None
+app.add_middleware(RateLimitMiddleware, backend=rate_limit_backend, stats=rate_limit_stats)
 
 # Enable CORS for frontend API calls
 app.add_middleware(
@@ -181,2900 +228,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON and page responses for clients that accept it
+compression_stats = CompressionStats()
+app.add_middleware(CompressionMiddleware, stats=compression_stats)
 
-@app.get("/")
-def read_root():
-    html_content = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <!-- Meta tags for SEO and mobile optimization -->
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <meta name="description" content="Weather Watcher - Get real-time weather information for any city">
-        <meta name="keywords" content="weather, forecast, temperature, humidity">
-        <title>Weather Watcher - Real-Time Weather Forecast</title>
-        
-        <!-- Google Fonts - Distinctive typography -->
-        <link rel="preconnect" href="https://fonts.googleapis.com">
-        <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-        <link href="https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;500;600;700;800&family=JetBrains+Mono:wght@400;500&display=swap" rel="stylesheet">
-        
-        <!-- Font Awesome CDN for weather icons -->
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" 
-              integrity="sha512-iecdLmaskl7CVkqkXNQ/ZH/XLlvWZOJyj7Yy7tcenmpD1ypASozpmT/E0iPtmFIB46ZmdtAc9eNBvH0H/ZpiBw==" 
-              crossorigin="anonymous" referrerpolicy="no-referrer" />
-        
-        <style>
-            /* ============================================
-               RESET & BASE STYLES
-               ============================================ */
-            * {
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }
-            
-            /* Smooth scrolling and font rendering */
-            html {
-                scroll-behavior: smooth;
-                -webkit-font-smoothing: antialiased;
-                -moz-osx-font-smoothing: grayscale;
-            }
-            
-            /* ============================================
-               DARK THEME COLOR PALETTE - REFINED
-               ============================================ */
-            :root {
-                --bg-primary: #06080d;
-                --bg-secondary: #0c1017;
-                --bg-card: #111827;
-                --bg-card-hover: #1a2234;
-                --text-primary: #f0f4f8;
-                --text-secondary: #94a3b8;
-                --text-muted: #64748b;
-                --accent-primary: #38bdf8;
-                --accent-secondary: #818cf8;
-                --accent-gradient: linear-gradient(135deg, #38bdf8 0%, #818cf8 50%, #c084fc 100%);
-                --success: #22c55e;
-                --success-glow: rgba(34, 197, 94, 0.3);
-                --error: #f43f5e;
-                --error-glow: rgba(244, 63, 94, 0.3);
-                --warning: #f59e0b;
-                --border: rgba(148, 163, 184, 0.1);
-                --border-hover: rgba(148, 163, 184, 0.2);
-                --shadow-sm: 0 2px 8px rgba(0, 0, 0, 0.3);
-                --shadow-md: 0 8px 32px rgba(0, 0, 0, 0.4);
-                --shadow-lg: 0 16px 64px rgba(0, 0, 0, 0.5);
-                --shadow-glow: 0 0 40px rgba(56, 189, 248, 0.15);
-                
-                /* Skeleton loading colors */
-                --skeleton-base: #1e293b;
-                --skeleton-shine: #334155;
-                
-                /* Comparison tool colors */
-                --comparison-highlight: #fbbf24;
-                --comparison-highlight-glow: rgba(251, 191, 36, 0.3);
-                --comparison-best: #10b981;
-                --comparison-worst: #ef4444;
-            }
-            
-            /* ============================================
-               BODY & BACKGROUND
-               ============================================ */
-            body {
-                font-family: 'Outfit', -apple-system, BlinkMacSystemFont, sans-serif;
-                background: var(--bg-primary);
-                color: var(--text-primary);
-                min-height: 100vh;
-                padding: 24px;
-                position: relative;
-                overflow-x: hidden;
-                line-height: 1.6;
-            }
-            
-            /* Animated gradient background overlay */
-            body::before {
-                content: '';
-                position: fixed;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                background: 
-                    radial-gradient(ellipse 80% 50% at 20% 40%, rgba(56, 189, 248, 0.08) 0%, transparent 50%),
-                    radial-gradient(ellipse 60% 40% at 80% 60%, rgba(129, 140, 248, 0.06) 0%, transparent 50%),
-                    radial-gradient(ellipse 40% 30% at 40% 80%, rgba(192, 132, 252, 0.04) 0%, transparent 50%);
-                animation: ambientGlow 20s ease-in-out infinite;
-                z-index: 0;
-                pointer-events: none;
-            }
-            
-            /* Smooth ambient glow animation */
-            @keyframes ambientGlow {
-                0%, 100% { 
-                    opacity: 1; 
-                    transform: scale(1);
-                }
-                50% { 
-                    opacity: 0.8; 
-                    transform: scale(1.02);
-                }
-            }
-            
-            /* ============================================
-               MAIN CONTAINER
-               ============================================ */
-            .container {
-                max-width: 720px;
-                width: 100%;
-                margin: 0 auto;
-                position: relative;
-                z-index: 1;
-            }
-            
-            /* ============================================
-               HEADER SECTION
-               ============================================ */
-            header {
-                text-align: center;
-                margin-bottom: 48px;
-                animation: fadeSlideDown 0.8s cubic-bezier(0.16, 1, 0.3, 1);
-            }
-            
-            h1 {
-                color: var(--text-primary);
-                font-size: clamp(2rem, 5vw, 3rem);
-                font-weight: 700;
-                margin-bottom: 8px;
-                letter-spacing: -0.03em;
-                display: inline-flex;
-                align-items: center;
-                gap: 16px;
-            }
-            
-            h1 i {
-                background: var(--accent-gradient);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-                filter: drop-shadow(0 0 20px rgba(56, 189, 248, 0.4));
-            }
-            
-            .subtitle {
-                color: var(--text-secondary);
-                font-size: 1.1rem;
-                font-weight: 400;
-                opacity: 0;
-                animation: fadeSlideUp 0.6s cubic-bezier(0.16, 1, 0.3, 1) 0.2s forwards;
-            }
-            
-            /* Temperature Unit Toggle */
-            .temperature-toggle-container {
-                margin-top: 20px;
-                display: flex;
-                justify-content: center;
-                opacity: 0;
-                animation: fadeSlideUp 0.6s cubic-bezier(0.16, 1, 0.3, 1) 0.4s forwards;
-            }
-            
-            .temperature-toggle {
-                display: flex;
-                align-items: center;
-                background: var(--bg-card);
-                border: 1px solid var(--border);
-                border-radius: 12px;
-                padding: 4px;
-                gap: 0;
-                cursor: pointer;
-                transition: all 0.3s cubic-bezier(0.16, 1, 0.3, 1);
-                box-shadow: var(--shadow-sm);
-                position: relative;
-            }
-            
-            .temperature-toggle:hover {
-                box-shadow: var(--shadow-md);
-                border-color: var(--accent);
-            }
-            
-            .temperature-toggle:focus {
-                outline: 2px solid var(--accent);
-                outline-offset: 2px;
-            }
-            
-            .temp-unit {
-                padding: 8px 16px;
-                font-size: 0.95rem;
-                font-weight: 600;
-                color: var(--text-secondary);
-                transition: all 0.3s cubic-bezier(0.16, 1, 0.3, 1);
-                border-radius: 8px;
-                user-select: none;
-                position: relative;
-                z-index: 1;
-            }
-            
-            .temp-unit.active {
-                color: var(--text-primary);
-                background: var(--accent-gradient);
-                box-shadow: var(--shadow-sm);
-            }
-            
-            .temp-unit:not(.active):hover {
-                color: var(--text-primary);
-            }
-            
-            /* ============================================
-               ANIMATIONS - CORE
-               ============================================ */
-            @keyframes fadeSlideDown {
-                from {
-                    opacity: 0;
-                    transform: translateY(-20px);
-                }
-                to {
-                    opacity: 1;
-                    transform: translateY(0);
-                }
-            }
-            
-            @keyframes fadeSlideUp {
-                from {
-                    opacity: 0;
-                    transform: translateY(20px);
-                }
-                to {
-                    opacity: 1;
-                    transform: translateY(0);
-                }
-            }
-            
-            @keyframes fadeIn {
-                from { opacity: 0; }
-                to { opacity: 1; }
-            }
-            
-            @keyframes scaleIn {
-                from {
-                    opacity: 0;
-                    transform: scale(0.95);
-                }
-                to {
-                    opacity: 1;
-                    transform: scale(1);
-                }
-            }
-            
-            @keyframes pulse {
-                0%, 100% { opacity: 1; }
-                50% { opacity: 0.5; }
-            }
-            
-            /* Shimmer animation for skeleton loading */
-            @keyframes shimmer {
-                0% {
-                    background-position: -200% 0;
-                }
-                100% {
-                    background-position: 200% 0;
-                }
-            }
-            
-            /* Success checkmark animation */
-            @keyframes checkmark {
-                0% {
-                    stroke-dashoffset: 100;
-                }
-                100% {
-                    stroke-dashoffset: 0;
-                }
-            }
-            
-            /* Bounce animation */
-            @keyframes bounce {
-                0%, 100% { transform: translateY(0); }
-                50% { transform: translateY(-6px); }
-            }
-            
-            /* Ripple effect */
-            @keyframes ripple {
-                0% {
-                    transform: scale(0);
-                    opacity: 0.6;
-                }
-                100% {
-                    transform: scale(2.5);
-                    opacity: 0;
-                }
-            }
-            
-            /* Spin animation */
-            @keyframes spin {
-                to { transform: rotate(360deg); }
-            }
-            
-            /* Float animation */
-            @keyframes float {
-                0%, 100% { transform: translateY(0) rotate(0deg); }
-                25% { transform: translateY(-5px) rotate(2deg); }
-                75% { transform: translateY(5px) rotate(-2deg); }
-            }
-            
-            /* Progress bar animation */
-            @keyframes progressPulse {
-                0%, 100% { box-shadow: 0 0 0 0 rgba(56, 189, 248, 0.4); }
-                50% { box-shadow: 0 0 0 8px rgba(56, 189, 248, 0); }
-            }
-            
-            /* ============================================
-               SEARCH FORM SECTION
-               ============================================ */
-            .search-section {
-                background: var(--bg-card);
-                padding: 32px;
-                border-radius: 24px;
-                border: 1px solid var(--border);
-                box-shadow: var(--shadow-md);
-                margin-bottom: 24px;
-                backdrop-filter: blur(20px);
-                opacity: 0;
-                animation: fadeSlideUp 0.6s cubic-bezier(0.16, 1, 0.3, 1) 0.1s forwards;
-                position: relative;
-                z-index: 100;
-                /* Removed overflow:hidden to allow dropdown to show */
-            }
-            
-            /* Subtle gradient border effect - using box-shadow instead */
-            .search-section::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: 50%;
-                transform: translateX(-50%);
-                width: 60%;
-                height: 1px;
-                background: linear-gradient(90deg, transparent, var(--accent-primary), transparent);
-                opacity: 0.5;
-                border-radius: 24px 24px 0 0;
-            }
-            
-            .search-form {
-                display: flex;
-                gap: 12px;
-            }
-            
-            .autocomplete-wrapper {
-                position: relative;
-                flex: 1;
-            }
-            
-            .search-input {
-                width: 100%;
-                padding: 16px 20px;
-                background: var(--bg-secondary);
-                border: 2px solid var(--border);
-                border-radius: 16px;
-                color: var(--text-primary);
-                font-family: 'Outfit', sans-serif;
-                font-size: 1rem;
-                font-weight: 400;
-                outline: none;
-                transition: all 0.3s cubic-bezier(0.16, 1, 0.3, 1);
-            }
-            
-            .search-input:focus {
-                border-color: var(--accent-primary);
-                box-shadow: 0 0 0 4px rgba(56, 189, 248, 0.15), var(--shadow-glow);
-                background: var(--bg-card);
-            }
-            
-            .search-input::placeholder {
-                color: var(--text-muted);
-            }
-            
-            /* Search Button with loading states */
-            .search-button {
-                padding: 16px 28px;
-                background: var(--accent-gradient);
-                border: none;
-                border-radius: 16px;
-                color: white;
-                font-family: 'Outfit', sans-serif;
-                font-size: 1rem;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s cubic-bezier(0.16, 1, 0.3, 1);
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                gap: 10px;
-                min-width: 140px;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .search-button::before {
-                content: '';
-                position: absolute;
-                inset: 0;
-                background: linear-gradient(135deg, rgba(255,255,255,0.2) 0%, transparent 50%);
-                opacity: 0;
-                transition: opacity 0.3s ease;
-            }
-            
-            .search-button:hover:not(:disabled)::before {
-                opacity: 1;
-            }
-            
-            .search-button:hover:not(:disabled) {
-                transform: translateY(-2px);
-                box-shadow: 0 8px 32px rgba(56, 189, 248, 0.4);
-            }
-            
-            .search-button:active:not(:disabled) {
-                transform: translateY(0);
-            }
-            
-            .search-button:disabled {
-                opacity: 0.7;
-                cursor: not-allowed;
-                transform: none;
-            }
-            
-            /* Button loading state */
-            .search-button.loading .button-text {
-                opacity: 0;
-            }
-            
-            .search-button.loading .button-spinner {
-                opacity: 1;
-            }
-            
-            .button-spinner {
-                position: absolute;
-                width: 20px;
-                height: 20px;
-                border: 2px solid rgba(255,255,255,0.3);
-                border-top-color: white;
-                border-radius: 50%;
-                animation: spin 0.8s linear infinite;
-                opacity: 0;
-                transition: opacity 0.2s ease;
-            }
-            
-            /* Ripple effect on click */
-            .search-button .ripple {
-                position: absolute;
-                border-radius: 50%;
-                background: rgba(255, 255, 255, 0.4);
-                transform: scale(0);
-                animation: ripple 0.6s ease-out;
-                pointer-events: none;
-            }
-            
-            /* ============================================
-               AUTOCOMPLETE DROPDOWN
-               ============================================ */
-            .autocomplete-wrapper {
-                position: relative;
-                flex: 1;
-                z-index: 1000;
-            }
-            
-            .autocomplete-dropdown {
-                position: absolute;
-                top: calc(100% + 8px);
-                left: 0;
-                right: 0;
-                background: var(--bg-card);
-                border: 1px solid var(--border-hover);
-                border-radius: 16px;
-                max-height: 320px;
-                overflow-y: auto;
-                z-index: 10000;
-                box-shadow: var(--shadow-lg), 0 0 0 1px rgba(56, 189, 248, 0.1);
-                display: none;
-                opacity: 0;
-                transform: translateY(-10px);
-            }
-            
-            .autocomplete-dropdown.show {
-                display: block;
-                animation: dropdownReveal 0.25s cubic-bezier(0.16, 1, 0.3, 1) forwards;
-            }
-            
-            .autocomplete-dropdown.hiding {
-                animation: dropdownHide 0.2s cubic-bezier(0.16, 1, 0.3, 1) forwards;
-            }
-            
-            @keyframes dropdownReveal {
-                from {
-                    opacity: 0;
-                    transform: translateY(-10px);
-                }
-                to {
-                    opacity: 1;
-                    transform: translateY(0);
-                }
-            }
-            
-            @keyframes dropdownHide {
-                from {
-                    opacity: 1;
-                    transform: translateY(0);
-                }
-                to {
-                    opacity: 0;
-                    transform: translateY(-10px);
-                }
-            }
-            
-            .autocomplete-item {
-                padding: 14px 20px;
-                cursor: pointer;
-                transition: all 0.2s ease;
-                color: var(--text-primary);
-                font-size: 0.95rem;
-                display: flex;
-                align-items: center;
-                gap: 12px;
-                border-bottom: 1px solid var(--border);
-            }
-            
-            .autocomplete-item:last-child {
-                border-bottom: none;
-            }
-            
-            .autocomplete-item:hover,
-            .autocomplete-item.active {
-                background: var(--bg-card-hover);
-            }
-            
-            .autocomplete-item i {
-                color: var(--accent-primary);
-                font-size: 0.9rem;
-                width: 20px;
-                text-align: center;
-            }
-            
-            .autocomplete-loading,
-            .autocomplete-empty {
-                padding: 20px;
-                text-align: center;
-                color: var(--text-secondary);
-                font-size: 0.9rem;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                gap: 10px;
-            }
-            
-            .autocomplete-loading i {
-                color: var(--accent-primary);
-            }
-            
-            /* ============================================
-               SKELETON LOADING STATES
-               ============================================ */
-            .skeleton {
-                background: linear-gradient(
-                    90deg,
-                    var(--skeleton-base) 0%,
-                    var(--skeleton-shine) 50%,
-                    var(--skeleton-base) 100%
-                );
-                background-size: 200% 100%;
-                animation: shimmer 1.5s ease-in-out infinite;
-                border-radius: 8px;
-            }
-            
-            .skeleton-text {
-                height: 1em;
-                border-radius: 6px;
-            }
-            
-            .skeleton-text-lg {
-                height: 2.5em;
-                border-radius: 8px;
-            }
-            
-            .skeleton-text-xl {
-                height: 4em;
-                border-radius: 12px;
-            }
-            
-            .skeleton-circle {
-                border-radius: 50%;
-            }
-            
-            .skeleton-card {
-                padding: 20px;
-                border-radius: 12px;
-            }
-            
-            /* Weather Display Skeleton */
-            .weather-skeleton {
-                background: var(--bg-card);
-                padding: 40px;
-                border-radius: 24px;
-                border: 1px solid var(--border);
-                box-shadow: var(--shadow-md);
-                display: none;
-            }
-            
-            .weather-skeleton.show {
-                display: block;
-                animation: fadeIn 0.3s ease;
-            }
-            
-            .weather-skeleton-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: flex-start;
-                margin-bottom: 32px;
-            }
-            
-            .weather-skeleton-location {
-                flex: 1;
-            }
-            
-            .weather-skeleton-city {
-                width: 180px;
-                height: 32px;
-                margin-bottom: 12px;
-            }
-            
-            .weather-skeleton-country {
-                width: 120px;
-                height: 20px;
-            }
-            
-            .weather-skeleton-icon {
-                width: 80px;
-                height: 80px;
-            }
-            
-            .weather-skeleton-main {
-                text-align: center;
-                margin-bottom: 32px;
-            }
-            
-            .weather-skeleton-temp {
-                width: 140px;
-                height: 64px;
-                margin: 0 auto 16px;
-            }
-            
-            .weather-skeleton-desc {
-                width: 200px;
-                height: 24px;
-                margin: 0 auto 12px;
-            }
-            
-            .weather-skeleton-feels {
-                width: 150px;
-                height: 18px;
-                margin: 0 auto;
-            }
-            
-            .weather-skeleton-details {
-                display: grid;
-                grid-template-columns: repeat(3, 1fr);
-                gap: 20px;
-            }
-            
-            .weather-skeleton-detail {
-                height: 100px;
-                border-radius: 16px;
-            }
-            
-            /* ============================================
-               LOADING OVERLAY - ENHANCED
-               ============================================ */
-            .loading-overlay {
-                position: fixed;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                background: rgba(6, 8, 13, 0.8);
-                backdrop-filter: blur(8px);
-                display: none;
-                align-items: center;
-                justify-content: center;
-                z-index: 9999;
-                opacity: 0;
-                transition: opacity 0.3s ease;
-            }
-            
-            .loading-overlay.show {
-                display: flex;
-                animation: fadeIn 0.3s ease forwards;
-            }
-            
-            .loading-content {
-                text-align: center;
-                animation: scaleIn 0.4s cubic-bezier(0.16, 1, 0.3, 1);
-            }
-            
-            /* Modern spinner */
-            .modern-spinner {
-                width: 64px;
-                height: 64px;
-                margin: 0 auto 24px;
-                position: relative;
-            }
-            
-            .modern-spinner::before,
-            .modern-spinner::after {
-                content: '';
-                position: absolute;
-                border-radius: 50%;
-            }
-            
-            .modern-spinner::before {
-                inset: 0;
-                border: 3px solid var(--border);
-            }
-            
-            .modern-spinner::after {
-                inset: 0;
-                border: 3px solid transparent;
-                border-top-color: var(--accent-primary);
-                animation: spin 0.8s linear infinite;
-            }
-            
-            /* Weather icon animation in loader */
-            .loading-weather-icon {
-                font-size: 2rem;
-                color: var(--accent-primary);
-                animation: float 2s ease-in-out infinite;
-                margin-bottom: 16px;
-            }
-            
-            .loading-text {
-                color: var(--text-primary);
-                font-size: 1.1rem;
-                font-weight: 500;
-                margin-bottom: 8px;
-            }
-            
-            .loading-subtext {
-                color: var(--text-secondary);
-                font-size: 0.9rem;
-            }
-            
-            /* Progress bar */
-            .loading-progress {
-                width: 200px;
-                height: 4px;
-                background: var(--border);
-                border-radius: 2px;
-                margin: 20px auto 0;
-                overflow: hidden;
-            }
-            
-            .loading-progress-bar {
-                height: 100%;
-                background: var(--accent-gradient);
-                border-radius: 2px;
-                width: 0%;
-                transition: width 0.3s ease;
-                animation: progressPulse 1.5s ease-in-out infinite;
-            }
-            
-            /* ============================================
-               INLINE LOADING STATE
-               ============================================ */
-            .loading-inline {
-                display: none;
-                text-align: center;
-                padding: 60px 40px;
-                background: var(--bg-card);
-                border-radius: 24px;
-                border: 1px solid var(--border);
-                box-shadow: var(--shadow-md);
-            }
-            
-            .loading-inline.show {
-                display: block;
-                animation: fadeSlideUp 0.4s cubic-bezier(0.16, 1, 0.3, 1);
-            }
-            
-            .loading-dots {
-                display: flex;
-                justify-content: center;
-                gap: 8px;
-                margin-bottom: 20px;
-            }
-            
-            .loading-dot {
-                width: 12px;
-                height: 12px;
-                background: var(--accent-primary);
-                border-radius: 50%;
-                animation: bounce 1.4s ease-in-out infinite;
-            }
-            
-            .loading-dot:nth-child(1) { animation-delay: 0s; }
-            .loading-dot:nth-child(2) { animation-delay: 0.2s; }
-            .loading-dot:nth-child(3) { animation-delay: 0.4s; }
-            
-            /* ============================================
-               WEATHER DISPLAY SECTION - ENHANCED
-               ============================================ */
-            .weather-display {
-                background: var(--bg-card);
-                padding: 40px;
-                border-radius: 24px;
-                border: 1px solid var(--border);
-                box-shadow: var(--shadow-md);
-                backdrop-filter: blur(20px);
-                display: none;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .weather-display::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: 0;
-                right: 0;
-                height: 1px;
-                background: linear-gradient(90deg, transparent, var(--success), transparent);
-                opacity: 0;
-                transition: opacity 0.5s ease;
-            }
-            
-            .weather-display.show {
-                display: block;
-            }
-            
-            .weather-display.show::before {
-                opacity: 0.6;
-            }
-            
-            /* Staggered reveal animation */
-            .weather-display.reveal .weather-header {
-                animation: fadeSlideUp 0.5s cubic-bezier(0.16, 1, 0.3, 1) 0s forwards;
-            }
-            
-            .weather-display.reveal .weather-main {
-                animation: fadeSlideUp 0.5s cubic-bezier(0.16, 1, 0.3, 1) 0.1s forwards;
-            }
-            
-            .weather-display.reveal .weather-details {
-                animation: fadeSlideUp 0.5s cubic-bezier(0.16, 1, 0.3, 1) 0.2s forwards;
-            }
-            
-            .weather-display.reveal .weather-header,
-            .weather-display.reveal .weather-main,
-            .weather-display.reveal .weather-details {
-                opacity: 0;
-            }
-            
-            .weather-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: flex-start;
-                margin-bottom: 32px;
-            }
-            
-            .weather-location {
-                flex: 1;
-            }
-            
-            .weather-city {
-                font-size: 2rem;
-                font-weight: 700;
-                color: var(--text-primary);
-                margin-bottom: 4px;
-                letter-spacing: -0.02em;
-            }
-            
-            .weather-country {
-                font-size: 1rem;
-                color: var(--text-secondary);
-                display: flex;
-                align-items: center;
-                gap: 6px;
-            }
-            
-            .weather-country i {
-                font-size: 0.8rem;
-            }
-            
-            .weather-icon {
-                font-size: 5rem;
-                line-height: 1;
-                background: var(--accent-gradient);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-                filter: drop-shadow(0 4px 20px rgba(56, 189, 248, 0.3));
-                transition: transform 0.3s ease;
-            }
-            
-            .weather-display.reveal .weather-icon {
-                animation: iconPop 0.6s cubic-bezier(0.34, 1.56, 0.64, 1) 0.3s forwards;
-                transform: scale(0);
-            }
-            
-            @keyframes iconPop {
-                to { transform: scale(1); }
-            }
-            
-            .weather-main {
-                text-align: center;
-                margin-bottom: 32px;
-            }
-            
-            .weather-temp {
-                font-size: 4.5rem;
-                font-weight: 800;
-                color: var(--text-primary);
-                margin-bottom: 8px;
-                line-height: 1;
-                letter-spacing: -0.04em;
-                font-family: 'JetBrains Mono', monospace;
-            }
-            
-            .weather-description {
-                font-size: 1.25rem;
-                color: var(--text-secondary);
-                text-transform: capitalize;
-                margin-bottom: 12px;
-                font-weight: 500;
-            }
-            
-            .weather-feels-like {
-                font-size: 0.95rem;
-                color: var(--text-muted);
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                gap: 6px;
-            }
-            
-            .weather-feels-like i {
-                color: var(--accent-secondary);
-            }
-            
-            .weather-details {
-                display: grid;
-                grid-template-columns: repeat(3, 1fr);
-                gap: 16px;
-            }
-            
-            .weather-detail-item {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                padding: 24px 16px;
-                background: var(--bg-secondary);
-                border-radius: 16px;
-                border: 1px solid var(--border);
-                transition: all 0.3s ease;
-            }
-            
-            .weather-detail-item:hover {
-                background: var(--bg-card-hover);
-                border-color: var(--border-hover);
-                transform: translateY(-2px);
-            }
-            
-            .weather-detail-icon {
-                font-size: 1.5rem;
-                margin-bottom: 12px;
-                background: var(--accent-gradient);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .weather-detail-label {
-                font-size: 0.8rem;
-                color: var(--text-muted);
-                margin-bottom: 6px;
-                text-transform: uppercase;
-                letter-spacing: 0.1em;
-                font-weight: 500;
-            }
-            
-            .weather-detail-value {
-                font-size: 1.5rem;
-                font-weight: 700;
-                color: var(--text-primary);
-                font-family: 'JetBrains Mono', monospace;
-            }
-            
-            /* ============================================
-               ERROR MESSAGE - ENHANCED
-               ============================================ */
-            .error-message {
-                display: none;
-                background: linear-gradient(135deg, rgba(244, 63, 94, 0.1) 0%, rgba(244, 63, 94, 0.05) 100%);
-                border: 1px solid var(--error);
-                border-radius: 16px;
-                padding: 24px;
-                margin-bottom: 24px;
-                text-align: center;
-            }
-            
-            .error-message.show {
-                display: block;
-                animation: shake 0.5s cubic-bezier(0.36, 0.07, 0.19, 0.97);
-            }
-            
-            @keyframes shake {
-                0%, 100% { transform: translateX(0); }
-                10%, 30%, 50%, 70%, 90% { transform: translateX(-4px); }
-                20%, 40%, 60%, 80% { transform: translateX(4px); }
-            }
-            
-            .error-icon {
-                font-size: 2.5rem;
-                color: var(--error);
-                margin-bottom: 12px;
-                animation: pulse 2s ease-in-out infinite;
-            }
-            
-            .error-title {
-                font-size: 1.1rem;
-                font-weight: 600;
-                color: var(--error);
-                margin-bottom: 8px;
-            }
-            
-            .error-text {
-                color: var(--text-secondary);
-                font-size: 0.95rem;
-                margin-bottom: 16px;
-            }
-            
-            .retry-button {
-                padding: 12px 24px;
-                background: var(--error);
-                border: none;
-                border-radius: 10px;
-                color: white;
-                font-family: 'Outfit', sans-serif;
-                font-size: 0.95rem;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                display: inline-flex;
-                align-items: center;
-                gap: 8px;
-            }
-            
-            .retry-button:hover {
-                background: #e11d48;
-                transform: translateY(-2px);
-                box-shadow: 0 8px 24px var(--error-glow);
-            }
-            
-            /* ============================================
-               5-DAY FORECAST SECTION - FULL WIDTH
-               ============================================ */
-            .forecast-section {
-                margin-top: 24px;
-                display: none;
-                width: 100vw;
-                position: relative;
-                left: 50%;
-                transform: translateX(-50%);
-                padding: 0 24px;
-                box-sizing: border-box;
-            }
-            
-            .forecast-section.show {
-                display: block;
-            }
-            
-            .forecast-title {
-                font-size: 1.25rem;
-                color: var(--text-primary);
-                margin-bottom: 20px;
-                display: flex;
-                align-items: center;
-                gap: 12px;
-                font-weight: 600;
-                opacity: 0;
-                animation: fadeSlideUp 0.5s cubic-bezier(0.16, 1, 0.3, 1) 0.3s forwards;
-                max-width: 1200px;
-                margin-left: auto;
-                margin-right: auto;
-            }
-            
-            .forecast-title i {
-                color: var(--accent-primary);
-            }
-            
-            .forecast-container {
-                display: grid;
-                grid-template-columns: repeat(5, 1fr);
-                gap: 16px;
-                max-width: 1200px;
-                margin: 0 auto;
-            }
-            
-            .forecast-card {
-                background: var(--bg-card);
-                border: 1px solid var(--border);
-                border-radius: 20px;
-                padding: 20px 16px;
-                text-align: center;
-                transition: all 0.3s cubic-bezier(0.16, 1, 0.3, 1);
-                opacity: 0;
-                transform: translateY(20px);
-            }
-            
-            .forecast-card.reveal {
-                animation: cardReveal 0.5s cubic-bezier(0.16, 1, 0.3, 1) forwards;
-            }
-            
-            @keyframes cardReveal {
-                to {
-                    opacity: 1;
-                    transform: translateY(0);
-                }
-            }
-            
-            .forecast-card:hover {
-                transform: translateY(-4px);
-                border-color: var(--accent-primary);
-                box-shadow: var(--shadow-glow);
-            }
-            
-            .forecast-day {
-                font-size: 0.9rem;
-                color: var(--text-secondary);
-                font-weight: 600;
-                margin-bottom: 4px;
-            }
-            
-            .forecast-date {
-                font-size: 0.75rem;
-                color: var(--text-muted);
-                margin-bottom: 12px;
-            }
-            
-            .forecast-icon {
-                font-size: 2rem;
-                margin: 8px 0;
-                background: var(--accent-gradient);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .forecast-temps {
-                margin: 12px 0 8px;
-            }
-            
-            .forecast-temp-high {
-                font-size: 1.25rem;
-                font-weight: 700;
-                color: var(--text-primary);
-                font-family: 'JetBrains Mono', monospace;
-            }
-            
-            .forecast-temp-low {
-                font-size: 1rem;
-                color: var(--text-muted);
-                margin-left: 4px;
-                font-family: 'JetBrains Mono', monospace;
-            }
-            
-            .forecast-description {
-                font-size: 0.8rem;
-                color: var(--text-secondary);
-                margin-top: 8px;
-                line-height: 1.3;
-            }
-            
-            /* Forecast skeleton */
-            .forecast-skeleton {
-                display: none;
-                margin-top: 24px;
-                width: 100vw;
-                position: relative;
-                left: 50%;
-                transform: translateX(-50%);
-                padding: 0 24px;
-                box-sizing: border-box;
-            }
-            
-            .forecast-skeleton.show {
-                display: block;
-                animation: fadeIn 0.3s ease;
-            }
-            
-            .forecast-skeleton-title {
-                width: 180px;
-                height: 24px;
-                margin-bottom: 20px;
-                max-width: 1200px;
-                margin-left: auto;
-                margin-right: auto;
-            }
-            
-            .forecast-skeleton-container {
-                display: grid;
-                grid-template-columns: repeat(5, 1fr);
-                gap: 16px;
-                max-width: 1200px;
-                margin: 0 auto;
-            }
-            
-            .forecast-skeleton-card {
-                height: 180px;
-                border-radius: 20px;
-            }
-            
-            /* ============================================
-               COMPARISON TOOL SECTION
-               ============================================ */
-            .comparison-section {
-                margin-top: 40px;
-                display: none;
-            }
-            
-            .comparison-section.show {
-                display: block;
-                animation: fadeSlideUp 0.6s cubic-bezier(0.16, 1, 0.3, 1);
-            }
-            
-            .comparison-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 24px;
-            }
-            
-            .comparison-title {
-                font-size: 1.5rem;
-                font-weight: 700;
-                color: var(--text-primary);
-                display: flex;
-                align-items: center;
-                gap: 12px;
-            }
-            
-            .comparison-title i {
-                background: var(--accent-gradient);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .comparison-count {
-                background: var(--bg-secondary);
-                padding: 6px 14px;
-                border-radius: 12px;
-                font-size: 0.85rem;
-                font-weight: 600;
-                color: var(--accent-primary);
-                border: 1px solid var(--border);
-            }
-            
-            .comparison-actions {
-                display: flex;
-                gap: 12px;
-            }
-            
-            .clear-comparison-btn {
-                padding: 10px 18px;
-                background: var(--bg-secondary);
-                border: 1px solid var(--border);
-                border-radius: 12px;
-                color: var(--text-secondary);
-                font-size: 0.9rem;
-                font-weight: 500;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                display: flex;
-                align-items: center;
-                gap: 8px;
-            }
-            
-            .clear-comparison-btn:hover {
-                background: var(--bg-card-hover);
-                border-color: var(--error);
-                color: var(--error);
-                transform: translateY(-2px);
-            }
-            
-            .add-to-comparison-btn {
-                background: var(--comparison-highlight);
-                color: #000;
-                padding: 12px 20px;
-                border: none;
-                border-radius: 12px;
-                font-size: 0.95rem;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                display: flex;
-                align-items: center;
-                gap: 8px;
-                margin-top: 16px;
-                width: 100%;
-                justify-content: center;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .add-to-comparison-btn::before {
-                content: '';
-                position: absolute;
-                inset: 0;
-                background: linear-gradient(135deg, rgba(255,255,255,0.3) 0%, transparent 50%);
-                opacity: 0;
-                transition: opacity 0.3s ease;
-            }
-            
-            .add-to-comparison-btn:hover::before {
-                opacity: 1;
-            }
-            
-            .add-to-comparison-btn:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 8px 24px var(--comparison-highlight-glow);
-            }
-            
-            .add-to-comparison-btn:disabled {
-                opacity: 0.5;
-                cursor: not-allowed;
-                transform: none;
-            }
-            
-            .add-to-comparison-btn.added {
-                background: var(--success);
-                color: white;
-            }
-            
-            .add-to-comparison-btn.added i {
-                animation: checkmark 0.5s ease;
-            }
-            
-            .comparison-container {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-                gap: 20px;
-            }
-            
-            .comparison-card {
-                background: var(--bg-card);
-                border: 2px solid var(--border);
-                border-radius: 20px;
-                padding: 24px;
-                position: relative;
-                transition: all 0.3s ease;
-                animation: scaleIn 0.4s cubic-bezier(0.16, 1, 0.3, 1);
-            }
-            
-            .comparison-card:hover {
-                border-color: var(--comparison-highlight);
-                box-shadow: 0 8px 32px var(--comparison-highlight-glow);
-                transform: translateY(-4px);
-            }
-            
-            .comparison-card.best-temp {
-                border-color: var(--comparison-best);
-                background: linear-gradient(135deg, var(--bg-card) 0%, rgba(16, 185, 129, 0.05) 100%);
-            }
-            
-            .comparison-card.worst-temp {
-                border-color: var(--comparison-worst);
-                background: linear-gradient(135deg, var(--bg-card) 0%, rgba(239, 68, 68, 0.05) 100%);
-            }
-            
-            .comparison-badge {
-                position: absolute;
-                top: 12px;
-                right: 12px;
-                padding: 4px 10px;
-                border-radius: 8px;
-                font-size: 0.75rem;
-                font-weight: 600;
-                display: flex;
-                align-items: center;
-                gap: 4px;
-            }
-            
-            .comparison-badge.warmest {
-                background: var(--comparison-best);
-                color: white;
-            }
-            
-            .comparison-badge.coldest {
-                background: var(--comparison-worst);
-                color: white;
-            }
-            
-            .comparison-card-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: flex-start;
-                margin-bottom: 20px;
-                padding-right: 60px;
-            }
-            
-            .comparison-location {
-                flex: 1;
-            }
-            
-            .comparison-city {
-                font-size: 1.25rem;
-                font-weight: 700;
-                color: var(--text-primary);
-                margin-bottom: 4px;
-            }
-            
-            .comparison-country {
-                font-size: 0.85rem;
-                color: var(--text-secondary);
-                display: flex;
-                align-items: center;
-                gap: 6px;
-            }
-            
-            .comparison-icon {
-                font-size: 3rem;
-                background: var(--accent-gradient);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .comparison-temp {
-                font-size: 2.5rem;
-                font-weight: 800;
-                color: var(--text-primary);
-                font-family: 'JetBrains Mono', monospace;
-                margin: 12px 0;
-                position: relative;
-            }
-            
-            .comparison-temp-indicator {
-                position: absolute;
-                right: -30px;
-                top: 50%;
-                transform: translateY(-50%);
-                font-size: 1.5rem;
-            }
-            
-            .comparison-temp-indicator.up {
-                color: var(--comparison-worst);
-            }
-            
-            .comparison-temp-indicator.down {
-                color: var(--comparison-best);
-            }
-            
-            .comparison-description {
-                font-size: 0.9rem;
-                color: var(--text-secondary);
-                margin-bottom: 16px;
-                text-transform: capitalize;
-            }
-            
-            .comparison-metrics {
-                display: grid;
-                grid-template-columns: repeat(3, 1fr);
-                gap: 12px;
-                margin-top: 16px;
-                padding-top: 16px;
-                border-top: 1px solid var(--border);
-            }
-            
-            .comparison-metric {
-                text-align: center;
-            }
-            
-            .comparison-metric-label {
-                font-size: 0.75rem;
-                color: var(--text-muted);
-                margin-bottom: 4px;
-                display: block;
-            }
-            
-            .comparison-metric-value {
-                font-size: 0.95rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                gap: 4px;
-            }
-            
-            .comparison-metric i {
-                color: var(--accent-primary);
-                font-size: 0.85rem;
-            }
-            
-            .remove-comparison-btn {
-                position: absolute;
-                top: 12px;
-                left: 12px;
-                width: 32px;
-                height: 32px;
-                background: var(--bg-secondary);
-                border: 1px solid var(--border);
-                border-radius: 8px;
-                color: var(--text-muted);
-                cursor: pointer;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                transition: all 0.3s ease;
-                z-index: 10;
-            }
-            
-            .remove-comparison-btn:hover {
-                background: var(--error);
-                border-color: var(--error);
-                color: white;
-                transform: scale(1.1);
-            }
-            
-            .comparison-empty {
-                text-align: center;
-                padding: 60px 40px;
-                background: var(--bg-card);
-                border: 2px dashed var(--border);
-                border-radius: 20px;
-                color: var(--text-secondary);
-            }
-            
-            .comparison-empty i {
-                font-size: 3rem;
-                color: var(--text-muted);
-                margin-bottom: 16px;
-                opacity: 0.5;
-            }
-            
-            .comparison-empty-title {
-                font-size: 1.1rem;
-                font-weight: 600;
-                color: var(--text-primary);
-                margin-bottom: 8px;
-            }
-            
-            .comparison-empty-text {
-                font-size: 0.9rem;
-            }
-            
-            /* ============================================
-               SUCCESS INDICATOR
-               ============================================ */
-            .success-indicator {
-                position: fixed;
-                top: 24px;
-                right: 24px;
-                background: var(--success);
-                color: white;
-                padding: 12px 20px;
-                border-radius: 12px;
-                display: flex;
-                align-items: center;
-                gap: 10px;
-                font-weight: 500;
-                box-shadow: 0 8px 32px var(--success-glow);
-                opacity: 0;
-                transform: translateX(100%);
-                transition: all 0.4s cubic-bezier(0.16, 1, 0.3, 1);
-                z-index: 9999;
-            }
-            
-            .success-indicator.show {
-                opacity: 1;
-                transform: translateX(0);
-            }
-            
-            .success-indicator i {
-                font-size: 1.1rem;
-            }
-            
-            /* ============================================
-               RESPONSIVE DESIGN
-               ============================================ */
-            @media (max-width: 768px) {
-                body {
-                    padding: 16px;
-                }
-                
-                .container {
-                    max-width: 100%;
-                }
-                
-                header {
-                    margin-bottom: 32px;
-                }
-                
-                h1 {
-                    font-size: 1.75rem;
-                    gap: 12px;
-                }
-                
-                .search-section {
-                    padding: 24px;
-                    border-radius: 20px;
-                }
-                
-                .search-form {
-                    flex-direction: column;
-                }
-                
-                .search-button {
-                    width: 100%;
-                }
-                
-                .weather-display {
-                    padding: 32px 24px;
-                    border-radius: 20px;
-                }
-                
-                .weather-header {
-                    flex-direction: column;
-                    align-items: center;
-                    text-align: center;
-                    gap: 16px;
-                }
-                
-                .weather-country {
-                    justify-content: center;
-                }
-                
-                .weather-temp {
-                    font-size: 3.5rem;
-                }
-                
-                .weather-icon {
-                    font-size: 4rem;
-                }
-                
-                .weather-details {
-                    grid-template-columns: repeat(3, 1fr);
-                    gap: 12px;
-                }
-                
-                .weather-detail-item {
-                    padding: 16px 12px;
-                }
-                
-                .weather-detail-value {
-                    font-size: 1.25rem;
-                }
-                
-                .forecast-container {
-                    grid-template-columns: repeat(5, 1fr);
-                    gap: 12px;
-                }
-                
-                .forecast-card {
-                    padding: 16px 8px;
-                    border-radius: 16px;
-                }
-                
-                .forecast-icon {
-                    font-size: 1.5rem;
-                }
-                
-                .forecast-skeleton-container {
-                    grid-template-columns: repeat(5, 1fr);
-                    gap: 8px;
-                }
-                
-                .forecast-section {
-                    padding: 0 16px;
-                }
-                
-                .comparison-container {
-                    grid-template-columns: 1fr;
-                }
-                
-                .comparison-header {
-                    flex-direction: column;
-                    gap: 16px;
-                    align-items: stretch;
-                }
-                
-                .comparison-actions {
-                    width: 100%;
-                }
-                
-                .clear-comparison-btn {
-                    flex: 1;
-                    justify-content: center;
-                }
-            }
-            
-            @media (max-width: 480px) {
-                .weather-details {
-                    grid-template-columns: 1fr;
-                }
-                
-                .forecast-container {
-                    grid-template-columns: repeat(2, 1fr);
-                }
-                
-                .forecast-skeleton-container {
-                    grid-template-columns: repeat(2, 1fr);
-                }
-                
-                .weather-skeleton-details {
-                    grid-template-columns: 1fr;
-                }
-                
-                .comparison-card-header {
-                    padding-right: 0;
-                }
-                
-                .comparison-temp {
-                    font-size: 2rem;
-                }
-                
-                .comparison-metrics {
-                    grid-template-columns: 1fr;
-                    gap: 8px;
-                }
-            }
-
-            /* ============================================
-               CLOTHING RECOMMENDATIONS
-               ============================================ */
-            .clothing-recommendations {
-                margin-top: 30px;
-                padding: 25px;
-                background: var(--bg-card);
-                border: 1px solid var(--border);
-                border-radius: 16px;
-                animation: fadeIn 0.5s ease;
-            }
 
-            .clothing-title {
-                font-size: 1.2rem;
-                color: var(--text-primary);
-                margin-bottom: 20px;
-                display: flex;
-                align-items: center;
-                gap: 10px;
-            }
+# -----------------------------------------------
+# Frontend
+# -----------------------------------------------
+# Loaded, fingerprinted and compressed once at startup
+static_assets = StaticAssets(STATIC_DIR)
 
-            .clothing-title i {
-                color: var(--accent);
-                font-size: 1.3rem;
-            }
 
-            .clothing-items {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(140px, 1fr));
-                gap: 15px;
-            }
+@app.get("/", include_in_schema=False)
+def read_root(request: Request):
+    """Serve the single-page frontend (revalidated with its ETag on every visit)."""
+    return static_assets.response(
+        static_assets.page("index.html"), request, cache_control=REVALIDATE_CACHE_CONTROL
+    )
 
-            .clothing-item {
-                display: flex;
-                align-items: center;
-                gap: 12px;
-                padding: 15px;
-                background: var(--bg-secondary);
-                border: 1px solid var(--border);
-                border-radius: 12px;
-                transition: all 0.3s ease;
-            }
 
-            .clothing-item:hover {
-                transform: translateY(-3px);
-                box-shadow: 0 4px 12px var(--shadow);
-                border-color: var(--accent);
-            }
+@app.get("/static/{asset_path:path}", include_in_schema=False)
+def read_static(asset_path: str, request: Request):
+    """Serve a fingerprinted CSS/JS asset; its URL changes whenever its content does."""
+    asset = static_assets.lookup(f"/static/{asset_path}")
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return static_assets.response(asset, request)
 
-            .clothing-icon {
-                font-size: 2rem;
-                flex-shrink: 0;
-            }
 
-            .clothing-text {
-                font-size: 0.95rem;
-                color: var(--text-primary);
-                font-weight: 500;
-            }
-
-            @media (max-width: 768px) {
-                .clothing-items {
-                    grid-template-columns: repeat(2, 1fr);
-                }
-                
-                .clothing-item {
-                    padding: 12px;
-                }
-                
-                .clothing-icon {
-                    font-size: 1.5rem;
-                }
-                
-                .clothing-text {
-                    font-size: 0.85rem;
-                }
-            }
-        </style>
-    </head>
-    <body>
-        <!-- Success indicator toast -->
-        <div class="success-indicator" id="successIndicator">
-            <i class="fas fa-check-circle"></i>
-            <span>Weather loaded successfully</span>
-        </div>
-        
-        <!-- Main container -->
-        <div class="container">
-            <!-- Header section -->
-            <header>
-                <h1><i class="fas fa-cloud-sun"></i> Weather Watcher</h1>
-                <p class="subtitle">Real-time weather at your fingertips</p>
-                <!-- Temperature Unit Toggle -->
-                <div class="temperature-toggle-container">
-                    <button class="temperature-toggle" id="temperatureToggle" aria-label="Toggle temperature unit">
-                        <span class="temp-unit active" id="tempUnitC">°C</span>
-                        <span class="temp-unit" id="tempUnitF">°F</span>
-                    </button>
-                </div>
-            </header>
-            
-            <!-- Search form section -->
-            <section class="search-section" aria-label="Search for weather">
-                <form class="search-form" id="weatherForm" role="search">
-                    <div class="autocomplete-wrapper">
-                        <input
-                            type="text"
-                            class="search-input"
-                            id="cityInput"
-                            placeholder="Search any city worldwide..."
-                            aria-label="City name"
-                            required
-                            autocomplete="off"
-                        >
-                        <div id="autocompleteDropdown" class="autocomplete-dropdown"></div>
-                    </div>
-                    <button type="submit" class="search-button" id="searchButton" aria-label="Search weather">
-                        <span class="button-text">
-                            <i class="fas fa-search" aria-hidden="true"></i>
-                            Search
-                        </span>
-                        <div class="button-spinner"></div>
-                    </button>
-                </form>
-            </section>
-            
-            <!-- Error message container -->
-            <div class="error-message" id="errorMessage" role="alert" aria-live="polite">
-                <div class="error-icon"><i class="fas fa-exclamation-triangle"></i></div>
-                <div class="error-title">Unable to fetch weather</div>
-                <div class="error-text" id="errorText"></div>
-                <button class="retry-button" id="retryButton">
-                    <i class="fas fa-redo"></i>
-                    Try Again
-                </button>
-            </div>
-            
-            <!-- Inline loading state with skeleton -->
-            <div class="loading-inline" id="loadingInline">
-                <div class="loading-dots">
-                    <div class="loading-dot"></div>
-                    <div class="loading-dot"></div>
-                    <div class="loading-dot"></div>
-                </div>
-                <div class="loading-weather-icon">
-                    <i class="fas fa-cloud-sun-rain"></i>
-                </div>
-                <div class="loading-text">Fetching weather data...</div>
-                <div class="loading-subtext" id="loadingSubtext">Locating city coordinates</div>
-                <div class="loading-progress">
-                    <div class="loading-progress-bar" id="loadingProgressBar"></div>
-                </div>
-            </div>
-            
-            <!-- Weather skeleton loader -->
-            <div class="weather-skeleton" id="weatherSkeleton">
-                <div class="weather-skeleton-header">
-                    <div class="weather-skeleton-location">
-                        <div class="skeleton weather-skeleton-city"></div>
-                        <div class="skeleton weather-skeleton-country"></div>
-                    </div>
-                    <div class="skeleton weather-skeleton-icon skeleton-circle"></div>
-                </div>
-                <div class="weather-skeleton-main">
-                    <div class="skeleton weather-skeleton-temp"></div>
-                    <div class="skeleton weather-skeleton-desc"></div>
-                    <div class="skeleton weather-skeleton-feels"></div>
-                </div>
-                <div class="weather-skeleton-details">
-                    <div class="skeleton weather-skeleton-detail"></div>
-                    <div class="skeleton weather-skeleton-detail"></div>
-                    <div class="skeleton weather-skeleton-detail"></div>
-                </div>
-            </div>
-            
-            <!-- Weather display section -->
-            <section class="weather-display" id="weatherDisplay" aria-label="Weather information">
-                <div class="weather-header">
-                    <div class="weather-location">
-                        <h2 class="weather-city" id="weatherCity"></h2>
-                        <p class="weather-country" id="weatherCountry">
-                            <i class="fas fa-map-marker-alt"></i>
-                            <span id="weatherCountryText"></span>
-                        </p>
-                    </div>
-                    <div class="weather-icon" id="weatherIcon" aria-hidden="true"></div>
-                </div>
-                
-                <div class="weather-main">
-                    <div class="weather-temp" id="weatherTemp"></div>
-                    <p class="weather-description" id="weatherDescription"></p>
-                    <p class="weather-feels-like" id="weatherFeelsLike">
-                        <i class="fas fa-temperature-low"></i>
-                        <span id="weatherFeelsLikeText"></span>
-                    </p>
-                </div>
-                
-                <div class="weather-details" role="list">
-                    <div class="weather-detail-item" role="listitem">
-                        <i class="fas fa-tint weather-detail-icon" aria-hidden="true"></i>
-                        <span class="weather-detail-label">Humidity</span>
-                        <span class="weather-detail-value" id="weatherHumidity"></span>
-                    </div>
-                    <div class="weather-detail-item" role="listitem">
-                        <i class="fas fa-wind weather-detail-icon" aria-hidden="true"></i>
-                        <span class="weather-detail-label">Wind</span>
-                        <span class="weather-detail-value" id="weatherWind"></span>
-                    </div>
-                    <div class="weather-detail-item" role="listitem">
-                        <i class="fas fa-compress-arrows-alt weather-detail-icon" aria-hidden="true"></i>
-                        <span class="weather-detail-label">Pressure</span>
-                        <span class="weather-detail-value" id="weatherPressure"></span>
-                    </div>
-                </div>
-
-                <!-- Clothing Recommendations Section -->
-                <div class="clothing-recommendations" id="clothingRecommendations" style="display: none;">
-                    <h3 class="clothing-title">
-                        <i class="fas fa-tshirt"></i> What to Wear
-                    </h3>
-                    <div class="clothing-items" id="clothingItems">
-                        <!-- Items will be added by JavaScript -->
-                    </div>
-                </div>
-
-                <!-- Add to Comparison Button -->
-                <button class="add-to-comparison-btn" id="addToComparisonBtn">
-                    <i class="fas fa-plus"></i>
-                    <span id="addToComparisonText">Add to Comparison</span>
-                </button>
-            </section>
-            
-            <!-- Forecast skeleton -->
-            <div class="forecast-skeleton" id="forecastSkeleton">
-                <div class="skeleton forecast-skeleton-title"></div>
-                <div class="forecast-skeleton-container">
-                    <div class="skeleton forecast-skeleton-card"></div>
-                    <div class="skeleton forecast-skeleton-card"></div>
-                    <div class="skeleton forecast-skeleton-card"></div>
-                    <div class="skeleton forecast-skeleton-card"></div>
-                    <div class="skeleton forecast-skeleton-card"></div>
-                </div>
-            </div>
-            
-            <!-- 5-Day Forecast Section -->
-            <section class="forecast-section" id="forecastSection">
-                <h2 class="forecast-title">
-                    <i class="fas fa-calendar-week"></i> 5-Day Forecast
-                </h2>
-                <div class="forecast-container" id="forecastContainer"></div>
-            </section>
-            
-            <!-- Weather Comparison Section -->
-            <section class="comparison-section" id="comparisonSection">
-                <div class="comparison-header">
-                    <div>
-                        <h2 class="comparison-title">
-                            <i class="fas fa-balance-scale"></i>
-                            Weather Comparison
-                        </h2>
-                        <span class="comparison-count" id="comparisonCount">0 cities</span>
-                    </div>
-                    <div class="comparison-actions">
-                        <button class="clear-comparison-btn" id="clearComparisonBtn">
-                            <i class="fas fa-trash"></i>
-                            Clear All
-                        </button>
-                    </div>
-                </div>
-                <div class="comparison-container" id="comparisonContainer">
-                    <div class="comparison-empty">
-                        <i class="fas fa-cloud-sun"></i>
-                        <div class="comparison-empty-title">No cities to compare</div>
-                        <div class="comparison-empty-text">Search for a city and click "Add to Comparison" to start comparing weather data</div>
-                    </div>
-                </div>
-            </section>
-        </div>
-        
-        <!-- JavaScript -->
-        <script>
-        document.addEventListener('DOMContentLoaded', () => {
-            // ============================================
-            // DOM ELEMENTS
-            // ============================================
-            const cityInput = document.getElementById('cityInput');
-            const searchButton = document.getElementById('searchButton');
-            const autocompleteDropdown = document.getElementById('autocompleteDropdown');
-            const weatherForm = document.getElementById('weatherForm');
-            const weatherDisplay = document.getElementById('weatherDisplay');
-            const loadingInline = document.getElementById('loadingInline');
-            const loadingSubtext = document.getElementById('loadingSubtext');
-            const loadingProgressBar = document.getElementById('loadingProgressBar');
-            const weatherSkeleton = document.getElementById('weatherSkeleton');
-            const errorMessage = document.getElementById('errorMessage');
-            const errorText = document.getElementById('errorText');
-            const retryButton = document.getElementById('retryButton');
-            const successIndicator = document.getElementById('successIndicator');
-            const forecastSection = document.getElementById('forecastSection');
-            const forecastContainer = document.getElementById('forecastContainer');
-            const forecastSkeleton = document.getElementById('forecastSkeleton');
-            
-            // Weather display elements
-            const weatherCity = document.getElementById('weatherCity');
-            const weatherCountryText = document.getElementById('weatherCountryText');
-            const weatherIcon = document.getElementById('weatherIcon');
-            const weatherTemp = document.getElementById('weatherTemp');
-            const weatherDescription = document.getElementById('weatherDescription');
-            const weatherFeelsLikeText = document.getElementById('weatherFeelsLikeText');
-            const weatherHumidity = document.getElementById('weatherHumidity');
-            const weatherWind = document.getElementById('weatherWind');
-            const weatherPressure = document.getElementById('weatherPressure');
-            
-            // Comparison elements
-            const addToComparisonBtn = document.getElementById('addToComparisonBtn');
-            const addToComparisonText = document.getElementById('addToComparisonText');
-            const comparisonSection = document.getElementById('comparisonSection');
-            const comparisonContainer = document.getElementById('comparisonContainer');
-            const comparisonCount = document.getElementById('comparisonCount');
-            const clearComparisonBtn = document.getElementById('clearComparisonBtn');
-            
-            // State
-            let autocompleteTimeout = null;
-            let selectedIndex = -1;
-            let currentCity = '';
-            let loadingInterval = null;
-            let currentWeatherData = null;
-            let comparisonCities = [];
-            
-            // Temperature unit management
-            const temperatureToggle = document.getElementById('temperatureToggle');
-            const tempUnitC = document.getElementById('tempUnitC');
-            const tempUnitF = document.getElementById('tempUnitF');
-            
-            // Get unit from localStorage or default to Celsius
-            let temperatureUnit = localStorage.getItem('temperatureUnit') || 'C';
-            
-            // Initialize toggle state
-            function initializeTemperatureToggle() {
-                if (temperatureUnit === 'F') {
-                    tempUnitC.classList.remove('active');
-                    tempUnitF.classList.add('active');
-                } else {
-                    tempUnitC.classList.add('active');
-                    tempUnitF.classList.remove('active');
-                }
-            }
-            
-            // Temperature conversion functions
-            function celsiusToFahrenheit(celsius) {
-                return Math.round((celsius * 9/5) + 32);
-            }
-            
-            function fahrenheitToCelsius(fahrenheit) {
-                return Math.round((fahrenheit - 32) * 5/9);
-            }
-            
-            // Convert temperature based on current unit
-            function convertTemperature(celsius) {
-                if (temperatureUnit === 'F') {
-                    return celsiusToFahrenheit(celsius);
-                }
-                return celsius;
-            }
-            
-            // Get temperature unit symbol
-            function getTemperatureUnitSymbol() {
-                return temperatureUnit === 'F' ? '°F' : '°C';
-            }
-            
-            // Toggle temperature unit
-            function toggleTemperatureUnit() {
-                temperatureUnit = temperatureUnit === 'C' ? 'F' : 'C';
-                localStorage.setItem('temperatureUnit', temperatureUnit);
-                
-                // Update toggle button appearance
-                if (temperatureUnit === 'F') {
-                    tempUnitC.classList.remove('active');
-                    tempUnitF.classList.add('active');
-                } else {
-                    tempUnitC.classList.add('active');
-                    tempUnitF.classList.remove('active');
-                }
-                
-                // Update all displayed temperatures
-                if (currentWeatherData) {
-                    displayWeather(currentWeatherData);
-                }
-                
-                // Update forecast if displayed
-                if (forecastSection.classList.contains('show')) {
-                    const city = currentCity || currentWeatherData?.city;
-                    if (city) {
-                        fetchForecast(city);
-                    }
-                }
-                
-                // Update comparison view if there are cities
-                if (comparisonCities.length > 0) {
-                    updateComparisonView();
-                }
-            }
-            
-            // Initialize on page load
-            initializeTemperatureToggle();
-            
-            // Add event listener for toggle button
-            temperatureToggle.addEventListener('click', toggleTemperatureUnit);
-            
-            // ============================================
-            // WEATHER ICON MAPPING
-            // ============================================
-            const weatherIconMap = {
-                '01d': 'fa-sun',
-                '01n': 'fa-moon',
-                '02d': 'fa-cloud-sun',
-                '02n': 'fa-cloud-moon',
-                '03d': 'fa-cloud',
-                '03n': 'fa-cloud',
-                '04d': 'fa-cloud',
-                '04n': 'fa-cloud',
-                '09d': 'fa-cloud-rain',
-                '09n': 'fa-cloud-rain',
-                '10d': 'fa-cloud-sun-rain',
-                '10n': 'fa-cloud-moon-rain',
-                '11d': 'fa-bolt',
-                '11n': 'fa-bolt',
-                '13d': 'fa-snowflake',
-                '13n': 'fa-snowflake',
-                '50d': 'fa-smog',
-                '50n': 'fa-smog'
-            };
-            
-            function getWeatherIcon(iconCode) {
-                const iconClass = weatherIconMap[iconCode] || 'fa-cloud';
-                return `<i class="fas ${iconClass}"></i>`;
-            }
-            
-            // ============================================
-            // LOADING STATE MANAGEMENT
-            // ============================================
-            const loadingMessages = [
-                'Locating city coordinates',
-                'Connecting to weather service',
-                'Fetching current conditions',
-                'Processing weather data',
-                'Almost there...'
-            ];
-            
-            function showLoadingState() {
-                // Hide other states
-                weatherDisplay.classList.remove('show', 'reveal');
-                forecastSection.classList.remove('show');
-                errorMessage.classList.remove('show');
-                
-                // Show loading
-                loadingInline.classList.add('show');
-                
-                // Add loading class to button
-                searchButton.classList.add('loading');
-                searchButton.disabled = true;
-                
-                // Animate progress bar and messages
-                let progress = 0;
-                let messageIndex = 0;
-                
-                loadingProgressBar.style.width = '0%';
-                loadingSubtext.textContent = loadingMessages[0];
-                
-                loadingInterval = setInterval(() => {
-                    progress += Math.random() * 15 + 5;
-                    if (progress > 90) progress = 90;
-                    loadingProgressBar.style.width = `${progress}%`;
-                    
-                    // Update message
-                    const newIndex = Math.min(Math.floor(progress / 20), loadingMessages.length - 1);
-                    if (newIndex !== messageIndex) {
-                        messageIndex = newIndex;
-                        loadingSubtext.style.opacity = '0';
-                        setTimeout(() => {
-                            loadingSubtext.textContent = loadingMessages[messageIndex];
-                            loadingSubtext.style.opacity = '1';
-                        }, 150);
-                    }
-                }, 300);
-            }
-            
-            function showSkeletonState() {
-                loadingInline.classList.remove('show');
-                weatherSkeleton.classList.add('show');
-                forecastSkeleton.classList.add('show');
-            }
-            
-            function hideLoadingState() {
-                // Clear interval
-                if (loadingInterval) {
-                    clearInterval(loadingInterval);
-                    loadingInterval = null;
-                }
-                
-                // Complete progress bar
-                loadingProgressBar.style.width = '100%';
-                
-                // Delay hiding for smooth transition
-                setTimeout(() => {
-                    loadingInline.classList.remove('show');
-                    weatherSkeleton.classList.remove('show');
-                    forecastSkeleton.classList.remove('show');
-                    searchButton.classList.remove('loading');
-                    searchButton.disabled = false;
-                }, 200);
-            }
-            
-            function showSuccessToast() {
-                successIndicator.classList.add('show');
-                setTimeout(() => {
-                    successIndicator.classList.remove('show');
-                }, 3000);
-            }
-            
-            function showError(message) {
-                hideLoadingState();
-                errorText.textContent = message;
-                errorMessage.classList.add('show');
-                weatherDisplay.classList.remove('show');
-                forecastSection.classList.remove('show');
-            }
-            
-            function hideError() {
-                errorMessage.classList.remove('show');
-            }
-            
-            // ============================================
-            // AUTOCOMPLETE FUNCTIONALITY
-            // ============================================
-            function handleAutocomplete() {
-                const query = cityInput.value.trim();
-                if (autocompleteTimeout) clearTimeout(autocompleteTimeout);
-                if (query.length < 2) {
-                    hideAutocomplete();
-                    return;
-                }
-                autocompleteTimeout = setTimeout(() => fetchAutocomplete(query), 300);
-            }
-            
-            async function fetchAutocomplete(query) {
-                try {
-                    showAutocompleteLoading();
-                    const response = await fetch(`/api/cities/autocomplete?query=${encodeURIComponent(query)}`);
-                    if (!response.ok) throw new Error('Failed');
-                    const data = await response.json();
-                    displayAutocomplete(data.suggestions || []);
-                } catch (error) {
-                    console.error('Autocomplete error:', error);
-                    hideAutocomplete();
-                }
-            }
-            
-            function displayAutocomplete(suggestions) {
-                if (suggestions.length === 0) {
-                    showAutocompleteEmpty();
-                    return;
-                }
-                
-                autocompleteDropdown.innerHTML = '';
-                selectedIndex = -1;
-                
-                suggestions.forEach((suggestion, index) => {
-                    const item = document.createElement('div');
-                    item.className = 'autocomplete-item';
-                    item.innerHTML = `<i class="fas fa-map-marker-alt"></i><span>${suggestion.display}</span>`;
-                    item.addEventListener('click', () => selectSuggestion(suggestion));
-                    item.dataset.city = suggestion.city;
-                    item.dataset.index = index;
-                    autocompleteDropdown.appendChild(item);
-                });
-                
-                autocompleteDropdown.classList.add('show');
-            }
-            
-            function showAutocompleteLoading() {
-                autocompleteDropdown.innerHTML = '<div class="autocomplete-loading"><i class="fas fa-circle-notch fa-spin"></i> Searching cities...</div>';
-                autocompleteDropdown.classList.add('show');
-            }
-            
-            function showAutocompleteEmpty() {
-                autocompleteDropdown.innerHTML = '<div class="autocomplete-empty"><i class="fas fa-search"></i> No cities found</div>';
-                autocompleteDropdown.classList.add('show');
-            }
-            
-            function hideAutocomplete() {
-                if (!autocompleteDropdown.classList.contains('show')) return;
-                
-                // Add hiding animation
-                autocompleteDropdown.classList.add('hiding');
-                
-                // Remove classes after animation completes
-                setTimeout(() => {
-                    autocompleteDropdown.classList.remove('show', 'hiding');
-                    autocompleteDropdown.innerHTML = '';
-                    selectedIndex = -1;
-                }, 200);
-            }
-            
-            function selectSuggestion(suggestion) {
-                cityInput.value = suggestion.city;
-                hideAutocomplete();
-                weatherForm.dispatchEvent(new Event('submit'));
-            }
-            
-            // Keyboard navigation
-            cityInput.addEventListener('keydown', (e) => {
-                const items = autocompleteDropdown.querySelectorAll('.autocomplete-item');
-                if (!items.length) return;
-                
-                if (e.key === 'ArrowDown') {
-                    e.preventDefault();
-                    selectedIndex = (selectedIndex + 1) % items.length;
-                    updateSelection(items);
-                } else if (e.key === 'ArrowUp') {
-                    e.preventDefault();
-                    selectedIndex = selectedIndex <= 0 ? items.length - 1 : selectedIndex - 1;
-                    updateSelection(items);
-                } else if (e.key === 'Enter') {
-                    if (selectedIndex >= 0 && items[selectedIndex]) {
-                        e.preventDefault();
-                        cityInput.value = items[selectedIndex].dataset.city;
-                        hideAutocomplete();
-                        weatherForm.dispatchEvent(new Event('submit'));
-                    }
-                } else if (e.key === 'Escape') {
-                    hideAutocomplete();
-                }
-            });
-            
-            function updateSelection(items) {
-                items.forEach((item, index) => {
-                    if (index === selectedIndex) {
-                        item.classList.add('active');
-                        item.scrollIntoView({ block: 'nearest', behavior: 'smooth' });
-                    } else {
-                        item.classList.remove('active');
-                    }
-                });
-            }
-            
-            document.addEventListener('click', (e) => {
-                if (!e.target.closest('.autocomplete-wrapper')) hideAutocomplete();
-            });
-            
-            cityInput.addEventListener('input', handleAutocomplete);
-            
-            cityInput.addEventListener('focus', () => {
-                // Don't trigger autocomplete on focus - wait for user to type
-                // This prevents the jarring jump when clicking back into the search box
-            });
-            
-            // ============================================
-            // WEATHER FETCH
-            // ============================================
-            async function fetchWeather(city, retryCount = 0) {
-                try {
-                    showLoadingState();
-                    hideError();
-                    hideAutocomplete();
-                    currentCity = city;
-                    
-                    // Simulate slight delay for better UX (shows loading states)
-                    await new Promise(resolve => setTimeout(resolve, 500));
-                    
-                    // Show skeleton after initial loading animation
-                    showSkeletonState();
-                    
-                    const response = await fetch(`/api/weather?city=${encodeURIComponent(city)}`);
-                    
-                    if (!response.ok) {
-                        const errorData = await response.json().catch(() => ({ detail: 'Unknown error' }));
-                        throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
-                    }
-                    
-                    const data = await response.json();
-                    
-                    // Hide loading and display weather
-                    hideLoadingState();
-                    displayWeather(data);
-                    showSuccessToast();
-                    
-                    // Show weather display
-                    weatherDisplay.classList.add('show');
-            
-                    // Display clothing recommendations
-                    displayClothingRecommendations(data.temperature, data.description, data.wind_speed);
-            
-                    // Fetch and display 5-day forecast
-                    fetchForecast(data.city);
-                    
-                } catch (error) {
-                    console.error('Weather fetch error:', error);
-                    
-                    let errorMsg = 'Failed to fetch weather data. ';
-                    
-                    if (error.message.includes('404') || error.message.includes('not found')) {
-                        errorMsg = `City "${city}" not found. Please check the spelling and try again.`;
-                    } else if (error.message.includes('timeout')) {
-                        errorMsg = 'Request timed out. The weather service is taking too long to respond.';
-                    } else if (error.message.includes('network') || error.message.includes('Failed to fetch')) {
-                        errorMsg = 'Network error. Please check your internet connection.';
-                    } else {
-                        errorMsg += error.message;
-                    }
-                    
-                    showError(errorMsg);
-                    
-                    if (retryCount < 2) {
-                        retryButton.onclick = () => fetchWeather(city, retryCount + 1);
-                        retryButton.style.display = 'inline-flex';
-                    } else {
-                        retryButton.style.display = 'none';
-                    }
-                }
-            }
-            
-            // ============================================
-            // DISPLAY WEATHER DATA
-            // ============================================
-            function displayWeather(data) {
-                // Store current weather data for comparison
-                currentWeatherData = data;
-                
-                // Convert temperatures based on selected unit
-                const displayTemp = convertTemperature(data.temperature);
-                const displayFeelsLike = convertTemperature(data.feels_like);
-                const unitSymbol = getTemperatureUnitSymbol();
-                
-                weatherCity.textContent = data.city;
-                weatherCountryText.textContent = data.country || '';
-                weatherIcon.innerHTML = getWeatherIcon(data.icon);
-                weatherTemp.textContent = `${displayTemp}${unitSymbol}`;
-                weatherDescription.textContent = data.description;
-                weatherFeelsLikeText.textContent = `Feels like ${displayFeelsLike}${unitSymbol}`;
-                weatherHumidity.textContent = `${data.humidity}%`;
-                weatherWind.textContent = `${data.wind_speed} m/s`;
-                weatherPressure.textContent = `${data.pressure} hPa`;
-                
-                // Show with staggered reveal animation
-                weatherDisplay.classList.add('show', 'reveal');
-                cityInput.blur();
-                
-                // Enable/update add to comparison button
-                const existingCity = comparisonCities.find(c => 
-                    c.city.toLowerCase() === data.city.toLowerCase()
-                );
-                
-                if (existingCity) {
-                    addToComparisonBtn.classList.add('added');
-                    addToComparisonText.textContent = 'Already Added';
-                    addToComparisonBtn.querySelector('i').className = 'fas fa-check';
-                } else {
-                    addToComparisonBtn.classList.remove('added');
-                    addToComparisonText.textContent = 'Add to Comparison';
-                    addToComparisonBtn.querySelector('i').className = 'fas fa-plus';
-                }
-            }
-
-            // ============================================
-        // CLOTHING RECOMMENDATIONS
-        // ============================================
-        function getClothingRecommendations(temp, condition, wind) {
-            const items = [];
-            
-            // Temperature-based recommendations
-            if (temp > 30) {
-                items.push({ icon: "👕", text: "Light T-shirt" });
-                items.push({ icon: "🩳", text: "Shorts" });
-                items.push({ icon: "🕶️", text: "Sunglasses" });
-                items.push({ icon: "🧴", text: "Sunscreen" });
-            } else if (temp > 25) {
-                items.push({ icon: "👕", text: "T-shirt" });
-                items.push({ icon: "👖", text: "Light pants" });
-                items.push({ icon: "🕶️", text: "Sunglasses" });
-                items.push({ icon: "🧢", text: "Cap" });
-            } else if (temp > 20) {
-                // Pleasant weather - 20-25°C (68-77°F)
-                items.push({ icon: "👕", text: "T-shirt or long sleeves" });
-                items.push({ icon: "👖", text: "Comfortable pants" });
-                items.push({ icon: "🕶️", text: "Sunglasses" });
-            } else if (temp > 15) {
-                // Cool weather - 15-20°C (59-68°F)
-                items.push({ icon: "👔", text: "Long sleeves" });
-                items.push({ icon: "👖", text: "Jeans" });
-                items.push({ icon: "🧥", text: "Light jacket (optional)" });
-            } else if (temp > 10) {
-                // Cold weather - 10-15°C (50-59°F)
-                items.push({ icon: "🧥", text: "Jacket" });
-                items.push({ icon: "👖", text: "Long pants" });
-                items.push({ icon: "🧣", text: "Scarf (optional)" });
-            } else if (temp > 5) {
-                // Very cold - 5-10°C (41-50°F)
-                items.push({ icon: "🧥", text: "Heavy jacket" });
-                items.push({ icon: "🧣", text: "Scarf" });
-                items.push({ icon: "🧤", text: "Gloves" });
-            } else {
-                // Freezing - < 5°C (41°F)
-                items.push({ icon: "🧥", text: "Winter coat" });
-                items.push({ icon: "🧤", text: "Gloves" });
-                items.push({ icon: "🧣", text: "Scarf" });
-                items.push({ icon: "🎩", text: "Warm hat" });
-            }
-            
-            // Condition-based additions
-            const conditionLower = condition.toLowerCase();
-            
-            if (conditionLower.includes("rain") || conditionLower.includes("drizzle")) {
-                items.push({ icon: "☔", text: "Umbrella" });
-                items.push({ icon: "🥾", text: "Waterproof shoes" });
-            }
-            
-            if (conditionLower.includes("snow")) {
-                items.push({ icon: "🧤", text: "Gloves" });
-                items.push({ icon: "👢", text: "Snow boots" });
-            }
-            
-            if (wind > 20) {
-                items.push({ icon: "🧥", text: "Windbreaker" });
-            }
-            
-            // Return max 4 items to keep it clean
-            return items.slice(0, 4);
-        }
-
-        function displayClothingRecommendations(temp, condition, wind) {
-            const clothingSection = document.getElementById('clothingRecommendations');
-            const clothingItems = document.getElementById('clothingItems');
-            
-            // Get recommendations
-            const recommendations = getClothingRecommendations(temp, condition, wind);
-            
-            // Clear previous items
-            clothingItems.innerHTML = '';
-            
-            // Create and add clothing items
-            recommendations.forEach(item => {
-                const itemDiv = document.createElement('div');
-                itemDiv.className = 'clothing-item';
-                itemDiv.innerHTML = `
-                    <span class="clothing-icon">${item.icon}</span>
-                    <span class="clothing-text">${item.text}</span>
-                `;
-                clothingItems.appendChild(itemDiv);
-            });
-            
-            // Show the section
-            clothingSection.style.display = 'block';
-        }
-            
-            // ============================================
-            // FORECAST FETCH & DISPLAY
-            // ============================================
-            async function fetchForecast(city) {
-                try {
-                    forecastSkeleton.classList.add('show');
-                    
-                    const response = await fetch(`/api/forecast?city=${encodeURIComponent(city)}`);
-                    
-                    if (!response.ok) {
-                        throw new Error('Failed to fetch forecast');
-                    }
-                    
-                    const data = await response.json();
-                    
-                    forecastSkeleton.classList.remove('show');
-                    displayForecast(data.forecasts);
-                    
-                } catch (error) {
-                    console.error('Forecast fetch error:', error);
-                    forecastSkeleton.classList.remove('show');
-                    forecastSection.classList.remove('show');
-                }
-            }
-            
-            function displayForecast(forecasts) {
-                if (!forecasts || forecasts.length === 0) {
-                    forecastSection.classList.remove('show');
-                    return;
-                }
-                
-                forecastContainer.innerHTML = '';
-                
-                const unitSymbol = getTemperatureUnitSymbol();
-                
-                forecasts.forEach((forecast, index) => {
-                    const card = document.createElement('div');
-                    card.className = 'forecast-card';
-                    
-                    // Add staggered reveal animation
-                    setTimeout(() => {
-                        card.classList.add('reveal');
-                    }, index * 100);
-                    
-                    const date = new Date(forecast.date);
-                    const dayName = date.toLocaleDateString('en-US', { weekday: 'short' });
-                    const monthDay = date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
-                    
-                    const icon = getWeatherIcon(forecast.icon);
-                    
-                    // Convert forecast temperatures
-                    const displayTempMax = convertTemperature(forecast.temp_max);
-                    const displayTempMin = convertTemperature(forecast.temp_min);
-                    
-                    card.innerHTML = `
-                        <div class="forecast-day">${dayName}</div>
-                        <div class="forecast-date">${monthDay}</div>
-                        <div class="forecast-icon">${icon}</div>
-                        <div class="forecast-temps">
-                            <span class="forecast-temp-high">${displayTempMax}${unitSymbol}</span>
-                            <span class="forecast-temp-low">${displayTempMin}${unitSymbol}</span>
-                        </div>
-                        <div class="forecast-description">${forecast.description}</div>
-                    `;
-                    
-                    forecastContainer.appendChild(card);
-                });
-                
-                forecastSection.classList.add('show');
-            }
-            
-            // ============================================
-            // COMPARISON TOOL FUNCTIONS
-            // ============================================
-            
-            // Add to comparison button handler
-            addToComparisonBtn.addEventListener('click', () => {
-                if (!currentWeatherData) return;
-                
-                // Check if city already exists in comparison
-                const existingCity = comparisonCities.find(c => 
-                    c.city.toLowerCase() === currentWeatherData.city.toLowerCase()
-                );
-                
-                if (existingCity) {
-                    showError('This city is already in the comparison list.');
-                    return;
-                }
-                
-                // Limit to 5 cities
-                if (comparisonCities.length >= 5) {
-                    showError('Maximum 5 cities can be compared at once.');
-                    return;
-                }
-                
-                // Add city to comparison
-                comparisonCities.push({...currentWeatherData});
-                updateComparisonView();
-                
-                // Show success feedback
-                addToComparisonBtn.classList.add('added');
-                addToComparisonText.textContent = 'Added!';
-                const icon = addToComparisonBtn.querySelector('i');
-                icon.className = 'fas fa-check';
-                
-                setTimeout(() => {
-                    addToComparisonBtn.classList.remove('added');
-                    addToComparisonText.textContent = 'Add to Comparison';
-                    icon.className = 'fas fa-plus';
-                }, 2000);
-            });
-            
-            // Clear all comparison button handler
-            clearComparisonBtn.addEventListener('click', () => {
-                if (comparisonCities.length === 0) return;
-                
-                if (confirm('Are you sure you want to clear all cities from comparison?')) {
-                    comparisonCities = [];
-                    updateComparisonView();
-                }
-            });
-            
-            // Update comparison view
-            function updateComparisonView() {
-                // Update count
-                comparisonCount.textContent = `${comparisonCities.length} ${comparisonCities.length === 1 ? 'city' : 'cities'}`;
-                
-                // Show/hide section
-                if (comparisonCities.length > 0) {
-                    comparisonSection.classList.add('show');
-                } else {
-                    comparisonSection.classList.remove('show');
-                }
-                
-                // Clear container
-                comparisonContainer.innerHTML = '';
-                
-                if (comparisonCities.length === 0) {
-                    comparisonContainer.innerHTML = `
-                        <div class="comparison-empty">
-                            <i class="fas fa-cloud-sun"></i>
-                            <div class="comparison-empty-title">No cities to compare</div>
-                            <div class="comparison-empty-text">Search for a city and click "Add to Comparison" to start comparing weather data</div>
-                        </div>
-                    `;
-                    return;
-                }
-                
-                // Find warmest and coldest (using Celsius values for comparison logic)
-                const temps = comparisonCities.map(c => c.temperature);
-                const maxTemp = Math.max(...temps);
-                const minTemp = Math.min(...temps);
-                const avgTemp = temps.reduce((a, b) => a + b, 0) / temps.length;
-                
-                const unitSymbol = getTemperatureUnitSymbol();
-                
-                // Render comparison cards
-                comparisonCities.forEach((city, index) => {
-                    const card = document.createElement('div');
-                    card.className = 'comparison-card';
-                    
-                    // Convert temperature for display
-                    const displayTemp = convertTemperature(city.temperature);
-                    
-                    // Add best/worst temp classes (using Celsius for comparison)
-                    if (city.temperature === maxTemp && comparisonCities.length > 1) {
-                        card.classList.add('best-temp');
-                    }
-                    if (city.temperature === minTemp && comparisonCities.length > 1) {
-                        card.classList.add('worst-temp');
-                    }
-                    
-                    // Get weather icon
-                    const iconClass = weatherIconMap[city.icon] || 'fa-cloud';
-                    
-                    // Temperature indicator (using Celsius for comparison)
-                    let tempIndicator = '';
-                    if (comparisonCities.length > 1) {
-                        if (city.temperature > avgTemp) {
-                            tempIndicator = '<i class="fas fa-arrow-up comparison-temp-indicator up"></i>';
-                        } else if (city.temperature < avgTemp) {
-                            tempIndicator = '<i class="fas fa-arrow-down comparison-temp-indicator down"></i>';
-                        }
-                    }
-                    
-                    // Badge for warmest/coldest
-                    let badge = '';
-                    if (city.temperature === maxTemp && comparisonCities.length > 1) {
-                        badge = '<div class="comparison-badge warmest"><i class="fas fa-fire"></i> Warmest</div>';
-                    } else if (city.temperature === minTemp && comparisonCities.length > 1) {
-                        badge = '<div class="comparison-badge coldest"><i class="fas fa-snowflake"></i> Coldest</div>';
-                    }
-                    
-                    card.innerHTML = `
-                        <button class="remove-comparison-btn" onclick="removeFromComparison(${index})" title="Remove from comparison">
-                            <i class="fas fa-times"></i>
-                        </button>
-                        ${badge}
-                        <div class="comparison-card-header">
-                            <div class="comparison-location">
-                                <div class="comparison-city">${city.city}</div>
-                                <div class="comparison-country">
-                                    <i class="fas fa-map-marker-alt"></i>
-                                    ${city.country}
-                                </div>
-                            </div>
-                        </div>
-                        <div class="comparison-icon"><i class="fas ${iconClass}"></i></div>
-                        <div class="comparison-temp">
-                            ${displayTemp}${unitSymbol}
-                            ${tempIndicator}
-                        </div>
-                        <div class="comparison-description">${city.description}</div>
-                        <div class="comparison-metrics">
-                            <div class="comparison-metric">
-                                <span class="comparison-metric-label">Humidity</span>
-                                <div class="comparison-metric-value">
-                                    <i class="fas fa-tint"></i>
-                                    ${city.humidity}%
-                                </div>
-                            </div>
-                            <div class="comparison-metric">
-                                <span class="comparison-metric-label">Wind</span>
-                                <div class="comparison-metric-value">
-                                    <i class="fas fa-wind"></i>
-                                    ${city.wind_speed} m/s
-                                </div>
-                            </div>
-                            <div class="comparison-metric">
-                                <span class="comparison-metric-label">Pressure</span>
-                                <div class="comparison-metric-value">
-                                    <i class="fas fa-compress-arrows-alt"></i>
-                                    ${city.pressure} hPa
-                                </div>
-                            </div>
-                        </div>
-                    `;
-                    
-                    comparisonContainer.appendChild(card);
-                });
-            }
-            
-            // Global function to remove from comparison (called from inline onclick)
-            window.removeFromComparison = function(index) {
-                comparisonCities.splice(index, 1);
-                updateComparisonView();
-            };
-            
-            // ============================================
-            // FORM SUBMISSION
-            // ============================================
-            weatherForm.addEventListener('submit', async (e) => {
-                e.preventDefault();
-                
-                const city = cityInput.value.trim();
-                
-                if (!city) {
-                    showError('Please enter a city name.');
-                    return;
-                }
-                
-                await fetchWeather(city);
-            });
-            
-            // Button ripple effect
-            searchButton.addEventListener('click', function(e) {
-                const rect = this.getBoundingClientRect();
-                const x = e.clientX - rect.left;
-                const y = e.clientY - rect.top;
-                
-                const ripple = document.createElement('span');
-                ripple.className = 'ripple';
-                ripple.style.left = `${x}px`;
-                ripple.style.top = `${y}px`;
-                
-                this.appendChild(ripple);
-                
-                setTimeout(() => ripple.remove(), 600);
-            });
-            
-        }); // End DOMContentLoaded
-        </script>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
-
-
-@app.get("/health")
-def health_check():
-    return {
-        "status": "healthy",
-        "version": "0.1.0",
-        "sprint": 1
-    }
+@app.get("/health")
+def health_check():
+    return {
+        "status": "healthy",
+        "version": "0.1.0",
+        "sprint": 1
+    }
 
 
 @app.get("/api/info")
@@ -3108,6 +297,22 @@ def debug_config():
     }
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    Runtime counters of the weather service (cache hit rates, evictions),
+    of hot city prefetching, of inbound rate limiting and of response
+    compression (ratio and CPU time per encoding). Used to tune cache sizes,
+    TTLs, client budgets and the compression threshold.
+    """
+    return {
+        **await weather_service.get_metrics(),
+        "prefetch": city_prefetcher.stats(),
+        "rate_limit": rate_limit_stats.to_dict(),
+        "compression": compression_stats.to_dict(),
+    }
+
+
 # -----------------------------------------------
 # Pydantic Models for API Response
 # -----------------------------------------------
@@ -3122,6 +327,7 @@ class WeatherResponse(BaseModel):
     wind_speed: float = Field(..., ge=0, description="Wind speed in m/s")
     pressure: int = Field(..., description="Atmospheric pressure in hPa")
     icon: str = Field(..., description="Weather icon code")
+    stale: bool = Field(False, description="True if served from cache past its TTL")
 
     class Config:
         json_schema_extra = {
@@ -3139,6 +345,91 @@ class WeatherResponse(BaseModel):
         }
 
 
+class ForecastDay(BaseModel):
+    """One day of the 5-day forecast."""
+    date: str = Field(..., description="Date (YYYY-MM-DD)")
+    temp_max: int = Field(..., description="Daily high in Celsius")
+    temp_min: int = Field(..., description="Daily low in Celsius")
+    description: str = Field(..., description="Weather condition description")
+    icon: str = Field(..., description="Weather icon code")
+
+
+class ForecastResponse(BaseModel):
+    """Response model for the 5-day forecast."""
+    city: str = Field(..., description="City name")
+    forecasts: List[ForecastDay] = Field(..., description="Daily forecasts, up to 5 days")
+    stale: bool = Field(False, description="True if served from cache past its TTL")
+
+
+class CityViewResponse(BaseModel):
+    """Response model for the combined weather and forecast of a city."""
+    weather: WeatherResponse
+    forecast: Optional[ForecastResponse] = Field(None, description="Forecast on success")
+    forecast_status: int = Field(
+        ..., description="HTTP status the forecast endpoint would return"
+    )
+    forecast_error: Optional[str] = Field(None, description="Forecast error detail on failure")
+
+
+class BatchWeatherRequest(BaseModel):
+    """Request body for fetching several cities at once."""
+    cities: List[str] = Field(..., min_length=1, description="City names")
+
+    class Config:
+        json_schema_extra = {"example": {"cities": ["London", "Paris", "Tokyo"]}}
+
+
+class BatchWeatherResult(BaseModel):
+    """Weather or error for one city of a batch."""
+    city: str = Field(..., description="City name as requested")
+    status: int = Field(..., description="HTTP status the single-city endpoint would return")
+    data: Optional[WeatherResponse] = Field(None, description="Weather data on success")
+    error: Optional[str] = Field(None, description="Error detail on failure")
+
+
+class BatchWeatherResponse(BaseModel):
+    """Response model for batch weather lookups."""
+    count: int = Field(..., description="Number of distinct cities looked up")
+    results: List[BatchWeatherResult]
+
+
+class Coordinates(BaseModel):
+    """A point on the globe."""
+    latitude: float = Field(..., ge=-90, le=90, description="Latitude in degrees")
+    longitude: float = Field(..., ge=-180, le=180, description="Longitude in degrees")
+
+
+class BatchCoordinatesRequest(BaseModel):
+    """Request body for fetching weather at several points at once."""
+    points: List[Coordinates] = Field(..., min_length=1, description="Points to look up")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "points": [
+                    {"latitude": 51.5074, "longitude": -0.1278},
+                    {"latitude": 48.8566, "longitude": 2.3522},
+                ]
+            }
+        }
+
+
+class CoordinatesWeatherResult(BaseModel):
+    """Weather or error for one point of a batch."""
+    latitude: float = Field(..., description="Latitude as requested")
+    longitude: float = Field(..., description="Longitude as requested")
+    status: int = Field(..., description="HTTP status the single-point endpoint would return")
+    data: Optional[WeatherResponse] = Field(None, description="Weather data on success")
+    error: Optional[str] = Field(None, description="Error detail on failure")
+
+
+class BatchCoordinatesResponse(BaseModel):
+    """Response model for batch coordinate lookups."""
+    count: int = Field(..., description="Number of points requested")
+    cells: int = Field(..., description="Number of distinct cache grid cells looked up")
+    results: List[CoordinatesWeatherResult]
+
+
 # -----------------------------------------------
 # Input Validation Helper
 # -----------------------------------------------
@@ -3191,6 +482,11 @@ def validate_city_name(city: str) -> str:
 # Weather Service Instance
 # -----------------------------------------------
 weather_service = WeatherService()
+# Keeps the most requested cities warm (started by the lifespan)
+city_prefetcher = CityPrefetcher(weather_service)
+# Time budget of each request per route (REQUEST_DEADLINE_<ROUTE>), shared
+# by every cache lookup and upstream call made to answer it
+REQUEST_DEADLINES = {route: route_deadline(route) for route in ROUTE_DEADLINES}
 
 
 # -----------------------------------------------
@@ -3206,11 +502,13 @@ weather_service = WeatherService()
         400: {"description": "Invalid city name"},
         404: {"description": "City not found"},
         500: {"description": "Weather service error"},
-        503: {"description": "Google Weather API not configured"},
+        503: {"description": "Weather API not configured or unavailable"},
         504: {"description": "Weather service timeout"},
     }
 )
 async def get_weather_by_path(
+    request: Request,
+    response: Response,
     city: str = Path(
         ...,
         min_length=2,
@@ -3231,47 +529,433 @@ async def get_weather_by_path(
     - Tokyo
     - Paris
     - Sydney
+    
+    Responses carry ETag/Last-Modified validators; a matching
+    If-None-Match or If-Modified-Since gets a 304 with no body.
     """
-    return await _fetch_weather_for_city(city)
+    with deadline_scope(REQUEST_DEADLINES["weather"]):
+        payload = await _fetch_weather_for_city(city, response)
+    return _conditional_response(request, response, payload)
 
 
 @app.get(
     "/api/weather",
-    response_model=WeatherResponse,
+    response_model=Union[WeatherResponse, BatchWeatherResponse],
     summary="Get weather by city (query parameter)",
-    description="Fetch current weather data for a city using Google Weather API.",
+    description=(
+        "Fetch current weather data for a city using Google Weather API. "
+        "Repeat the parameter (?city=A&city=B) to get a batch response."
+    ),
     responses={
         200: {"description": "Weather data retrieved successfully"},
         400: {"description": "Invalid city name"},
         404: {"description": "City not found"},
         500: {"description": "Weather service error"},
-        503: {"description": "Google Weather API not configured"},
+        503: {"description": "Weather API not configured or unavailable"},
         504: {"description": "Weather service timeout"},
     }
 )
 async def get_weather_by_query(
-    city: str = Query(
-        ...,
-        min_length=2,
-        max_length=100,
-        description="City name",
-        example="London"
+    request: Request,
+    response: Response,
+    city: Optional[List[str]] = Query(
+        None,
+        description="City name (repeat for a batch)",
+        example=["London"]
     )
 ):
     """
     Fetch current weather data for a city (query parameter version).
     
     This endpoint is the same as /weather/{city} but uses a query parameter
-    for backward compatibility with the existing frontend.
+    for backward compatibility with the existing frontend. When the city
+    parameter is repeated, it behaves like POST /api/weather/batch.
+    
+    Names are validated by validate_city_name rather than by the query
+    schema, so that in a batch an invalid name is reported in its own
+    result wherever it appears in the query string.
     """
-    return await _fetch_weather_for_city(city)
+    if not city:
+        raise HTTPException(status_code=422, detail="City parameter is required")
+    if len(city) > 1:
+        with deadline_scope(REQUEST_DEADLINES["batch"]):
+            return await _fetch_weather_batch(city)
+    with deadline_scope(REQUEST_DEADLINES["weather"]):
+        payload = await _fetch_weather_for_city(city[0], response)
+    return _conditional_response(request, response, payload)
+
+
+@app.post(
+    "/api/weather/batch",
+    response_model=BatchWeatherResponse,
+    summary="Get weather for several cities",
+    description=(
+        "Fetch current weather for up to BATCH_MAX_CITIES cities in one request. "
+        "Each city gets its own result or error."
+    ),
+    responses={
+        200: {
+            "description": "Per-city results (individual cities may have failed)",
+            "content": {
+                "application/x-ndjson": {},
+                "text/event-stream": {},
+            },
+        },
+        400: {"description": "Too many cities"},
+    }
+)
+async def get_weather_batch(
+    request: Request,
+    batch: BatchWeatherRequest,
+    stream: Optional[str] = Query(
+        None,
+        pattern="^(ndjson|sse)$",
+        description="Stream results as they complete: ndjson or sse",
+    ),
+):
+    """
+    Fetch current weather for several cities concurrently.
+    
+    Repeated cities (ignoring case, accents and spacing) are looked up
+    once. Every name is validated like the single-city endpoint, and
+    per-city failures are reported in that city's result instead of
+    failing the whole batch.
+    
+    With ?stream=ndjson or ?stream=sse (or an Accept header of
+    application/x-ndjson or text/event-stream), each city's result is
+    sent as soon as its lookup finishes instead of after the whole batch.
+    Streams have no overall deadline; each city has the weather deadline.
+    """
+    stream = stream or _stream_format_from_accept(request.headers.get("accept", ""))
+    if stream:
+        return _stream_weather_batch_response(batch.cities, stream)
+    with deadline_scope(REQUEST_DEADLINES["batch"]):
+        return await _fetch_weather_batch(batch.cities)
+
+
+@app.get(
+    "/api/weather/coords",
+    response_model=Union[WeatherResponse, BatchCoordinatesResponse],
+    summary="Get weather by coordinates",
+    description=(
+        "Fetch current weather data for a latitude/longitude without geocoding. "
+        "Repeat lat and lng (?lat=A&lng=B&lat=C&lng=D) to get a batch response."
+    ),
+    responses={
+        200: {"description": "Weather data retrieved successfully"},
+        400: {"description": "Invalid coordinates"},
+        500: {"description": "Weather service error"},
+        503: {"description": "Weather API not configured or unavailable"},
+        504: {"description": "Weather service timeout"},
+    }
+)
+async def get_weather_by_coords(
+    request: Request,
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90, description="Latitude", example=51.5074),
+    lng: float = Query(..., ge=-180, le=180, description="Longitude", example=-0.1278),
+):
+    """
+    Fetch current weather data for a point.
+    
+    Coordinates are snapped to the weather cache grid, so nearby points
+    share one cached observation and a cache hit makes no upstream call.
+    """
+    latitudes = request.query_params.getlist("lat")
+    longitudes = request.query_params.getlist("lng")
+    if len(latitudes) > 1 or len(longitudes) > 1:
+        points = _parse_coordinate_pairs(latitudes, longitudes)
+        with deadline_scope(REQUEST_DEADLINES["batch"]):
+            return await _fetch_weather_coordinates_batch(points)
+    with deadline_scope(REQUEST_DEADLINES["weather"]):
+        payload = await _fetch_weather_for_coordinates(lat, lng, response)
+    return _conditional_response(request, response, payload)
+
+
+@app.post(
+    "/api/weather/coords/batch",
+    response_model=BatchCoordinatesResponse,
+    summary="Get weather for several coordinates",
+    description=(
+        "Fetch current weather for up to BATCH_MAX_POINTS points in one request. "
+        "Each point gets its own result or error."
+    ),
+    responses={
+        200: {"description": "Per-point results (individual points may have failed)"},
+        400: {"description": "Too many points"},
+    }
+)
+async def get_weather_coords_batch(batch: BatchCoordinatesRequest):
+    """
+    Fetch current weather for several points concurrently.
+    
+    Points that fall into the same cache grid cell are looked up once and
+    share the result. Results are returned in request order.
+    """
+    with deadline_scope(REQUEST_DEADLINES["batch"]):
+        return await _fetch_weather_coordinates_batch(
+            [(point.latitude, point.longitude) for point in batch.points]
+        )
+
+
+# -----------------------------------------------
+# Batch Weather Helpers
+# -----------------------------------------------
+BATCH_MAX_CITIES = env_int("BATCH_MAX_CITIES", 100)
+BATCH_MAX_CONCURRENCY = env_int("BATCH_MAX_CONCURRENCY", 10)
+
+
+def _dedupe_cities(cities: List[str]) -> List[str]:
+    """Drop repeated cities, keeping the first spelling of each."""
+    seen = set()
+    unique = []
+    for city in cities:
+        key = normalize_text(city)
+        if key not in seen:
+            seen.add(key)
+            unique.append(city)
+    return unique
+
+
+async def _fetch_weather_batch(cities: List[str]) -> dict:
+    """
+    Fetch weather for many cities with bounded concurrency.
+    
+    Geocode and weather lookups run concurrently, at most
+    BATCH_MAX_CONCURRENCY at a time, so the batch takes about as long as its
+    slowest upstream call instead of the sum of all of them.
+    """
+    if len(cities) > BATCH_MAX_CITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many cities (max {BATCH_MAX_CITIES} per request)"
+        )
+    
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+    
+    async def fetch_one(city: str) -> dict:
+        async with semaphore:
+            return await _fetch_weather_batch_item(city)
+    
+    results = await asyncio.gather(*(fetch_one(city) for city in _dedupe_cities(cities)))
+    return {"count": len(results), "results": list(results)}
+
+
+async def _fetch_weather_batch_item(city: str) -> dict:
+    """
+    Fetch one city of a batch, turning HTTP errors into an error entry.
+    
+    Each city gets the weather deadline, within what is left of the batch's.
+    """
+    try:
+        with deadline_scope(REQUEST_DEADLINES["weather"]):
+            data = await _fetch_weather_for_city(city)
+        return {"city": city, "status": 200, "data": data}
+    except HTTPException as e:
+        return {"city": city, "status": e.status_code, "error": e.detail}
+
+
+# -----------------------------------------------
+# Streaming Batch Weather
+# -----------------------------------------------
+BATCH_STREAM_MAX_CITIES = env_int("BATCH_STREAM_MAX_CITIES", 1000)
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _stream_format_from_accept(accept: str) -> Optional[str]:
+    """Pick a streaming format from the Accept header, if one is requested."""
+    for stream, media_type in STREAM_MEDIA_TYPES.items():
+        if media_type in accept:
+            return stream
+    return None
+
+
+async def _iter_weather_batch(cities: List[str]) -> AsyncIterator[dict]:
+    """
+    Yield batch results in completion order.
+    
+    At most BATCH_MAX_CONCURRENCY lookups are in flight, and a new one is
+    only started after a finished result has been handed to the consumer.
+    A slow client therefore slows down the lookups instead of piling up
+    results in memory. Lookups still running when the consumer goes away
+    (e.g. the client disconnected) are cancelled.
+    """
+    pending_cities = iter(enumerate(_dedupe_cities(cities)))
+    running = {}
+    
+    def start_next() -> None:
+        for index, city in pending_cities:
+            task = asyncio.ensure_future(_fetch_weather_batch_item(city))
+            running[task] = index
+            return
+    
+    try:
+        for _ in range(BATCH_MAX_CONCURRENCY):
+            start_next()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = running.pop(task)
+                yield {"index": index, **task.result()}
+                start_next()
+    finally:
+        for task in running:
+            task.cancel()
+
+
+def _stream_weather_batch_response(cities: List[str], stream: str) -> StreamingResponse:
+    """
+    Build the streaming response for a batch, as NDJSON lines or SSE events.
+    
+    Each item is the same envelope as a batch result plus its position in
+    the deduplicated city list. SSE streams end with a "done" event.
+    
+    Raises:
+        HTTPException: 400 if the batch is over BATCH_STREAM_MAX_CITIES
+    """
+    if len(cities) > BATCH_STREAM_MAX_CITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many cities (max {BATCH_STREAM_MAX_CITIES} per request)"
+        )
+    
+    async def body() -> AsyncIterator[str]:
+        count = 0
+        async for item in _iter_weather_batch(cities):
+            count += 1
+            payload = json.dumps(item, separators=(",", ":"))
+            if stream == "sse":
+                yield f"event: weather\ndata: {payload}\n\n"
+            else:
+                yield payload + "\n"
+        if stream == "sse":
+            yield f"event: done\ndata: {json.dumps({'count': count})}\n\n"
+    
+    return StreamingResponse(
+        body(),
+        media_type=STREAM_MEDIA_TYPES[stream],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _set_freshness_headers(
+    response: Response, data: Union[WeatherData, ForecastData]
+) -> None:
+    """
+    Describe how fresh a cached observation is via Cache-Control and Age.
+    
+    max-age is the time left until the service refreshes the observation,
+    so downstream caches never hold it longer than the service does. Stale
+    data (served while refreshing or while upstream is failing) is flagged
+    with a Warning header.
+    """
+    if not data.fetched_at:
+        return
+    now = time.time()
+    age = int(max(0, now - data.fetched_at))
+    max_age = int(max(0, data.expires_at - now))
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    response.headers["Age"] = str(age)
+    if data.stale:
+        response.headers["Warning"] = '110 - "Response is Stale"'
+
+
+def _weather_to_response(weather_data: WeatherData) -> dict:
+    """Convert service WeatherData into the WeatherResponse payload."""
+    # Return weather data with full country name from Google's API
+    return {
+        "city": weather_data.city,
+        "country": weather_data.country_name,  # Use full name directly from Google
+        "temperature": weather_data.temperature,
+        "feels_like": weather_data.feels_like,
+        "description": weather_data.description,
+        "humidity": weather_data.humidity,
+        "wind_speed": weather_data.wind_speed,
+        "pressure": weather_data.pressure,
+        "icon": weather_data.icon,
+        "stale": weather_data.stale,
+    }
+
+
+# -----------------------------------------------
+# Conditional Request Helpers
+# -----------------------------------------------
+def _set_validators(response: Response, payload: dict, last_modified: float = 0.0) -> None:
+    """
+    Set ETag (and Last-Modified) for a JSON payload built from cached data.
+    
+    The tag combines the upstream timestamp with a hash of the payload
+    fields, so it is identical in every worker for the same cached
+    observation and changes whenever the response body would.
+    """
+    digest = hashlib.blake2b(repr(payload).encode("utf-8"), digest_size=8).hexdigest()
+    if last_modified:
+        response.headers["ETag"] = f'"{int(last_modified):x}-{digest}"'
+        response.headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    else:
+        response.headers["ETag"] = f'"{digest}"'
+
+
+def _is_not_modified(request: Request, response: Response) -> bool:
+    """
+    Whether the client's cached copy matches the validators on response.
+    
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    etag = response.headers.get("etag")
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {strip_encoding_suffix(tag) for tag in if_none_match.split(",")}
+        return "*" in tags or (etag is not None and etag in tags)
+    
+    last_modified = response.headers.get("last-modified")
+    if_modified_since = request.headers.get("if-modified-since")
+    if last_modified and if_modified_since:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _conditional_response(
+    request: Request, response: Response, payload: Union[dict, list]
+) -> Union[dict, list, Response]:
+    """
+    Answer 304 Not Modified when the client already has payload.
+    
+    Returning a Response object makes FastAPI skip response model
+    validation and JSON serialization entirely.
+    """
+    if _is_not_modified(request, response):
+        headers = {
+            name: value for name, value in response.headers.items()
+            if name != "content-length"
+        }
+        return Response(status_code=304, headers=headers)
+    return payload
 
 
-async def _fetch_weather_for_city(city: str) -> dict:
+def _unavailable_error(error: UpstreamUnavailableError) -> HTTPException:
+    """503 telling the client when the upstream will be called again."""
+    return HTTPException(
+        status_code=503,
+        detail="Weather service is temporarily unavailable. Please try again shortly.",
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))},
+    )
+
+
+async def _fetch_weather_for_city(city: str, response: Optional[Response] = None) -> dict:
     """
     Internal function to fetch weather data for a city.
     
-    Handles both path and query parameter endpoints to avoid code duplication.
+    Handles both path and query parameter endpoints (and each city of a
+    batch) to avoid code duplication. Freshness headers are set on
+    response when one is given.
     """
     # Validate input
     city = validate_city_name(city)
@@ -3282,17 +966,7 @@ async def _fetch_weather_for_city(city: str) -> dict:
     if not api_key:
         # Return mock data for development/testing when API key is not set
         logger.warning(f"GOOGLE_MAPS_API_KEY not set. Returning mock data for: {city}")
-        return {
-            "city": city.title(),
-            "country": convert_country_code_to_name("US"),  # Fallback for mock data only
-            "temperature": 22,
-            "feels_like": 24,
-            "description": "Clear sky (Mock Data)",
-            "humidity": 65,
-            "wind_speed": 3.5,
-            "pressure": 1013,
-            "icon": "01d"
-        }
+        return _mock_weather(city)
     
     try:
         # Fetch weather using the service
@@ -3301,58 +975,231 @@ async def _fetch_weather_for_city(city: str) -> dict:
         track_weather_search(logger, city=city, success=True, temperature=weather_data.temperature)
 
         logger.info(f"Successfully fetched weather for: {city}")
+        payload = _weather_to_response(weather_data)
+        if response is not None:
+            _set_freshness_headers(response, weather_data)
+            _set_validators(
+                response, payload, weather_data.observed_at or weather_data.fetched_at
+            )
         
-        # Return weather data with full country name from Google's API
-        return {
-            "city": weather_data.city,
-            "country": weather_data.country_name,  # Use full name directly from Google
-            "temperature": weather_data.temperature,
-            "feels_like": weather_data.feels_like,
-            "description": weather_data.description,
-            "humidity": weather_data.humidity,
-            "wind_speed": weather_data.wind_speed,
-            "pressure": weather_data.pressure,
-            "icon": weather_data.icon,
-        }
-        
-    except CityNotFoundError as e:
+        return payload
+    
+    except Exception as e:
+        raise _weather_http_error(city, e)
+
+
+def _mock_weather(city: str) -> dict:
+    """Weather payload served for development when GOOGLE_MAPS_API_KEY is not set."""
+    return {
+        "city": city.title(),
+        "country": convert_country_code_to_name("US"),  # Fallback for mock data only
+        "temperature": 22,
+        "feels_like": 24,
+        "description": "Clear sky (Mock Data)",
+        "humidity": 65,
+        "wind_speed": 3.5,
+        "pressure": 1013,
+        "icon": "01d"
+    }
+
+
+def _weather_http_error(city: str, error: Exception) -> HTTPException:
+    """Log a failed weather lookup for a city and map it to an HTTP error."""
+    if isinstance(error, CityNotFoundError):
         logger.warning(f"City not found: {city}")
         track_weather_search(logger, city=city, success=False)
-        raise HTTPException(
+        return HTTPException(
             status_code=404,
             detail=f"City not found: {city}. Please check the spelling and try again."
         )
     
-    except APIKeyMissingError as e:
+    if isinstance(error, APIKeyMissingError):
+        logger.error("Google Maps API key not configured")
+        return HTTPException(
+            status_code=503,
+            detail="Weather service not configured. Please set GOOGLE_MAPS_API_KEY."
+        )
+    
+    if isinstance(error, UpstreamUnavailableError):
+        logger.warning(f"Upstream unavailable for {city}: {str(error)}")
+        return _unavailable_error(error)
+    
+    if isinstance(error, WeatherAPIError):
+        logger.error(f"Weather API error for {city}: {str(error)}")
+        track_weather_search(logger, city=city, success=False)
+        if "timeout" in str(error).lower():
+            return HTTPException(
+                status_code=504,
+                detail="Weather service is taking too long to respond. Please try again."
+            )
+        
+        return HTTPException(
+            status_code=500,
+            detail="Failed to fetch weather data. Please try again later."
+        )
+    
+    logger.error(f"Unexpected error fetching weather for {city}: {str(error)}")
+    track_weather_search(logger, city=city, success=False)
+    return HTTPException(
+        status_code=500,
+        detail="An unexpected error occurred. Please try again."
+    )
+
+
+# -----------------------------------------------
+# Coordinate Weather Helpers
+# -----------------------------------------------
+BATCH_MAX_POINTS = env_int("BATCH_MAX_POINTS", 500)
+
+
+def _parse_coordinate_pairs(latitudes: List[str], longitudes: List[str]) -> List[tuple]:
+    """
+    Pair up repeated lat/lng query parameters.
+    
+    Raises:
+        HTTPException: 400 if the lists differ in length or a value is not a
+                       valid latitude/longitude
+    """
+    if len(latitudes) != len(longitudes):
+        raise HTTPException(
+            status_code=400,
+            detail="Each lat parameter needs a matching lng parameter"
+        )
+    points = []
+    for raw_lat, raw_lng in zip(latitudes, longitudes):
+        try:
+            point = Coordinates(latitude=raw_lat, longitude=raw_lng)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid coordinates: {raw_lat}, {raw_lng}"
+            )
+        points.append((point.latitude, point.longitude))
+    return points
+
+
+async def _fetch_weather_for_coordinates(
+    lat: float,
+    lng: float,
+    response: Optional[Response] = None,
+    place: Optional[GeoLocation] = None,
+) -> dict:
+    """
+    Internal function to fetch weather data for a point.
+    
+    Shared by the single-point endpoint and each cell of a batch. Freshness
+    headers are set on response when one is given. The point is named after
+    the nearest bundled city; batches pass place, resolved for all cells at
+    once.
+    """
+    api_key = os.getenv("GOOGLE_MAPS_API_KEY")
+    
+    if not api_key:
+        logger.warning(f"GOOGLE_MAPS_API_KEY not set. Returning mock data for: {lat}, {lng}")
+        place = place or weather_service.reverse_geocode(lat, lng)
+        return {
+            "city": place.city if place else f"{lat:.4f}, {lng:.4f}",
+            "country": (
+                place.country_name if place
+                else convert_country_code_to_name("US")  # Fallback for mock data only
+            ),
+            "temperature": 22,
+            "feels_like": 24,
+            "description": "Clear sky (Mock Data)",
+            "humidity": 65,
+            "wind_speed": 3.5,
+            "pressure": 1013,
+            "icon": "01d"
+        }
+    
+    try:
+        if place is not None:
+            weather_data = await weather_service.get_weather_by_coordinates(
+                lat, lng, place.city, place.country, place.country_name
+            )
+        else:
+            weather_data = await weather_service.get_weather_by_coordinates(lat, lng)
+        payload = _weather_to_response(weather_data)
+        if response is not None:
+            _set_freshness_headers(response, weather_data)
+            _set_validators(
+                response, payload, weather_data.observed_at or weather_data.fetched_at
+            )
+        return payload
+    
+    except APIKeyMissingError:
         logger.error("Google Maps API key not configured")
         raise HTTPException(
             status_code=503,
             detail="Weather service not configured. Please set GOOGLE_MAPS_API_KEY."
         )
     
+    except UpstreamUnavailableError as e:
+        logger.warning(f"Upstream unavailable for {lat}, {lng}: {str(e)}")
+        raise _unavailable_error(e)
+    
     except WeatherAPIError as e:
-        logger.error(f"Weather API error for {city}: {str(e)}")
-        track_weather_search(logger, city=city, success=False)
+        logger.error(f"Weather API error for {lat}, {lng}: {str(e)}")
         if "timeout" in str(e).lower():
             raise HTTPException(
                 status_code=504,
                 detail="Weather service is taking too long to respond. Please try again."
             )
-        
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch weather data. Please try again later."
         )
     
     except Exception as e:
-        logger.error(f"Unexpected error fetching weather for {city}: {str(e)}")
-        track_weather_search(logger, city=city, success=False)
+        logger.error(f"Unexpected error fetching weather for {lat}, {lng}: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred. Please try again."
         )
 
 
+async def _fetch_weather_coordinates_batch(points: List[tuple]) -> dict:
+    """
+    Fetch weather for many points, one upstream lookup per grid cell.
+    
+    Points are snapped to the weather cache grid and deduplicated by cell
+    before fanning out (at most BATCH_MAX_CONCURRENCY lookups at a time);
+    every point then gets the result of its cell, in request order.
+    """
+    if len(points) > BATCH_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many points (max {BATCH_MAX_POINTS} per request)"
+        )
+    
+    cells = {}
+    for lat, lng in points:
+        cells.setdefault(weather_service.snap_coordinates(lat, lng), (lat, lng))
+    
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+    places = weather_service.reverse_geocode_many(list(cells.values()))
+    
+    async def fetch_one(lat: float, lng: float, place: Optional[GeoLocation]) -> dict:
+        async with semaphore:
+            try:
+                with deadline_scope(REQUEST_DEADLINES["weather"]):
+                    data = await _fetch_weather_for_coordinates(lat, lng, place=place)
+                return {"status": 200, "data": data}
+            except HTTPException as e:
+                return {"status": e.status_code, "error": e.detail}
+    
+    outcomes = await asyncio.gather(*(
+        fetch_one(lat, lng, place) for (lat, lng), place in zip(cells.values(), places)
+    ))
+    by_cell = dict(zip(cells, outcomes))
+    
+    results = [
+        {"latitude": lat, "longitude": lng, **by_cell[weather_service.snap_coordinates(lat, lng)]}
+        for lat, lng in points
+    ]
+    return {"count": len(results), "cells": len(cells), "results": results}
+
+
 # -----------------------------------------------
 # City Autocomplete Endpoint
 # -----------------------------------------------
@@ -3362,6 +1209,8 @@ async def _fetch_weather_for_city(city: str) -> dict:
     description="Get city suggestions as user types for autocomplete functionality.",
 )
 async def autocomplete_cities(
+    request: Request,
+    response: Response,
     query: str = Query(
         ...,
         min_length=2,
@@ -3370,91 +1219,73 @@ async def autocomplete_cities(
         example="Mad"
     )
 ):
-    """Get city autocomplete suggestions using Google Places API."""
+    """Get city autocomplete suggestions from the city index or Google Places API."""
     
     if not query or len(query.strip()) < 2:
         raise HTTPException(status_code=400, detail="Query must be at least 2 characters")
     
-    api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-    
-    if not api_key:
-        logger.warning("GOOGLE_MAPS_API_KEY not set for autocomplete")
-
-        # ⭐ ADD THIS CUSTOM TELEMETRY ⭐
-        logger.info(
-            "Autocomplete executed",
-            extra={
-                "custom_dimensions": {
-                    "query": query,
-                    "success": True,
-                    "source": "mock"
-                }
-            }
-        )
-
-        return {
-            "suggestions": [
-                {
-                    "city": f"{query.title()}",
-                    "country": "Mock",
-                    "display": f"{query.title()}, Mock"
-                }
-            ]
-        }
-    
     try:
-        url = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
-        params = {"input": query, "types": "(cities)", "key": api_key}
-        
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("status") != "OK":
-                return {"suggestions": []}
-            
-            suggestions = []
-            for prediction in data.get("predictions", [])[:10]:
-                description = prediction.get("description", "")
-                parts = [part.strip() for part in description.split(",")]
-                
-                if len(parts) >= 2:
-                    suggestions.append({
-                        "city": parts[0],
-                        "country": parts[-1],
-                        "display": description
-                    })
-                                        
-# telemetry for successful real autocomplete
-            logger.info(
-                "Autocomplete executed",
-                extra={
-                    "custom_dimensions": {
-                        "query": query,
-                        "success": True,
-                        "source": "google",
-                        "count": len(suggestions)
-                    }
-                }
-            )
-            
-            return {"suggestions": suggestions}
-
-            
+        # Answered from the offline city index when possible; misses go to
+        # the Places API through the service's pooled client
+        with deadline_scope(REQUEST_DEADLINES["autocomplete"]):
+            suggestions = await weather_service.get_city_suggestions(query)
+        source = "live"
+    except APIKeyMissingError:
+        logger.warning("GOOGLE_MAPS_API_KEY not set for autocomplete")
+        suggestions = [
+            {
+                "city": f"{query.title()}",
+                "country": "Mock",
+                "display": f"{query.title()}, Mock"
+            }
+        ]
+        source = "mock"
+    except UpstreamUnavailableError as e:
+        logger.warning(f"Upstream unavailable for autocomplete: {str(e)}")
+        raise _unavailable_error(e)
+    except DeadlineExceededError as e:
+        logger.warning(f"Autocomplete deadline exceeded: {str(e)}")
+        raise HTTPException(status_code=504, detail="Autocomplete timeout. Please try again.")
     except Exception as e:
         logger.error(f"Autocomplete error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch suggestions")
+    
+    logger.info(
+        "Autocomplete executed",
+        extra={
+            "custom_dimensions": {
+                "query": query,
+                "success": True,
+                "source": source,
+                "count": len(suggestions)
+            }
+        }
+    )
+    
+    payload = {"suggestions": suggestions}
+    _set_validators(response, payload)
+    return _conditional_response(request, response, payload)
 
 # -----------------------------------------------
 # Weather Forecast Endpoint
 # -----------------------------------------------
 @app.get(
     "/api/forecast",
+    response_model=ForecastResponse,
     summary="Get 5-day weather forecast",
     description="Get weather forecast for the next 5 days for a given city.",
+    responses={
+        200: {"description": "Forecast retrieved successfully"},
+        400: {"description": "Invalid city name"},
+        404: {"description": "City not found"},
+        500: {"description": "Forecast service error"},
+        503: {"description": "OpenWeatherMap API not configured or unavailable"},
+        504: {"description": "Forecast service timeout"},
+    }
 )
 async def get_forecast(
+    request: Request,
+    response: Response,
     city: str = Query(
         ...,
         min_length=2,
@@ -3471,6 +1302,13 @@ async def get_forecast(
     - High/low temperatures
     - Weather condition description
     - Weather icon code
+    
+    This is a thin wrapper over WeatherService.get_forecast_by_city, which
+    resolves the city like /api/weather and caches the parsed forecast per
+    location until OpenWeatherMap's next 3-hour run. An expired forecast may be returned with "stale": true while it is
+    refreshed or while the upstream API fails. Clients revalidating with
+    If-None-Match/If-Modified-Since get a 304 until the cached forecast
+    changes.
     """
     # Validate city name
     city = validate_city_name(city)
@@ -3480,114 +1318,151 @@ async def get_forecast(
     
     if not openweather_key:
         logger.error("OPENWEATHER_API_KEY not configured")
-        raise HTTPException(
-            status_code=503,
-            detail="Forecast service not configured. Please set OPENWEATHER_API_KEY."
-        )
+        raise _forecast_not_configured()
     
     try:
-        # Fetch forecast directly from OpenWeatherMap API
-        url = "https://api.openweathermap.org/data/2.5/forecast"
-        params = {
-            "q": city,
-            "appid": openweather_key,
-            "units": "metric",
-            "cnt": 40  # 5 days × 8 data points per day (3-hour intervals)
-        }
-        
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code == 404:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"City not found: {city}"
-                )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("cod") != "200":
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Weather API error: {data.get('message', 'Unknown error')}"
-                )
-            
-            # Parse forecast data - group by day and get min/max temps
-            daily_data = {}
-            
-            for item in data.get("list", []):
-                dt_txt = item.get("dt_txt", "")
-                if not dt_txt:
-                    continue
-                
-                date = dt_txt.split(" ")[0]
-                
-                if date not in daily_data:
-                    daily_data[date] = {
-                        "temps": [],
-                        "descriptions": [],
-                        "icons": []
-                    }
-                
-                # Collect temperature data
-                temp = item.get("main", {}).get("temp", 0)
-                daily_data[date]["temps"].append(temp)
-                
-                # Prefer midday weather data (12:00-15:00) for description
-                hour = dt_txt.split(" ")[1] if " " in dt_txt else ""
-                if hour in ["12:00:00", "15:00:00", "09:00:00"]:
-                    weather_info = item.get("weather", [{}])[0]
-                    daily_data[date]["descriptions"].append(
-                        weather_info.get("description", "").capitalize()
-                    )
-                    daily_data[date]["icons"].append(
-                        weather_info.get("icon", "01d")
-                    )
-            
-            # Build forecast response for first 5 days
-            forecasts = []
-            for date in sorted(daily_data.keys())[:5]:
-                day = daily_data[date]
-                
-                if not day["temps"]:
-                    continue
-                
-                description = day["descriptions"][0] if day["descriptions"] else "Clear"
-                icon = day["icons"][0] if day["icons"] else "01d"
-                
-                forecasts.append({
-                    "date": date,
-                    "temp_max": round(max(day["temps"])),
-                    "temp_min": round(min(day["temps"])),
-                    "description": description,
-                    "icon": icon,
-                })
-            
-            logger.info(f"Successfully fetched forecast for: {city}")
-            
-            return {
-                "city": city.title(),
-                "forecasts": forecasts
-            }
-            
-    except HTTPException:
-        raise
-    except httpx.TimeoutException:
-        logger.error(f"Forecast timeout for city: {city}")
-        raise HTTPException(
-            status_code=504,
-            detail="Forecast service timeout. Please try again."
+        with deadline_scope(REQUEST_DEADLINES["forecast"]):
+            forecast = await weather_service.get_forecast_by_city(city)
+    except Exception as e:
+        raise _forecast_http_error(city, e)
+    
+    logger.info(f"Successfully fetched forecast for: {city}")
+    payload = _forecast_to_response(forecast)
+    _set_freshness_headers(response, forecast)
+    _set_validators(response, payload, forecast.fetched_at)
+    
+    return _conditional_response(request, response, payload)
+
+
+def _forecast_to_response(forecast: ForecastData) -> dict:
+    """Convert service ForecastData into the ForecastResponse payload."""
+    return {
+        "city": forecast.city,
+        "forecasts": forecast.forecasts,
+        "stale": forecast.stale,
+    }
+
+
+def _forecast_not_configured() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Forecast service not configured. Please set OPENWEATHER_API_KEY."
+    )
+
+
+def _forecast_http_error(city: str, error: Exception) -> HTTPException:
+    """Log a failed forecast lookup for a city and map it to an HTTP error."""
+    if isinstance(error, CityNotFoundError):
+        logger.warning(f"Forecast city not found: {city}")
+        return HTTPException(
+            status_code=404,
+            detail=f"City not found: {city}"
         )
-    except httpx.HTTPStatusError as e:
-        logger.error(f"Forecast HTTP error for {city}: {e.response.status_code}")
-        raise HTTPException(
+    if isinstance(error, UpstreamUnavailableError):
+        logger.warning(f"Upstream unavailable for forecast of {city}: {str(error)}")
+        return _unavailable_error(error)
+    if isinstance(error, WeatherAPIError):
+        logger.error(f"Forecast error for {city}: {str(error)}")
+        if "timeout" in str(error).lower():
+            return HTTPException(
+                status_code=504,
+                detail="Forecast service timeout. Please try again."
+            )
+        return HTTPException(
             status_code=500,
             detail="Failed to fetch forecast data"
         )
+    logger.error(f"Unexpected error fetching forecast for {city}: {str(error)}")
+    return HTTPException(
+        status_code=500,
+        detail="An unexpected error occurred"
+    )
+
+
+# -----------------------------------------------
+# City View Endpoint
+# -----------------------------------------------
+@app.get(
+    "/api/city-view",
+    response_model=CityViewResponse,
+    summary="Get weather and forecast for a city",
+    description=(
+        "Fetch current weather and the 5-day forecast of a city in one request. "
+        "A failed forecast is reported next to the weather instead of failing it."
+    ),
+    responses={
+        200: {"description": "Weather retrieved (the forecast may have failed)"},
+        400: {"description": "Invalid city name"},
+        404: {"description": "City not found"},
+        500: {"description": "Weather service error"},
+        503: {"description": "Weather API not configured or unavailable"},
+        504: {"description": "Weather service timeout"},
+    }
+)
+async def get_city_view(
+    request: Request,
+    response: Response,
+    city: str = Query(
+        ...,
+        min_length=2,
+        max_length=100,
+        description="City name",
+        example="London"
+    )
+):
+    """
+    Fetch everything the city page shows in one round trip.
+    
+    The city is geocoded once, then its current conditions and forecast for
+    the geocoded coordinates are fetched concurrently. Both share their
+    cache entries with /api/weather and /api/forecast. Cache-Control follows
+    whichever part expires first.
+    """
+    city = validate_city_name(city)
+    
+    with deadline_scope(REQUEST_DEADLINES["city_view"]):
+        if not os.getenv("GOOGLE_MAPS_API_KEY"):
+            logger.warning(f"GOOGLE_MAPS_API_KEY not set. Returning mock data for: {city}")
+            return await _mock_city_view(city)
+        try:
+            view = await weather_service.get_city_view(city)
+        except Exception as e:
+            raise _weather_http_error(city, e)
+    
+    track_weather_search(logger, city=city, success=True, temperature=view.weather.temperature)
+    payload = {"weather": _weather_to_response(view.weather), **_city_view_forecast(city, view)}
+    
+    parts = [view.weather] + ([view.forecast] if view.forecast is not None else [])
+    _set_freshness_headers(response, min(parts, key=lambda part: part.expires_at))
+    if any(part.stale for part in parts):
+        response.headers["Warning"] = '110 - "Response is Stale"'
+    _set_validators(response, payload, max(
+        view.weather.observed_at or view.weather.fetched_at,
+        view.forecast.fetched_at if view.forecast is not None else 0.0,
+    ))
+    return _conditional_response(request, response, payload)
+
+
+def _city_view_forecast(city: str, view: CityView) -> dict:
+    """The forecast fields of a city view payload."""
+    if not os.getenv("OPENWEATHER_API_KEY"):
+        error = _forecast_not_configured()
+    elif view.forecast_error is not None:
+        error = _forecast_http_error(city, view.forecast_error)
+    else:
+        return {"forecast": _forecast_to_response(view.forecast), "forecast_status": 200}
+    return {"forecast": None, "forecast_status": error.status_code, "forecast_error": error.detail}
+
+
+async def _mock_city_view(city: str) -> dict:
+    """City view served for development when GOOGLE_MAPS_API_KEY is not set."""
+    payload = {"weather": _mock_weather(city), "forecast": None}
+    if not os.getenv("OPENWEATHER_API_KEY"):
+        error = _forecast_not_configured()
+        return {**payload, "forecast_status": error.status_code, "forecast_error": error.detail}
+    try:
+        forecast = await weather_service.get_forecast_by_city(city)
     except Exception as e:
-        logger.error(f"Unexpected error fetching forecast for {city}: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail="An unexpected error occurred"
-        )
\ No newline at end of file
+        error = _forecast_http_error(city, e)
+        return {**payload, "forecast_status": error.status_code, "forecast_error": error.detail}
+    return {**payload, "forecast": _forecast_to_response(forecast), "forecast_status": 200}
@@ -0,0 +1,365 @@
+"""
+Response Compression Middleware
+-------------------------------
+Content-negotiated compression of API and page responses.
+
+Responses with a compressible media type above a size threshold are
+encoded with the best coding the client accepts: brotli or zstd (when the
+optional 'brotli' / 'zstandard' packages are installed) or gzip.
+
+Compressing the same JSON over and over is wasted CPU: when many users
+ask for the same cached forecast, the body bytes are identical. Compressed
+bodies of cacheable responses (anything without no-store/private) are kept
+in a small LRU cache keyed by a hash of the body, so each distinct payload
+is compressed once per encoding.
+
+Streaming responses (NDJSON/SSE or anything sent in several chunks) and
+responses that are already encoded (the prebuilt static assets) pass
+through untouched.
+
+Configuration:
+    COMPRESSION_MIN_SIZE           Smallest body (bytes) worth compressing
+    COMPRESSION_CACHE_MAX_ENTRIES  Compressed bodies kept in memory
+    COMPRESSION_CACHE_TTL          Seconds a compressed body is kept
+    COMPRESSION_GZIP_LEVEL         1-9
+    COMPRESSION_BROTLI_QUALITY     0-11
+    COMPRESSION_ZSTD_LEVEL         1-22
+"""
+
+import gzip
+import time
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.cache import TTLCache
+from app.services.config import env_int
+
+# Optional codecs: pip install brotli zstandard
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Server preference when the client accepts several codings equally
+ENCODING_PREFERENCE = ("br", "zstd", "gzip")
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Sent in chunks as results become available; buffering would defeat them
+STREAMING_TYPES = ("text/event-stream", "application/x-ndjson")
+
+
+# -----------------------------------------------
+# Content Negotiation
+# -----------------------------------------------
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into {coding: q-value}.
+
+    Args:
+        header: Raw header value, e.g. "gzip, br;q=0.9, *;q=0"
+
+    Returns:
+        Lower-cased codings mapped to their quality (invalid q counts as 0)
+    """
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header: str, available: Iterable[str]) -> Optional[str]:
+    """
+    Pick the content coding to use for a response.
+
+    Args:
+        header: Accept-Encoding header value
+        available: Codings the server can produce
+
+    Returns:
+        The accepted coding with the highest q-value (ties broken by
+        ENCODING_PREFERENCE), or None for identity
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in ENCODING_PREFERENCE:
+        if coding not in available:
+            continue
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def strip_encoding_suffix(etag: str) -> str:
+    """
+    Undo the per-encoding ETag suffix added by CompressionMiddleware.
+
+    '"abc-gzip"' -> '"abc"', so handlers can compare entity tags that
+    clients echo back from a compressed response. Weak markers are dropped.
+    """
+    etag = etag.strip().removeprefix("W/")
+    for coding in ENCODING_PREFERENCE:
+        suffix = f'-{coding}"'
+        if etag.endswith(suffix):
+            return etag[: -len(suffix)] + '"'
+    return etag
+
+
+# -----------------------------------------------
+# Codecs
+# -----------------------------------------------
+def available_codecs(
+    gzip_level: int = 6, brotli_quality: int = 5, zstd_level: int = 3
+) -> Dict[str, Callable[[bytes], bytes]]:
+    """Compression functions for every coding installed on this host."""
+    codecs = {"gzip": lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0)}
+    if brotli is not None:
+        codecs["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=zstd_level)
+        codecs["zstd"] = compressor.compress
+    return codecs
+
+
+# -----------------------------------------------
+# Metrics
+# -----------------------------------------------
+@dataclass
+class EncodingStats:
+    """Counters for one content coding."""
+    responses: int = 0
+    compressions: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    cpu_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "compressions": self.compressions,
+            "cache_hits": self.responses - self.compressions,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+            "cpu_ms": round(self.cpu_seconds * 1000, 3),
+            "cpu_ms_per_compression": (
+                round(self.cpu_seconds * 1000 / self.compressions, 3)
+                if self.compressions else 0.0
+            ),
+        }
+
+
+class CompressionStats:
+    """Compression ratio, CPU time and skip reasons, shared with /api/metrics."""
+
+    def __init__(self):
+        self.encodings: Dict[str, EncodingStats] = {}
+        self.skipped: Dict[str, int] = {}
+        self.cache: Optional[TTLCache] = None
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: Optional[float]) -> None:
+        """Count one compressed response (cpu_seconds is None for a cache hit)."""
+        stats = self.encodings.setdefault(encoding, EncodingStats())
+        stats.responses += 1
+        stats.bytes_in += bytes_in
+        stats.bytes_out += bytes_out
+        if cpu_seconds is not None:
+            stats.compressions += 1
+            stats.cpu_seconds += cpu_seconds
+
+    def skip(self, reason: str) -> None:
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "encodings": {name: stats.to_dict() for name, stats in self.encodings.items()},
+            "skipped": dict(self.skipped),
+            "cache": self.cache.stats() if self.cache is not None else {},
+        }
+
+
+# -----------------------------------------------
+# Middleware
+# -----------------------------------------------
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete responses above a size threshold.
+
+    Usage:
+        stats = CompressionStats()
+        app.add_middleware(CompressionMiddleware, stats=stats)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        cache_max_entries: Optional[int] = None,
+        cache_ttl: Optional[int] = None,
+        stats: Optional[CompressionStats] = None,
+        codecs: Optional[Dict[str, Callable[[bytes], bytes]]] = None,
+    ):
+        """
+        Args:
+            app: Wrapped ASGI application
+            minimum_size: Smallest body worth compressing (default from env)
+            cache_max_entries: Compressed bodies kept in memory (default from env)
+            cache_ttl: Seconds a compressed body is kept (default from env)
+            stats: Metrics sink, shared with the metrics endpoint
+            codecs: Coding name -> compress function (default: all installed)
+        """
+        self.app = app
+        self.minimum_size = (
+            minimum_size if minimum_size is not None
+            else env_int("COMPRESSION_MIN_SIZE", 1024)
+        )
+        self.codecs = codecs or available_codecs(
+            gzip_level=env_int("COMPRESSION_GZIP_LEVEL", 6),
+            brotli_quality=env_int("COMPRESSION_BROTLI_QUALITY", 5),
+            zstd_level=env_int("COMPRESSION_ZSTD_LEVEL", 3),
+        )
+        self.cache = TTLCache(
+            max_entries=(
+                cache_max_entries if cache_max_entries is not None
+                else env_int("COMPRESSION_CACHE_MAX_ENTRIES", 512)
+            ),
+            default_ttl=(
+                cache_ttl if cache_ttl is not None
+                else env_int("COMPRESSION_CACHE_TTL", 3600)
+            ),
+        )
+        self.stats = stats or CompressionStats()
+        self.stats.cache = self.cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.codecs
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the headers until the body shows whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                self.stats.skip("streaming")
+                await send(start)
+                await send(message)
+                return
+
+            start, body = self._encode(start, body, encoding)
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _encode(self, start: Message, body: bytes, encoding: str) -> Tuple[Message, bytes]:
+        """Compress a complete response if it qualifies, updating its headers."""
+        headers = Headers(raw=start["headers"])
+        reason = self._skip_reason(start["status"], headers, body)
+        if reason is not None:
+            self.stats.skip(reason)
+            return start, body
+
+        compressed, cpu_seconds = self._compress(body, encoding, headers)
+        self.stats.record(encoding, len(body), len(compressed), cpu_seconds)
+
+        start = dict(start)
+        start["headers"] = list(start["headers"])
+        mutable = MutableHeaders(raw=start["headers"])
+        mutable["Content-Encoding"] = encoding
+        mutable["Content-Length"] = str(len(compressed))
+        mutable.add_vary_header("Accept-Encoding")
+        etag = mutable.get("etag")
+        if etag and etag.endswith('"'):
+            # A different representation needs a different entity tag
+            mutable["ETag"] = f'{etag[:-1]}-{encoding}"'
+        return start, compressed
+
+    def _skip_reason(self, status: int, headers: Headers, body: bytes) -> Optional[str]:
+        """Why a response should be sent as is, or None to compress it."""
+        media_type = headers.get("content-type", "").lower()
+        if status < 200 or status in (204, 206, 304):
+            return "status"
+        if "content-encoding" in headers:
+            return "encoded"
+        if media_type.startswith(STREAMING_TYPES):
+            return "streaming"
+        if not media_type.startswith(COMPRESSIBLE_TYPES):
+            return "media_type"
+        if "no-transform" in headers.get("cache-control", ""):
+            return "no_transform"
+        if len(body) < self.minimum_size:
+            return "too_small"
+        return None
+
+    def _compress(
+        self, body: bytes, encoding: str, headers: Headers
+    ) -> Tuple[bytes, Optional[float]]:
+        """
+        Compress body, reusing a previously compressed identical body.
+
+        Returns:
+            Tuple of (compressed bytes, CPU seconds spent or None on a cache hit)
+        """
+        cache_control = headers.get("cache-control", "")
+        cacheable = "no-store" not in cache_control and "private" not in cache_control
+        key = None
+        if cacheable:
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached, None
+
+        started = time.thread_time()
+        compressed = self.codecs[encoding](body)
+        cpu_seconds = time.thread_time() - started
+
+        if key is not None:
+            self.cache.set(key, compressed)
+        return compressed, cpu_seconds
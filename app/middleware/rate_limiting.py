@@ -0,0 +1,383 @@
+"""
+Inbound Rate Limiting Middleware
+--------------------------------
+Per-client request budgets for the endpoints that cost upstream calls.
+
+Each client (its X-API-Key if the key is in RATE_LIMIT_API_KEYS, else its
+IP address) gets a separate budget per route group: /api/weather (and
+/weather/{city}), the batch endpoints, /api/forecast and
+/api/cities/autocomplete. A batch request is charged one request per city
+or point it asks for (at most the group's burst), whether they come as
+repeated query parameters or in a JSON body. Budgets use GCRA (the generic cell rate
+algorithm): a client is a single "theoretical arrival time", so memory is
+O(1) per active client, and the entry expires once the client's burst
+allowance has fully recovered. The in-memory table is also LRU-bounded.
+
+With RATE_LIMIT_SHARED=true the budgets are kept in the cache backend
+(WEATHER_CACHE_BACKEND) instead, as token buckets taken atomically by the
+backend, so that all gunicorn workers enforce one budget per client.
+
+Requests over budget are answered with 429 and Retry-After by the
+middleware itself, before routing, validation or any handler runs.
+
+Configuration:
+    RATE_LIMIT_ENABLED                Enforce the limits (default true)
+    RATE_LIMIT_WEATHER                Weather requests per minute (default 120)
+    RATE_LIMIT_FORECAST               Forecast requests per minute (default 60)
+    RATE_LIMIT_AUTOCOMPLETE           Autocomplete requests per minute (default 600)
+    RATE_LIMIT_BATCH                  Batch cities/points per minute (default 1200)
+    RATE_LIMIT_<GROUP>_BURST          Requests allowed at once (default: one
+                                      minute's worth)
+    RATE_LIMIT_SHARED                 Share budgets through the cache backend
+    RATE_LIMIT_TRUST_FORWARDED        Identify clients by X-Forwarded-For
+                                      (only behind a trusted proxy, e.g. the
+                                      Azure App Service front end; without
+                                      it every user shares the proxy's IP)
+    RATE_LIMIT_FORWARDED_HOPS         Trusted proxies appending to
+                                      X-Forwarded-For (default 1)
+    RATE_LIMIT_MAX_CLIENTS            Clients tracked in memory (default 100000)
+    RATE_LIMIT_API_KEYS               Comma-separated API keys given their own
+                                      budget; other keys count as their IP
+"""
+
+import json
+import math
+import time
+import hashlib
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.cache import CacheBackend, TTLCache
+from app.services.config import env_bool, env_float, env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "inbound"
+
+
+# -----------------------------------------------
+# Budgets
+# -----------------------------------------------
+@dataclass
+class RouteLimit:
+    """Request budget of one group of routes."""
+    name: str
+    prefixes: Tuple[str, ...]
+    per_minute: float
+    burst: float
+    # Query parameters or JSON body lists whose items are charged one each
+    batch_fields: Tuple[str, ...] = ()
+
+    @property
+    def interval(self) -> float:
+        """Seconds between requests at the sustained rate."""
+        return 60.0 / self.per_minute
+
+    def matches(self, path: str) -> bool:
+        return path.startswith(self.prefixes)
+
+
+def default_route_limits() -> List[RouteLimit]:
+    """Budgets for the upstream-backed endpoints, from the environment."""
+    # First match wins: the batch routes are also under /api/weather
+    groups = (
+        ("batch", ("/api/weather/batch", "/api/weather/coords/batch"), 1200,
+         ("cities", "points")),
+        ("weather", ("/api/weather", "/weather/", "/api/city-view"), 120, ("city", "lat")),
+        ("forecast", ("/api/forecast",), 60, ()),
+        ("autocomplete", ("/api/cities/autocomplete",), 600, ()),
+    )
+    limits = []
+    for name, prefixes, per_minute, batch_fields in groups:
+        per_minute = max(1.0, env_float(f"RATE_LIMIT_{name.upper()}", per_minute))
+        burst = max(1.0, env_float(f"RATE_LIMIT_{name.upper()}_BURST", per_minute))
+        limits.append(RouteLimit(name, prefixes, per_minute, burst, batch_fields))
+    return limits
+
+
+def gcra(
+    tat: Optional[float], now: float, interval: float, burst: float, cost: float = 1.0
+) -> Tuple[bool, float, float]:
+    """
+    One GCRA decision.
+
+    Args:
+        tat: Client's theoretical arrival time, or None for a new client
+        now: Current time
+        interval: Seconds between requests at the sustained rate
+        burst: Requests allowed back to back
+        cost: Requests this one counts as (at most burst)
+
+    Returns:
+        Tuple of (allowed; new theoretical arrival time, which is also when
+        the client's budget is fully recovered; seconds until the next
+        request would be allowed, 0 if allowed)
+    """
+    tat = max(tat or now, now)
+    allow_at = tat - interval * burst
+    if now < allow_at + interval * cost:
+        return False, tat, allow_at + interval * cost - now
+    return True, tat + interval * cost, 0.0
+
+
+class ClientLimiter:
+    """
+    GCRA budgets per (route group, client) in process memory.
+
+    Usage:
+        limiter = ClientLimiter()
+        allowed, retry_after = limiter.check(limit, "ip:10.0.0.1")
+    """
+
+    def __init__(self, max_clients: int = 100000, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self.clients = TTLCache(max_entries=max_clients, default_ttl=0, clock=clock)
+
+    async def check(
+        self, limit: RouteLimit, client: str, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        """Count cost requests; return (allowed, seconds to wait if not)."""
+        key = (limit.name, client)
+        now = self._clock()
+        allowed, tat, retry_after = gcra(
+            self.clients.get(key), now, limit.interval, limit.burst, cost
+        )
+        if allowed:
+            # Past tat the client has its full burst again: forget it
+            self.clients.set(key, tat, ttl=tat - now)
+        return allowed, retry_after
+
+
+class SharedClientLimiter:
+    """
+    Budgets per (route group, client) kept in a cache backend, shared by
+    every worker using it. Token buckets (equivalent to GCRA) are taken
+    atomically by the backend.
+    """
+
+    def __init__(self, backend: CacheBackend, clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self._clock = clock
+        backend.register(NAMESPACE, env_int("RATE_LIMIT_MAX_CLIENTS", 100000))
+
+    async def check(
+        self, limit: RouteLimit, client: str, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        wait = await self.backend.take_tokens(
+            NAMESPACE, f"{limit.name}:{client}", 1.0 / limit.interval, limit.burst,
+            self._clock(), cost,
+        )
+        return wait <= 0, wait
+
+
+# -----------------------------------------------
+# Middleware
+# -----------------------------------------------
+class RateLimitStats:
+    """Allowed/rejected counters per route group, shared with /api/metrics."""
+
+    def __init__(self):
+        self.counters: Dict[str, Counter] = {}
+        self.limiter: Optional[Any] = None
+
+    def record(self, group: str, outcome: str) -> None:
+        self.counters.setdefault(group, Counter())[outcome] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        clients = getattr(self.limiter, "clients", None)
+        return {
+            "groups": {group: dict(counts) for group, counts in self.counters.items()},
+            "tracked_clients": len(clients) if clients is not None else None,
+        }
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware rejecting over-budget requests with 429.
+
+    Usage:
+        stats = RateLimitStats()
+        app.add_middleware(RateLimitMiddleware, stats=stats)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: Optional[List[RouteLimit]] = None,
+        backend: Optional[CacheBackend] = None,
+        trust_forwarded: Optional[bool] = None,
+        forwarded_hops: Optional[int] = None,
+        api_keys: Optional[Iterable[str]] = None,
+        enabled: Optional[bool] = None,
+        stats: Optional[RateLimitStats] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            app: Wrapped ASGI application
+            limits: Route budgets (default from env, see default_route_limits)
+            backend: Shared cache backend; budgets are per process without one
+            trust_forwarded: Identify clients by X-Forwarded-For (default from env)
+            forwarded_hops: Trusted proxies in front of the app (default from env)
+            api_keys: API keys given their own budget (default from env)
+            enabled: Enforce the limits (default from env)
+            stats: Metrics sink, shared with the metrics endpoint
+            clock: Time source, injectable for tests
+        """
+        self.app = app
+        self.limits = limits if limits is not None else default_route_limits()
+        self.trust_forwarded = (
+            trust_forwarded if trust_forwarded is not None
+            else env_bool("RATE_LIMIT_TRUST_FORWARDED", False)
+        )
+        self.forwarded_hops = max(1, (
+            forwarded_hops if forwarded_hops is not None
+            else env_int("RATE_LIMIT_FORWARDED_HOPS", 1)
+        ))
+        if api_keys is None:
+            api_keys = env_str("RATE_LIMIT_API_KEYS", "").split(",")
+        self.api_keys = frozenset(_hash_key(key.strip()) for key in api_keys if key.strip())
+        self.enabled = enabled if enabled is not None else env_bool("RATE_LIMIT_ENABLED", True)
+        self.limiter = (
+            SharedClientLimiter(backend, clock) if backend is not None
+            else ClientLimiter(env_int("RATE_LIMIT_MAX_CLIENTS", 100000), clock)
+        )
+        self.stats = stats or RateLimitStats()
+        self.stats.limiter = self.limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self._route_limit(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        cost = 1
+        if limit.batch_fields:
+            if scope["method"] == "POST":
+                body = await _read_body(receive)
+                receive = _replay(body, receive)
+            else:
+                body = b""
+            cost = min(self._batch_size(limit, scope, body), int(limit.burst))
+
+        try:
+            allowed, retry_after = await self.limiter.check(
+                limit, self._client_id(scope), cost
+            )
+        except Exception as e:
+            # A broken shared backend must not take the API down
+            logger.warning(f"Rate limit check failed, allowing request: {str(e)}")
+            self.stats.record(limit.name, "errors")
+            allowed = True
+
+        if allowed:
+            self.stats.record(limit.name, "allowed")
+            await self.app(scope, receive, send)
+            return
+
+        self.stats.record(limit.name, "rejected")
+        await self._reject(send, limit, retry_after)
+
+    def _route_limit(self, path: str) -> Optional[RouteLimit]:
+        for limit in self.limits:
+            if limit.matches(path):
+                return limit
+        return None
+
+    @staticmethod
+    def _batch_size(limit: RouteLimit, scope: Scope, body: bytes) -> int:
+        """Cities or points a request asks for (1 unless it is a batch)."""
+        params = QueryParams(scope.get("query_string", b""))
+        size = max(len(params.getlist(field)) for field in limit.batch_fields)
+        if body:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                payload = None  # rejected by validation
+            if isinstance(payload, dict):
+                for field in limit.batch_fields:
+                    if isinstance(payload.get(field), list):
+                        size = max(size, len(payload[field]))
+        return max(1, size)
+
+    def _client_id(self, scope: Scope) -> str:
+        """
+        Known API key (hashed, so it is never stored) or client IP address.
+
+        Unknown keys are ignored: any string would otherwise get a fresh
+        budget, and a stream of random keys would evict real clients.
+        """
+        headers = Headers(scope=scope)
+        api_key = headers.get("x-api-key")
+        if api_key and self.api_keys:
+            digest = _hash_key(api_key)
+            if digest in self.api_keys:
+                return f"key:{digest}"
+        if self.trust_forwarded:
+            # Each proxy appends the address it received the request from,
+            # so only the last forwarded_hops entries are trustworthy; the
+            # ones before them are whatever the client sent
+            forwarded = [
+                address.strip()
+                for address in headers.get("x-forwarded-for", "").split(",")
+                if address.strip()
+            ]
+            if len(forwarded) >= self.forwarded_hops:
+                return f"ip:{forwarded[-self.forwarded_hops]}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    @staticmethod
+    async def _reject(send: Send, limit: RouteLimit, retry_after: float) -> None:
+        body = json.dumps({"detail": "Too many requests. Please slow down."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+                (b"x-ratelimit-limit", f"{limit.per_minute:g}/min".encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _hash_key(api_key: str) -> str:
+    return hashlib.blake2b(api_key.encode(), digest_size=12).hexdigest()
+
+
+async def _read_body(receive: Receive) -> bytes:
+    """Read a whole request body from the ASGI receive channel."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _replay(body: bytes, receive: Receive) -> Receive:
+    """Receive channel giving the app a body already read by the middleware."""
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
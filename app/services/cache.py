@@ -0,0 +1,466 @@
+"""
+Cache Module
+------------
+Caches used by the weather service to avoid repeated upstream calls for
+data that rarely changes (geocoding) or is shared by many users (current
+conditions, forecasts, autocomplete).
+
+TTLCache combines a per-entry time-to-live with LRU eviction once the
+configured number of entries is reached, and keeps hit/miss/eviction
+counters that are exposed through the /api/metrics endpoint. Entries can
+outlive their TTL by a "stale" grace period so that callers may serve them
+while refreshing (stale-while-revalidate) or when upstream is failing.
+
+The service does not talk to TTLCache directly: each kind of data lives in
+a CacheRegion on top of a pluggable CacheBackend, so that several gunicorn
+workers can share one cache (see cache_backends.py for the Redis and
+SQLite implementations). Every backend stores the same JSON envelope and
+applies the same TTL rules.
+"""
+
+import re
+import json
+import time
+import logging
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------------------------
+# Key Normalization
+# -----------------------------------------------
+def normalize_text(text: str) -> str:
+    """
+    Normalize free-form place text into a cache/index key.
+
+    Folds case and accents and collapses whitespace, so that "São Paulo",
+    "sao  paulo" and "SAO PAULO" all map to "sao paulo".
+
+    Args:
+        text: Raw user input
+
+    Returns:
+        Normalized key string
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    folded = stripped.casefold()
+    folded = re.sub(r"\s*,\s*", ", ", folded)
+    return " ".join(folded.split())
+
+
+# -----------------------------------------------
+# TTL + LRU Cache
+# -----------------------------------------------
+@dataclass
+class CacheEntry:
+    """
+    A cached value together with its timestamps (seconds since epoch).
+
+    The entry is fresh until ``fresh_until`` and is dropped from the cache
+    at ``expires_at``; in between it is stale but still usable.
+    """
+    value: Any
+    stored_at: float
+    expires_at: float
+    fresh_until: float = 0.0
+
+    def __post_init__(self):
+        if not self.fresh_until:
+            self.fresh_until = self.expires_at
+
+    def age(self, now: float) -> float:
+        """Seconds since the value was stored."""
+        return max(0.0, now - self.stored_at)
+
+    def is_fresh(self, now: float) -> bool:
+        """Whether the entry is still within its TTL."""
+        return now < self.fresh_until
+
+    def staleness(self, now: float) -> float:
+        """Seconds past the TTL (0 while fresh)."""
+        return max(0.0, now - self.fresh_until)
+
+    def dumps(self) -> str:
+        """Serialize the entry to the JSON envelope shared by all backends."""
+        return json.dumps(
+            {"v": self.value, "s": self.stored_at, "f": self.fresh_until, "e": self.expires_at},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def loads(cls, payload) -> "CacheEntry":
+        """Deserialize an entry produced by dumps()."""
+        data = json.loads(payload)
+        return cls(value=data["v"], stored_at=data["s"], expires_at=data["e"], fresh_until=data["f"])
+
+
+class TTLCache:
+    """
+    Bounded mapping with per-entry expiry and least-recently-used eviction.
+
+    Usage:
+        cache = TTLCache(max_entries=1000, default_ttl=300)
+        cache.set("london", {"lat": 51.5})
+        entry = cache.get_entry("london")
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        default_ttl: float,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            max_entries: Maximum number of live entries before LRU eviction
+            default_ttl: Time-to-live in seconds when set() is not given one
+            stale_ttl: Extra seconds an entry is kept after its TTL as stale
+            clock: Time source, injectable for tests
+        """
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the live entry for key (marking it recently used), or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired."""
+        entry = self.get_entry(key)
+        return default if entry is None else entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> CacheEntry:
+        """Store value under key, evicting the least recently used entry if full."""
+        now = self._clock()
+        fresh_until = now + (self.default_ttl if ttl is None else ttl)
+        entry = CacheEntry(
+            value=value,
+            stored_at=now,
+            expires_at=fresh_until + self.stale_ttl,
+            fresh_until=fresh_until,
+        )
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def delete(self, key: Hashable) -> None:
+        """Remove key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# -----------------------------------------------
+# Token Buckets
+# -----------------------------------------------
+def token_bucket_take(
+    payload: Optional[str], now: float, rate: float, capacity: float, cost: float = 1.0
+) -> Tuple[float, Optional[str], float]:
+    """
+    Apply one token bucket take to a stored bucket state.
+
+    The state is "tokens,updated_at"; a missing state is a full bucket.
+    Shared by the backends so every one of them applies the same rule.
+
+    Args:
+        payload: Stored state, or None
+        now: Current time
+        rate: Tokens added per second
+        capacity: Bucket size (largest burst)
+        cost: Tokens to take
+
+    Returns:
+        Tuple of (seconds to wait, 0.0 if the tokens were taken; new state
+        to store, or None to leave it unchanged; time the state can expire,
+        i.e. when the bucket is full again)
+    """
+    tokens, updated = capacity, now
+    if payload is not None:
+        stored_tokens, stored_at = payload.split(",")
+        tokens, updated = float(stored_tokens), float(stored_at)
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    if tokens < cost:
+        return (cost - tokens) / rate, None, 0.0
+    tokens -= cost
+    return 0.0, f"{tokens!r},{now!r}", now + (capacity - tokens) / rate + 1.0
+
+
+# -----------------------------------------------
+# Pluggable Cache Backends
+# -----------------------------------------------
+class CacheBackend(ABC):
+    """
+    Storage for serialized cache entries, grouped by namespace.
+
+    Implementations store the payload produced by CacheEntry.dumps() and
+    must drop it once ``expires_at`` has passed. Each namespace is bounded
+    to the number of entries given to register().
+    """
+
+    name = "abstract"
+
+    def register(self, namespace: str, max_entries: int) -> None:
+        """Declare a namespace and its entry bound (optional for backends)."""
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        """Return the stored payload, or None if missing or expired."""
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, payload: str, expires_at: float) -> None:
+        """Store payload until the absolute time expires_at."""
+
+    @abstractmethod
+    async def delete(self, namespace: str, key: str) -> None:
+        """Remove a key if present."""
+
+    async def take_tokens(
+        self,
+        namespace: str,
+        key: str,
+        rate: float,
+        capacity: float,
+        now: float,
+        cost: float = 1.0,
+    ) -> float:
+        """
+        Take tokens from a token bucket stored under key (see token_bucket_take).
+
+        This default is atomic only within one event loop; backends shared
+        between processes override it.
+
+        Returns:
+            0.0 if the tokens were taken, else seconds until they will be
+        """
+        wait, payload, expires_at = token_bucket_take(
+            await self.get(namespace, key), now, rate, capacity, cost
+        )
+        if payload is not None:
+            await self.set(namespace, key, payload, expires_at)
+        return wait
+
+    async def incr(self, namespace: str, key: str, amount: int, expires_at: float) -> int:
+        """
+        Add amount to an integer counter (created at 0) and return the total.
+
+        Like take_tokens(), backends shared between processes override this
+        with an atomic version.
+        """
+        value = int(await self.get(namespace, key) or 0) + amount
+        await self.set(namespace, key, str(value), expires_at)
+        return value
+
+    async def aclose(self) -> None:
+        """Release connections held by the backend."""
+
+    async def namespace_stats(self, namespace: str) -> Dict[str, Any]:
+        """Size/eviction counters for one namespace, where the backend knows them."""
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process backend: one TTLCache (LRU-bounded) per namespace."""
+
+    name = "memory"
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._caches: Dict[str, TTLCache] = {}
+
+    def register(self, namespace: str, max_entries: int) -> None:
+        if namespace not in self._caches:
+            self._caches[namespace] = TTLCache(
+                max_entries=max_entries, default_ttl=0, clock=self._clock
+            )
+
+    def _cache(self, namespace: str) -> TTLCache:
+        if namespace not in self._caches:
+            self.register(namespace, 10000)
+        return self._caches[namespace]
+
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        return self._cache(namespace).get(key)
+
+    async def set(self, namespace: str, key: str, payload: str, expires_at: float) -> None:
+        self._cache(namespace).set(key, payload, ttl=expires_at - self._clock())
+
+    async def delete(self, namespace: str, key: str) -> None:
+        self._cache(namespace).delete(key)
+
+    async def namespace_stats(self, namespace: str) -> Dict[str, Any]:
+        cache = self._cache(namespace)
+        return {
+            "size": len(cache),
+            "evictions": cache.evictions,
+            "expirations": cache.expirations,
+        }
+
+
+class CacheRegion:
+    """
+    One kind of cached data (geocode, weather, ...) stored in a backend.
+
+    Keys are converted to strings, values must be JSON-serializable. The
+    region applies the TTL rules (fresh TTL plus stale grace period) and
+    counts hits and misses for this worker. Backend failures are logged
+    and treated as cache misses so that a cache outage never fails a
+    request.
+
+    Usage:
+        region = CacheRegion(backend, "geocode", default_ttl=3600)
+        await region.set("london", {"latitude": 51.5})
+        entry = await region.get_entry("london")
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str,
+        default_ttl: float,
+        stale_ttl: float = 0.0,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            backend: Storage backend shared by all regions
+            namespace: Region name, used as key prefix in the backend
+            default_ttl: Seconds an entry stays fresh when set() is not given a TTL
+            stale_ttl: Extra seconds an entry is kept after its TTL as stale
+            max_entries: Entry bound for this namespace
+            clock: Time source, injectable for tests
+        """
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        backend.register(namespace, max_entries)
+
+    @staticmethod
+    def _key(key: Any) -> str:
+        if isinstance(key, tuple):
+            return ":".join(str(part) for part in key)
+        return str(key)
+
+    async def get_entry(self, key: Any) -> Optional[CacheEntry]:
+        """Return the live (fresh or stale) entry for key, or None."""
+        entry = await self.peek_entry(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    async def peek_entry(self, key: Any) -> Optional[CacheEntry]:
+        """Like get_entry(), without counting a hit or miss (for housekeeping)."""
+        try:
+            payload = await self.backend.get(self.namespace, self._key(key))
+            entry = CacheEntry.loads(payload) if payload is not None else None
+        except Exception as e:
+            logger.warning(f"Cache read failed for {self.namespace}: {str(e)}")
+            self.errors += 1
+            return None
+        if entry is None or entry.expires_at <= self._clock():
+            return None
+        return entry
+
+    async def get(self, key: Any, default: Any = None) -> Any:
+        """Return the cached value for key, or default."""
+        entry = await self.get_entry(key)
+        return default if entry is None else entry.value
+
+    async def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> CacheEntry:
+        """Store value as fresh for ttl seconds (plus the stale grace period)."""
+        now = self._clock()
+        fresh_until = now + (self.default_ttl if ttl is None else ttl)
+        entry = CacheEntry(
+            value=value,
+            stored_at=now,
+            expires_at=fresh_until + self.stale_ttl,
+            fresh_until=fresh_until,
+        )
+        await self.set_entry(key, entry)
+        return entry
+
+    async def set_entry(self, key: Any, entry: CacheEntry) -> None:
+        """Store a prebuilt entry as is."""
+        try:
+            await self.backend.set(
+                self.namespace, self._key(key), entry.dumps(), entry.expires_at
+            )
+        except Exception as e:
+            logger.warning(f"Cache write failed for {self.namespace}: {str(e)}")
+            self.errors += 1
+
+    async def delete(self, key: Any) -> None:
+        """Remove key from the region."""
+        try:
+            await self.backend.delete(self.namespace, self._key(key))
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {self.namespace}: {str(e)}")
+            self.errors += 1
+
+    async def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring (hits/misses are per worker)."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            **await self.backend.namespace_stats(self.namespace),
+        }
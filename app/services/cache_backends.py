@@ -0,0 +1,367 @@
+"""
+Shared Cache Backends
+---------------------
+CacheBackend implementations that share cached data between the gunicorn
+workers of a deployment, plus the factory that picks one from the
+environment.
+
+- memory: per-process LRU (default, see cache.py)
+- redis:  any Redis-protocol server, shared by all workers and hosts
+- sqlite: a memory-mapped SQLite file, shared by all workers on one host
+
+Configuration:
+    WEATHER_CACHE_BACKEND       memory | redis | sqlite
+    WEATHER_CACHE_REDIS_URL     e.g. redis://localhost:6379/0
+    WEATHER_CACHE_SQLITE_PATH   e.g. /home/data/weatherwatcher-cache.sqlite3
+"""
+
+import os
+import time
+import asyncio
+import logging
+import sqlite3
+import tempfile
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.services.cache import CacheBackend, MemoryCacheBackend, token_bucket_take
+from app.services.config import env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+# The Redis client is optional: pip install redis
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+
+# -----------------------------------------------
+# Redis Backend
+# -----------------------------------------------
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache backend on a Redis-protocol server.
+
+    Expiry is delegated to Redis (PX), and the entry bound is expected to
+    be enforced by the server's maxmemory policy (allkeys-lru).
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        client: Any = None,
+        prefix: str = "weatherwatcher:",
+    ):
+        """
+        Args:
+            url: Redis URL, used when no client is given
+            client: Existing redis.asyncio-compatible client (e.g. fakeredis)
+            prefix: Prefix for all keys written by this app
+        """
+        if client is None:
+            if redis_asyncio is None:
+                raise RuntimeError("The redis cache backend requires the 'redis' package")
+            client = redis_asyncio.from_url(url or "redis://localhost:6379/0")
+        self._client = client
+        self.prefix = prefix
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}{namespace}:{key}"
+
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        return await self._client.get(self._key(namespace, key))
+
+    async def set(self, namespace: str, key: str, payload: str, expires_at: float) -> None:
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms <= 0:
+            await self.delete(namespace, key)
+            return
+        await self._client.set(self._key(namespace, key), payload, px=ttl_ms)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        await self._client.delete(self._key(namespace, key))
+
+    # Same rule as token_bucket_take(), run atomically on the server
+    TAKE_TOKENS_SCRIPT = """
+        local now, rate, capacity, cost = tonumber(ARGV[1]), tonumber(ARGV[2]),
+            tonumber(ARGV[3]), tonumber(ARGV[4])
+        local tokens, updated = capacity, now
+        local state = redis.call('GET', KEYS[1])
+        if state then
+            local sep = string.find(state, ',')
+            tokens = tonumber(string.sub(state, 1, sep - 1))
+            updated = tonumber(string.sub(state, sep + 1))
+        end
+        tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+        if tokens < cost then
+            return tostring((cost - tokens) / rate)
+        end
+        tokens = tokens - cost
+        local ttl_ms = math.ceil(((capacity - tokens) / rate + 1) * 1000)
+        redis.call('SET', KEYS[1], string.format('%.17g,%.17g', tokens, now), 'PX', ttl_ms)
+        return '0'
+    """
+
+    async def take_tokens(
+        self,
+        namespace: str,
+        key: str,
+        rate: float,
+        capacity: float,
+        now: float,
+        cost: float = 1.0,
+    ) -> float:
+        wait = await self._client.eval(
+            self.TAKE_TOKENS_SCRIPT, 1, self._key(namespace, key), now, rate, capacity, cost
+        )
+        return float(wait)
+
+    async def incr(self, namespace: str, key: str, amount: int, expires_at: float) -> int:
+        full_key = self._key(namespace, key)
+        value = await self._client.incrby(full_key, amount)
+        await self._client.expireat(full_key, int(expires_at) + 1)
+        return int(value)
+
+    async def aclose(self) -> None:
+        close = getattr(self._client, "aclose", None) or self._client.close
+        await close()
+
+
+# -----------------------------------------------
+# SQLite Backend
+# -----------------------------------------------
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache backend on a local SQLite file shared by all workers on a host.
+
+    The database runs in WAL mode with a memory-mapped file, so reads from
+    several processes do not block each other. Queries run in a worker
+    thread to keep the event loop free. Each namespace is trimmed to its
+    entry bound (least recently read first) every PRUNE_EVERY writes.
+    Read times are kept to ACCESS_RESOLUTION seconds, so that most hits do
+    not write to the database.
+    """
+
+    name = "sqlite"
+    PRUNE_EVERY = 200
+    ACCESS_RESOLUTION = 60.0
+
+    def __init__(
+        self,
+        path: str,
+        mmap_size: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: Database file path (created if missing)
+            mmap_size: Bytes of the file to memory-map
+            clock: Time source, injectable for tests
+        """
+        self.path = path
+        self.mmap_size = mmap_size
+        self._clock = clock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._max_entries: Dict[str, int] = {}
+        self._writes: Counter = Counter()
+        self.evictions: Counter = Counter()
+
+    def register(self, namespace: str, max_entries: int) -> None:
+        self._max_entries[namespace] = max_entries
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=2.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key)"
+                ") WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn: Callable, *args):
+        with self._lock:
+            return fn(self._connection(), *args)
+
+    def _get(self, conn: sqlite3.Connection, namespace: str, key: str) -> Optional[str]:
+        now = self._clock()
+        row = conn.execute(
+            "SELECT payload, expires_at, accessed_at FROM cache"
+            " WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        if now - row[2] >= self.ACCESS_RESOLUTION:
+            conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key),
+            )
+        return row[0]
+
+    def _set(
+        self, conn: sqlite3.Connection, namespace: str, key: str, payload: str, expires_at: float
+    ) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, payload, expires_at, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, payload, expires_at, self._clock()),
+        )
+        self._writes[namespace] += 1
+        if self._writes[namespace] % self.PRUNE_EVERY == 0:
+            self._prune(conn, namespace)
+
+    def _prune(self, conn: sqlite3.Connection, namespace: str) -> None:
+        """Drop expired rows, then the least recently read rows over the bound."""
+        conn.execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+            (namespace, self._clock()),
+        )
+        max_entries = self._max_entries.get(namespace)
+        if not max_entries:
+            return
+        (size,) = conn.execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        excess = size - max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache WHERE namespace = ?"
+                " ORDER BY accessed_at LIMIT ?)",
+                (namespace, namespace, excess),
+            )
+            self.evictions[namespace] += excess
+
+    def _delete(self, conn: sqlite3.Connection, namespace: str, key: str) -> None:
+        conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def _update(
+        self,
+        conn: sqlite3.Connection,
+        namespace: str,
+        key: str,
+        fn: Callable[[Optional[str]], Tuple[Any, Optional[str], float]],
+    ) -> Any:
+        """
+        Read-modify-write one key in a write transaction, so that workers
+        sharing the file cannot interleave. fn maps the current payload to
+        (result, new payload or None to keep it, expires_at).
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result, payload, expires_at = fn(self._get(conn, namespace, key))
+            if payload is not None:
+                self._set(conn, namespace, key, payload, expires_at)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    async def take_tokens(
+        self,
+        namespace: str,
+        key: str,
+        rate: float,
+        capacity: float,
+        now: float,
+        cost: float = 1.0,
+    ) -> float:
+        return await asyncio.to_thread(
+            self._run, self._update, namespace, key,
+            lambda payload: token_bucket_take(payload, now, rate, capacity, cost),
+        )
+
+    async def incr(self, namespace: str, key: str, amount: int, expires_at: float) -> int:
+        def add(payload: Optional[str]) -> Tuple[int, str, float]:
+            value = int(payload or 0) + amount
+            return value, str(value), expires_at
+
+        return await asyncio.to_thread(self._run, self._update, namespace, key, add)
+
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._run, self._get, namespace, key)
+
+    async def set(self, namespace: str, key: str, payload: str, expires_at: float) -> None:
+        await asyncio.to_thread(self._run, self._set, namespace, key, payload, expires_at)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        await asyncio.to_thread(self._run, self._delete, namespace, key)
+
+    def prune(self) -> None:
+        """Enforce expiry and entry bounds on every namespace now."""
+        for namespace in self._max_entries:
+            self._run(self._prune, namespace)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _size(self, conn: sqlite3.Connection, namespace: str) -> int:
+        (size,) = conn.execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return size
+
+    async def namespace_stats(self, namespace: str) -> Dict[str, Any]:
+        size = await asyncio.to_thread(self._run, self._size, namespace)
+        return {"size": size, "evictions": self.evictions[namespace]}
+
+
+# -----------------------------------------------
+# Backend Factory
+# -----------------------------------------------
+def create_cache_backend(kind: Optional[str] = None) -> CacheBackend:
+    """
+    Build the cache backend selected by WEATHER_CACHE_BACKEND.
+
+    Falls back to the in-process memory backend (with an error log) if the
+    selected backend is unknown or its client library is not installed.
+
+    Args:
+        kind: Backend name; read from the environment when omitted
+
+    Returns:
+        A CacheBackend instance
+    """
+    kind = (kind or env_str("WEATHER_CACHE_BACKEND", "memory")).lower()
+
+    if kind == "redis":
+        try:
+            return RedisCacheBackend(
+                url=env_str("WEATHER_CACHE_REDIS_URL", "redis://localhost:6379/0")
+            )
+        except RuntimeError as e:
+            logger.error(f"{str(e)}; falling back to the memory cache backend")
+    elif kind == "sqlite":
+        default_path = os.path.join(tempfile.gettempdir(), "weatherwatcher-cache.sqlite3")
+        return SQLiteCacheBackend(
+            path=env_str("WEATHER_CACHE_SQLITE_PATH", default_path),
+            mmap_size=env_int("WEATHER_CACHE_SQLITE_MMAP_SIZE", 64 * 1024 * 1024),
+        )
+    elif kind != "memory":
+        logger.error(f"Unknown WEATHER_CACHE_BACKEND {kind!r}; using the memory backend")
+
+    return MemoryCacheBackend()
@@ -0,0 +1,265 @@
+"""
+Upstream Circuit Breakers
+-------------------------
+Fail fast while an upstream API is down or degraded, and size request
+timeouts from the latency it actually shows.
+
+Each upstream has a circuit breaker:
+
+- closed: calls go through; outcomes over the last BREAKER_WINDOW seconds
+  are counted. Errors, 5xx answers, timeouts and calls slower than
+  BREAKER_SLOW_CALL_SECONDS are failures. Once at least BREAKER_MIN_CALLS
+  were made and BREAKER_FAILURE_RATE of them failed, the circuit opens.
+- open: calls fail immediately (CircuitOpenError) for BREAKER_OPEN_SECONDS,
+  so callers serve stale data or an error without tying up a connection.
+- half-open: afterwards one probe call is let through; success closes the
+  circuit, failure opens it again.
+
+The open/half-open state lives in the cache backend, so with a shared
+backend one worker tripping the breaker protects every worker.
+
+Timeouts adapt to the upstream: ADAPTIVE_TIMEOUT_MULTIPLIER times the p99
+of recent call latencies, between ADAPTIVE_TIMEOUT_MIN and the configured
+timeout. Timed-out calls count as samples at their timeout, so the timeout
+grows again when the upstream slows down for good.
+"""
+
+import math
+import time
+import logging
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from app.services.cache import CacheBackend
+from app.services.config import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "circuit"
+
+
+class CircuitOpenError(Exception):
+    """The circuit of an upstream is open for another retry_after seconds."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{upstream} circuit open, retry in {retry_after:.1f}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+# -----------------------------------------------
+# Adaptive Timeouts
+# -----------------------------------------------
+class LatencyTracker:
+    """
+    Recent call latencies of one upstream and the timeout derived from them.
+
+    Usage:
+        latencies = LatencyTracker()
+        latencies.record(0.12)
+        client.get(url, timeout=latencies.timeout(10.0))
+    """
+
+    def __init__(
+        self,
+        samples: int = 500,
+        min_samples: int = 20,
+        multiplier: Optional[float] = None,
+        min_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            samples: Latencies kept
+            min_samples: Below this many, the configured timeout is used
+            multiplier: Timeout as a multiple of p99 (ADAPTIVE_TIMEOUT_MULTIPLIER)
+            min_timeout: Lowest timeout ever used (ADAPTIVE_TIMEOUT_MIN)
+        """
+        self._latencies: Deque[float] = deque(maxlen=samples)
+        self.min_samples = min_samples
+        self.multiplier = multiplier or env_float("ADAPTIVE_TIMEOUT_MULTIPLIER", 3.0)
+        self.min_timeout = min_timeout or env_float("ADAPTIVE_TIMEOUT_MIN", 1.0)
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def record(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency below which `fraction` of recent calls finished."""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+    def timeout(self, configured: float) -> float:
+        """Timeout for the next call, never above the configured one."""
+        if len(self._latencies) < self.min_samples:
+            return configured
+        adaptive = self.percentile(0.99) * self.multiplier
+        return min(configured, max(self.min_timeout, adaptive))
+
+
+# -----------------------------------------------
+# Circuit Breaker
+# -----------------------------------------------
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker for one upstream, shared through a backend.
+
+    Usage:
+        breaker = CircuitBreaker("google_weather", backend)
+        probe = await breaker.before_call()   # may raise CircuitOpenError
+        ...
+        await breaker.record(failed, latency, probe)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: CacheBackend,
+        failure_rate: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        window: Optional[float] = None,
+        open_seconds: Optional[float] = None,
+        slow_call_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            name: Upstream name, used in keys, metrics and errors
+            backend: Storage of the shared open/half-open state
+            failure_rate: Failed fraction opening the circuit (BREAKER_FAILURE_RATE)
+            min_calls: Calls in the window before it can open (BREAKER_MIN_CALLS)
+            window: Seconds of outcomes considered (BREAKER_WINDOW)
+            open_seconds: Seconds calls fail fast once open (BREAKER_OPEN_SECONDS)
+            slow_call_seconds: Calls slower than this are failures
+                               (BREAKER_SLOW_CALL_SECONDS)
+            clock: Wall-clock time source, injectable for tests
+        """
+        self.name = name
+        self.backend = backend
+        self.failure_rate = failure_rate or env_float("BREAKER_FAILURE_RATE", 0.5)
+        self.min_calls = min_calls or env_int("BREAKER_MIN_CALLS", 10)
+        self.window = window or env_float("BREAKER_WINDOW", 30.0)
+        self.open_seconds = open_seconds or env_float("BREAKER_OPEN_SECONDS", 30.0)
+        self.slow_call_seconds = slow_call_seconds or env_float("BREAKER_SLOW_CALL_SECONDS", 5.0)
+        self._clock = clock
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self.state = "closed"  # as last seen by this worker
+        self.counters: Counter = Counter()
+        backend.register(NAMESPACE, 1000)
+
+    @property
+    def _key(self) -> str:
+        return f"{self.name}:open_until"
+
+    async def before_call(self) -> bool:
+        """
+        Check the circuit before calling the upstream.
+
+        Returns:
+            True if this call is the half-open probe
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with the
+                              probe already taken
+        """
+        now = self._clock()
+        try:
+            payload = await self.backend.get(NAMESPACE, self._key)
+        except Exception as e:
+            logger.warning(f"Circuit state of {self.name} unavailable: {str(e)}")
+            return False
+        if payload is None:
+            self.state = "closed"
+            return False
+
+        open_until = float(payload)
+        if now < open_until:
+            self.state = "open"
+            self.counters["rejected"] += 1
+            raise CircuitOpenError(self.name, open_until - now)
+
+        # Half-open: the first caller after open_until probes the upstream.
+        # Each further open_seconds period gets a new probe, in case one
+        # never reports back (e.g. it was cancelled).
+        self.state = "half_open"
+        period = int((now - open_until) // self.open_seconds)
+        try:
+            probes = await self.backend.incr(
+                NAMESPACE, f"{self.name}:probe:{payload}:{period}", 1,
+                expires_at=open_until + (period + 1) * self.open_seconds,
+            )
+        except Exception as e:
+            logger.warning(f"Circuit state of {self.name} unavailable: {str(e)}")
+            probes = 1
+        if probes > 1:
+            self.counters["rejected"] += 1
+            raise CircuitOpenError(self.name, 1.0)
+        self.counters["probes"] += 1
+        return True
+
+    async def record(self, failed: bool, latency: float, probe: bool = False) -> None:
+        """
+        Record the outcome of a call.
+
+        Args:
+            failed: Whether the call failed (error, 5xx or timeout)
+            latency: Seconds the call took
+            probe: Whether it was the half-open probe (from before_call)
+        """
+        now = self._clock()
+        failed = failed or latency > self.slow_call_seconds
+        self.counters["failures" if failed else "successes"] += 1
+        if probe:
+            if failed:
+                await self._trip(now, "probe failed")
+            else:
+                await self._close()
+            return
+
+        self._outcomes.append((now, failed))
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+        calls, failures = self._window_counts()
+        if failed and calls >= self.min_calls and failures / calls >= self.failure_rate:
+            await self._trip(now, f"{failures}/{calls} calls failed")
+
+    def _window_counts(self) -> Tuple[int, int]:
+        return len(self._outcomes), sum(1 for _, failed in self._outcomes if failed)
+
+    async def _trip(self, now: float, reason: str) -> None:
+        open_until = now + self.open_seconds
+        logger.warning(
+            f"Opening {self.name} circuit for {self.open_seconds:.0f}s: {reason}"
+        )
+        self.state = "open"
+        self.counters["opened"] += 1
+        self._outcomes.clear()
+        try:
+            # Kept past open_until as the half-open marker
+            await self.backend.set(
+                NAMESPACE, self._key, repr(open_until), open_until + 10 * self.open_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Could not share {self.name} circuit state: {str(e)}")
+
+    async def _close(self) -> None:
+        logger.info(f"Closing {self.name} circuit: probe succeeded")
+        self.state = "closed"
+        self.counters["closed"] += 1
+        self._outcomes.clear()
+        try:
+            await self.backend.delete(NAMESPACE, self._key)
+        except Exception as e:
+            logger.warning(f"Could not share {self.name} circuit state: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        calls, failures = self._window_counts()
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "window_failures": failures,
+            **self.counters,
+        }
@@ -0,0 +1,547 @@
+"""
+Offline City Index
+------------------
+A compact, read-only index of the bundled cities dataset (app/data), used
+to answer autocomplete prefixes, city-name geocoding and coordinate-to-city
+lookups locally instead of calling Google APIs.
+
+The index is a single binary file that is memory-mapped at startup, so
+loading it costs one mmap() call and no parsing:
+
+    header      magic, version, digest of the source TSV files, counts and
+                section offsets
+    cities      fixed-size records (lat, lng, population, country, name,
+                admin1), ordered by population (largest first)
+    keys        fixed-size (normalized name, flags, city) records sorted by
+                name bytes, covering every name, ASCII name and alternate name
+    countries   ISO code, name and aliases
+    strings     UTF-8 blob referenced by the sections above
+
+A prefix lookup is a binary search over the keys followed by a scan of the
+matching range. Because cities are numbered by population, ranking the
+matches is just sorting their ids (cities matched by their own name come
+before those matched only by an alternate name, so "madr" suggests Madrid
+before Chennai, formerly Madras).
+
+Reverse lookups (nearest city to a point) use a grid of GRID_DEGREES
+cells built from the city records on first use. The search scans rings of
+cells around the point and stops once no unscanned cell can hold a closer
+city.
+
+Rebuild the index after editing app/data/cities.tsv or countries.tsv:
+
+    python -m app.services.city_index
+
+Configuration:
+    CITY_INDEX_ENABLED   Use the local index (default true)
+    CITY_INDEX_PATH      Prebuilt index file (default app/data/cities.idx)
+"""
+
+import os
+import math
+import mmap
+import struct
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.cache import normalize_text
+from app.services.config import env_bool, env_str
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+CITIES_TSV = os.path.join(DATA_DIR, "cities.tsv")
+COUNTRIES_TSV = os.path.join(DATA_DIR, "countries.tsv")
+DEFAULT_INDEX_PATH = os.path.join(DATA_DIR, "cities.idx")
+
+MAGIC = b"WWCITIES"
+VERSION = 1
+
+# magic, version, source digest, city/key/country counts, section offsets
+HEADER = struct.Struct("<8sI16sIIIIIII")
+# lat, lng, population, country, name (off, len), admin1 (off, len)
+CITY = struct.Struct("<ffIHIHIH")
+# key (off, len), flags, city id
+KEY = struct.Struct("<IHHI")
+# Key flag: the key is the city's own name rather than an alternate name
+PRIMARY = 1
+# code, name (off, len), aliases (off, len; "|"-separated)
+COUNTRY = struct.Struct("<2sIHIH")
+
+# Reverse geocoding grid cell size, in degrees
+GRID_DEGREES = 1.0
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+@dataclass
+class City:
+    """One city of the bundled dataset."""
+    id: int
+    name: str
+    admin1: str
+    country_code: str
+    country_name: str
+    latitude: float
+    longitude: float
+    population: int
+
+    def suggestion(self, qualified: bool = False) -> Dict[str, str]:
+        """
+        Format as an autocomplete suggestion, like the Places API mapping.
+
+        Args:
+            qualified: Include the region, to tell same-named cities apart
+        """
+        parts = [self.name]
+        if qualified and self.admin1 and self.admin1 != self.name:
+            parts.append(self.admin1)
+        parts.append(self.country_name)
+        return {"city": self.name, "country": self.country_name, "display": ", ".join(parts)}
+
+
+# -----------------------------------------------
+# Index Builder
+# -----------------------------------------------
+def _read_tsv(path: str) -> List[List[str]]:
+    with open(path, encoding="utf-8") as f:
+        return [
+            line.rstrip("\n").split("\t")
+            for line in f
+            if line.strip() and not line.startswith("#")
+        ]
+
+
+def source_digest(cities_path: str = CITIES_TSV, countries_path: str = COUNTRIES_TSV) -> bytes:
+    """Digest of the source files, stored in the index to detect stale builds."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in (cities_path, countries_path):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def build_index(cities_path: str = CITIES_TSV, countries_path: str = COUNTRIES_TSV) -> bytes:
+    """
+    Build the binary index from the bundled TSV files.
+
+    Args:
+        cities_path: name, asciiname, alternatenames, latitude, longitude,
+                     country_code, admin1, population (tab-separated)
+        countries_path: iso, name, aliases (tab-separated)
+
+    Returns:
+        The index file contents
+    """
+    strings = bytearray()
+    string_refs: Dict[str, Tuple[int, int]] = {}
+
+    def ref(text: str) -> Tuple[int, int]:
+        if text not in string_refs:
+            encoded = text.encode("utf-8")
+            string_refs[text] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        return string_refs[text]
+
+    countries = _read_tsv(countries_path)
+    country_ids = {row[0]: i for i, row in enumerate(countries)}
+    country_records = b"".join(
+        COUNTRY.pack(row[0].encode("ascii"), *ref(row[1]), *ref(row[2].replace(",", "|")))
+        for row in countries
+    )
+
+    cities = sorted(_read_tsv(cities_path), key=lambda row: -int(row[7]))
+    city_records = bytearray()
+    keys = set()
+    for city_id, row in enumerate(cities):
+        name, ascii_name, alternates, lat, lng, country, admin1, population = row
+        city_records += CITY.pack(
+            float(lat), float(lng), int(population), country_ids[country],
+            *ref(name), *ref(admin1),
+        )
+        city_keys: Dict[str, int] = {}
+        for alias in alternates.split(","):
+            if normalize_text(alias):
+                city_keys[normalize_text(alias)] = 0
+        for alias in (name, ascii_name):
+            city_keys[normalize_text(alias)] = PRIMARY
+        keys.update((key.encode("utf-8"), city_id, flags) for key, flags in city_keys.items())
+
+    key_records = b"".join(
+        KEY.pack(*ref(key.decode("utf-8")), flags, city_id)
+        for key, city_id, flags in sorted(keys)
+    )
+
+    cities_off = HEADER.size
+    keys_off = cities_off + len(city_records)
+    countries_off = keys_off + len(key_records)
+    strings_off = countries_off + len(country_records)
+    header = HEADER.pack(
+        MAGIC, VERSION, source_digest(cities_path, countries_path),
+        len(cities), len(keys), len(countries),
+        cities_off, keys_off, countries_off, strings_off,
+    )
+    return header + bytes(city_records) + key_records + country_records + bytes(strings)
+
+
+def write_index(
+    path: str = DEFAULT_INDEX_PATH,
+    cities_path: str = CITIES_TSV,
+    countries_path: str = COUNTRIES_TSV,
+) -> int:
+    """Build the index and write it atomically to path. Returns its size."""
+    data = build_index(cities_path, countries_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+# -----------------------------------------------
+# Index Reader
+# -----------------------------------------------
+class CityIndex:
+    """
+    Read-only view over a built index (memory-mapped file or bytes).
+
+    Usage:
+        index = CityIndex.open("app/data/cities.idx")
+        index.suggest("sao p")   # [{"city": "São Paulo", ...}]
+    """
+
+    def __init__(self, buffer, source: str = "memory"):
+        """
+        Args:
+            buffer: Index contents (bytes or mmap)
+            source: Where the buffer came from, for logs and metrics
+
+        Raises:
+            ValueError: If the buffer is not an index of this version
+        """
+        (
+            magic, version, self.digest, self.city_count, self.key_count,
+            self.country_count, self._cities_off, self._keys_off,
+            self._countries_off, self._strings_off,
+        ) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} city index: {source}")
+        self._buf = buffer
+        self.source = source
+        self._countries = [self._read_country(i) for i in range(self.country_count)]
+        self._country_names = {
+            code: [normalize_text(name) for name in (country_name, *aliases)]
+            for code, country_name, aliases in self._countries
+        }
+        self._grid: Optional[Dict[Tuple[int, int], List[Tuple[int, float, float]]]] = None
+
+    @classmethod
+    def open(cls, path: str) -> "CityIndex":
+        """Memory-map a prebuilt index file."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, source=path)
+
+    @classmethod
+    def from_sources(
+        cls, cities_path: Optional[str] = None, countries_path: Optional[str] = None
+    ) -> "CityIndex":
+        """Build an index in memory straight from the TSV files (default: bundled)."""
+        cities_path = cities_path or CITIES_TSV
+        countries_path = countries_path or COUNTRIES_TSV
+        return cls(build_index(cities_path, countries_path), source=cities_path)
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __len__(self) -> int:
+        return self.city_count
+
+    # -- record access ------------------------------------------------
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_off + offset
+        return self._buf[start:start + length].decode("utf-8")
+
+    def _read_country(self, country_id: int) -> Tuple[str, str, List[str]]:
+        code, name_off, name_len, aliases_off, aliases_len = COUNTRY.unpack_from(
+            self._buf, self._countries_off + country_id * COUNTRY.size
+        )
+        aliases = self._string(aliases_off, aliases_len)
+        return (
+            code.decode("ascii"),
+            self._string(name_off, name_len),
+            [alias for alias in aliases.split("|") if alias],
+        )
+
+    def city(self, city_id: int) -> City:
+        """Decode one city record."""
+        lat, lng, population, country_id, name_off, name_len, admin_off, admin_len = (
+            CITY.unpack_from(self._buf, self._cities_off + city_id * CITY.size)
+        )
+        code, country_name, _ = self._countries[country_id]
+        return City(
+            id=city_id,
+            name=self._string(name_off, name_len),
+            admin1=self._string(admin_off, admin_len),
+            country_code=code,
+            country_name=country_name,
+            latitude=round(lat, 5),
+            longitude=round(lng, 5),
+            population=population,
+        )
+
+    def _key(self, position: int) -> Tuple[bytes, int, int]:
+        key_off, key_len, flags, city_id = KEY.unpack_from(
+            self._buf, self._keys_off + position * KEY.size
+        )
+        start = self._strings_off + key_off
+        return self._buf[start:start + key_len], flags, city_id
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Position of the first key >= key."""
+        lo, hi = 0, self.key_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # -- queries ------------------------------------------------------
+    def _matches(self, name: str, prefix: bool = True) -> List[int]:
+        """
+        Ids of cities with a name starting with (or, with prefix=False,
+        equal to) name: those matched by their own name first, each group
+        largest first.
+        """
+        encoded = name.encode("utf-8")
+        ranks: Dict[int, int] = {}
+        position = self._lower_bound(encoded)
+        while position < self.key_count:
+            key, flags, city_id = self._key(position)
+            if not (key.startswith(encoded) if prefix else key == encoded):
+                break
+            rank = 0 if flags & PRIMARY else 1
+            ranks[city_id] = min(rank, ranks.get(city_id, rank))
+            position += 1
+        return sorted(ranks, key=lambda city_id: (ranks[city_id], city_id))
+
+    def _matches_qualifier(self, city: City, qualifier: str) -> bool:
+        """Whether "…, qualifier" names the city's country or region."""
+        if qualifier == city.country_code.lower():
+            return True
+        names = [*self._country_names[city.country_code], normalize_text(city.admin1)]
+        return any(name.startswith(qualifier) for name in names if name)
+
+    def search(self, query: str, limit: int = 10) -> List[City]:
+        """
+        Cities whose name starts with the query, most populous first.
+
+        Accents and case are ignored. Text after a comma narrows the
+        results to a country (code, name or alias) or region, e.g.
+        "paris, texas" or "cordoba, arg".
+
+        Args:
+            query: Partial city name, optionally followed by ", country"
+            limit: Maximum number of results
+
+        Returns:
+            Matching cities, largest first
+        """
+        name, _, qualifier = normalize_text(query).partition(",")
+        name, qualifier = name.strip(), qualifier.strip()
+        if not name:
+            return []
+
+        results = []
+        for city_id in self._matches(name):
+            city = self.city(city_id)
+            if qualifier and not self._matches_qualifier(city, qualifier):
+                continue
+            results.append(city)
+            if len(results) == limit:
+                break
+        return results
+
+    def lookup(self, query: str, unique: bool = False) -> Optional[City]:
+        """
+        Geocode a full city name: the most populous city called query.
+
+        Accepts the same ", country or region" qualifier as search(), e.g.
+        "Portland, Maine". Names are matched whole, so "Madr" finds nothing.
+
+        Args:
+            query: City name, optionally followed by ", country or region"
+            unique: Without a qualifier, give up when several cities share
+                    the name ("Valencia") instead of picking the largest
+
+        Returns:
+            The city, or None if no city has that name (or, with unique,
+            if the name is ambiguous)
+        """
+        name, _, qualifier = normalize_text(query).partition(",")
+        name, qualifier = name.strip(), qualifier.strip()
+        if not name:
+            return None
+        matches = self._matches(name, prefix=False)
+        if unique and not qualifier and len(matches) > 1:
+            return None
+        for city_id in matches:
+            city = self.city(city_id)
+            if not qualifier or self._matches_qualifier(city, qualifier):
+                return city
+        return None
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """
+        Autocomplete suggestions in the same shape as the Places API mapping.
+
+        Cities sharing a name within the results are shown with their
+        region ("Portland, Oregon, United States").
+        """
+        cities = self.search(query, limit)
+        names = [city.name for city in cities]
+        return [city.suggestion(qualified=names.count(city.name) > 1) for city in cities]
+
+    # -- reverse geocoding --------------------------------------------
+    def _spatial_grid(self) -> Dict[Tuple[int, int], List[Tuple[int, float, float]]]:
+        """Cities bucketed by grid cell as (id, lat, lng in radians), built once."""
+        if self._grid is None:
+            grid: Dict[Tuple[int, int], List[Tuple[int, float, float]]] = {}
+            for city_id in range(self.city_count):
+                lat, lng = struct.unpack_from(
+                    "<ff", self._buf, self._cities_off + city_id * CITY.size
+                )
+                grid.setdefault(_grid_cell(lat, lng), []).append(
+                    (city_id, math.radians(lat), math.radians(lng))
+                )
+            self._grid = grid
+        return self._grid
+
+    def nearest(
+        self, latitude: float, longitude: float, max_distance_km: float = 100.0
+    ) -> Optional[City]:
+        """
+        The city closest to a point (great-circle distance).
+
+        Args:
+            latitude: Point latitude
+            longitude: Point longitude
+            max_distance_km: Ignore cities further away than this
+
+        Returns:
+            The nearest city, or None if none lies within max_distance_km
+        """
+        grid = self._spatial_grid()
+        row, col = _grid_cell(latitude, longitude)
+        lat, lng = math.radians(latitude), math.radians(longitude)
+        columns = round(360 / GRID_DEGREES)
+        best_id, best_km = None, max_distance_km
+
+        for ring in range(columns // 2 + 1):
+            for cell_row, cell_col in _ring_cells(row, col, ring):
+                for city_id, city_lat, city_lng in grid.get((cell_row, cell_col % columns), ()):
+                    distance = _haversine_km(lat, lng, city_lat, city_lng)
+                    if distance < best_km:
+                        best_id, best_km = city_id, distance
+
+            # Unscanned cities are at least `ring` cells away in latitude or
+            # longitude; a closer one would lie within best_km of the
+            # point's latitude, where a degree of longitude is shortest at
+            # the poleward edge.
+            poleward = min(90.0, abs(latitude) + best_km / KM_PER_DEGREE)
+            bound = ring * GRID_DEGREES * KM_PER_DEGREE * math.cos(math.radians(poleward))
+            if bound >= best_km:
+                break
+
+        return self.city(best_id) if best_id is not None else None
+
+    def nearest_many(
+        self, points: Iterable[Tuple[float, float]], max_distance_km: float = 100.0
+    ) -> List[Optional[City]]:
+        """
+        Nearest city for each (latitude, longitude) point, in order.
+
+        Repeated points are looked up once.
+        """
+        found: Dict[Tuple[float, float], Optional[City]] = {}
+        results = []
+        for point in points:
+            if point not in found:
+                found[point] = self.nearest(point[0], point[1], max_distance_km)
+            results.append(found[point])
+        return results
+
+
+def _grid_cell(latitude: float, longitude: float) -> Tuple[int, int]:
+    return (
+        math.floor(latitude / GRID_DEGREES),
+        math.floor((longitude % 360) / GRID_DEGREES),
+    )
+
+
+def _ring_cells(row: int, col: int, ring: int) -> Iterable[Tuple[int, int]]:
+    """Cells on the square ring `ring` cells away from (row, col)."""
+    if ring == 0:
+        yield row, col
+        return
+    for c in range(col - ring, col + ring + 1):
+        yield row - ring, c
+        yield row + ring, c
+    for r in range(row - ring + 1, row + ring):
+        yield r, col - ring
+        yield r, col + ring
+
+
+def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points given in radians."""
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# -----------------------------------------------
+# Loading
+# -----------------------------------------------
+def load_city_index(path: Optional[str] = None) -> Optional[CityIndex]:
+    """
+    Load the index selected by CITY_INDEX_ENABLED / CITY_INDEX_PATH.
+
+    The prebuilt file is memory-mapped. If it is missing, unreadable or
+    older than the bundled TSV files, the index is built in memory from the
+    TSV files instead (and a warning suggests rebuilding it).
+
+    Returns:
+        The index, or None when disabled or no data is available
+    """
+    if not env_bool("CITY_INDEX_ENABLED", True):
+        return None
+    path = path or env_str("CITY_INDEX_PATH", DEFAULT_INDEX_PATH)
+
+    try:
+        index = CityIndex.open(path)
+        current = source_digest(CITIES_TSV, COUNTRIES_TSV) if os.path.exists(CITIES_TSV) else None
+        if current is None or index.digest == current:
+            logger.info(f"Loaded city index {path} ({len(index)} cities)")
+            return index
+        index.close()
+        logger.warning(f"City index {path} is older than {CITIES_TSV}; rebuilding in memory")
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not open city index {path}: {str(e)}")
+
+    try:
+        return CityIndex.from_sources()
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        logger.error(f"City index unavailable: {str(e)}")
+        return None
+
+
+if __name__ == "__main__":
+    size = write_index()
+    print(f"Wrote {DEFAULT_INDEX_PATH} ({size} bytes)")
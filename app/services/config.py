@@ -0,0 +1,55 @@
+"""
+Service Configuration Helpers
+-----------------------------
+Small helpers for reading typed settings from environment variables.
+
+All tuning knobs of the service layer (connection pool sizes, cache TTLs,
+limits) are read through these helpers so that a malformed value falls back
+to the documented default instead of crashing the app at import time.
+"""
+
+import os
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a string setting, treating empty values as unset."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip()
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to the default if invalid."""
+    value = env_str(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Invalid integer for {name}: {value!r}, using {default}")
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, falling back to the default if invalid."""
+    value = env_str(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Invalid number for {name}: {value!r}, using {default}")
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting ("1", "true", "yes", "on" are truthy)."""
+    value = env_str(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
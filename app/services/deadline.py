@@ -0,0 +1,109 @@
+"""
+Request Deadlines
+-----------------
+One time budget per API request, shared by every step serving it.
+
+Endpoints open a deadline_scope() with their route's budget
+(REQUEST_DEADLINE_<ROUTE>, else REQUEST_DEADLINE). The deadline is kept in
+a context variable, so it follows the request through the weather service:
+its cache lookups and its waits on shared upstream lookups only get the
+time that is left. The shared lookups themselves run without a deadline,
+since callers with different deadlines wait on them; one that outlives its
+first caller still fills the cache for the next. A nested scope can tighten
+the deadline but never extend it.
+"""
+
+import time
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+from app.services.config import env_float
+
+T = TypeVar("T")
+
+# Default budget per route in seconds; 0 disables the deadline
+ROUTE_DEADLINES = {
+    "weather": 8.0,
+    "forecast": 8.0,
+    "autocomplete": 3.0,
+    "batch": 20.0,
+    "city_view": 8.0,
+}
+
+# time.monotonic() by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The current request's deadline passed before work could finish."""
+
+    def __init__(self, what: str):
+        super().__init__(f"deadline exceeded while waiting for {what}")
+        self.what = what
+
+
+def route_deadline(route: str) -> Optional[float]:
+    """
+    Budget in seconds for requests to a route, or None for no deadline.
+
+    Read from REQUEST_DEADLINE_<ROUTE>, falling back to REQUEST_DEADLINE
+    and then to ROUTE_DEADLINES.
+    """
+    default = env_float("REQUEST_DEADLINE", ROUTE_DEADLINES.get(route, 8.0))
+    seconds = env_float(f"REQUEST_DEADLINE_{route.upper()}", default)
+    return seconds if seconds > 0 else None
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Run the block with a deadline `seconds` from now.
+
+    An enclosing deadline that expires earlier stays in force; None leaves
+    the current deadline unchanged.
+    """
+    deadline = _deadline.get()
+    if seconds is not None:
+        ends = time.monotonic() + seconds
+        deadline = ends if deadline is None else min(deadline, ends)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def clear_deadline() -> None:
+    """Drop the deadline of the current context (e.g. in a shared task)."""
+    _deadline.set(None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline (may be negative), None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+async def within_deadline(awaitable: Awaitable[T], what: str) -> T:
+    """
+    Await awaitable, giving up when the deadline passes.
+
+    Without a deadline it is awaited as is. Shield awaitables whose work
+    should go on for other callers (single-flight tasks already are).
+
+    Raises:
+        DeadlineExceeded: If the deadline passed first
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded(what)
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(what)
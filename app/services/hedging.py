@@ -0,0 +1,105 @@
+"""
+Hedged Upstream Requests
+------------------------
+Cuts tail latency caused by the occasional slow upstream response.
+
+When a call has not returned after the upstream's recent HEDGE_PERCENTILE
+latency (p95 by default), an identical second request is sent; whichever
+answers first is used and the other is cancelled. Hedges are paid for out
+of a global budget that grows by HEDGE_BUDGET_RATIO (5% by default) per
+primary request, so hedging never adds more than that share of upstream
+traffic.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.services.config import env_float
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgeBudget:
+    """
+    Hedges allowed as a fraction of primary requests.
+
+    Every primary request earns `ratio` of a hedge; a hedge spends one.
+    At most `burst` unspent hedges are saved up.
+    """
+
+    def __init__(self, ratio: Optional[float] = None, burst: float = 10.0):
+        self.ratio = ratio if ratio is not None else env_float("HEDGE_BUDGET_RATIO", 0.05)
+        self.burst = burst
+        self._tokens = 0.0
+        self.counters: Counter = Counter()
+
+    def record_request(self) -> None:
+        self.counters["requests"] += 1
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1.0:
+            self.counters["budget_exhausted"] += 1
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.counters["requests"]
+        return {
+            "ratio": self.ratio,
+            **self.counters,
+            "extra_traffic": round(self.counters["fired"] / requests, 4) if requests else 0.0,
+        }
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    delay: Optional[float],
+    budget: HedgeBudget,
+    may_hedge: Callable[[], Awaitable[bool]],
+) -> T:
+    """
+    Run call, sending a second identical call if the first is slow.
+
+    Args:
+        call: Zero-argument coroutine function making the request
+        delay: Seconds to wait before hedging (None never hedges)
+        budget: Shared hedge budget, charged per hedge
+        may_hedge: Last check before hedging (e.g. a rate limit token)
+
+    Returns:
+        The first successful result; if both calls fail, the error of
+        the last one to finish is raised
+    """
+    budget.record_request()
+    primary = asyncio.ensure_future(call())
+    tasks = {primary}
+    try:
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or not budget.try_spend():
+            return await primary
+        if not await may_hedge():
+            budget.counters["skipped"] += 1
+            return await primary
+
+        budget.counters["fired"] += 1
+        hedge = asyncio.ensure_future(call())
+        tasks.add(hedge)
+        while True:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tasks.discard(task)
+                if task.exception() is None or not tasks:
+                    if task is hedge:
+                        budget.counters["won"] += 1
+                    return task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,361 @@
+"""
+Hot City Prefetching
+--------------------
+Keeps the caches warm for the cities most people ask about.
+
+After a deploy or worker restart every cache is cold, and the first
+minutes of traffic pay for a geocode plus a weather call per city. This
+module:
+
+- tracks how often each city is requested with exponentially decaying
+  counters (HOT_CITY_HALF_LIFE), so the hot set follows the time of day;
+- persists the hot set to a small JSON file (HOT_CITIES_PATH) and warms it
+  when the app starts;
+- refreshes current conditions and forecasts of the top-K cities shortly
+  before their cache entries go stale, hottest first, within a refresh
+  budget (HOT_CITY_REFRESH_RATE per minute) so prefetching never eats
+  more upstream quota than configured.
+
+Cities are remembered with their geocoded location, so a refresh is a
+single weather (or forecast) call and never a geocode.
+
+Configuration:
+    HOT_CITY_PREFETCH_ENABLED  Run the prefetcher (default true)
+    HOT_CITY_TOP_K             Cities kept warm (default 20)
+    HOT_CITY_HALF_LIFE         Seconds for a request to count half (default 3600)
+    HOT_CITY_REFRESH_AHEAD     Refresh entries this many seconds before they
+                               go stale (default 60)
+    HOT_CITY_INTERVAL          Seconds between refresh passes (default 30)
+    HOT_CITY_REFRESH_RATE      Upstream refreshes per minute (default 60)
+    HOT_CITIES_PATH            Where the hot set is saved
+"""
+
+import os
+import json
+import math
+import time
+import asyncio
+import logging
+import tempfile
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from app.services.cache import normalize_text
+from app.services.config import env_bool, env_float, env_int, env_str
+
+if TYPE_CHECKING:
+    from app.services.weather_service import GeoLocation, WeatherService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOT_CITIES_PATH = os.path.join(tempfile.gettempdir(), "weatherwatcher-hot-cities.json")
+
+
+# -----------------------------------------------
+# Request Frequency Tracking
+# -----------------------------------------------
+@dataclass
+class HotCity:
+    """A tracked city with its current (decayed) request score."""
+    city: str
+    score: float
+    location: Optional[Dict[str, Any]] = None
+
+
+class HotCityTracker:
+    """
+    Exponentially decaying request counters per city.
+
+    A request counts 1 now and half as much every half_life seconds later.
+    Instead of decaying every counter over time, new requests are weighted
+    up by 2^(elapsed / half_life) since a reference time; scores are divided
+    back when read, and the reference moves forward before weights overflow.
+
+    Usage:
+        tracker = HotCityTracker(half_life=3600)
+        tracker.record("London", location)
+        tracker.top(10)   # [HotCity(city="London", score=1.0, ...)]
+    """
+
+    def __init__(
+        self,
+        half_life: float = 3600.0,
+        max_tracked: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            half_life: Seconds after which a request counts half
+            max_tracked: Cities kept; the coldest are dropped beyond this
+            clock: Time source, injectable for tests
+        """
+        self.half_life = half_life
+        self.max_tracked = max_tracked
+        self._clock = clock
+        self._epoch = clock()
+        self._entries: Dict[str, HotCity] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _weight(self, now: float) -> float:
+        exponent = (now - self._epoch) / self.half_life
+        if exponent > 64:
+            self._rebase(now)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rebase(self, now: float) -> None:
+        """Move the reference time to now, rescaling stored scores."""
+        factor = 2.0 ** -((now - self._epoch) / self.half_life)
+        for entry in self._entries.values():
+            entry.score *= factor
+        self._epoch = now
+
+    def record(
+        self,
+        city: str,
+        location: Optional["GeoLocation"] = None,
+        count: float = 1.0,
+    ) -> None:
+        """
+        Count requests for a city.
+
+        Args:
+            city: City name as requested
+            location: Geocoded location, remembered for refreshes
+            count: Number of requests to add
+        """
+        key = normalize_text(city)
+        if not key:
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = HotCity(city=city, score=0.0)
+        entry.score += count * self._weight(self._clock())
+        if location is not None:
+            entry.location = asdict(location)
+        if len(self._entries) > self.max_tracked * 1.25:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop the coldest cities down to max_tracked."""
+        keep = sorted(self._entries.items(), key=lambda item: -item[1].score)
+        self._entries = dict(keep[:self.max_tracked])
+
+    def top(self, k: int) -> List[HotCity]:
+        """The k hottest cities with their current scores, hottest first."""
+        weight = self._weight(self._clock())
+        ranked = sorted(self._entries.values(), key=lambda entry: -entry.score)[:k]
+        return [
+            HotCity(city=entry.city, score=entry.score / weight, location=entry.location)
+            for entry in ranked
+        ]
+
+    # -- persistence --------------------------------------------------
+    def save(self, path: str, limit: Optional[int] = None) -> None:
+        """Write the hottest cities (all by default) atomically to a JSON file."""
+        payload = {
+            "saved_at": self._clock(),
+            "cities": [asdict(entry) for entry in self.top(limit or len(self._entries))],
+        }
+        # Each worker writes its own temporary file, so concurrent saves
+        # never interleave; the last rename wins
+        directory, name = os.path.split(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=directory, prefix=f"{name}.", suffix=".tmp", delete=False
+        ) as f:
+            tmp_path = f.name
+            try:
+                json.dump(payload, f)
+            except BaseException:
+                f.close()
+                os.unlink(tmp_path)
+                raise
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """
+        Merge a saved hot set, decayed by the time since it was saved.
+
+        Returns:
+            Number of cities loaded (0 if the file is missing or invalid)
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+            age = max(0.0, self._clock() - float(payload["saved_at"]))
+            decay = 0.5 ** (age / self.half_life)
+            entries = [HotCity(**item) for item in payload["cities"]]
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable hot city file {path}: {str(e)}")
+            return 0
+
+        for entry in entries:
+            score = entry.score * decay
+            if not math.isfinite(score) or score <= 0:
+                continue
+            self.record(entry.city, count=score)
+            tracked = self._entries.get(normalize_text(entry.city))
+            if tracked is not None and entry.location:
+                tracked.location = entry.location
+        return len(entries)
+
+
+# -----------------------------------------------
+# Refresh Budget
+# -----------------------------------------------
+class RefreshBudget:
+    """
+    Token bucket limiting upstream refreshes to rate_per_minute.
+
+    The bucket holds up to one minute of tokens, which is also the largest
+    burst allowed (for example the startup warm-up).
+    """
+
+    def __init__(self, rate_per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, rate_per_minute)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def try_acquire(self) -> bool:
+        """Take one token if available."""
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+# -----------------------------------------------
+# Background Prefetcher
+# -----------------------------------------------
+class CityPrefetcher:
+    """
+    Background task keeping the top-K cities' weather and forecasts fresh.
+
+    Usage (app lifespan):
+        prefetcher = CityPrefetcher(weather_service)
+        await prefetcher.start()
+        ...
+        await prefetcher.stop()
+    """
+
+    KINDS = ("weather", "forecast")
+
+    def __init__(
+        self,
+        service: "WeatherService",
+        top_k: Optional[int] = None,
+        refresh_ahead: Optional[float] = None,
+        interval: Optional[float] = None,
+        refresh_rate: Optional[float] = None,
+        path: Optional[str] = None,
+    ):
+        """
+        Args:
+            service: Weather service whose caches are kept warm; its
+                     hot_cities tracker supplies the hot set
+            top_k: Cities kept warm (HOT_CITY_TOP_K)
+            refresh_ahead: Seconds before staleness to refresh (HOT_CITY_REFRESH_AHEAD)
+            interval: Seconds between passes (HOT_CITY_INTERVAL)
+            refresh_rate: Upstream refreshes per minute (HOT_CITY_REFRESH_RATE)
+            path: Hot set file (HOT_CITIES_PATH)
+        """
+        self.service = service
+        self.tracker: HotCityTracker = service.hot_cities
+        self.top_k = top_k or env_int("HOT_CITY_TOP_K", 20)
+        self.refresh_ahead = (
+            refresh_ahead if refresh_ahead is not None
+            else env_float("HOT_CITY_REFRESH_AHEAD", 60)
+        )
+        self.interval = interval or env_float("HOT_CITY_INTERVAL", 30)
+        self.budget = RefreshBudget(refresh_rate or env_float("HOT_CITY_REFRESH_RATE", 60))
+        self.path = path or env_str("HOT_CITIES_PATH", DEFAULT_HOT_CITIES_PATH)
+        self.counters: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Load the saved hot set and start refreshing (warming it first)."""
+        if not env_bool("HOT_CITY_PREFETCH_ENABLED", True):
+            return
+        if not self.service.api_key:
+            logger.info("Hot city prefetch disabled: no Google Maps API key")
+            return
+        loaded = self.tracker.load(self.path)
+        logger.info(f"Hot city prefetch started ({loaded} cities loaded from {self.path})")
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop refreshing and save the hot set."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._save()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_once()
+            except Exception as e:
+                logger.warning(f"Hot city refresh pass failed: {str(e)}")
+            self._save()
+            await asyncio.sleep(self.interval)
+
+    def _save(self) -> None:
+        try:
+            self.tracker.save(self.path, limit=max(100, self.top_k * 5))
+        except OSError as e:
+            logger.warning(f"Could not save hot cities to {self.path}: {str(e)}")
+
+    async def refresh_once(self) -> int:
+        """
+        Refresh every top-K entry that is missing or about to go stale.
+
+        Cities are visited hottest first; the pass ends early when the
+        refresh budget runs out, so the coldest cities wait for the next one.
+
+        Returns:
+            Number of upstream refreshes made
+        """
+        self.counters["passes"] += 1
+        refreshed = 0
+        for hot in self.tracker.top(self.top_k):
+            for kind in self.KINDS:
+                if kind == "weather" and not hot.location:
+                    continue
+                remaining = await self.service.freshness_remaining(kind, hot.city, hot.location)
+                if remaining > self.refresh_ahead:
+                    continue
+                if not self.budget.try_acquire():
+                    self.counters["budget_exhausted"] += 1
+                    return refreshed
+                try:
+                    await self.service.prefetch(kind, hot.city, hot.location)
+                    self.counters[f"{kind}_refreshed"] += 1
+                    refreshed += 1
+                except Exception as e:
+                    logger.warning(f"Prefetch of {kind} for {hot.city} failed: {str(e)}")
+                    self.counters["errors"] += 1
+        return refreshed
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and the current hot set for /api/metrics."""
+        return {
+            "running": self._task is not None,
+            "tracked": len(self.tracker),
+            "counters": dict(self.counters),
+            "top": [
+                {"city": hot.city, "score": round(hot.score, 3)}
+                for hot in self.tracker.top(self.top_k)
+            ],
+        }
@@ -0,0 +1,135 @@
+"""
+Prefix-Aware Autocomplete Cache
+-------------------------------
+Caches autocomplete results per normalized prefix and answers longer
+prefixes from shorter ones.
+
+Users type "Mad", "Madr", "Madri" one keystroke at a time. When upstream
+returned fewer results for a parent prefix than its cap (5 Places
+predictions), that result is complete: every city matching the longer
+prefix also matches the parent, so it is already in the list.
+The longer prefix is then answered by filtering the parent's result,
+without an upstream call.
+
+Hits are counted per prefix length (exact hits, hits derived from a
+parent prefix, misses) so the saved Places API traffic can be measured.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from app.services.cache import CacheRegion, normalize_text
+
+
+def matches_prefix(suggestion: Dict[str, str], prefix: str) -> bool:
+    """
+    Whether a suggestion would be returned for prefix.
+
+    Places matches the start of any word of the description, so
+    "york" finds "New York, NY, USA".
+
+    Args:
+        suggestion: {"city", "country", "display"} dict
+        prefix: Normalized prefix
+    """
+    text = normalize_text(suggestion.get("display") or suggestion.get("city", ""))
+    return text.startswith(prefix) or f" {prefix}" in text
+
+
+class PrefixCache:
+    """
+    Autocomplete results per normalized prefix, stored in a cache region
+    (TTL and LRU eviction come from the region's backend).
+
+    Usage:
+        cache = PrefixCache(region)
+        suggestions = await cache.get("madri")
+        if suggestions is None:
+            suggestions, complete = await fetch("madri")
+            await cache.set("madri", suggestions, complete=complete)
+    """
+
+    def __init__(self, region: CacheRegion, min_length: int = 2, max_parents: int = 4):
+        """
+        Args:
+            region: Cache region holding the results
+            min_length: Shortest prefix ever cached (the endpoint minimum)
+            max_parents: Shorter prefixes checked for a complete parent
+        """
+        self.region = region
+        self.min_length = min_length
+        self.max_parents = max_parents
+        self._lookups: Dict[int, Counter] = {}
+
+    def _count(self, prefix: str, outcome: str) -> None:
+        self._lookups.setdefault(len(prefix), Counter())[outcome] += 1
+
+    async def get(self, prefix: str) -> Optional[List[Dict[str, str]]]:
+        """
+        Cached results for prefix, exact or filtered from a complete parent.
+
+        Only the longest cached parent is considered: a shorter one holds
+        at least as many matches, so it cannot be complete when the longer
+        one is not. At most max_parents parents are read, concurrently and
+        without counting as region misses; derived results are stored, so
+        a complete answer follows the user from keystroke to keystroke.
+
+        Args:
+            prefix: Normalized prefix
+
+        Returns:
+            Suggestions, or None when upstream has to be asked
+        """
+        cached = await self.region.get(prefix)
+        if cached is not None:
+            self._count(prefix, "hits")
+            return cached["suggestions"]
+
+        lengths = range(
+            len(prefix) - 1, max(self.min_length, len(prefix) - self.max_parents) - 1, -1
+        )
+        parents = await asyncio.gather(
+            *(self.region.peek_entry(prefix[:length]) for length in lengths)
+        )
+        for entry in parents:
+            if entry is None:
+                continue
+            parent = entry.value
+            if not parent["complete"]:
+                break
+            suggestions = [s for s in parent["suggestions"] if matches_prefix(s, prefix)]
+            await self.set(prefix, suggestions, complete=True)
+            self._count(prefix, "prefix_hits")
+            return suggestions
+
+        self._count(prefix, "misses")
+        return None
+
+    async def set(
+        self, prefix: str, suggestions: List[Dict[str, str]], complete: bool = False
+    ) -> None:
+        """
+        Store results for prefix.
+
+        Args:
+            prefix: Normalized prefix
+            suggestions: Results to return for it
+            complete: Whether upstream returned every match (fewer than
+                      its cap), so longer prefixes can be filtered from it
+        """
+        await self.region.set(prefix, {"suggestions": suggestions, "complete": complete})
+
+    async def stats(self) -> Dict[str, Any]:
+        """Region counters plus hit rates by prefix length."""
+        by_length = {}
+        for length, counts in sorted(self._lookups.items()):
+            hits = counts["hits"] + counts["prefix_hits"]
+            lookups = hits + counts["misses"]
+            by_length[str(length)] = {
+                "hits": counts["hits"],
+                "prefix_hits": counts["prefix_hits"],
+                "misses": counts["misses"],
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+        return {**await self.region.stats(), "by_prefix_length": by_length}
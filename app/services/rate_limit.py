@@ -0,0 +1,197 @@
+"""
+Upstream Rate Limiting
+----------------------
+Keeps calls to each upstream API (Google Geocoding, Google Weather, Places
+Autocomplete, OpenWeatherMap) within a request rate and a daily quota.
+
+Each upstream has a token bucket (UPSTREAM_<NAME>_RATE calls per second,
+bursts of UPSTREAM_<NAME>_BURST) and an optional daily quota
+(UPSTREAM_<NAME>_DAILY_QUOTA, reset at midnight UTC). Both are stored in
+the pluggable cache backend, so with the redis or sqlite backend every
+worker draws from the same budget. When an upstream answers 429, the
+limiter blocks it for the Retry-After period it asked for.
+
+A caller that finds the bucket empty may wait up to max_wait seconds for
+a token; beyond that, or when the day's quota is spent, RateLimitExceeded
+tells it how long to back off. A backend outage fails open (the call is
+allowed) so that the limiter never takes the service down.
+"""
+
+import math
+import time
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.services.cache import CacheBackend
+from app.services.config import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "ratelimit"
+DAY_SECONDS = 24 * 3600
+
+
+@dataclass
+class UpstreamLimit:
+    """Rate and quota of one upstream API."""
+    rate: float  # calls per second
+    burst: float  # bucket size
+    daily_quota: int = 0  # calls per UTC day, 0 for no quota
+
+    @classmethod
+    def from_env(cls, name: str, rate: float, burst: float, daily_quota: int = 0) -> "UpstreamLimit":
+        """Defaults overridden by UPSTREAM_<NAME>_RATE / _BURST / _DAILY_QUOTA."""
+        prefix = f"UPSTREAM_{name.upper()}"
+        return cls(
+            rate=max(0.001, env_float(f"{prefix}_RATE", rate)),
+            burst=max(1.0, env_float(f"{prefix}_BURST", burst)),
+            daily_quota=env_int(f"{prefix}_DAILY_QUOTA", daily_quota),
+        )
+
+
+class RateLimitExceeded(Exception):
+    """The upstream budget is spent for at least retry_after seconds."""
+
+    def __init__(self, upstream: str, retry_after: float, reason: str):
+        super().__init__(f"{upstream} {reason} limit reached, retry in {retry_after:.1f}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class UpstreamLimiter:
+    """
+    Token bucket plus daily quota for one upstream, shared through a backend.
+
+    Usage:
+        limiter = UpstreamLimiter("google_weather", UpstreamLimit(50, 50), backend)
+        await limiter.acquire(max_wait=2.0)   # may raise RateLimitExceeded
+        response = await client.get(...)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: UpstreamLimit,
+        backend: CacheBackend,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        """
+        Args:
+            name: Upstream name, used in keys, metrics and errors
+            limit: Rate, burst and daily quota
+            backend: Storage shared by the workers
+            clock: Wall-clock time source, injectable for tests
+            sleep: Sleep function, injectable for tests
+        """
+        self.name = name
+        self.limit = limit
+        self.backend = backend
+        self._clock = clock
+        self._sleep = sleep
+        self.counters: Counter = Counter()
+        backend.register(NAMESPACE, 1000)
+
+    async def acquire(
+        self, max_wait: float = 0.0, on_queue: Optional[Callable[[], Any]] = None
+    ) -> None:
+        """
+        Take one call from the budget, waiting up to max_wait for a token.
+
+        Args:
+            max_wait: Seconds the call may queue for a token
+            on_queue: Called once if the call has to queue
+
+        Raises:
+            RateLimitExceeded: If no token is available within max_wait, the
+                               upstream asked us to back off, or the daily
+                               quota is used up
+        """
+        try:
+            await self._take_token(max_wait, on_queue)
+            if self.limit.daily_quota:
+                await self._count_quota()
+        except RateLimitExceeded as e:
+            self.counters[f"rejected_{e.reason}"] += 1
+            raise
+        except Exception as e:
+            logger.warning(f"Rate limiter for {self.name} unavailable, allowing call: {str(e)}")
+            self.counters["backend_errors"] += 1
+        self.counters["allowed"] += 1
+
+    async def _take_token(self, max_wait: float, on_queue: Optional[Callable[[], Any]]) -> None:
+        deadline = self._clock() + max_wait
+        queued = False
+        while True:
+            now = self._clock()
+            blocked_until = float(await self.backend.get(NAMESPACE, f"{self.name}:blocked") or 0)
+            if blocked_until > now:
+                wait, reason = blocked_until - now, "backoff"
+            else:
+                wait = await self.backend.take_tokens(
+                    NAMESPACE, self.name, self.limit.rate, self.limit.burst, now
+                )
+                reason = "rate"
+            if wait <= 0:
+                return
+            if now + wait > deadline:
+                raise RateLimitExceeded(self.name, wait, reason)
+            if not queued:
+                self.counters["queued"] += 1
+                queued = True
+                if on_queue is not None:
+                    on_queue()
+            await self._sleep(wait)
+
+    async def _count_quota(self) -> None:
+        now = self._clock()
+        day = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y-%m-%d")
+        next_midnight = (math.floor(now / DAY_SECONDS) + 1) * DAY_SECONDS
+        used = await self.backend.incr(
+            NAMESPACE, f"{self.name}:quota:{day}", 1, expires_at=next_midnight + 3600
+        )
+        if used > self.limit.daily_quota:
+            raise RateLimitExceeded(self.name, next_midnight - now, "quota")
+
+    async def block(self, seconds: float) -> None:
+        """Stop all workers calling this upstream for seconds (after a 429)."""
+        until = self._clock() + seconds
+        self.counters["upstream_429"] += 1
+        try:
+            await self.backend.set(NAMESPACE, f"{self.name}:blocked", repr(until), until)
+        except Exception as e:
+            logger.warning(f"Could not record backoff for {self.name}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.limit.rate,
+            "burst": self.limit.burst,
+            "daily_quota": self.limit.daily_quota,
+            **self.counters,
+        }
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date).
+
+    Returns:
+        Seconds (>= 0), or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (now if now is not None else time.time()))
@@ -0,0 +1,79 @@
+"""
+Single-Flight Module
+--------------------
+Coalesces concurrent identical upstream lookups into one call.
+
+When many requests miss the cache for the same key at the same moment (a
+trending city, say), only the first one calls the upstream API. Everyone
+else awaits the same in-flight task and receives its result or exception.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    Keys are ``(namespace, key)`` tuples so that counters can be reported
+    per kind of lookup (geocode, weather, forecast, autocomplete).
+
+    Usage:
+        flights = SingleFlight()
+        location = await flights.do(("geocode", "london"), lambda: fetch("london"))
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple[str, Hashable], "asyncio.Task[Any]"] = {}
+        self.leaders: Counter = Counter()
+        self.coalesced: Counter = Counter()
+
+    async def do(self, key: Tuple[str, Hashable], fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() unless a call for the same key is already in flight.
+
+        The upstream call runs in its own task, so a caller that gets
+        cancelled (e.g. the client disconnected) does not cancel the lookup
+        for the others waiting on it.
+
+        Args:
+            key: (namespace, key) identifying the lookup
+            fn: Zero-argument coroutine function performing the lookup
+
+        Returns:
+            The lookup result, shared by all concurrent callers
+        """
+        namespace = key[0]
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders[namespace] += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced[namespace] += 1
+        return await asyncio.shield(task)
+
+    def is_in_flight(self, key: Tuple[str, Hashable]) -> bool:
+        """Whether a call for key is currently running."""
+        return key in self._in_flight
+
+    def _finish(self, key: Tuple[str, Hashable], task: "asyncio.Task[Any]") -> None:
+        """Forget a completed flight and mark its exception as retrieved."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": dict(self.leaders),
+            "coalesced": dict(self.coalesced),
+            "coalesced_total": sum(self.coalesced.values()),
+        }
@@ -10,13 +10,48 @@ The Google Weather API requires latitude/longitude coordinates, so this service:
 """
 
 import os
+import re
+import time
+import random
+import asyncio
 import logging
-from typing import Optional
-from dataclasses import dataclass
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from dataclasses import asdict, dataclass
 import httpx
 
+from app.services.cache import CacheBackend, CacheEntry, CacheRegion, normalize_text
+from app.services.cache_backends import create_cache_backend
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, LatencyTracker
+from app.services.city_index import CityIndex, load_city_index
+from app.services.config import env_bool, env_float, env_int, env_str
+from app.services.deadline import (
+    DeadlineExceeded, clear_deadline, within_deadline,
+)
+from app.services.hedging import HedgeBudget, hedged
+from app.services.hot_cities import HotCityTracker
+from app.services.prefix_cache import PrefixCache
+from app.services.rate_limit import (
+    RateLimitExceeded, UpstreamLimit, UpstreamLimiter, parse_retry_after,
+)
+from app.services.singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional "h2" package (pip install httpx[http2]).
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Set inside a shared upstream lookup: its upstream calls set the event when
+# they queue for a rate limit token, so that callers with stale data to fall
+# back on can stop waiting for the lookup.
+_flight_queued: ContextVar[Optional[asyncio.Event]] = ContextVar("flight_queued", default=None)
+
 
 # -----------------------------------------------
 # Data Classes for Weather Response
@@ -34,6 +69,28 @@ class WeatherData:
     wind_speed: float
     pressure: int
     icon: str
+    fetched_at: float = 0.0  # When the upstream observation was cached (epoch seconds)
+    expires_at: float = 0.0  # When the cached observation should be refreshed
+    stale: bool = False  # Served past its TTL (refreshing, or upstream failing)
+    observed_at: float = 0.0  # Upstream observation time (currentTime), if reported
+
+
+@dataclass
+class ForecastData:
+    """Parsed 5-day forecast for a city."""
+    city: str
+    forecasts: list  # One {"date", "temp_max", "temp_min", "description", "icon"} per day
+    fetched_at: float = 0.0
+    expires_at: float = 0.0
+    stale: bool = False
+
+
+@dataclass
+class CityView:
+    """Current conditions and forecast of a city, looked up together."""
+    weather: WeatherData
+    forecast: Optional[ForecastData] = None
+    forecast_error: Optional["WeatherServiceError"] = None  # Why forecast is None
 
 
 @dataclass
@@ -108,6 +165,29 @@ class APIKeyMissingError(WeatherServiceError):
     pass
 
 
+class UpstreamUnavailableError(WeatherAPIError):
+    """Raised when an upstream is not called for the next retry_after seconds."""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UpstreamRateLimitedError(UpstreamUnavailableError):
+    """Raised when an upstream's rate limit or daily quota is exhausted."""
+    pass
+
+
+class UpstreamCircuitOpenError(UpstreamUnavailableError):
+    """Raised when an upstream's circuit breaker is open."""
+    pass
+
+
+class DeadlineExceededError(WeatherAPIError):
+    """Raised when the request's deadline passes before its data is ready."""
+    pass
+
+
 # -----------------------------------------------
 # Weather Service Class
 # -----------------------------------------------
@@ -115,15 +195,48 @@ class WeatherService:
     """
     Service for fetching weather data from Google Maps Weather API.
     
+    All upstream calls share one pooled ``httpx.AsyncClient`` so that
+    connections (DNS, TCP and TLS state) are reused across requests. The
+    client is created lazily on first use, or eagerly via ``start()`` from
+    the application lifespan, and must be released with ``aclose()``.
+    
     Usage:
         service = WeatherService()
         weather = await service.get_weather_by_city("London")
+        await service.aclose()
     """
     
     GEOCODING_BASE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
     WEATHER_BASE_URL = "https://weather.googleapis.com/v1/currentConditions:lookup"
+    FORECAST_BASE_URL = "https://api.openweathermap.org/data/2.5/forecast"
+    AUTOCOMPLETE_BASE_URL = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
+    FORECAST_STEP_SECONDS = 3 * 3600  # OpenWeatherMap forecast resolution
+    AUTOCOMPLETE_LIMIT = 5  # Places Autocomplete returns at most 5 predictions
+    GEOCODE_POLICIES = ("prefer_local", "prefer_remote", "local_only")
+    # Default (calls per second, burst) per upstream; daily quotas are off
+    # unless UPSTREAM_<NAME>_DAILY_QUOTA is set.
+    UPSTREAM_LIMITS = {
+        "google_geocoding": (50.0, 50.0),
+        "google_weather": (50.0, 50.0),
+        "google_places": (50.0, 50.0),
+        "openweathermap": (1.0, 60.0),
+    }
+    HEDGED_UPSTREAMS = ("google_geocoding", "google_weather")
+    RETRYABLE_STATUSES = (502, 503, 504)
     
-    def __init__(self, api_key: Optional[str] = None, timeout: float = 10.0):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout: float = 10.0,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache_backend: Optional[CacheBackend] = None,
+        city_index: Optional[CityIndex] = None,
+        geocode_policy: Optional[str] = None,
+    ):
         """
         Initialize the weather service.
         
@@ -131,9 +244,531 @@ class WeatherService:
             api_key: Google Maps API key. If not provided, reads from 
                      GOOGLE_MAPS_API_KEY environment variable.
             timeout: HTTP request timeout in seconds.
+            max_connections: Maximum open connections in the pool
+                             (HTTP_MAX_CONNECTIONS, default 100).
+            max_keepalive_connections: Idle connections kept alive for reuse
+                                       (HTTP_MAX_KEEPALIVE, default 20).
+            keepalive_expiry: Seconds an idle connection is kept
+                              (HTTP_KEEPALIVE_EXPIRY, default 30).
+            http2: Enable HTTP/2 (HTTP_ENABLE_HTTP2, default on). Only takes
+                   effect when the optional h2 package is installed.
+            transport: Optional custom transport, mainly for tests.
+            cache_backend: Storage for all caches. Defaults to the backend
+                           selected by WEATHER_CACHE_BACKEND (memory, redis
+                           or sqlite).
+            city_index: Offline index answering autocomplete prefixes.
+                        Defaults to the bundled index (CITY_INDEX_ENABLED,
+                        CITY_INDEX_PATH).
+            geocode_policy: How city names are geocoded (GEOCODE_POLICY):
+                            "prefer_local" (city index for unambiguous names, then Google),
+                            "prefer_remote" (Google, city index if Google
+                            fails) or "local_only".
         """
         self.api_key = api_key or os.getenv("GOOGLE_MAPS_API_KEY")
         self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections or env_int("HTTP_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=(
+                max_keepalive_connections or env_int("HTTP_MAX_KEEPALIVE", 20)
+            ),
+            keepalive_expiry=keepalive_expiry or env_float("HTTP_KEEPALIVE_EXPIRY", 30.0),
+        )
+        if http2 is None:
+            http2 = env_bool("HTTP_ENABLE_HTTP2", True)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # All caches live in one backend, which may be shared by workers
+        self.cache_backend = cache_backend or create_cache_backend()
+        
+        # Geocoding answers almost never change: cache them for a long time,
+        # and remember unknown cities for a shorter period.
+        self.geocode_cache = CacheRegion(
+            self.cache_backend,
+            "geocode",
+            default_ttl=env_float("GEOCODE_CACHE_TTL", 7 * 24 * 3600),
+            max_entries=env_int("GEOCODE_CACHE_MAX_ENTRIES", 10000),
+        )
+        self.geocode_negative_ttl = env_float("GEOCODE_NEGATIVE_TTL", 600)
+        
+        # Expired weather/forecast entries are kept for a while: served
+        # immediately while one background task refreshes them, or as a
+        # fallback when upstream is failing.
+        self.stale_while_revalidate = env_float("CACHE_STALE_WHILE_REVALIDATE", 600)
+        self.stale_if_error = env_float("CACHE_STALE_IF_ERROR", 3600)
+        stale_ttl = max(self.stale_while_revalidate, self.stale_if_error)
+        
+        # Current conditions are shared by everyone asking about the same
+        # place, so cache them per grid cell (WEATHER_CACHE_GRID degrees).
+        self.weather_cache = CacheRegion(
+            self.cache_backend,
+            "weather",
+            default_ttl=env_float("WEATHER_CACHE_TTL", 300),
+            stale_ttl=stale_ttl,
+            max_entries=env_int("WEATHER_CACHE_MAX_ENTRIES", 5000),
+        )
+        self.coordinate_grid = env_float("WEATHER_CACHE_GRID", 0.01)
+        
+        # Forecasts are cached until OpenWeatherMap's next 3-hour run
+        self.forecast_cache = CacheRegion(
+            self.cache_backend,
+            "forecast",
+            default_ttl=self.FORECAST_STEP_SECONDS,
+            stale_ttl=stale_ttl,
+            max_entries=env_int("FORECAST_CACHE_MAX_ENTRIES", 2000),
+        )
+        self.forecast_publish_delay = env_float("FORECAST_PUBLISH_DELAY", 600)
+        
+        # Keyed by prefix; longer prefixes are filtered from a complete
+        # parent result instead of asking the Places API again.
+        self.autocomplete_cache = PrefixCache(CacheRegion(
+            self.cache_backend,
+            "autocomplete",
+            default_ttl=env_float("AUTOCOMPLETE_CACHE_TTL", 24 * 3600),
+            max_entries=env_int("AUTOCOMPLETE_CACHE_MAX_ENTRIES", 20000),
+        ))
+        
+        # Most prefixes are answered from the bundled city index; only
+        # misses go to the Places API.
+        self.city_index = city_index or load_city_index()
+        self.autocomplete_sources: Counter = Counter()
+        # Coordinates further than this from every bundled city stay unnamed
+        self.reverse_geocode_max_km = env_float("REVERSE_GEOCODE_MAX_KM", 100.0)
+        
+        # Known cities are geocoded from the index, skipping the Geocoding API
+        self.geocode_policy = geocode_policy or env_str("GEOCODE_POLICY", "prefer_local")
+        if self.geocode_policy not in self.GEOCODE_POLICIES:
+            logger.warning(f"Unknown GEOCODE_POLICY {self.geocode_policy!r}, using prefer_local")
+            self.geocode_policy = "prefer_local"
+        self.geocode_sources: Counter = Counter()
+        
+        # Request frequency per city, used to keep the hottest ones warm
+        self.hot_cities = HotCityTracker(
+            half_life=env_float("HOT_CITY_HALF_LIFE", 3600),
+            max_tracked=env_int("HOT_CITY_MAX_TRACKED", 1000),
+        )
+        
+        # Concurrent misses for the same key share one upstream call
+        self._flights = SingleFlight()
+        self._flight_queued: Dict[Tuple[str, Any], asyncio.Event] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        self.stale_served: Counter = Counter()
+        
+        # Upstream budgets live in the cache backend, so with a shared
+        # backend all workers draw from the same tokens and daily quotas.
+        self.rate_limiters: Dict[str, UpstreamLimiter] = {
+            name: UpstreamLimiter(
+                name, UpstreamLimit.from_env(name, rate, burst), self.cache_backend
+            )
+            for name, (rate, burst) in self.UPSTREAM_LIMITS.items()
+        }
+        self.upstream_queue_max_wait = env_float("UPSTREAM_QUEUE_MAX_WAIT", 2.0)
+        
+        # Failing upstreams are skipped for a while instead of waiting out
+        # every timeout; timeouts follow each upstream's observed p99.
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {
+            name: CircuitBreaker(name, self.cache_backend) for name in self.UPSTREAM_LIMITS
+        }
+        self.upstream_latencies: Dict[str, LatencyTracker] = {
+            name: LatencyTracker() for name in self.UPSTREAM_LIMITS
+        }
+        
+        # Slow geocode and current conditions calls are raced against a
+        # second request, within a small share of extra upstream traffic.
+        self.hedging_enabled = env_bool("HEDGE_ENABLED", True)
+        self.hedge_percentile = env_float("HEDGE_PERCENTILE", 0.95)
+        self.hedge_budget = HedgeBudget()
+        
+        # Transient upstream failures are retried with decorrelated jitter
+        self.retry_attempts = max(1, env_int("UPSTREAM_RETRY_ATTEMPTS", 3))
+        self.retry_base_delay = env_float("UPSTREAM_RETRY_BASE_DELAY", 0.1)
+        self.retry_max_delay = env_float("UPSTREAM_RETRY_MAX_DELAY", 2.0)
+        self.retry_deadline = env_float("UPSTREAM_RETRY_DEADLINE", 5.0)
+        self.upstream_retries: Dict[str, Counter] = {
+            name: Counter() for name in self.UPSTREAM_LIMITS
+        }
+        
+        # Steps cut short by the request deadline (see app.services.deadline)
+        self.deadline_exceeded: Counter = Counter()
+    
+    # -----------------------------------------------
+    # HTTP client lifecycle
+    # -----------------------------------------------
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client, created on first access."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self._transport,
+            )
+            logger.info(
+                f"Created pooled HTTP client (http2={self.http2}, "
+                f"max_connections={self.limits.max_connections})"
+            )
+        return self._client
+    
+    async def start(self) -> None:
+        """Open the pooled HTTP client ahead of the first request."""
+        _ = self.http_client
+    
+    async def aclose(self) -> None:
+        """Cancel background refreshes and close the pooled HTTP client."""
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await self.cache_backend.aclose()
+    
+    async def get_metrics(self) -> Dict[str, Any]:
+        """Cache counters for the /api/metrics endpoint."""
+        return {
+            "geocode_cache": await self.geocode_cache.stats(),
+            "weather_cache": await self.weather_cache.stats(),
+            "forecast_cache": await self.forecast_cache.stats(),
+            "autocomplete_cache": await self.autocomplete_cache.stats(),
+            "single_flight": self._flights.stats(),
+            "stale_served": dict(self.stale_served),
+            "autocomplete_sources": dict(self.autocomplete_sources),
+            "geocode_sources": dict(self.geocode_sources),
+            "upstream_limits": {
+                name: limiter.stats() for name, limiter in self.rate_limiters.items()
+            },
+            "circuit_breakers": {
+                name: {
+                    **breaker.stats(),
+                    "timeout": self.upstream_latencies[name].timeout(self.timeout),
+                    "latency_p99": self.upstream_latencies[name].percentile(0.99),
+                }
+                for name, breaker in self.circuit_breakers.items()
+            },
+            "hedging": self.hedge_budget.stats(),
+            "retries": {
+                name: dict(counts) for name, counts in self.upstream_retries.items()
+            },
+            "deadline_exceeded": dict(self.deadline_exceeded),
+        }
+    
+    async def _within_deadline(self, awaitable: Awaitable[Any], what: str) -> Any:
+        """
+        Await a cache lookup or single-flight wait within the request deadline.
+        
+        Raises:
+            DeadlineExceededError: If the deadline passed first
+        """
+        try:
+            return await within_deadline(awaitable, what)
+        except DeadlineExceeded as e:
+            self.deadline_exceeded[what] += 1
+            raise DeadlineExceededError(f"Request timeout: {str(e)}")
+    
+    async def _upstream_get(
+        self, upstream: str, url: str, params: dict, timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """
+        GET an upstream URL, retrying transient failures.
+        
+        Connect errors, 502/503/504 answers and 429 answers carrying a
+        Retry-After are retried, up to UPSTREAM_RETRY_ATTEMPTS attempts in
+        all. Waits between attempts use decorrelated jitter between
+        UPSTREAM_RETRY_BASE_DELAY and UPSTREAM_RETRY_MAX_DELAY (and at least
+        the Retry-After); no attempt starts later than UPSTREAM_RETRY_DEADLINE
+        seconds after the first. Only GETs go through here, so every retry
+        is safe to repeat.
+        
+        Returns:
+            The last response (the caller checks its status)
+        
+        Raises:
+            UpstreamCircuitOpenError: If the upstream's circuit is open
+            UpstreamRateLimitedError: If the budget is exhausted or upstream
+                                      answered 429
+            httpx.TransportError: If the last attempt failed to connect
+                                  or timed out
+        """
+        limiter = self.rate_limiters[upstream]
+        retries = self.upstream_retries[upstream]
+        deadline = time.monotonic() + self.retry_deadline
+        backoff = self.retry_base_delay
+        for attempt in range(1, self.retry_attempts + 1):
+            error: Optional[Exception] = None
+            response: Optional[httpx.Response] = None
+            min_wait = 0.0
+            try:
+                response = await self._upstream_attempt(upstream, url, params, timeout)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                error, reason = e, "connect_error"
+            else:
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    pause = 60.0 if retry_after is None else retry_after
+                    await limiter.block(pause)
+                    logger.warning(f"{upstream} returned 429, pausing calls for {pause:.0f}s")
+                    error = UpstreamRateLimitedError(f"{upstream} rate limited the service", pause)
+                    if retry_after is None:
+                        raise error
+                    reason, min_wait = "429", retry_after
+                elif response.status_code in self.RETRYABLE_STATUSES:
+                    reason = str(response.status_code)
+                else:
+                    return response
+            
+            backoff = min(self.retry_max_delay, random.uniform(self.retry_base_delay, backoff * 3))
+            wait = max(backoff, min_wait)
+            if attempt == self.retry_attempts or time.monotonic() + wait > deadline:
+                retries["gave_up"] += 1
+                if error is not None:
+                    raise error
+                return response
+            retries[reason] += 1
+            logger.warning(f"Retrying {upstream} in {wait:.2f}s after {reason} (attempt {attempt})")
+            await asyncio.sleep(wait)
+    
+    async def _upstream_attempt(
+        self, upstream: str, url: str, params: dict, timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """
+        GET an upstream URL once, through its circuit breaker and rate limit.
+        
+        Fails fast while the upstream's circuit is open. Otherwise waits up
+        to UPSTREAM_QUEUE_MAX_WAIT seconds for a rate limit token, telling
+        the callers of the shared lookup when it starts to queue. A 429 from upstream
+        pauses calls to it, in every worker, for its Retry-After period.
+        
+        The timeout adapts to the upstream's recent p99 latency, up to
+        timeout (default: the service timeout).
+        
+        Raises:
+            UpstreamCircuitOpenError: If the upstream's circuit is open
+            UpstreamRateLimitedError: If the rate limit budget is exhausted
+        """
+        breaker = self.circuit_breakers[upstream]
+        try:
+            probe = await breaker.before_call()
+        except CircuitOpenError as e:
+            raise UpstreamCircuitOpenError(str(e), e.retry_after)
+        
+        limiter = self.rate_limiters[upstream]
+        queued = _flight_queued.get()
+        try:
+            await limiter.acquire(
+                self.upstream_queue_max_wait, on_queue=queued.set if queued else None
+            )
+        except RateLimitExceeded as e:
+            logger.warning(str(e))
+            raise UpstreamRateLimitedError(str(e), e.retry_after)
+        
+        latencies = self.upstream_latencies[upstream]
+        timeout = latencies.timeout(timeout or self.timeout)
+        started = time.monotonic()
+        try:
+            response = await self._send(upstream, url, params, timeout)
+        except httpx.TimeoutException:
+            latencies.record(timeout)
+            await breaker.record(True, timeout, probe)
+            raise
+        except httpx.TransportError:
+            await breaker.record(True, time.monotonic() - started, probe)
+            raise
+        latency = time.monotonic() - started
+        latencies.record(latency)
+        await breaker.record(response.status_code >= 500, latency, probe)
+        return response
+    
+    async def _send(
+        self, upstream: str, url: str, params: dict, timeout: float
+    ) -> httpx.Response:
+        """
+        GET url, hedging it when it is a geocode or current conditions call
+        slower than that upstream's HEDGE_PERCENTILE latency.
+        """
+        def call() -> Awaitable[httpx.Response]:
+            return self.http_client.get(url, params=params, timeout=timeout)
+        
+        latencies = self.upstream_latencies[upstream]
+        if (
+            not self.hedging_enabled
+            or upstream not in self.HEDGED_UPSTREAMS
+            or len(latencies) < latencies.min_samples
+        ):
+            return await call()
+        
+        async def may_hedge() -> bool:
+            # The hedge is a real upstream call: it needs a rate limit token
+            try:
+                await self.rate_limiters[upstream].acquire(0.0)
+            except RateLimitExceeded:
+                return False
+            return True
+        
+        delay = latencies.percentile(self.hedge_percentile)
+        return await hedged(call, delay if delay < timeout else None, self.hedge_budget, may_hedge)
+    
+    # -----------------------------------------------
+    # Stale-while-revalidate cache lookups
+    # -----------------------------------------------
+    async def _cached_lookup(
+        self,
+        namespace: str,
+        cache: CacheRegion,
+        key: Any,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[Callable[[], float]] = None,
+    ) -> Tuple[CacheEntry, bool]:
+        """
+        Look a value up through a cache with stale-while-revalidate semantics.
+        
+        - Fresh entry: returned as is.
+        - Expired by at most CACHE_STALE_WHILE_REVALIDATE seconds: returned
+          immediately while a single background task refreshes it.
+        - Older (or missing): fetched synchronously; if the fetch fails with
+          a WeatherAPIError and an entry within CACHE_STALE_IF_ERROR exists,
+          that entry is served instead of failing.
+        
+        When the upstream's rate limit is exhausted, a lookup with such an
+        entry serves it as soon as the fetch queues for a token; the fetch
+        goes on for the callers without one.
+        The cache read and the wait for the fetch end at the request
+        deadline; an entry within CACHE_STALE_IF_ERROR is served then too.
+        
+        Args:
+            namespace: Lookup kind, used for single-flight keys and metrics
+            cache: Cache holding the values
+            key: Cache key
+            fetch: Zero-argument coroutine function fetching a fresh value
+            ttl: Optional function computing the TTL of a freshly fetched
+                 value (defaults to the cache's TTL)
+            
+        Returns:
+            Tuple of (cache entry, whether it is stale)
+        """
+        now = time.time()
+        entry = await self._within_deadline(cache.get_entry(key), f"{namespace}_cache")
+        if entry is not None:
+            if entry.is_fresh(now):
+                return entry, False
+            if entry.staleness(now) <= self.stale_while_revalidate:
+                self._refresh_in_background(namespace, cache, key, fetch, ttl)
+                self.stale_served[f"{namespace}.revalidate"] += 1
+                return entry, True
+        
+        has_fallback = entry is not None and entry.staleness(now) <= self.stale_if_error
+        try:
+            fresh = await self._within_deadline(
+                self._flight(
+                    (namespace, key),
+                    lambda: self._store(cache, key, fetch, ttl),
+                    until_queued=has_fallback,
+                ),
+                namespace,
+            )
+            return fresh, False
+        except WeatherAPIError as e:
+            if not has_fallback:
+                raise
+            logger.warning(f"Serving stale {namespace} data after upstream error: {str(e)}")
+            if isinstance(e, UpstreamRateLimitedError):
+                reason = "rate_limited"
+            elif isinstance(e, UpstreamCircuitOpenError):
+                reason = "circuit_open"
+            elif isinstance(e, DeadlineExceededError):
+                reason = "deadline"
+            else:
+                reason = "error"
+            self.stale_served[f"{namespace}.{reason}"] += 1
+            return entry, True
+    
+    async def _flight(
+        self,
+        key: Tuple[str, Any],
+        fn: Callable[[], Awaitable[Any]],
+        until_queued: bool = False,
+    ) -> Any:
+        """
+        Run fn as the single upstream lookup shared by every caller of key.
+        
+        The lookup runs without the request deadline and queue settings of
+        the caller that started it: it serves callers whose deadlines
+        differ, and each of them bounds only its own wait on it (see
+        _within_deadline). A caller giving up leaves the lookup running for
+        the others, and its result still fills the cache.
+        
+        Args:
+            key: Single-flight key
+            fn: Zero-argument coroutine function doing the lookup
+            until_queued: Stop waiting once the lookup queues for an
+                          upstream rate limit token
+        
+        Raises:
+            UpstreamRateLimitedError: If until_queued and the lookup queued
+        """
+        queued = self._flight_queued.setdefault(key, asyncio.Event())
+        
+        async def run() -> Any:
+            clear_deadline()
+            _flight_queued.set(queued)
+            try:
+                return await fn()
+            finally:
+                if self._flight_queued.get(key) is queued:
+                    del self._flight_queued[key]
+        
+        flight = self._flights.do(key, run)
+        if not until_queued:
+            return await flight
+        
+        lookup = asyncio.ensure_future(flight)
+        signal = asyncio.ensure_future(queued.wait())
+        try:
+            await asyncio.wait({lookup, signal}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            signal.cancel()
+            if not lookup.done():
+                lookup.cancel()
+        if lookup.done() and not lookup.cancelled():
+            return lookup.result()
+        raise UpstreamRateLimitedError(f"{key[0]} lookup queued for a rate limit token", 0.0)
+    
+    def _refresh_in_background(
+        self,
+        namespace: str,
+        cache: CacheRegion,
+        key: Any,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[Callable[[], float]] = None,
+    ) -> None:
+        """Start one background refresh for key unless one is already running."""
+        if self._flights.is_in_flight((namespace, key)):
+            return
+        
+        async def refresh() -> None:
+            try:
+                await self._flight(
+                    (namespace, key), lambda: self._store(cache, key, fetch, ttl)
+                )
+            except WeatherServiceError as e:
+                logger.warning(f"Background refresh of {namespace} failed: {str(e)}")
+        
+        task = asyncio.ensure_future(refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    @staticmethod
+    async def _store(
+        cache: CacheRegion,
+        key: Any,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[Callable[[], float]] = None,
+    ) -> CacheEntry:
+        """Fetch a fresh value and store it in the cache."""
+        value = await fetch()
+        return await cache.set(key, value, ttl=ttl() if ttl else None)
     
     def _validate_api_key(self) -> None:
         """Ensure API key is available."""
@@ -144,6 +779,89 @@ class WeatherService:
             )
     
     async def _geocode_city(self, city: str) -> GeoLocation:
+        """
+        Convert a city name to coordinates, answering from the city index or
+        the geocode cache when possible.
+        
+        Depending on GEOCODE_POLICY, cities known to the bundled city index
+        are resolved locally before (prefer_local) or instead of
+        (local_only) the Geocoding API, or only when it fails
+        (prefer_remote). prefer_local answers locally only when the index
+        has a single city of that name or the query names its country or
+        region ("Valencia, Spain"); ambiguous names go to Google, so that
+        results match what the API would return.
+        
+        API lookups are keyed on the normalized city text, so "London",
+        " london " and "LONDON" share one entry. Unknown cities are cached
+        too (for GEOCODE_NEGATIVE_TTL seconds) so typos do not hammer the API.
+        
+        Args:
+            city: City name (e.g., "London", "New York, NY")
+            
+        Returns:
+            GeoLocation with latitude, longitude, and formatted city/country
+            
+        Raises:
+            CityNotFoundError: If the city cannot be found
+            WeatherAPIError: If the geocoding API call fails
+        """
+        if self.geocode_policy != "prefer_remote":
+            location = self._local_geocode(city, unique=self.geocode_policy == "prefer_local")
+            if location is not None:
+                return location
+            if self.geocode_policy == "local_only":
+                raise CityNotFoundError(f"City not found: {city}")
+        
+        key = normalize_text(city)
+        cached = await self._within_deadline(self.geocode_cache.get(key), "geocode_cache")
+        if cached is not None:
+            if cached.get("not_found"):
+                raise CityNotFoundError(f"City not found: {city}")
+            return GeoLocation(**cached)
+        
+        async def lookup() -> GeoLocation:
+            self.geocode_sources["google"] += 1
+            try:
+                location = await self._request_geocode(city)
+            except CityNotFoundError:
+                await self.geocode_cache.set(
+                    key, {"not_found": True}, ttl=self.geocode_negative_ttl
+                )
+                raise
+            await self.geocode_cache.set(key, asdict(location))
+            return location
+        
+        try:
+            return await self._within_deadline(
+                self._flight(("geocode", key), lookup), "geocode"
+            )
+        except WeatherAPIError:
+            location = self._local_geocode(city) if self.geocode_policy == "prefer_remote" else None
+            if location is None:
+                raise
+            logger.warning(f"Geocoding API failed, using city index for: {city}")
+            return location
+    
+    def _local_geocode(self, city: str, unique: bool = False) -> Optional[GeoLocation]:
+        """
+        Geocode city from the bundled city index, or None if it is not there
+        (or, with unique, if several cities have that name; see CityIndex.lookup).
+        """
+        if self.city_index is None:
+            return None
+        match = self.city_index.lookup(city, unique=unique)
+        if match is None:
+            return None
+        self.geocode_sources["local"] += 1
+        return GeoLocation(
+            latitude=match.latitude,
+            longitude=match.longitude,
+            city=match.name,
+            country=match.country_code,
+            country_name=match.country_name,
+        )
+    
+    async def _request_geocode(self, city: str) -> GeoLocation:
         """
         Convert a city name to geographic coordinates using Google Geocoding API.
         
@@ -163,56 +881,100 @@ class WeatherService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.GEOCODING_BASE_URL, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("status") == "ZERO_RESULTS" or not data.get("results"):
-                    raise CityNotFoundError(f"City not found: {city}")
-                
-                if data.get("status") != "OK":
-                    logger.error(f"Geocoding API error: {data.get('status')}")
-                    raise WeatherAPIError(f"Geocoding failed: {data.get('status')}")
-                
-                result = data["results"][0]
-                location = result["geometry"]["location"]
-                
-                # Extract city and country from address components
-                city_name = city.title()
-                country_code = ""
-                country_name = ""  # Full country name from Google
-                
-                for component in result.get("address_components", []):
-                    types = component.get("types", [])
-                    if "locality" in types:
-                        city_name = component["long_name"]
-                    elif "administrative_area_level_1" in types and not city_name:
-                        city_name = component["long_name"]
-                    elif "country" in types:
-                        country_code = component["short_name"]  # e.g., "GB"
-                        country_name = component["long_name"]   # e.g., "United Kingdom"
-                
-                return GeoLocation(
-                    latitude=location["lat"],
-                    longitude=location["lng"],
-                    city=city_name,
-                    country=country_code,
-                    country_name=country_name,
-                )
-                
+            response = await self._upstream_get(
+                "google_geocoding", self.GEOCODING_BASE_URL, params
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            if data.get("status") == "ZERO_RESULTS" or not data.get("results"):
+                raise CityNotFoundError(f"City not found: {city}")
+            
+            if data.get("status") != "OK":
+                logger.error(f"Geocoding API error: {data.get('status')}")
+                raise WeatherAPIError(f"Geocoding failed: {data.get('status')}")
+            
+            result = data["results"][0]
+            location = result["geometry"]["location"]
+            
+            # Extract city and country from address components
+            city_name = city.title()
+            country_code = ""
+            country_name = ""  # Full country name from Google
+            
+            for component in result.get("address_components", []):
+                types = component.get("types", [])
+                if "locality" in types:
+                    city_name = component["long_name"]
+                elif "administrative_area_level_1" in types and not city_name:
+                    city_name = component["long_name"]
+                elif "country" in types:
+                    country_code = component["short_name"]  # e.g., "GB"
+                    country_name = component["long_name"]   # e.g., "United Kingdom"
+            
+            return GeoLocation(
+                latitude=location["lat"],
+                longitude=location["lng"],
+                city=city_name,
+                country=country_code,
+                country_name=country_name,
+            )
+            
         except httpx.TimeoutException:
             logger.error(f"Geocoding timeout for city: {city}")
             raise WeatherAPIError("Geocoding service timeout")
         except httpx.HTTPStatusError as e:
             logger.error(f"Geocoding HTTP error: {e.response.status_code}")
             raise WeatherAPIError(f"Geocoding service error: {e.response.status_code}")
-        except CityNotFoundError:
+        except (CityNotFoundError, UpstreamUnavailableError):
             raise
         except Exception as e:
             logger.error(f"Unexpected geocoding error: {str(e)}")
             raise WeatherAPIError(f"Failed to geocode city: {str(e)}")
     
+    def _coordinate_key(self, lat: float, lng: float) -> Tuple[int, int]:
+        """Quantize coordinates to the cache grid cell that contains them."""
+        return (round(lat / self.coordinate_grid), round(lng / self.coordinate_grid))
+    
+    def snap_coordinates(self, lat: float, lng: float) -> Tuple[float, float]:
+        """Return the center of the grid cell containing the coordinates."""
+        cell_lat, cell_lng = self._coordinate_key(lat, lng)
+        return (
+            round(cell_lat * self.coordinate_grid, 6),
+            round(cell_lng * self.coordinate_grid, 6),
+        )
+    
+    async def _fetch_weather_entry(self, lat: float, lng: float) -> Tuple[CacheEntry, bool]:
+        """
+        Get current conditions for coordinates through the weather cache.
+        
+        Nearby coordinates that fall in the same grid cell share one cached
+        upstream observation, fetched for the cell center.
+        
+        Args:
+            lat: Latitude
+            lng: Longitude
+            
+        Returns:
+            Tuple of (CacheEntry whose value is the raw Google Weather API
+            response, whether the entry is stale)
+            
+        Raises:
+            WeatherAPIError: If the weather API call fails and no stale
+                             observation is available
+        """
+        return await self._cached_lookup("weather", *self._weather_target(lat, lng))
+    
+    def _weather_target(self, lat: float, lng: float) -> tuple:
+        """(cache, key, fetch, ttl) of the current conditions for coordinates."""
+        snapped_lat, snapped_lng = self.snap_coordinates(lat, lng)
+        return (
+            self.weather_cache,
+            self._coordinate_key(lat, lng),
+            lambda: self._fetch_weather(snapped_lat, snapped_lng),
+            None,
+        )
+    
     async def _fetch_weather(self, lat: float, lng: float) -> dict:
         """
         Fetch current weather conditions from Google Weather API.
@@ -235,11 +997,10 @@ class WeatherService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(self.WEATHER_BASE_URL, params=params)
-                response.raise_for_status()
-                return response.json()
-                
+            response = await self._upstream_get("google_weather", self.WEATHER_BASE_URL, params)
+            response.raise_for_status()
+            return response.json()
+            
         except httpx.TimeoutException:
             logger.error(f"Weather API timeout for coordinates: {lat}, {lng}")
             raise WeatherAPIError("Weather service timeout")
@@ -248,6 +1009,8 @@ class WeatherService:
             if e.response.status_code == 403:
                 raise WeatherAPIError("Weather API access denied. Check API key permissions.")
             raise WeatherAPIError(f"Weather service error: {e.response.status_code}")
+        except UpstreamUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected weather API error: {str(e)}")
             raise WeatherAPIError(f"Failed to fetch weather: {str(e)}")
@@ -324,6 +1087,35 @@ class WeatherService:
             icon=icon,
         )
     
+    def _build_weather_data(
+        self, entry: CacheEntry, location: GeoLocation, stale: bool = False
+    ) -> WeatherData:
+        """Parse a cached observation and stamp it with its freshness."""
+        weather = self._parse_weather_response(entry.value, location)
+        weather.fetched_at = entry.stored_at
+        weather.expires_at = entry.fresh_until
+        weather.stale = stale
+        weather.observed_at = self._parse_timestamp(entry.value.get("currentTime"))
+        return weather
+    
+    @staticmethod
+    def _parse_timestamp(value: Optional[str]) -> float:
+        """
+        Convert an RFC 3339 timestamp from Google APIs to epoch seconds.
+        
+        Google reports up to nanosecond precision, which datetime cannot
+        parse, so the fraction is cut to microseconds. Returns 0.0 if the
+        value is missing or malformed.
+        """
+        if not value:
+            return 0.0
+        value = re.sub(r"(\.\d{6})\d+", r"\1", value).replace("Z", "+00:00")
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            logger.warning(f"Unparseable upstream timestamp: {value!r}")
+            return 0.0
+    
     async def get_weather_by_city(self, city: str) -> WeatherData:
         """
         Get current weather conditions for a city.
@@ -352,22 +1144,208 @@ class WeatherService:
         # Step 1: Geocode city to coordinates
         location = await self._geocode_city(city)
         logger.info(f"Geocoded {city} to: {location.latitude}, {location.longitude}")
+        self.hot_cities.record(city, location)
         
-        # Step 2: Fetch weather for coordinates
-        weather_data = await self._fetch_weather(location.latitude, location.longitude)
+        # Step 2: Fetch weather for coordinates (cached per grid cell)
+        entry, stale = await self._fetch_weather_entry(location.latitude, location.longitude)
         
         # Step 3: Parse and return formatted data
-        return self._parse_weather_response(weather_data, location)
+        return self._build_weather_data(entry, location, stale)
+    
+    async def get_city_view(self, city: str) -> CityView:
+        """
+        Get current conditions and the 5-day forecast of a city at once.
+        
+        The city is geocoded once; its current conditions and forecast are
+        then fetched concurrently for the geocoded coordinates, so that an
+        ambiguous name (e.g. "Paris, Texas") gets the forecast of the place
+        it was geocoded to. Both go through the same cache entries as
+        get_weather_by_city and get_forecast_by_city.
+        
+        Args:
+            city: City name (e.g., "London", "Tokyo", "New York")
+            
+        Returns:
+            CityView with the weather, and the forecast or why it failed
+            
+        Raises:
+            APIKeyMissingError: If API key is not configured
+            CityNotFoundError: If city cannot be found
+            WeatherAPIError: If the weather fetch fails (forecast failures
+                             are reported in the view instead)
+        """
+        self._validate_api_key()
+        
+        location = await self._geocode_city(city)
+        logger.info(f"Geocoded {city} to: {location.latitude}, {location.longitude}")
+        self.hot_cities.record(city, location)
+        
+        weather, forecast = await asyncio.gather(
+            self._fetch_weather_entry(location.latitude, location.longitude),
+            self._fetch_forecast_at(location),
+            return_exceptions=True,
+        )
+        if isinstance(weather, BaseException):
+            raise weather
+        entry, stale = weather
+        view = CityView(weather=self._build_weather_data(entry, location, stale))
+        if isinstance(forecast, WeatherServiceError):
+            logger.warning(f"Forecast unavailable for city view of {city}: {str(forecast)}")
+            view.forecast_error = forecast
+        elif isinstance(forecast, BaseException):
+            raise forecast
+        else:
+            view.forecast = forecast
+        return view
+    
+    def _forecast_ttl(self, now: Optional[float] = None) -> float:
+        """
+        Seconds until OpenWeatherMap publishes its next forecast run.
+        
+        The 5-day forecast advances in 3-hour steps (00:00, 03:00, ... UTC),
+        so a cached forecast stays valid until the next step boundary plus
+        FORECAST_PUBLISH_DELAY seconds for the new run to become available.
+        """
+        now = time.time() if now is None else now
+        step = self.FORECAST_STEP_SECONDS
+        anchor = now - self.forecast_publish_delay
+        next_refresh = (anchor // step + 1) * step + self.forecast_publish_delay
+        return max(60.0, next_refresh - now)
     
-    async def get_forecast_by_city(self, city: str) -> list:
+    async def get_forecast_by_city(self, city: str) -> ForecastData:
         """
         Get 5-day weather forecast for a city using OpenWeatherMap API.
         
+        This is the single forecast engine used by the API: the city is
+        geocoded like for current conditions and the forecast asked for its
+        coordinates, so an ambiguous name gets the forecast of the place it
+        resolves to. The parsed result is cached per coordinate grid cell
+        (shared with get_city_view and the hot city prefetcher) until the
+        next 3-hour forecast step, served stale-while-revalidate, and
+        concurrent requests for the same cell share one upstream call.
+        
+        Without a Google API key, cities missing from the city index are
+        asked for by name instead.
+        
         Args:
             city: City name (e.g., "London", "Madrid")
             
         Returns:
-            List of forecast data for next 5 days
+            ForecastData with forecast data for next 5 days
+            
+        Raises:
+            CityNotFoundError: If the city cannot be found
+            WeatherAPIError: If the API call fails and no stale forecast
+                             is available
+        """
+        if self.api_key:
+            location = await self._geocode_city(city)
+        else:
+            location = self._local_geocode(city)
+        self.hot_cities.record(city, location)
+        if location is not None:
+            return await self._fetch_forecast_at(location)
+        
+        entry, stale = await self._cached_lookup("forecast", *self._forecast_target(city))
+        return ForecastData(
+            city=entry.value["city"] or city.title(),
+            forecasts=entry.value["forecasts"],
+            fetched_at=entry.stored_at,
+            expires_at=entry.fresh_until,
+            stale=stale,
+        )
+    
+    def _forecast_target(self, city: str) -> tuple:
+        """(cache, key, fetch, ttl) of the forecast for a city."""
+        return (
+            self.forecast_cache,
+            normalize_text(city),
+            lambda: self._request_forecast(city),
+            self._forecast_ttl,
+        )
+    
+    async def _fetch_forecast_at(self, location: GeoLocation) -> ForecastData:
+        """
+        Get the forecast of a geocoded location through the forecast cache.
+        
+        Nearby locations in the same grid cell share one cached forecast,
+        fetched for the cell center.
+        """
+        entry, stale = await self._cached_lookup(
+            "forecast", *self._forecast_at_target(location)
+        )
+        return ForecastData(
+            city=location.city,
+            forecasts=entry.value["forecasts"],
+            fetched_at=entry.stored_at,
+            expires_at=entry.fresh_until,
+            stale=stale,
+        )
+    
+    def _forecast_at_target(self, location: GeoLocation) -> tuple:
+        """(cache, key, fetch, ttl) of the forecast for a location's grid cell."""
+        lat, lng = location.latitude, location.longitude
+        snapped = self.snap_coordinates(lat, lng)
+        return (
+            self.forecast_cache,
+            ("coords", *self._coordinate_key(lat, lng)),
+            lambda: self._request_forecast(location.city, snapped),
+            self._forecast_ttl,
+        )
+    
+    # -----------------------------------------------
+    # Prefetching (see app.services.hot_cities)
+    # -----------------------------------------------
+    def _prefetch_target(self, kind: str, city: str, location: Optional[dict]) -> tuple:
+        if kind == "weather":
+            return self._weather_target(location["latitude"], location["longitude"])
+        if location:
+            return self._forecast_at_target(GeoLocation(**location))
+        return self._forecast_target(city)
+    
+    async def freshness_remaining(
+        self, kind: str, city: str, location: Optional[dict] = None
+    ) -> float:
+        """
+        Seconds until the cached "weather" or "forecast" entry of a city goes
+        stale (0 if it is missing or already stale). Does not count as a
+        cache lookup.
+        
+        Args:
+            kind: "weather" (needs location) or "forecast"
+            city: City name
+            location: Geocoded location as a dict (GeoLocation fields)
+        """
+        cache, key, _, _ = self._prefetch_target(kind, city, location)
+        entry = await cache.peek_entry(key)
+        if entry is None:
+            return 0.0
+        return max(0.0, entry.fresh_until - time.time())
+    
+    async def prefetch(self, kind: str, city: str, location: Optional[dict] = None) -> None:
+        """
+        Fetch and cache a fresh "weather" or "forecast" entry for a city,
+        sharing the call with any concurrent request for the same key.
+        
+        Raises:
+            WeatherServiceError: If the upstream call fails
+        """
+        cache, key, fetch, ttl = self._prefetch_target(kind, city, location)
+        await self._flight((kind, key), lambda: self._store(cache, key, fetch, ttl))
+    
+    async def _request_forecast(
+        self, city: str, coordinates: Optional[Tuple[float, float]] = None
+    ) -> dict:
+        """
+        Fetch the 5-day forecast for a city from OpenWeatherMap.
+        
+        Args:
+            city: City name (e.g., "London", "Madrid")
+            coordinates: (lat, lng) to ask for instead of the city name,
+                         which OpenWeatherMap would geocode on its own
+            
+        Returns:
+            Dict with the resolved "city" name and parsed daily "forecasts"
             
         Raises:
             CityNotFoundError: If the city cannot be found
@@ -381,78 +1359,31 @@ class WeatherService:
             raise WeatherAPIError("OpenWeatherMap API key not configured")
         
         try:
-            # Call OpenWeatherMap 5-day forecast API directly with city name
-            url = "https://api.openweathermap.org/data/2.5/forecast"
-            params = {
-                "q": city,
+            # Call OpenWeatherMap 5-day forecast API by city name or coordinates
+            if coordinates is None:
+                params = {"q": city}
+            else:
+                params = {"lat": coordinates[0], "lon": coordinates[1]}
+            params.update({
                 "appid": openweather_key,
                 "units": "metric",
                 "cnt": 40  # Get 40 data points (5 days × 8 per day, 3-hour intervals)
+            })
+            
+            response = await self._upstream_get("openweathermap", self.FORECAST_BASE_URL, params)
+            response.raise_for_status()
+            data = response.json()
+            
+            if data.get("cod") != "200":
+                if data.get("cod") == "404":
+                    raise CityNotFoundError(f"City not found: {city}")
+                raise WeatherAPIError(f"OpenWeatherMap error: {data.get('message', 'Unknown error')}")
+            
+            return {
+                "city": data.get("city", {}).get("name", ""),
+                "forecasts": self._parse_forecast_response(data),
             }
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("cod") != "200":
-                    if data.get("cod") == "404":
-                        raise CityNotFoundError(f"City not found: {city}")
-                    raise WeatherAPIError(f"OpenWeatherMap error: {data.get('message', 'Unknown error')}")
-                
-                # Parse forecast data - group by day and get min/max temps
-                forecasts = []
-                daily_data = {}
-                
-                # Group hourly forecasts by day
-                for item in data.get("list", []):
-                    # Get date (YYYY-MM-DD)
-                    dt_txt = item.get("dt_txt", "")
-                    if not dt_txt:
-                        continue
-                    
-                    date = dt_txt.split(" ")[0]
-                    
-                    if date not in daily_data:
-                        daily_data[date] = {
-                            "temps": [],
-                            "descriptions": [],
-                            "icons": []
-                        }
-                    
-                    # Collect temperature data
-                    temp = item.get("main", {}).get("temp", 0)
-                    daily_data[date]["temps"].append(temp)
-                    
-                    # Collect weather description (prefer midday data 12:00-15:00)
-                    hour = dt_txt.split(" ")[1] if " " in dt_txt else ""
-                    if hour in ["12:00:00", "15:00:00", "09:00:00"]:
-                        weather_info = item.get("weather", [{}])[0]
-                        daily_data[date]["descriptions"].append(
-                            weather_info.get("description", "").capitalize()
-                        )
-                        daily_data[date]["icons"].append(
-                            weather_info.get("icon", "01d")
-                        )
-                
-                # Create forecast for first 5 days
-                for date in sorted(daily_data.keys())[:5]:
-                    day = daily_data[date]
-                    
-                    # Get the best description (prefer midday, fallback to first)
-                    description = day["descriptions"][0] if day["descriptions"] else "Clear"
-                    icon = day["icons"][0] if day["icons"] else "01d"
-                    
-                    forecasts.append({
-                        "date": date,
-                        "temp_max": round(max(day["temps"])),
-                        "temp_min": round(min(day["temps"])),
-                        "description": description,
-                        "icon": icon,
-                    })
-                
-                return forecasts
-                
         except httpx.HTTPStatusError as e:
             logger.error(f"OpenWeatherMap HTTP error: {e.response.status_code}")
             if e.response.status_code == 404:
@@ -468,12 +1399,216 @@ class WeatherService:
         except Exception as e:
             logger.error(f"Forecast error for {city}: {str(e)}")
             raise WeatherAPIError(f"Failed to fetch forecast: {str(e)}")
-
+    
+    def _parse_forecast_response(self, data: dict) -> list:
+        """
+        Group OpenWeatherMap 3-hour steps into daily forecasts.
+        
+        Args:
+            data: Raw response from the OpenWeatherMap forecast API
+            
+        Returns:
+            Up to 5 dicts with date, temp_max, temp_min, description and icon
+        """
+        daily_data = {}
+        
+        # Group hourly forecasts by day
+        for item in data.get("list", []):
+            # Get date (YYYY-MM-DD)
+            dt_txt = item.get("dt_txt", "")
+            if not dt_txt:
+                continue
+            
+            date = dt_txt.split(" ")[0]
+            
+            if date not in daily_data:
+                daily_data[date] = {
+                    "temps": [],
+                    "descriptions": [],
+                    "icons": []
+                }
+            
+            # Collect temperature data
+            temp = item.get("main", {}).get("temp", 0)
+            daily_data[date]["temps"].append(temp)
+            
+            # Collect weather description (prefer midday data 12:00-15:00)
+            hour = dt_txt.split(" ")[1] if " " in dt_txt else ""
+            if hour in ["12:00:00", "15:00:00", "09:00:00"]:
+                weather_info = item.get("weather", [{}])[0]
+                daily_data[date]["descriptions"].append(
+                    weather_info.get("description", "").capitalize()
+                )
+                daily_data[date]["icons"].append(
+                    weather_info.get("icon", "01d")
+                )
+        
+        # Create forecast for first 5 days
+        forecasts = []
+        for date in sorted(daily_data.keys())[:5]:
+            day = daily_data[date]
+            
+            # Get the best description (prefer midday, fallback to first)
+            description = day["descriptions"][0] if day["descriptions"] else "Clear"
+            icon = day["icons"][0] if day["icons"] else "01d"
+            
+            forecasts.append({
+                "date": date,
+                "temp_max": round(max(day["temps"])),
+                "temp_min": round(min(day["temps"])),
+                "description": description,
+                "icon": icon,
+            })
+        
+        return forecasts
+    
+    async def get_city_suggestions(self, query: str) -> list:
+        """
+        Get city autocomplete suggestions.
+        
+        Prefixes matching the bundled city index are answered locally.
+        Misses go to the Google Places API; those results are cached per
+        normalized query, and concurrent requests for the same prefix share
+        one upstream call. A prefix whose shorter parent got a complete
+        answer is filtered from it without an upstream call.
+        
+        Args:
+            query: Partial city name typed by the user (e.g., "Mad")
+            
+        Returns:
+            Up to 10 suggestions as {"city", "country", "display"} dicts
+            
+        Raises:
+            APIKeyMissingError: If the index has no match and no API key is set
+            WeatherAPIError: If the Places API call fails
+        """
+        if self.city_index is not None:
+            suggestions = self.city_index.suggest(query)
+            if suggestions:
+                self.autocomplete_sources["local"] += 1
+                return suggestions
+        
+        self._validate_api_key()
+        key = normalize_text(query)
+        cached = await self._within_deadline(
+            self.autocomplete_cache.get(key), "autocomplete_cache"
+        )
+        if cached is not None:
+            return cached
+        
+        async def lookup() -> list:
+            # Counted only when the Places API is actually called
+            self.autocomplete_sources["google"] += 1
+            suggestions, complete = await self._request_suggestions(query)
+            await self.autocomplete_cache.set(key, suggestions, complete=complete)
+            return suggestions
+        
+        return await self._within_deadline(
+            self._flight(("autocomplete", key), lookup), "autocomplete"
+        )
+    
+    async def _request_suggestions(self, query: str) -> Tuple[list, bool]:
+        """
+        Call Google Places Autocomplete and map predictions to suggestions.
+        
+        Returns:
+            Tuple of (suggestions, whether the predictions were all matches,
+            i.e. ZERO_RESULTS or fewer than AUTOCOMPLETE_LIMIT)
+        
+        Raises:
+            UpstreamRateLimitedError: If Places answered OVER_QUERY_LIMIT
+            WeatherAPIError: If the call failed or Places answered any
+                             status other than OK or ZERO_RESULTS
+        """
+        params = {"input": query, "types": "(cities)", "key": self.api_key}
+        
+        try:
+            response = await self._upstream_get(
+                "google_places", self.AUTOCOMPLETE_BASE_URL, params, timeout=5.0
+            )
+            response.raise_for_status()
+            data = response.json()
+        except httpx.TimeoutException:
+            logger.error(f"Autocomplete timeout for query: {query}")
+            raise WeatherAPIError("Autocomplete service timeout")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Autocomplete HTTP error: {e.response.status_code}")
+            raise WeatherAPIError(f"Autocomplete service error: {e.response.status_code}")
+        except UpstreamUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected autocomplete error: {str(e)}")
+            raise WeatherAPIError(f"Failed to fetch suggestions: {str(e)}")
+        
+        # Only OK and ZERO_RESULTS are answers; the other statuses are
+        # errors and must not be cached as an empty list
+        status = data.get("status")
+        if status == "ZERO_RESULTS":
+            return [], True
+        if status == "OVER_QUERY_LIMIT":
+            pause = 60.0
+            await self.rate_limiters["google_places"].block(pause)
+            logger.warning(f"Autocomplete quota exceeded, pausing calls for {pause:.0f}s")
+            raise UpstreamRateLimitedError("google_places quota exceeded", pause)
+        if status != "OK":
+            logger.error(f"Autocomplete API error: {status} - {data.get('error_message', '')}")
+            raise WeatherAPIError(f"Autocomplete service error: {status}")
+        
+        predictions = data.get("predictions", [])
+        suggestions = []
+        for prediction in predictions[:self.AUTOCOMPLETE_LIMIT]:
+            description = prediction.get("description", "")
+            parts = [part.strip() for part in description.split(",")]
+            
+            if len(parts) >= 2:
+                suggestions.append({
+                    "city": parts[0],
+                    "country": parts[-1],
+                    "display": description
+                })
+        return suggestions, len(predictions) < self.AUTOCOMPLETE_LIMIT
+    
+    def reverse_geocode(self, latitude: float, longitude: float) -> Optional[GeoLocation]:
+        """
+        Name the bundled city nearest to a point, without any API call.
+        
+        Args:
+            latitude: Point latitude
+            longitude: Point longitude
+            
+        Returns:
+            GeoLocation for the point carrying the city and country names, or
+            None if no city lies within REVERSE_GEOCODE_MAX_KM (or the city
+            index is disabled)
+        """
+        return self.reverse_geocode_many([(latitude, longitude)])[0]
+    
+    def reverse_geocode_many(self, points: list) -> list:
+        """
+        Reverse-geocode many (latitude, longitude) points in one pass.
+        
+        Returns:
+            One Optional[GeoLocation] per point, in order
+        """
+        if self.city_index is None:
+            return [None] * len(points)
+        cities = self.city_index.nearest_many(points, self.reverse_geocode_max_km)
+        return [
+            GeoLocation(
+                latitude=latitude,
+                longitude=longitude,
+                city=city.name,
+                country=city.country_code,
+                country_name=city.country_name,
+            ) if city is not None else None
+            for (latitude, longitude), city in zip(points, cities)
+        ]
+    
     async def get_weather_by_coordinates(
         self, 
         latitude: float, 
         longitude: float,
-        city_name: str = "Unknown",
+        city_name: Optional[str] = None,
         country_code: str = "",
         country_name: str = ""
     ) -> WeatherData:
@@ -483,7 +1618,9 @@ class WeatherService:
         Args:
             latitude: Location latitude
             longitude: Location longitude
-            city_name: Optional city name for display
+            city_name: Optional city name for display. When omitted, the
+                       nearest bundled city is used ("Unknown" if none is
+                       close enough).
             country_code: Optional country code for display
             country_name: Optional full country name for display
             
@@ -492,16 +1629,20 @@ class WeatherService:
         """
         self._validate_api_key()
         
-        location = GeoLocation(
-            latitude=latitude,
-            longitude=longitude,
-            city=city_name,
-            country=country_code,
-            country_name=country_name,
-        )
+        location = None
+        if city_name is None:
+            location = self.reverse_geocode(latitude, longitude)
+        if location is None:
+            location = GeoLocation(
+                latitude=latitude,
+                longitude=longitude,
+                city=city_name or "Unknown",
+                country=country_code,
+                country_name=country_name,
+            )
         
-        weather_data = await self._fetch_weather(latitude, longitude)
-        return self._parse_weather_response(weather_data, location)
+        entry, stale = await self._fetch_weather_entry(latitude, longitude)
+        return self._build_weather_data(entry, location, stale)
 
 
 # -----------------------------------------------
@@ -519,4 +1660,7 @@ async def get_weather(city: str, api_key: Optional[str] = None) -> WeatherData:
         WeatherData instance
     """
     service = WeatherService(api_key=api_key)
-    return await service.get_weather_by_city(city)
+    try:
+        return await service.get_weather_by_city(city)
+    finally:
+        await service.aclose()
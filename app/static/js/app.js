@@ -0,0 +1,848 @@
+document.addEventListener('DOMContentLoaded', () => {
+    // ============================================
+    // DOM ELEMENTS
+    // ============================================
+    const cityInput = document.getElementById('cityInput');
+    const searchButton = document.getElementById('searchButton');
+    const autocompleteDropdown = document.getElementById('autocompleteDropdown');
+    const weatherForm = document.getElementById('weatherForm');
+    const weatherDisplay = document.getElementById('weatherDisplay');
+    const loadingInline = document.getElementById('loadingInline');
+    const loadingSubtext = document.getElementById('loadingSubtext');
+    const loadingProgressBar = document.getElementById('loadingProgressBar');
+    const weatherSkeleton = document.getElementById('weatherSkeleton');
+    const errorMessage = document.getElementById('errorMessage');
+    const errorText = document.getElementById('errorText');
+    const retryButton = document.getElementById('retryButton');
+    const successIndicator = document.getElementById('successIndicator');
+    const forecastSection = document.getElementById('forecastSection');
+    const forecastContainer = document.getElementById('forecastContainer');
+    const forecastSkeleton = document.getElementById('forecastSkeleton');
+
+    // Weather display elements
+    const weatherCity = document.getElementById('weatherCity');
+    const weatherCountryText = document.getElementById('weatherCountryText');
+    const weatherIcon = document.getElementById('weatherIcon');
+    const weatherTemp = document.getElementById('weatherTemp');
+    const weatherDescription = document.getElementById('weatherDescription');
+    const weatherFeelsLikeText = document.getElementById('weatherFeelsLikeText');
+    const weatherHumidity = document.getElementById('weatherHumidity');
+    const weatherWind = document.getElementById('weatherWind');
+    const weatherPressure = document.getElementById('weatherPressure');
+
+    // Comparison elements
+    const addToComparisonBtn = document.getElementById('addToComparisonBtn');
+    const addToComparisonText = document.getElementById('addToComparisonText');
+    const comparisonSection = document.getElementById('comparisonSection');
+    const comparisonContainer = document.getElementById('comparisonContainer');
+    const comparisonCount = document.getElementById('comparisonCount');
+    const clearComparisonBtn = document.getElementById('clearComparisonBtn');
+
+    // State
+    let autocompleteTimeout = null;
+    let selectedIndex = -1;
+    let currentCity = '';
+    let loadingInterval = null;
+    let currentWeatherData = null;
+    let currentForecasts = null;
+    let comparisonCities = [];
+
+    // Temperature unit management
+    const temperatureToggle = document.getElementById('temperatureToggle');
+    const tempUnitC = document.getElementById('tempUnitC');
+    const tempUnitF = document.getElementById('tempUnitF');
+
+    // Get unit from localStorage or default to Celsius
+    let temperatureUnit = localStorage.getItem('temperatureUnit') || 'C';
+
+    // Initialize toggle state
+    function initializeTemperatureToggle() {
+        if (temperatureUnit === 'F') {
+            tempUnitC.classList.remove('active');
+            tempUnitF.classList.add('active');
+        } else {
+            tempUnitC.classList.add('active');
+            tempUnitF.classList.remove('active');
+        }
+    }
+
+    // Temperature conversion functions
+    function celsiusToFahrenheit(celsius) {
+        return Math.round((celsius * 9/5) + 32);
+    }
+
+    function fahrenheitToCelsius(fahrenheit) {
+        return Math.round((fahrenheit - 32) * 5/9);
+    }
+
+    // Convert temperature based on current unit
+    function convertTemperature(celsius) {
+        if (temperatureUnit === 'F') {
+            return celsiusToFahrenheit(celsius);
+        }
+        return celsius;
+    }
+
+    // Get temperature unit symbol
+    function getTemperatureUnitSymbol() {
+        return temperatureUnit === 'F' ? '°F' : '°C';
+    }
+
+    // Toggle temperature unit
+    function toggleTemperatureUnit() {
+        temperatureUnit = temperatureUnit === 'C' ? 'F' : 'C';
+        localStorage.setItem('temperatureUnit', temperatureUnit);
+
+        // Update toggle button appearance
+        if (temperatureUnit === 'F') {
+            tempUnitC.classList.remove('active');
+            tempUnitF.classList.add('active');
+        } else {
+            tempUnitC.classList.add('active');
+            tempUnitF.classList.remove('active');
+        }
+
+        // Update all displayed temperatures
+        if (currentWeatherData) {
+            displayWeather(currentWeatherData);
+        }
+
+        // Update forecast if displayed
+        if (forecastSection.classList.contains('show') && currentForecasts) {
+            displayForecast(currentForecasts);
+        }
+
+        // Update comparison view if there are cities
+        if (comparisonCities.length > 0) {
+            updateComparisonView();
+        }
+    }
+
+    // Initialize on page load
+    initializeTemperatureToggle();
+
+    // Add event listener for toggle button
+    temperatureToggle.addEventListener('click', toggleTemperatureUnit);
+
+    // ============================================
+    // WEATHER ICON MAPPING
+    // ============================================
+    const weatherIconMap = {
+        '01d': 'fa-sun',
+        '01n': 'fa-moon',
+        '02d': 'fa-cloud-sun',
+        '02n': 'fa-cloud-moon',
+        '03d': 'fa-cloud',
+        '03n': 'fa-cloud',
+        '04d': 'fa-cloud',
+        '04n': 'fa-cloud',
+        '09d': 'fa-cloud-rain',
+        '09n': 'fa-cloud-rain',
+        '10d': 'fa-cloud-sun-rain',
+        '10n': 'fa-cloud-moon-rain',
+        '11d': 'fa-bolt',
+        '11n': 'fa-bolt',
+        '13d': 'fa-snowflake',
+        '13n': 'fa-snowflake',
+        '50d': 'fa-smog',
+        '50n': 'fa-smog'
+    };
+
+    function getWeatherIcon(iconCode) {
+        const iconClass = weatherIconMap[iconCode] || 'fa-cloud';
+        return `<i class="fas ${iconClass}"></i>`;
+    }
+
+    // ============================================
+    // LOADING STATE MANAGEMENT
+    // ============================================
+    const loadingMessages = [
+        'Locating city coordinates',
+        'Connecting to weather service',
+        'Fetching current conditions',
+        'Processing weather data',
+        'Almost there...'
+    ];
+
+    function showLoadingState() {
+        // Hide other states
+        weatherDisplay.classList.remove('show', 'reveal');
+        forecastSection.classList.remove('show');
+        errorMessage.classList.remove('show');
+
+        // Show loading
+        loadingInline.classList.add('show');
+
+        // Add loading class to button
+        searchButton.classList.add('loading');
+        searchButton.disabled = true;
+
+        // Animate progress bar and messages
+        let progress = 0;
+        let messageIndex = 0;
+
+        loadingProgressBar.style.width = '0%';
+        loadingSubtext.textContent = loadingMessages[0];
+
+        loadingInterval = setInterval(() => {
+            progress += Math.random() * 15 + 5;
+            if (progress > 90) progress = 90;
+            loadingProgressBar.style.width = `${progress}%`;
+
+            // Update message
+            const newIndex = Math.min(Math.floor(progress / 20), loadingMessages.length - 1);
+            if (newIndex !== messageIndex) {
+                messageIndex = newIndex;
+                loadingSubtext.style.opacity = '0';
+                setTimeout(() => {
+                    loadingSubtext.textContent = loadingMessages[messageIndex];
+                    loadingSubtext.style.opacity = '1';
+                }, 150);
+            }
+        }, 300);
+    }
+
+    function showSkeletonState() {
+        loadingInline.classList.remove('show');
+        weatherSkeleton.classList.add('show');
+        forecastSkeleton.classList.add('show');
+    }
+
+    function hideLoadingState() {
+        // Clear interval
+        if (loadingInterval) {
+            clearInterval(loadingInterval);
+            loadingInterval = null;
+        }
+
+        // Complete progress bar
+        loadingProgressBar.style.width = '100%';
+
+        // Delay hiding for smooth transition
+        setTimeout(() => {
+            loadingInline.classList.remove('show');
+            weatherSkeleton.classList.remove('show');
+            forecastSkeleton.classList.remove('show');
+            searchButton.classList.remove('loading');
+            searchButton.disabled = false;
+        }, 200);
+    }
+
+    function showSuccessToast() {
+        successIndicator.classList.add('show');
+        setTimeout(() => {
+            successIndicator.classList.remove('show');
+        }, 3000);
+    }
+
+    function showError(message) {
+        hideLoadingState();
+        errorText.textContent = message;
+        errorMessage.classList.add('show');
+        weatherDisplay.classList.remove('show');
+        forecastSection.classList.remove('show');
+    }
+
+    function hideError() {
+        errorMessage.classList.remove('show');
+    }
+
+    // ============================================
+    // AUTOCOMPLETE FUNCTIONALITY
+    // ============================================
+    function handleAutocomplete() {
+        const query = cityInput.value.trim();
+        if (autocompleteTimeout) clearTimeout(autocompleteTimeout);
+        if (query.length < 2) {
+            hideAutocomplete();
+            return;
+        }
+        autocompleteTimeout = setTimeout(() => fetchAutocomplete(query), 300);
+    }
+
+    async function fetchAutocomplete(query) {
+        try {
+            showAutocompleteLoading();
+            const response = await fetch(`/api/cities/autocomplete?query=${encodeURIComponent(query)}`);
+            if (!response.ok) throw new Error('Failed');
+            const data = await response.json();
+            displayAutocomplete(data.suggestions || []);
+        } catch (error) {
+            console.error('Autocomplete error:', error);
+            hideAutocomplete();
+        }
+    }
+
+    function displayAutocomplete(suggestions) {
+        if (suggestions.length === 0) {
+            showAutocompleteEmpty();
+            return;
+        }
+
+        autocompleteDropdown.innerHTML = '';
+        selectedIndex = -1;
+
+        suggestions.forEach((suggestion, index) => {
+            const item = document.createElement('div');
+            item.className = 'autocomplete-item';
+            item.innerHTML = `<i class="fas fa-map-marker-alt"></i><span>${suggestion.display}</span>`;
+            item.addEventListener('click', () => selectSuggestion(suggestion));
+            item.dataset.city = suggestion.city;
+            item.dataset.index = index;
+            autocompleteDropdown.appendChild(item);
+        });
+
+        autocompleteDropdown.classList.add('show');
+    }
+
+    function showAutocompleteLoading() {
+        autocompleteDropdown.innerHTML = '<div class="autocomplete-loading"><i class="fas fa-circle-notch fa-spin"></i> Searching cities...</div>';
+        autocompleteDropdown.classList.add('show');
+    }
+
+    function showAutocompleteEmpty() {
+        autocompleteDropdown.innerHTML = '<div class="autocomplete-empty"><i class="fas fa-search"></i> No cities found</div>';
+        autocompleteDropdown.classList.add('show');
+    }
+
+    function hideAutocomplete() {
+        if (!autocompleteDropdown.classList.contains('show')) return;
+
+        // Add hiding animation
+        autocompleteDropdown.classList.add('hiding');
+
+        // Remove classes after animation completes
+        setTimeout(() => {
+            autocompleteDropdown.classList.remove('show', 'hiding');
+            autocompleteDropdown.innerHTML = '';
+            selectedIndex = -1;
+        }, 200);
+    }
+
+    function selectSuggestion(suggestion) {
+        cityInput.value = suggestion.city;
+        hideAutocomplete();
+        weatherForm.dispatchEvent(new Event('submit'));
+    }
+
+    // Keyboard navigation
+    cityInput.addEventListener('keydown', (e) => {
+        const items = autocompleteDropdown.querySelectorAll('.autocomplete-item');
+        if (!items.length) return;
+
+        if (e.key === 'ArrowDown') {
+            e.preventDefault();
+            selectedIndex = (selectedIndex + 1) % items.length;
+            updateSelection(items);
+        } else if (e.key === 'ArrowUp') {
+            e.preventDefault();
+            selectedIndex = selectedIndex <= 0 ? items.length - 1 : selectedIndex - 1;
+            updateSelection(items);
+        } else if (e.key === 'Enter') {
+            if (selectedIndex >= 0 && items[selectedIndex]) {
+                e.preventDefault();
+                cityInput.value = items[selectedIndex].dataset.city;
+                hideAutocomplete();
+                weatherForm.dispatchEvent(new Event('submit'));
+            }
+        } else if (e.key === 'Escape') {
+            hideAutocomplete();
+        }
+    });
+
+    function updateSelection(items) {
+        items.forEach((item, index) => {
+            if (index === selectedIndex) {
+                item.classList.add('active');
+                item.scrollIntoView({ block: 'nearest', behavior: 'smooth' });
+            } else {
+                item.classList.remove('active');
+            }
+        });
+    }
+
+    document.addEventListener('click', (e) => {
+        if (!e.target.closest('.autocomplete-wrapper')) hideAutocomplete();
+    });
+
+    cityInput.addEventListener('input', handleAutocomplete);
+
+    cityInput.addEventListener('focus', () => {
+        // Don't trigger autocomplete on focus - wait for user to type
+        // This prevents the jarring jump when clicking back into the search box
+    });
+
+    // ============================================
+    // WEATHER FETCH
+    // ============================================
+    async function fetchWeather(city, retryCount = 0) {
+        try {
+            showLoadingState();
+            hideError();
+            hideAutocomplete();
+            currentCity = city;
+
+            // Simulate slight delay for better UX (shows loading states).
+            // Retries skip it: the server already retried transient errors.
+            if (retryCount === 0) {
+                await new Promise(resolve => setTimeout(resolve, 500));
+            }
+
+            // Show skeleton after initial loading animation
+            showSkeletonState();
+            forecastSkeleton.classList.add('show');
+
+            // Weather and forecast arrive together in one round trip
+            const response = await fetch(`/api/city-view?city=${encodeURIComponent(city)}`);
+
+            if (!response.ok) {
+                forecastSkeleton.classList.remove('show');
+                const errorData = await response.json().catch(() => ({ detail: 'Unknown error' }));
+                throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+            }
+
+            const view = await response.json();
+            const data = view.weather;
+
+            // Hide loading and display weather
+            hideLoadingState();
+            displayWeather(data);
+            showSuccessToast();
+
+            // Show weather display
+            weatherDisplay.classList.add('show');
+
+            // Display clothing recommendations
+            displayClothingRecommendations(data.temperature, data.description, data.wind_speed);
+
+            // Display 5-day forecast
+            forecastSkeleton.classList.remove('show');
+            if (view.forecast) {
+                currentForecasts = view.forecast.forecasts;
+                displayForecast(currentForecasts);
+            } else {
+                console.error('Forecast unavailable:', view.forecast_error);
+                currentForecasts = null;
+                forecastSection.classList.remove('show');
+            }
+
+        } catch (error) {
+            console.error('Weather fetch error:', error);
+
+            let errorMsg = 'Failed to fetch weather data. ';
+
+            if (error.message.includes('404') || error.message.includes('not found')) {
+                errorMsg = `City "${city}" not found. Please check the spelling and try again.`;
+            } else if (error.message.includes('timeout')) {
+                errorMsg = 'Request timed out. The weather service is taking too long to respond.';
+            } else if (error.message.includes('network') || error.message.includes('Failed to fetch')) {
+                errorMsg = 'Network error. Please check your internet connection.';
+            } else {
+                errorMsg += error.message;
+            }
+
+            showError(errorMsg);
+
+            if (retryCount < 2) {
+                retryButton.onclick = () => fetchWeather(city, retryCount + 1);
+                retryButton.style.display = 'inline-flex';
+            } else {
+                retryButton.style.display = 'none';
+            }
+        }
+    }
+
+    // ============================================
+    // DISPLAY WEATHER DATA
+    // ============================================
+    function displayWeather(data) {
+        // Store current weather data for comparison
+        currentWeatherData = data;
+
+        // Convert temperatures based on selected unit
+        const displayTemp = convertTemperature(data.temperature);
+        const displayFeelsLike = convertTemperature(data.feels_like);
+        const unitSymbol = getTemperatureUnitSymbol();
+
+        weatherCity.textContent = data.city;
+        weatherCountryText.textContent = data.country || '';
+        weatherIcon.innerHTML = getWeatherIcon(data.icon);
+        weatherTemp.textContent = `${displayTemp}${unitSymbol}`;
+        weatherDescription.textContent = data.stale
+            ? `${data.description} (last known, refreshing)`
+            : data.description;
+        weatherFeelsLikeText.textContent = `Feels like ${displayFeelsLike}${unitSymbol}`;
+        weatherHumidity.textContent = `${data.humidity}%`;
+        weatherWind.textContent = `${data.wind_speed} m/s`;
+        weatherPressure.textContent = `${data.pressure} hPa`;
+
+        // Show with staggered reveal animation
+        weatherDisplay.classList.add('show', 'reveal');
+        cityInput.blur();
+
+        // Enable/update add to comparison button
+        const existingCity = comparisonCities.find(c => 
+            c.city.toLowerCase() === data.city.toLowerCase()
+        );
+
+        if (existingCity) {
+            addToComparisonBtn.classList.add('added');
+            addToComparisonText.textContent = 'Already Added';
+            addToComparisonBtn.querySelector('i').className = 'fas fa-check';
+        } else {
+            addToComparisonBtn.classList.remove('added');
+            addToComparisonText.textContent = 'Add to Comparison';
+            addToComparisonBtn.querySelector('i').className = 'fas fa-plus';
+        }
+    }
+
+    // ============================================
+// CLOTHING RECOMMENDATIONS
+// ============================================
+function getClothingRecommendations(temp, condition, wind) {
+    const items = [];
+
+    // Temperature-based recommendations
+    if (temp > 30) {
+        items.push({ icon: "👕", text: "Light T-shirt" });
+        items.push({ icon: "🩳", text: "Shorts" });
+        items.push({ icon: "🕶️", text: "Sunglasses" });
+        items.push({ icon: "🧴", text: "Sunscreen" });
+    } else if (temp > 25) {
+        items.push({ icon: "👕", text: "T-shirt" });
+        items.push({ icon: "👖", text: "Light pants" });
+        items.push({ icon: "🕶️", text: "Sunglasses" });
+        items.push({ icon: "🧢", text: "Cap" });
+    } else if (temp > 20) {
+        // Pleasant weather - 20-25°C (68-77°F)
+        items.push({ icon: "👕", text: "T-shirt or long sleeves" });
+        items.push({ icon: "👖", text: "Comfortable pants" });
+        items.push({ icon: "🕶️", text: "Sunglasses" });
+    } else if (temp > 15) {
+        // Cool weather - 15-20°C (59-68°F)
+        items.push({ icon: "👔", text: "Long sleeves" });
+        items.push({ icon: "👖", text: "Jeans" });
+        items.push({ icon: "🧥", text: "Light jacket (optional)" });
+    } else if (temp > 10) {
+        // Cold weather - 10-15°C (50-59°F)
+        items.push({ icon: "🧥", text: "Jacket" });
+        items.push({ icon: "👖", text: "Long pants" });
+        items.push({ icon: "🧣", text: "Scarf (optional)" });
+    } else if (temp > 5) {
+        // Very cold - 5-10°C (41-50°F)
+        items.push({ icon: "🧥", text: "Heavy jacket" });
+        items.push({ icon: "🧣", text: "Scarf" });
+        items.push({ icon: "🧤", text: "Gloves" });
+    } else {
+        // Freezing - < 5°C (41°F)
+        items.push({ icon: "🧥", text: "Winter coat" });
+        items.push({ icon: "🧤", text: "Gloves" });
+        items.push({ icon: "🧣", text: "Scarf" });
+        items.push({ icon: "🎩", text: "Warm hat" });
+    }
+
+    // Condition-based additions
+    const conditionLower = condition.toLowerCase();
+
+    if (conditionLower.includes("rain") || conditionLower.includes("drizzle")) {
+        items.push({ icon: "☔", text: "Umbrella" });
+        items.push({ icon: "🥾", text: "Waterproof shoes" });
+    }
+
+    if (conditionLower.includes("snow")) {
+        items.push({ icon: "🧤", text: "Gloves" });
+        items.push({ icon: "👢", text: "Snow boots" });
+    }
+
+    if (wind > 20) {
+        items.push({ icon: "🧥", text: "Windbreaker" });
+    }
+
+    // Return max 4 items to keep it clean
+    return items.slice(0, 4);
+}
+
+function displayClothingRecommendations(temp, condition, wind) {
+    const clothingSection = document.getElementById('clothingRecommendations');
+    const clothingItems = document.getElementById('clothingItems');
+
+    // Get recommendations
+    const recommendations = getClothingRecommendations(temp, condition, wind);
+
+    // Clear previous items
+    clothingItems.innerHTML = '';
+
+    // Create and add clothing items
+    recommendations.forEach(item => {
+        const itemDiv = document.createElement('div');
+        itemDiv.className = 'clothing-item';
+        itemDiv.innerHTML = `
+            <span class="clothing-icon">${item.icon}</span>
+            <span class="clothing-text">${item.text}</span>
+        `;
+        clothingItems.appendChild(itemDiv);
+    });
+
+    // Show the section
+    clothingSection.style.display = 'block';
+}
+
+    // ============================================
+    // FORECAST DISPLAY
+    // ============================================
+    function displayForecast(forecasts) {
+        if (!forecasts || forecasts.length === 0) {
+            forecastSection.classList.remove('show');
+            return;
+        }
+
+        forecastContainer.innerHTML = '';
+
+        const unitSymbol = getTemperatureUnitSymbol();
+
+        forecasts.forEach((forecast, index) => {
+            const card = document.createElement('div');
+            card.className = 'forecast-card';
+
+            // Add staggered reveal animation
+            setTimeout(() => {
+                card.classList.add('reveal');
+            }, index * 100);
+
+            const date = new Date(forecast.date);
+            const dayName = date.toLocaleDateString('en-US', { weekday: 'short' });
+            const monthDay = date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
+
+            const icon = getWeatherIcon(forecast.icon);
+
+            // Convert forecast temperatures
+            const displayTempMax = convertTemperature(forecast.temp_max);
+            const displayTempMin = convertTemperature(forecast.temp_min);
+
+            card.innerHTML = `
+                <div class="forecast-day">${dayName}</div>
+                <div class="forecast-date">${monthDay}</div>
+                <div class="forecast-icon">${icon}</div>
+                <div class="forecast-temps">
+                    <span class="forecast-temp-high">${displayTempMax}${unitSymbol}</span>
+                    <span class="forecast-temp-low">${displayTempMin}${unitSymbol}</span>
+                </div>
+                <div class="forecast-description">${forecast.description}</div>
+            `;
+
+            forecastContainer.appendChild(card);
+        });
+
+        forecastSection.classList.add('show');
+    }
+
+    // ============================================
+    // COMPARISON TOOL FUNCTIONS
+    // ============================================
+
+    // Add to comparison button handler
+    addToComparisonBtn.addEventListener('click', () => {
+        if (!currentWeatherData) return;
+
+        // Check if city already exists in comparison
+        const existingCity = comparisonCities.find(c => 
+            c.city.toLowerCase() === currentWeatherData.city.toLowerCase()
+        );
+
+        if (existingCity) {
+            showError('This city is already in the comparison list.');
+            return;
+        }
+
+        // Limit to 5 cities
+        if (comparisonCities.length >= 5) {
+            showError('Maximum 5 cities can be compared at once.');
+            return;
+        }
+
+        // Add city to comparison
+        comparisonCities.push({...currentWeatherData});
+        updateComparisonView();
+
+        // Show success feedback
+        addToComparisonBtn.classList.add('added');
+        addToComparisonText.textContent = 'Added!';
+        const icon = addToComparisonBtn.querySelector('i');
+        icon.className = 'fas fa-check';
+
+        setTimeout(() => {
+            addToComparisonBtn.classList.remove('added');
+            addToComparisonText.textContent = 'Add to Comparison';
+            icon.className = 'fas fa-plus';
+        }, 2000);
+    });
+
+    // Clear all comparison button handler
+    clearComparisonBtn.addEventListener('click', () => {
+        if (comparisonCities.length === 0) return;
+
+        if (confirm('Are you sure you want to clear all cities from comparison?')) {
+            comparisonCities = [];
+            updateComparisonView();
+        }
+    });
+
+    // Update comparison view
+    function updateComparisonView() {
+        // Update count
+        comparisonCount.textContent = `${comparisonCities.length} ${comparisonCities.length === 1 ? 'city' : 'cities'}`;
+
+        // Show/hide section
+        if (comparisonCities.length > 0) {
+            comparisonSection.classList.add('show');
+        } else {
+            comparisonSection.classList.remove('show');
+        }
+
+        // Clear container
+        comparisonContainer.innerHTML = '';
+
+        if (comparisonCities.length === 0) {
+            comparisonContainer.innerHTML = `
+                <div class="comparison-empty">
+                    <i class="fas fa-cloud-sun"></i>
+                    <div class="comparison-empty-title">No cities to compare</div>
+                    <div class="comparison-empty-text">Search for a city and click "Add to Comparison" to start comparing weather data</div>
+                </div>
+            `;
+            return;
+        }
+
+        // Find warmest and coldest (using Celsius values for comparison logic)
+        const temps = comparisonCities.map(c => c.temperature);
+        const maxTemp = Math.max(...temps);
+        const minTemp = Math.min(...temps);
+        const avgTemp = temps.reduce((a, b) => a + b, 0) / temps.length;
+
+        const unitSymbol = getTemperatureUnitSymbol();
+
+        // Render comparison cards
+        comparisonCities.forEach((city, index) => {
+            const card = document.createElement('div');
+            card.className = 'comparison-card';
+
+            // Convert temperature for display
+            const displayTemp = convertTemperature(city.temperature);
+
+            // Add best/worst temp classes (using Celsius for comparison)
+            if (city.temperature === maxTemp && comparisonCities.length > 1) {
+                card.classList.add('best-temp');
+            }
+            if (city.temperature === minTemp && comparisonCities.length > 1) {
+                card.classList.add('worst-temp');
+            }
+
+            // Get weather icon
+            const iconClass = weatherIconMap[city.icon] || 'fa-cloud';
+
+            // Temperature indicator (using Celsius for comparison)
+            let tempIndicator = '';
+            if (comparisonCities.length > 1) {
+                if (city.temperature > avgTemp) {
+                    tempIndicator = '<i class="fas fa-arrow-up comparison-temp-indicator up"></i>';
+                } else if (city.temperature < avgTemp) {
+                    tempIndicator = '<i class="fas fa-arrow-down comparison-temp-indicator down"></i>';
+                }
+            }
+
+            // Badge for warmest/coldest
+            let badge = '';
+            if (city.temperature === maxTemp && comparisonCities.length > 1) {
+                badge = '<div class="comparison-badge warmest"><i class="fas fa-fire"></i> Warmest</div>';
+            } else if (city.temperature === minTemp && comparisonCities.length > 1) {
+                badge = '<div class="comparison-badge coldest"><i class="fas fa-snowflake"></i> Coldest</div>';
+            }
+
+            card.innerHTML = `
+                <button class="remove-comparison-btn" onclick="removeFromComparison(${index})" title="Remove from comparison">
+                    <i class="fas fa-times"></i>
+                </button>
+                ${badge}
+                <div class="comparison-card-header">
+                    <div class="comparison-location">
+                        <div class="comparison-city">${city.city}</div>
+                        <div class="comparison-country">
+                            <i class="fas fa-map-marker-alt"></i>
+                            ${city.country}
+                        </div>
+                    </div>
+                </div>
+                <div class="comparison-icon"><i class="fas ${iconClass}"></i></div>
+                <div class="comparison-temp">
+                    ${displayTemp}${unitSymbol}
+                    ${tempIndicator}
+                </div>
+                <div class="comparison-description">${city.description}</div>
+                <div class="comparison-metrics">
+                    <div class="comparison-metric">
+                        <span class="comparison-metric-label">Humidity</span>
+                        <div class="comparison-metric-value">
+                            <i class="fas fa-tint"></i>
+                            ${city.humidity}%
+                        </div>
+                    </div>
+                    <div class="comparison-metric">
+                        <span class="comparison-metric-label">Wind</span>
+                        <div class="comparison-metric-value">
+                            <i class="fas fa-wind"></i>
+                            ${city.wind_speed} m/s
+                        </div>
+                    </div>
+                    <div class="comparison-metric">
+                        <span class="comparison-metric-label">Pressure</span>
+                        <div class="comparison-metric-value">
+                            <i class="fas fa-compress-arrows-alt"></i>
+                            ${city.pressure} hPa
+                        </div>
+                    </div>
+                </div>
+            `;
+
+            comparisonContainer.appendChild(card);
+        });
+    }
+
+    // Global function to remove from comparison (called from inline onclick)
+    window.removeFromComparison = function(index) {
+        comparisonCities.splice(index, 1);
+        updateComparisonView();
+    };
+
+    // ============================================
+    // FORM SUBMISSION
+    // ============================================
+    weatherForm.addEventListener('submit', async (e) => {
+        e.preventDefault();
+
+        const city = cityInput.value.trim();
+
+        if (!city) {
+            showError('Please enter a city name.');
+            return;
+        }
+
+        await fetchWeather(city);
+    });
+
+    // Button ripple effect
+    searchButton.addEventListener('click', function(e) {
+        const rect = this.getBoundingClientRect();
+        const x = e.clientX - rect.left;
+        const y = e.clientY - rect.top;
+
+        const ripple = document.createElement('span');
+        ripple.className = 'ripple';
+        ripple.style.left = `${x}px`;
+        ripple.style.top = `${y}px`;
+
+        this.appendChild(ripple);
+
+        setTimeout(() => ripple.remove(), 600);
+    });
+
+}); // End DOMContentLoaded
@@ -0,0 +1,20 @@
+"""
+Shared Test Helpers
+-------------------
+Helpers used by several test modules.
+"""
+
+
+class FakeClock:
+    """Manually advanced time source whose sleep advances it."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
@@ -0,0 +1,111 @@
+"""
+Test Suite for Static Assets
+----------------------------
+Tests for fingerprinting, precompression and conditional requests on the
+frontend assets.
+"""
+
+import re
+
+from fastapi.testclient import TestClient
+
+from app.assets import IMMUTABLE_CACHE_CONTROL, StaticAssets
+from app.main import app
+
+client = TestClient(app)
+
+
+def _write(directory, path, text):
+    target = directory / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(text)
+
+
+# ============================================
+# Asset Registry Tests
+# ============================================
+
+class TestStaticAssets:
+    """Tests for loading and fingerprinting asset files."""
+
+    def test_pages_link_fingerprinted_urls(self, tmp_path):
+        _write(tmp_path, "css/site.css", "body { color: red; }")
+        _write(tmp_path, "index.html", '<link href="{{ asset:css/site.css }}">')
+        assets = StaticAssets(str(tmp_path))
+
+        url = assets.url_for("css/site.css")
+        assert re.fullmatch(r"/static/css/site\.[0-9a-f]{16}\.css", url)
+        assert assets.page("index.html").bodies["identity"] == f'<link href="{url}">'.encode()
+
+    def test_fingerprint_follows_content(self, tmp_path):
+        _write(tmp_path, "app.js", "console.log(1);")
+        before = StaticAssets(str(tmp_path)).url_for("app.js")
+        _write(tmp_path, "app.js", "console.log(2);")
+        after = StaticAssets(str(tmp_path)).url_for("app.js")
+
+        assert before != after
+
+    def test_small_files_are_not_compressed(self, tmp_path):
+        _write(tmp_path, "tiny.css", "a{}")
+        _write(tmp_path, "big.css", "a { color: red; }\n" * 100)
+        assets = StaticAssets(str(tmp_path))
+
+        assert set(assets.page("tiny.css").bodies) == {"identity"}
+        assert "gzip" in assets.page("big.css").bodies
+
+
+# ============================================
+# Endpoint Tests
+# ============================================
+
+def _asset_urls():
+    return re.findall(r'(?:href|src)="(/static/[^"]+)"', client.get("/").text)
+
+
+class TestFrontendEndpoints:
+    """Tests for caching headers on the page and its assets."""
+
+    def test_root_links_css_and_js(self):
+        urls = _asset_urls()
+        assert any(url.endswith(".css") for url in urls)
+        assert any(url.endswith(".js") for url in urls)
+
+    def test_assets_are_immutable(self):
+        for url in _asset_urls():
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    def test_root_is_revalidated_with_etag(self):
+        first = client.get("/")
+        assert first.headers["cache-control"] == "no-cache"
+
+        repeat = client.get("/", headers={"If-None-Match": first.headers["etag"]})
+        assert repeat.status_code == 304
+        assert repeat.content == b""
+
+    def test_conditional_asset_request(self):
+        url = _asset_urls()[0]
+        etag = client.get(url).headers["etag"]
+
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+    def test_gzip_variant_is_served(self):
+        url = next(url for url in _asset_urls() if url.endswith(".css"))
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        # httpx decodes the body, so the wire size is the Content-Length
+        assert int(response.headers["content-length"]) < len(response.content) / 3
+        assert ".comparison-card" in response.text
+
+    def test_identity_when_compression_refused(self):
+        url = _asset_urls()[0]
+        response = client.get(url, headers={"Accept-Encoding": "gzip;q=0"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_unknown_asset_is_404(self):
+        assert client.get("/static/css/styles.0000000000000000.css").status_code == 404
@@ -0,0 +1,216 @@
+"""
+Test Suite for Cache Module
+---------------------------
+Unit tests for TTL/LRU caching, key normalization and cache backends.
+"""
+
+import time
+
+import pytest
+
+from app.services.cache import CacheEntry, CacheRegion, MemoryCacheBackend, TTLCache, normalize_text
+from app.services.cache_backends import SQLiteCacheBackend, create_cache_backend
+
+from tests.conftest import FakeClock
+
+
+# ============================================
+# Key Normalization Tests
+# ============================================
+
+class TestNormalizeText:
+    """Tests for city text normalization."""
+
+    def test_case_and_whitespace_folding(self):
+        assert normalize_text("  New   York ") == "new york"
+        assert normalize_text("LONDON") == "london"
+
+    def test_accent_folding(self):
+        assert normalize_text("São Paulo") == normalize_text("Sao Paulo")
+        assert normalize_text("Zürich") == "zurich"
+
+    def test_comma_spacing(self):
+        assert normalize_text("Paris ,TX") == "paris, tx"
+
+
+# ============================================
+# TTLCache Tests
+# ============================================
+
+class TestTTLCache:
+    """Tests for expiry, LRU eviction and counters."""
+
+    def test_hit_and_miss_counters(self):
+        cache = TTLCache(max_entries=10, default_ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = TTLCache(max_entries=10, default_ttl=60, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=5)
+
+        clock.now += 10
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_lru_eviction(self):
+        cache = TTLCache(max_entries=2, default_ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" becomes least recently used
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_entry_age(self):
+        clock = FakeClock()
+        cache = TTLCache(max_entries=10, default_ttl=60, clock=clock)
+        cache.set("a", 1)
+        clock.now += 12
+
+        assert cache.get_entry("a").age(clock.now) == 12
+
+
+# ============================================
+# Cache Backend Tests
+# ============================================
+
+class TestCacheEntrySerialization:
+    """Tests for the JSON envelope shared by all backends."""
+
+    def test_round_trip(self):
+        entry = CacheEntry(value={"a": [1, 2]}, stored_at=1.0, expires_at=9.0, fresh_until=5.0)
+        assert CacheEntry.loads(entry.dumps()) == entry
+
+
+class TestCacheRegion:
+    """Tests for TTL rules and counters applied on top of a backend."""
+
+    async def test_set_and_get_with_stale_window(self):
+        clock = FakeClock()
+        region = CacheRegion(
+            MemoryCacheBackend(clock=clock), "weather",
+            default_ttl=60, stale_ttl=30, clock=clock,
+        )
+        await region.set((1, 2), {"temp": 10})
+
+        clock.now += 70
+        entry = await region.get_entry((1, 2))
+        assert entry.value == {"temp": 10}
+        assert not entry.is_fresh(clock.now)
+
+        clock.now += 30
+        assert await region.get_entry((1, 2)) is None
+        assert (await region.stats())["hits"] == 1
+        assert (await region.stats())["misses"] == 1
+
+    async def test_memory_backend_bounds_each_namespace(self):
+        backend = MemoryCacheBackend()
+        region = CacheRegion(backend, "geocode", default_ttl=60, max_entries=2)
+        for city in ("a", "b", "c"):
+            await region.set(city, city)
+
+        assert await region.get("a") is None
+        assert (await region.stats())["evictions"] == 1
+
+    async def test_backend_failure_is_a_miss(self):
+        class BrokenBackend(MemoryCacheBackend):
+            async def get(self, namespace, key):
+                raise ConnectionError("cache down")
+
+        region = CacheRegion(BrokenBackend(), "geocode", default_ttl=60)
+
+        assert await region.get("london") is None
+        assert (await region.stats())["errors"] == 1
+
+
+class TestSQLiteBackend:
+    """Tests for the on-disk backend shared by workers on one host."""
+
+    async def test_workers_share_entries(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        worker_a = CacheRegion(SQLiteCacheBackend(path), "forecast", default_ttl=60)
+        worker_b = CacheRegion(SQLiteCacheBackend(path), "forecast", default_ttl=60)
+
+        await worker_a.set("madrid", [{"date": "2025-01-29"}])
+
+        assert await worker_b.get("madrid") == [{"date": "2025-01-29"}]
+        await worker_a.backend.aclose()
+        await worker_b.backend.aclose()
+
+    async def test_prune_enforces_bound(self, tmp_path):
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+        region = CacheRegion(backend, "geocode", default_ttl=60, max_entries=2)
+        for city in ("a", "b", "c"):
+            await region.set(city, city)
+        backend.prune()
+
+        assert (await region.stats())["size"] == 2
+        assert (await region.stats())["evictions"] == 1
+        await backend.aclose()
+
+    async def test_reads_update_recency_lazily(self, tmp_path):
+        clock = FakeClock(time.time())
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), clock=clock)
+        await backend.set("geocode", "london", "{}", clock.now + 3600)
+
+        def accessed_at():
+            return backend._run(
+                lambda conn: conn.execute("SELECT accessed_at FROM cache").fetchone()[0]
+            )
+
+        stored = accessed_at()
+        clock.now += backend.ACCESS_RESOLUTION / 2
+        assert await backend.get("geocode", "london") == "{}"
+        assert accessed_at() == stored
+
+        clock.now += backend.ACCESS_RESOLUTION
+        await backend.get("geocode", "london")
+        assert accessed_at() == clock.now
+        await backend.aclose()
+
+
+class TestRedisBackend:
+    """Tests for the Redis-protocol backend (requires fakeredis)."""
+
+    async def test_set_and_get(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        from app.services.cache_backends import RedisCacheBackend
+
+        region = CacheRegion(
+            RedisCacheBackend(client=fakeredis.FakeAsyncRedis()), "weather", default_ttl=60
+        )
+        await region.set((5150, -12), {"temp": 10})
+
+        assert await region.get((5150, -12)) == {"temp": 10}
+
+
+class TestBackendFactory:
+    """Tests for environment-based backend selection."""
+
+    def test_default_is_memory(self, monkeypatch):
+        monkeypatch.delenv("WEATHER_CACHE_BACKEND", raising=False)
+        assert create_cache_backend().name == "memory"
+
+    def test_sqlite_from_environment(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("WEATHER_CACHE_BACKEND", "sqlite")
+        monkeypatch.setenv("WEATHER_CACHE_SQLITE_PATH", str(tmp_path / "c.sqlite3"))
+        backend = create_cache_backend()
+
+        assert isinstance(backend, SQLiteCacheBackend)
+        assert backend.path == str(tmp_path / "c.sqlite3")
+
+    def test_unknown_backend_falls_back_to_memory(self):
+        assert create_cache_backend("memcached").name == "memory"
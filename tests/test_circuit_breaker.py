@@ -0,0 +1,217 @@
+"""
+Test Suite for Upstream Circuit Breakers
+----------------------------------------
+Tests for the closed/open/half-open transitions, state shared across
+workers, adaptive timeouts and failing fast in the weather service.
+"""
+
+import time
+
+import httpx
+import pytest
+
+from app.services.cache import MemoryCacheBackend
+from app.services.cache_backends import SQLiteCacheBackend
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, LatencyTracker
+from app.services.weather_service import (
+    UpstreamCircuitOpenError, WeatherAPIError, WeatherService,
+)
+
+from tests.conftest import FakeClock
+from tests.test_weather_service import FakeUpstream, _age_weather_entry
+
+
+def _breaker(clock, backend=None, **options):
+    options.setdefault("min_calls", 4)
+    options.setdefault("open_seconds", 30)
+    return CircuitBreaker(
+        "google_weather", backend or MemoryCacheBackend(clock=clock),
+        failure_rate=0.5, window=60, slow_call_seconds=2.0, clock=clock, **options
+    )
+
+
+async def _trip(breaker):
+    for failed in (False, False, True, True):
+        await breaker.record(failed, 0.1)
+
+
+# ============================================
+# Circuit Breaker Tests
+# ============================================
+
+class TestCircuitBreaker:
+    """Tests for state transitions."""
+
+    async def test_opens_at_failure_rate(self):
+        breaker = _breaker(FakeClock())
+        for failed in (False, False, True):
+            await breaker.record(failed, 0.1)
+        assert await breaker.before_call() is False
+
+        await breaker.record(True, 0.1)
+
+        with pytest.raises(CircuitOpenError) as exc:
+            await breaker.before_call()
+        assert exc.value.retry_after == 30
+        assert breaker.stats()["state"] == "open"
+
+    async def test_needs_minimum_calls(self):
+        breaker = _breaker(FakeClock())
+        await breaker.record(True, 0.1)
+        await breaker.record(True, 0.1)
+
+        assert await breaker.before_call() is False
+
+    async def test_old_outcomes_leave_window(self):
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        for _ in range(3):
+            await breaker.record(True, 0.1)
+        clock.now += 61
+        await breaker.record(True, 0.1)
+
+        assert breaker.stats()["window_calls"] == 1
+        assert await breaker.before_call() is False
+
+    async def test_slow_calls_count_as_failures(self):
+        breaker = _breaker(FakeClock())
+        for latency in (0.1, 0.1, 3.0, 3.0):
+            await breaker.record(False, latency)
+
+        with pytest.raises(CircuitOpenError):
+            await breaker.before_call()
+
+    async def test_half_open_allows_one_probe(self):
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        await _trip(breaker)
+        clock.now += 30
+
+        assert await breaker.before_call() is True
+        with pytest.raises(CircuitOpenError):
+            await breaker.before_call()
+        assert breaker.stats()["state"] == "half_open"
+
+        await breaker.record(False, 0.1, probe=True)
+        assert await breaker.before_call() is False
+        assert breaker.stats()["state"] == "closed"
+
+    async def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        await _trip(breaker)
+        clock.now += 30
+        probe = await breaker.before_call()
+
+        await breaker.record(True, 0.1, probe)
+
+        with pytest.raises(CircuitOpenError):
+            await breaker.before_call()
+        assert breaker.stats()["opened"] == 2
+
+    async def test_lost_probe_replaced_after_open_seconds(self):
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        await _trip(breaker)
+        clock.now += 30
+        assert await breaker.before_call() is True
+
+        clock.now += 30
+        assert await breaker.before_call() is True
+
+    async def test_workers_share_state_through_sqlite(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        clock = FakeClock(time.time())
+        worker_a = _breaker(clock, backend=SQLiteCacheBackend(path))
+        worker_b = _breaker(clock, backend=SQLiteCacheBackend(path))
+
+        await _trip(worker_a)
+
+        with pytest.raises(CircuitOpenError):
+            await worker_b.before_call()
+        await worker_a.backend.aclose()
+        await worker_b.backend.aclose()
+
+
+class TestLatencyTracker:
+    """Tests for p99-based timeouts."""
+
+    def test_configured_timeout_until_enough_samples(self):
+        latencies = LatencyTracker(min_samples=5, multiplier=3, min_timeout=0.5)
+        latencies.record(0.2)
+        assert latencies.timeout(10.0) == 10.0
+
+    def test_timeout_follows_p99(self):
+        latencies = LatencyTracker(min_samples=5, multiplier=3, min_timeout=0.5)
+        for _ in range(99):
+            latencies.record(0.2)
+        latencies.record(1.0)
+
+        assert latencies.percentile(0.99) == 0.2
+        assert latencies.timeout(10.0) == pytest.approx(0.6)
+
+        # Two slow calls out of 101 reach the p99
+        latencies.record(2.0)
+        assert latencies.timeout(10.0) == pytest.approx(3.0)
+        assert latencies.timeout(2.0) == 2.0
+
+    def test_never_below_minimum(self):
+        latencies = LatencyTracker(min_samples=1, multiplier=3, min_timeout=0.5)
+        latencies.record(0.01)
+        assert latencies.timeout(10.0) == 0.5
+
+
+# ============================================
+# Weather Service Tests
+# ============================================
+
+class TestServiceCircuitBreaker:
+    """Tests for failing fast and serving stale data while a circuit is open."""
+
+    def _service(self, monkeypatch, handler):
+        monkeypatch.setenv("BREAKER_MIN_CALLS", "2")
+        return WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+
+    async def test_fails_fast_once_open(self, monkeypatch):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500)
+
+        service = self._service(monkeypatch, handler)
+        for lat in (1.0, 2.0):
+            with pytest.raises(WeatherAPIError):
+                await service.get_weather_by_coordinates(lat, 0.0)
+
+        with pytest.raises(UpstreamCircuitOpenError):
+            await service.get_weather_by_coordinates(3.0, 0.0)
+        assert len(calls) == 2
+        metrics = (await service.get_metrics())["circuit_breakers"]["google_weather"]
+        assert (metrics["state"], metrics["opened"]) == ("open", 1)
+        await service.aclose()
+
+    async def test_stale_entry_served_while_open(self, monkeypatch):
+        upstream = FakeUpstream()
+        failing = {"on": False}
+
+        def handler(request):
+            if failing["on"]:
+                return httpx.Response(500)
+            return upstream(request)
+
+        service = self._service(monkeypatch, handler)
+        await service.get_weather_by_coordinates(51.5, -0.12)
+        await _age_weather_entry(
+            service, service.weather_cache.default_ttl + service.stale_while_revalidate + 60
+        )
+        failing["on"] = True
+        await service.get_weather_by_coordinates(51.5, -0.12)
+
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+
+        assert weather.stale is True
+        assert (await service.get_metrics())["stale_served"] == {
+            "weather.error": 1, "weather.circuit_open": 1
+        }
+        await service.aclose()
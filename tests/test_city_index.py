@@ -0,0 +1,197 @@
+"""
+Test Suite for the Offline City Index
+-------------------------------------
+Tests for prefix search, ranking, accent folding, country disambiguation,
+nearest-city lookups and loading the prebuilt memory-mapped index.
+"""
+
+import pytest
+
+from app.services import city_index
+from app.services.city_index import CityIndex, load_city_index, write_index
+
+CITIES = (
+    "# name\tasciiname\talternatenames\tlatitude\tlongitude\tcountry_code\tadmin1\tpopulation\n"
+    "Springfield\tSpringfield\t\t39.80\t-89.64\tUS\tIllinois\t114230\n"
+    "Springfield\tSpringfield\t\t37.21\t-93.29\tUS\tMissouri\t169176\n"
+    "Kraków\tKrakow\tCracow,Krakau\t50.06\t19.94\tPL\tLesser Poland\t755050\n"
+    "Kramatorsk\tKramatorsk\t\t48.72\t37.56\tUA\tDonetsk\t150000\n"
+)
+COUNTRIES = (
+    "# iso\tname\taliases\n"
+    "US\tUnited States\tUSA,America\n"
+    "PL\tPoland\tPolska\n"
+    "UA\tUkraine\t\n"
+)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    cities = tmp_path / "cities.tsv"
+    countries = tmp_path / "countries.tsv"
+    cities.write_text(CITIES, encoding="utf-8")
+    countries.write_text(COUNTRIES, encoding="utf-8")
+    return str(cities), str(countries)
+
+
+@pytest.fixture
+def index(sources):
+    return CityIndex.from_sources(*sources)
+
+
+# ============================================
+# Search Tests
+# ============================================
+
+class TestSearch:
+    """Tests for prefix lookups."""
+
+    def test_prefix_ranked_by_population(self, index):
+        assert [city.name for city in index.search("kra")] == ["Kraków", "Kramatorsk"]
+
+    def test_accents_and_case_ignored(self, index):
+        assert index.search("KRAKÓ")[0].name == "Kraków"
+        assert index.search("krako")[0].name == "Kraków"
+
+    def test_alternate_names_match_once(self, index):
+        assert [city.name for city in index.search("cra")] == ["Kraków"]
+        assert len(index.search("kra")) == 2
+
+    def test_no_match(self, index):
+        assert index.search("xyz") == []
+        assert index.search(" , poland") == []
+
+    def test_limit(self, index):
+        assert len(index.search("kra", limit=1)) == 1
+
+    def test_country_qualifier(self, index):
+        assert [city.country_code for city in index.search("kra, ua")] == ["UA"]
+        assert [city.country_code for city in index.search("kra, pol")] == ["PL"]
+        assert [city.country_code for city in index.search("kra, polska")] == ["PL"]
+
+    def test_region_qualifier(self, index):
+        [city] = index.search("springfield, illi")
+        assert city.admin1 == "Illinois"
+
+
+class TestLookup:
+    """Tests for whole-name geocoding."""
+
+    def test_most_populous_namesake(self, index):
+        assert index.lookup("Springfield").admin1 == "Missouri"
+
+    def test_qualified_and_alternate_names(self, index):
+        assert index.lookup("springfield, illinois").admin1 == "Illinois"
+        assert index.lookup("Cracow").name == "Kraków"
+
+    def test_unique_rejects_ambiguous_bare_names(self, index):
+        assert index.lookup("Springfield", unique=True) is None
+        assert index.lookup("Springfield, Illinois", unique=True).admin1 == "Illinois"
+        assert index.lookup("Cracow", unique=True).name == "Kraków"
+
+    def test_prefixes_do_not_match(self, index):
+        assert index.lookup("Krak") is None
+        assert index.lookup("Kraków, Ukraine") is None
+
+
+class TestSuggest:
+    """Tests for suggestion formatting."""
+
+    def test_unique_names_show_country(self, index):
+        assert index.suggest("krak") == [
+            {"city": "Kraków", "country": "Poland", "display": "Kraków, Poland"}
+        ]
+
+    def test_duplicate_names_show_region(self, index):
+        assert [s["display"] for s in index.suggest("spring")] == [
+            "Springfield, Missouri, United States",
+            "Springfield, Illinois, United States",
+        ]
+
+
+# ============================================
+# Reverse Geocoding Tests
+# ============================================
+
+class TestNearest:
+    """Tests for coordinate to city resolution."""
+
+    def test_nearest_city(self, index):
+        city = index.nearest(50.1, 19.8)
+        assert (city.name, city.country_code, city.country_name) == ("Kraków", "PL", "Poland")
+
+    def test_same_named_cities_told_apart(self, index):
+        assert index.nearest(37.0, -93.0).admin1 == "Missouri"
+        assert index.nearest(40.0, -89.5).admin1 == "Illinois"
+
+    def test_nothing_within_max_distance(self, index):
+        assert index.nearest(0.0, 0.0) is None
+        assert index.nearest(50.1, 21.5, max_distance_km=50) is None
+        assert index.nearest(50.1, 21.5, max_distance_km=200).name == "Kraków"
+
+    def test_search_crosses_grid_cells(self, index):
+        # Closer to Kraków than to Kramatorsk, several cells away
+        assert index.nearest(50.9, 23.9, max_distance_km=2000).name == "Kraków"
+
+    def test_nearest_many_in_order(self, index):
+        cities = index.nearest_many([(48.7, 37.5), (0.0, 0.0), (50.0, 20.0), (48.7, 37.5)])
+        assert [city and city.name for city in cities] == [
+            "Kramatorsk", None, "Kraków", "Kramatorsk"
+        ]
+
+    def test_antimeridian(self, tmp_path):
+        cities = tmp_path / "cities.tsv"
+        countries = tmp_path / "countries.tsv"
+        cities.write_text("Suva\tSuva\t\t-18.14\t178.44\tFJ\tCentral\t77366\n", encoding="utf-8")
+        countries.write_text("FJ\tFiji\t\n", encoding="utf-8")
+        index = CityIndex.from_sources(str(cities), str(countries))
+
+        assert index.nearest(-18.1, -179.9, max_distance_km=300).name == "Suva"
+
+
+# ============================================
+# Index File Tests
+# ============================================
+
+class TestIndexFile:
+    """Tests for writing and memory-mapping the prebuilt index."""
+
+    def test_mmap_matches_in_memory_index(self, sources, tmp_path, index):
+        path = str(tmp_path / "cities.idx")
+        write_index(path, *sources)
+        mapped = CityIndex.open(path)
+
+        assert len(mapped) == len(index) == 4
+        assert mapped.suggest("spring") == index.suggest("spring")
+        mapped.close()
+
+    def test_invalid_file_rejected(self, tmp_path):
+        path = tmp_path / "cities.idx"
+        path.write_bytes(b"\0" * 128)
+
+        with pytest.raises(ValueError):
+            CityIndex.open(str(path))
+
+    def test_stale_file_rebuilt_in_memory(self, sources, tmp_path, monkeypatch):
+        path = str(tmp_path / "cities.idx")
+        write_index(path, *sources)
+        monkeypatch.setattr(city_index, "CITIES_TSV", sources[0])
+        monkeypatch.setattr(city_index, "COUNTRIES_TSV", sources[1])
+        with open(sources[0], "a", encoding="utf-8") as f:
+            f.write("Kraljevo\tKraljevo\t\t43.72\t20.69\tUA\t\t60000\n")
+
+        loaded = load_city_index(path)
+
+        assert loaded.source == sources[0]
+        assert len(loaded) == 5
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv("CITY_INDEX_ENABLED", "false")
+        assert load_city_index() is None
+
+    def test_bundled_index_is_current(self):
+        """app/data/cities.idx must be rebuilt after editing the TSV files."""
+        bundled = CityIndex.open(city_index.DEFAULT_INDEX_PATH)
+        assert bundled.digest == city_index.source_digest()
+        assert bundled.suggest("sao pa")[0]["city"] == "São Paulo"
+        bundled.close()
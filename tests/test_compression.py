@@ -0,0 +1,162 @@
+"""
+Test Suite for Compression Middleware
+-------------------------------------
+Tests for Accept-Encoding negotiation, size thresholds, passthrough of
+streaming/encoded responses and the compressed body cache.
+"""
+
+import gzip
+
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import (
+    CompressionMiddleware,
+    CompressionStats,
+    choose_encoding,
+    parse_accept_encoding,
+)
+
+BIG_PAYLOAD = {"forecasts": [{"date": f"2025-01-{day:02d}", "temp": 10} for day in range(1, 29)]}
+
+
+def make_client(**options):
+    """Small app wrapped in the middleware, with its stats object."""
+    stats = CompressionStats()
+    test_app = FastAPI()
+    test_app.add_middleware(
+        CompressionMiddleware, minimum_size=500, stats=stats,
+        codecs={"gzip": lambda body: gzip.compress(body, mtime=0)}, **options
+    )
+
+    @test_app.get("/big")
+    def big(response: Response):
+        response.headers["Cache-Control"] = "public, max-age=60"
+        response.headers["ETag"] = '"abc"'
+        return BIG_PAYLOAD
+
+    @test_app.get("/private")
+    def private(response: Response):
+        response.headers["Cache-Control"] = "no-store"
+        return BIG_PAYLOAD
+
+    @test_app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @test_app.get("/stream")
+    def stream():
+        async def lines():
+            for _ in range(50):
+                yield "x" * 40 + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @test_app.get("/encoded")
+    def encoded():
+        return Response(
+            gzip.compress(b"a" * 2000), media_type="text/css",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    return TestClient(test_app), stats
+
+
+# ============================================
+# Negotiation Tests
+# ============================================
+
+class TestNegotiation:
+    """Tests for Accept-Encoding parsing."""
+
+    def test_parse_q_values(self):
+        assert parse_accept_encoding("gzip, br;q=0.5, zstd;q=bad") == {
+            "gzip": 1.0, "br": 0.5, "zstd": 0.0
+        }
+
+    def test_highest_quality_wins(self):
+        assert choose_encoding("gzip;q=1, br;q=0.5", {"gzip", "br"}) == "gzip"
+
+    def test_server_preference_breaks_ties(self):
+        assert choose_encoding("gzip, br", {"gzip", "br"}) == "br"
+
+    def test_refused_and_wildcard(self):
+        assert choose_encoding("gzip;q=0", {"gzip"}) is None
+        assert choose_encoding("*", {"gzip"}) == "gzip"
+        assert choose_encoding("br", {"gzip"}) is None
+
+
+# ============================================
+# Middleware Tests
+# ============================================
+
+class TestCompressionMiddleware:
+    """Tests for which responses get compressed, and how."""
+
+    def test_large_json_is_compressed(self):
+        client, stats = make_client()
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.headers["etag"] == '"abc-gzip"'
+        assert response.json() == BIG_PAYLOAD
+        assert stats.to_dict()["encodings"]["gzip"]["ratio"] < 0.5
+
+    def test_identity_without_accept_encoding(self):
+        client, _ = make_client()
+        response = client.get("/big", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"abc"'
+
+    def test_small_responses_skipped(self):
+        client, stats = make_client()
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert stats.skipped["too_small"] == 1
+
+    def test_streaming_passes_through(self):
+        client, stats = make_client()
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert len(response.text.splitlines()) == 50
+        assert stats.skipped["streaming"] == 1
+
+    def test_already_encoded_passes_through(self):
+        client, stats = make_client()
+        response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+        assert response.text == "a" * 2000
+        assert stats.skipped["encoded"] == 1
+
+    def test_identical_bodies_compressed_once(self):
+        client, stats = make_client()
+        for _ in range(3):
+            client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+        gzip_stats = stats.to_dict()["encodings"]["gzip"]
+        assert gzip_stats["responses"] == 3
+        assert gzip_stats["compressions"] == 1
+        assert gzip_stats["cache_hits"] == 2
+
+    def test_no_store_bodies_not_cached(self):
+        client, stats = make_client()
+        for _ in range(2):
+            client.get("/private", headers={"Accept-Encoding": "gzip"})
+
+        assert stats.to_dict()["encodings"]["gzip"]["compressions"] == 2
+        assert stats.to_dict()["cache"]["size"] == 0
+
+
+def test_metrics_endpoint_reports_compression():
+    from app.main import app
+
+    client = TestClient(app)
+    client.get("/", headers={"Accept-Encoding": "gzip"})
+    metrics = client.get("/api/metrics").json()
+
+    assert set(metrics["compression"]) == {"encodings", "skipped", "cache"}
+    assert metrics["compression"]["skipped"]["encoded"] >= 1
@@ -0,0 +1,180 @@
+"""
+Test Suite for Request Deadlines
+--------------------------------
+Tests for deadline scopes and their propagation through the weather
+service: cache lookups and waits on shared upstream lookups.
+"""
+
+import time
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.deadline import (
+    DeadlineExceeded, deadline_scope, remaining, route_deadline, within_deadline,
+)
+from app.services.weather_service import DeadlineExceededError, WeatherService
+
+from tests.test_weather_service import FakeUpstream, WEATHER_OK, _age_weather_entry
+
+
+def _slow_handler(seconds, calls=None):
+    """Upstream answering current conditions after `seconds`."""
+    async def handler(request):
+        if calls is not None:
+            calls.append(request)
+        await asyncio.sleep(seconds)
+        return httpx.Response(200, json=WEATHER_OK)
+    return handler
+
+
+# ============================================
+# Deadline Scope Tests
+# ============================================
+
+class TestDeadlineScope:
+    """Tests for setting and reading the request deadline."""
+
+    def test_no_deadline_by_default(self):
+        assert remaining() is None
+
+    def test_scope_sets_and_restores(self):
+        with deadline_scope(5.0):
+            assert 4.9 < remaining() <= 5.0
+        assert remaining() is None
+
+    def test_nested_scope_cannot_extend(self):
+        with deadline_scope(1.0):
+            with deadline_scope(5.0):
+                assert remaining() <= 1.0
+            with deadline_scope(0.5):
+                assert remaining() <= 0.5
+
+    def test_none_keeps_current_deadline(self):
+        with deadline_scope(1.0):
+            with deadline_scope(None):
+                assert remaining() <= 1.0
+
+    def test_route_deadline_from_env(self, monkeypatch):
+        assert route_deadline("autocomplete") == 3.0
+        monkeypatch.setenv("REQUEST_DEADLINE", "6")
+        monkeypatch.setenv("REQUEST_DEADLINE_FORECAST", "0")
+        assert route_deadline("weather") == 6.0
+        assert route_deadline("forecast") is None
+
+
+class TestWithinDeadline:
+    """Tests for bounding a wait by the deadline."""
+
+    async def test_without_deadline_waits(self):
+        assert await within_deadline(asyncio.sleep(0.01, result=1), "sleep") == 1
+
+    async def test_gives_up_at_deadline(self):
+        started = time.monotonic()
+        with deadline_scope(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await within_deadline(asyncio.sleep(1.0), "sleep")
+        assert time.monotonic() - started < 0.5
+
+    async def test_spent_deadline_fails_at_once(self):
+        with deadline_scope(0.0):
+            with pytest.raises(DeadlineExceeded):
+                await within_deadline(asyncio.sleep(1.0), "sleep")
+
+
+# ============================================
+# Weather Service Tests
+# ============================================
+
+class TestServiceDeadlines:
+    """Tests for upstream calls and waits bounded by the request deadline."""
+
+    async def test_slow_lookup_outlives_deadline_and_fills_cache(self):
+        calls = []
+        service = WeatherService(
+            api_key="test_key", transport=httpx.MockTransport(_slow_handler(0.2, calls))
+        )
+        started = time.monotonic()
+        with deadline_scope(0.05):
+            with pytest.raises(DeadlineExceededError):
+                await service.get_weather_by_coordinates(51.5, -0.12)
+        assert time.monotonic() - started < 0.15
+
+        # The upstream call was not cut short: it fills the cache
+        await asyncio.sleep(0.3)
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+
+        assert weather.stale is False
+        assert len(calls) == 1
+        assert service.circuit_breakers["google_weather"].counters["failures"] == 0
+        assert (await service.get_metrics())["deadline_exceeded"] == {"weather": 1}
+        await service.aclose()
+
+    async def test_stale_entry_served_at_deadline(self):
+        upstream = FakeUpstream()
+        slow = {"on": False}
+
+        async def handler(request):
+            if slow["on"]:
+                await asyncio.sleep(0.3)
+            return upstream(request)
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        await service.get_weather_by_coordinates(51.5, -0.12)
+        await _age_weather_entry(
+            service, service.weather_cache.default_ttl + service.stale_while_revalidate + 60
+        )
+        slow["on"] = True
+
+        started = time.monotonic()
+        with deadline_scope(0.1):
+            weather = await service.get_weather_by_coordinates(51.5, -0.12)
+
+        assert weather.stale is True
+        assert time.monotonic() - started < 0.5
+        assert (await service.get_metrics())["stale_served"] == {"weather.deadline": 1}
+        await asyncio.sleep(0.3)  # the shared lookup finishes in the background
+        await service.aclose()
+
+    async def test_coalesced_wait_respects_own_deadline(self):
+        calls = []
+        service = WeatherService(
+            api_key="test_key", transport=httpx.MockTransport(_slow_handler(0.3, calls))
+        )
+
+        async def with_deadline(seconds):
+            with deadline_scope(seconds):
+                return await service.get_weather_by_coordinates(51.5, -0.12)
+
+        leader = asyncio.ensure_future(with_deadline(2.0))
+        await asyncio.sleep(0.01)
+        with pytest.raises(DeadlineExceededError):
+            await with_deadline(0.05)
+
+        # The leader's call went on unaffected
+        weather = await leader
+        assert weather.stale is False
+        assert len(calls) == 1
+        assert (await service.get_metrics())["deadline_exceeded"] == {"weather": 1}
+        await service.aclose()
+
+    async def test_joiner_not_bound_by_leader_deadline(self):
+        calls = []
+        service = WeatherService(
+            api_key="test_key", transport=httpx.MockTransport(_slow_handler(0.3, calls))
+        )
+
+        async def with_deadline(seconds):
+            with deadline_scope(seconds):
+                return await service.get_weather_by_coordinates(51.5, -0.12)
+
+        leader = asyncio.ensure_future(with_deadline(0.1))
+        await asyncio.sleep(0.01)
+        weather = await with_deadline(5.0)
+
+        assert weather.stale is False
+        assert len(calls) == 1
+        with pytest.raises(DeadlineExceededError):
+            await leader
+        await service.aclose()
@@ -0,0 +1,157 @@
+"""
+Test Suite for Hedged Requests
+------------------------------
+Tests for racing slow calls against a second request, the hedge budget
+and hedging in the weather service.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.hedging import HedgeBudget, hedged
+from app.services.weather_service import WeatherService
+
+from tests.test_weather_service import WEATHER_OK
+
+
+def _calls(*delays, fail=()):
+    """Call factory whose n-th call sleeps delays[n] and returns n."""
+    started = []
+    cancelled = []
+
+    async def call():
+        n = len(started)
+        started.append(n)
+        try:
+            await asyncio.sleep(delays[n])
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        if n in fail:
+            raise ConnectionError(f"call {n} failed")
+        return n
+
+    return call, started, cancelled
+
+
+async def _allow():
+    return True
+
+
+def _budget(tokens=1.0):
+    budget = HedgeBudget(ratio=1.0)
+    budget._tokens = tokens - 1.0  # record_request() adds the ratio
+    return budget
+
+
+# ============================================
+# Hedging Tests
+# ============================================
+
+class TestHedged:
+    """Tests for the hedged call helper."""
+
+    async def test_fast_call_not_hedged(self):
+        call, started, _ = _calls(0.0)
+        assert await hedged(call, 0.05, _budget(), _allow) == 0
+        assert started == [0]
+
+    async def test_slow_call_hedged_and_loser_cancelled(self):
+        call, started, cancelled = _calls(1.0, 0.0)
+        budget = _budget()
+
+        assert await hedged(call, 0.01, budget, _allow) == 1
+        await asyncio.sleep(0)
+        assert cancelled == [0]
+        assert (budget.counters["fired"], budget.counters["won"]) == (1, 1)
+
+    async def test_primary_can_still_win(self):
+        call, _, cancelled = _calls(0.05, 1.0)
+        budget = _budget()
+
+        assert await hedged(call, 0.01, budget, _allow) == 0
+        await asyncio.sleep(0)
+        assert cancelled == [1]
+        assert budget.counters["won"] == 0
+
+    async def test_failed_call_waits_for_the_other(self):
+        call, _, _ = _calls(0.05, 0.0, fail={1})
+        assert await hedged(call, 0.01, _budget(), _allow) == 0
+
+    async def test_both_failing_raises(self):
+        call, _, _ = _calls(0.05, 0.0, fail={0, 1})
+        with pytest.raises(ConnectionError):
+            await hedged(call, 0.01, _budget(), _allow)
+
+    async def test_no_budget_no_hedge(self):
+        call, started, _ = _calls(0.05, 0.0)
+        budget = _budget(tokens=0.5)
+
+        assert await hedged(call, 0.01, budget, _allow) == 0
+        assert started == [0]
+        assert budget.counters["budget_exhausted"] == 1
+
+    async def test_veto_skips_hedge(self):
+        async def deny():
+            return False
+
+        call, started, _ = _calls(0.05, 0.0)
+        budget = _budget()
+        assert await hedged(call, 0.01, budget, deny) == 0
+        assert started == [0]
+        assert budget.counters["skipped"] == 1
+
+
+class TestHedgeBudget:
+    """Tests for the extra traffic bound."""
+
+    def test_ratio_of_requests(self):
+        budget = HedgeBudget(ratio=0.05)
+        spent = 0
+        for _ in range(200):
+            budget.record_request()
+            if budget.try_spend():
+                spent += 1
+                budget.counters["fired"] += 1
+
+        assert spent == 10
+        assert budget.stats()["extra_traffic"] == 0.05
+
+
+# ============================================
+# Weather Service Tests
+# ============================================
+
+class TestServiceHedging:
+    """Tests for hedging current conditions calls."""
+
+    async def test_slow_weather_call_hedged(self, monkeypatch):
+        monkeypatch.setenv("HEDGE_BUDGET_RATIO", "1.0")
+        slow = {"on": False}
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if slow["on"] and len(calls) == 21:
+                await asyncio.sleep(1.0)
+            return httpx.Response(200, json=WEATHER_OK)
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        for i in range(20):
+            await service.get_weather_by_coordinates(10.0 + i, 0.0)
+        slow["on"] = True
+
+        await asyncio.wait_for(service.get_weather_by_coordinates(50.0, 0.0), timeout=0.5)
+
+        assert len(calls) == 22
+        hedging = (await service.get_metrics())["hedging"]
+        assert (hedging["fired"], hedging["won"]) == (1, 1)
+        await service.aclose()
+
+    async def test_disabled(self, monkeypatch):
+        monkeypatch.setenv("HEDGE_ENABLED", "false")
+        service = WeatherService(api_key="test_key")
+        assert service.hedging_enabled is False
+        await service.aclose()
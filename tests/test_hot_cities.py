@@ -0,0 +1,236 @@
+"""
+Test Suite for Hot City Prefetching
+-----------------------------------
+Tests for the decaying request counters, hot set persistence, the refresh
+budget and the background prefetcher.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.hot_cities import CityPrefetcher, HotCityTracker, RefreshBudget
+from app.services.weather_service import GeoLocation, WeatherService
+
+from tests.conftest import FakeClock
+from tests.test_weather_service import FORECAST_OK, GEOCODE_OK, WEATHER_OK
+
+
+LONDON = GeoLocation(latitude=51.5074, longitude=-0.1278, city="London", country="GB")
+
+
+# ============================================
+# Tracker Tests
+# ============================================
+
+class TestHotCityTracker:
+    """Tests for decaying request counters."""
+
+    def test_ranked_by_request_count(self):
+        tracker = HotCityTracker(clock=FakeClock())
+        for city in ["Paris", "London", "london ", "LONDON", "Paris", "Oslo"]:
+            tracker.record(city)
+
+        assert [(hot.city, hot.score) for hot in tracker.top(2)] == [
+            ("London", 3.0), ("Paris", 2.0)
+        ]
+
+    def test_counts_halve_every_half_life(self):
+        clock = FakeClock()
+        tracker = HotCityTracker(half_life=60, clock=clock)
+        for _ in range(4):
+            tracker.record("London")
+        clock.now += 60
+        tracker.record("Paris")
+        tracker.record("Paris")
+        tracker.record("Paris")
+
+        assert [(hot.city, hot.score) for hot in tracker.top(2)] == [
+            ("Paris", 3.0), ("London", 2.0)
+        ]
+
+    def test_long_uptime_does_not_overflow(self):
+        clock = FakeClock()
+        tracker = HotCityTracker(half_life=1, clock=clock)
+        tracker.record("London")
+        clock.now += 5000
+        tracker.record("Paris")
+
+        top = tracker.top(2)
+        assert top[0].city == "Paris" and top[0].score == pytest.approx(1.0)
+        assert top[1].score == 0.0
+
+    def test_coldest_cities_evicted(self):
+        tracker = HotCityTracker(max_tracked=4)
+        tracker.record("London", count=10)
+        for i in range(10):
+            tracker.record(f"City {i}")
+
+        assert len(tracker) <= 5
+        assert tracker.top(1)[0].city == "London"
+
+    def test_location_remembered(self):
+        tracker = HotCityTracker()
+        tracker.record("London", LONDON)
+        tracker.record("London")
+
+        assert tracker.top(1)[0].location["latitude"] == 51.5074
+
+
+class TestPersistence:
+    """Tests for saving and reloading the hot set."""
+
+    def test_round_trip_decays_by_age(self, tmp_path):
+        path = str(tmp_path / "hot.json")
+        clock = FakeClock()
+        tracker = HotCityTracker(half_life=60, clock=clock)
+        tracker.record("London", LONDON, count=8)
+        tracker.save(path)
+
+        clock.now += 120
+        restored = HotCityTracker(half_life=60, clock=clock)
+        assert restored.load(path) == 1
+
+        [hot] = restored.top(1)
+        assert (hot.city, hot.score) == ("London", 2.0)
+        assert hot.location["city"] == "London"
+
+    def test_workers_write_separate_temporary_files(self, tmp_path):
+        path = tmp_path / "hot.json"
+        # Another worker's save in progress
+        other = tmp_path / "hot.json.tmp"
+        other.write_text("partial")
+        tracker = HotCityTracker()
+        tracker.record("London", LONDON)
+
+        tracker.save(str(path))
+
+        assert other.read_text() == "partial"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["hot.json", "hot.json.tmp"]
+        assert HotCityTracker().load(str(path)) == 1
+
+    def test_missing_or_corrupt_file(self, tmp_path):
+        tracker = HotCityTracker()
+        assert tracker.load(str(tmp_path / "missing.json")) == 0
+
+        corrupt = tmp_path / "corrupt.json"
+        corrupt.write_text("{not json")
+        assert tracker.load(str(corrupt)) == 0
+
+
+class TestRefreshBudget:
+    """Tests for the refresh rate limit."""
+
+    def test_burst_then_rate(self):
+        clock = FakeClock()
+        budget = RefreshBudget(rate_per_minute=2, clock=clock)
+
+        assert [budget.try_acquire() for _ in range(3)] == [True, True, False]
+        clock.now += 30
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+
+
+# ============================================
+# Prefetcher Tests
+# ============================================
+
+@pytest.fixture
+async def service(monkeypatch):
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "owm_key")
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.host)
+        if request.url.host == "api.openweathermap.org":
+            return httpx.Response(200, json=FORECAST_OK)
+        if request.url.host == "maps.googleapis.com":
+            return httpx.Response(200, json=GEOCODE_OK)
+        return httpx.Response(200, json=WEATHER_OK)
+
+    service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+    service.calls = calls
+    yield service
+    await service.aclose()
+
+
+class TestCityPrefetcher:
+    """Tests for refreshing the hottest cities."""
+
+    def _prefetcher(self, service, tmp_path, **options):
+        options.setdefault("refresh_rate", 600)
+        return CityPrefetcher(service, top_k=2, path=str(tmp_path / "hot.json"), **options)
+
+    async def test_requests_are_tracked(self, service):
+        await service.get_weather_by_city("London")
+        await service.get_forecast_by_city("Madrid")
+
+        hot = {city.city: city for city in service.hot_cities.top(5)}
+        assert set(hot) == {"London", "Madrid"}
+        assert hot["London"].location["country"] == "GB"
+
+    async def test_cold_entries_warmed_without_geocoding(self, service, tmp_path):
+        service.hot_cities.record("London", LONDON)
+        prefetcher = self._prefetcher(service, tmp_path)
+
+        assert await prefetcher.refresh_once() == 2
+        assert sorted(service.calls) == ["api.openweathermap.org", "weather.googleapis.com"]
+
+        # Both entries are now fresh: the user's request only needs the
+        # name geocoded ("London" is ambiguous in the city index)
+        await service.get_weather_by_city("London")
+        assert service.calls[2:] == ["maps.googleapis.com"]
+        assert (await service.get_metrics())["weather_cache"]["hits"] == 1
+
+    async def test_fresh_entries_left_alone(self, service, tmp_path):
+        service.hot_cities.record("London", LONDON)
+        prefetcher = self._prefetcher(service, tmp_path)
+        await prefetcher.refresh_once()
+
+        assert await prefetcher.refresh_once() == 0
+
+    async def test_expiring_entries_refreshed(self, service, tmp_path):
+        service.hot_cities.record("London", LONDON)
+        prefetcher = self._prefetcher(service, tmp_path, refresh_ahead=400)
+        await prefetcher.refresh_once()
+
+        # Weather stays fresh for 300s, less than the 400s refresh window
+        assert await prefetcher.refresh_once() >= 1
+        assert prefetcher.counters["weather_refreshed"] == 2
+
+    async def test_budget_limits_refreshes_hottest_first(self, service, tmp_path):
+        service.hot_cities.record("London", LONDON, count=5)
+        service.hot_cities.record("Madrid")
+        prefetcher = self._prefetcher(service, tmp_path, refresh_rate=1)
+
+        assert await prefetcher.refresh_once() == 1
+        assert service.calls == ["weather.googleapis.com"]
+        assert prefetcher.counters["budget_exhausted"] == 1
+
+    async def test_start_warms_saved_hot_set(self, service, tmp_path):
+        path = str(tmp_path / "hot.json")
+        saved = HotCityTracker()
+        saved.record("London", LONDON)
+        saved.save(path)
+
+        prefetcher = self._prefetcher(service, tmp_path)
+        await prefetcher.start()
+        for _ in range(100):
+            if prefetcher.counters["passes"]:
+                break
+            await asyncio.sleep(0.01)
+        await prefetcher.stop()
+
+        assert service.hot_cities.top(1)[0].city == "London"
+        assert prefetcher.counters["passes"] == 1
+        assert prefetcher.stats()["running"] is False
+
+    async def test_not_started_without_api_key(self, tmp_path):
+        service = WeatherService(api_key=None)
+        service.api_key = None
+        prefetcher = self._prefetcher(service, tmp_path)
+        await prefetcher.start()
+
+        assert prefetcher.stats()["running"] is False
+        await service.aclose()
@@ -4,6 +4,7 @@ Test Suite for Weather Watcher API
 Unit tests for all API endpoints including weather functionality.
 """
 
+import re
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
@@ -11,15 +12,32 @@ from app.main import app, validate_city_name
 from app.services.weather_service import (
     WeatherService,
     WeatherData,
+    ForecastData,
     GeoLocation,
     CityNotFoundError,
     WeatherAPIError,
     APIKeyMissingError,
+    UpstreamRateLimitedError,
+    DeadlineExceededError,
+    CityView,
 )
+from app.services.deadline import remaining
 
 client = TestClient(app)
 
 
+def get_frontend_source() -> str:
+    """Return the homepage HTML followed by the CSS/JS assets it links."""
+    response = client.get("/")
+    assert response.status_code == 200
+    sources = [response.text]
+    for url in re.findall(r'(?:href|src)="(/static/[^"]+)"', response.text):
+        asset = client.get(url)
+        assert asset.status_code == 200
+        sources.append(asset.text)
+    return "\n".join(sources)
+
+
 # ============================================
 # Basic Endpoint Tests
 # ============================================
@@ -40,6 +58,16 @@ def test_health_check():
     assert data["version"] == "0.1.0"
 
 
+def test_lifespan_manages_pooled_client():
+    """Test the app lifespan opens and closes the shared HTTP client"""
+    from app.main import weather_service
+
+    with TestClient(app) as lifespan_client:
+        assert weather_service._client is not None
+        assert lifespan_client.get("/health").status_code == 200
+    assert weather_service._client is None
+
+
 def test_api_info():
     """Test info endpoint returns project details"""
     response = client.get("/api/info")
@@ -338,6 +366,658 @@ class TestWeatherEndpointWithMockedAPI:
                 assert response.status_code == 504
 
 
+class TestWeatherCacheHeaders:
+    """Tests for Cache-Control/Age headers on weather endpoints."""
+    
+    def test_freshness_headers_reflect_cached_observation(self):
+        """Cached observations report their age and remaining lifetime."""
+        import time
+        
+        now = time.time()
+        cached_weather = WeatherData(
+            city="Paris", country="FR", country_name="France",
+            temperature=18, feels_like=17, description="Partly cloudy",
+            humidity=70, wind_speed=4.5, pressure=1012, icon="02d",
+            fetched_at=now - 60, expires_at=now + 240,
+        )
+        
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_city',
+                new_callable=AsyncMock,
+                return_value=cached_weather
+            ):
+                for url in ("/api/weather?city=Paris", "/weather/Paris"):
+                    response = client.get(url)
+                    assert response.status_code == 200
+                    assert 59 <= int(response.headers["age"]) <= 61
+                    assert response.headers["cache-control"].startswith("public, max-age=")
+
+
+class TestBatchWeather:
+    """Tests for the batch weather endpoints."""
+    
+    @staticmethod
+    def _weather_for(city):
+        if city == "Atlantis":
+            raise CityNotFoundError("City 'Atlantis' not found")
+        return WeatherData(
+            city=city, country="XX", country_name="Somewhere",
+            temperature=20, feels_like=19, description="Clear",
+            humidity=50, wind_speed=3.0, pressure=1010, icon="01d",
+        )
+    
+    def test_post_batch_returns_per_city_results(self):
+        """Each city gets its own result; failures do not fail the batch."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_city',
+                new_callable=AsyncMock,
+                side_effect=self._weather_for
+            ):
+                response = client.post(
+                    "/api/weather/batch",
+                    json={"cities": ["London", "Atlantis", "x"]}
+                )
+        
+        assert response.status_code == 200
+        results = {item["city"]: item for item in response.json()["results"]}
+        assert results["London"]["status"] == 200
+        assert results["London"]["data"]["city"] == "London"
+        assert results["Atlantis"]["status"] == 404
+        assert results["x"]["status"] == 400
+        assert results["x"]["data"] is None
+    
+    def test_post_batch_dedupes_cities(self):
+        """Repeated cities are looked up once."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_city',
+                new_callable=AsyncMock,
+                side_effect=self._weather_for
+            ) as mock_get:
+                response = client.post(
+                    "/api/weather/batch",
+                    json={"cities": ["São Paulo", "sao paulo", "Paris", "PARIS "]}
+                )
+        
+        assert response.status_code == 200
+        assert response.json()["count"] == 2
+        assert mock_get.await_count == 2
+    
+    def test_post_batch_rejects_oversized_batch(self):
+        """Batches over the configured limit are rejected."""
+        from app import main
+        
+        with patch.object(main, "BATCH_MAX_CITIES", 2):
+            response = client.post(
+                "/api/weather/batch", json={"cities": ["A1", "B1", "C1"]}
+            )
+        assert response.status_code == 400
+    
+    def test_post_batch_rejects_empty_list(self):
+        """An empty city list is a validation error."""
+        response = client.post("/api/weather/batch", json={"cities": []})
+        assert response.status_code == 422
+    
+    def test_repeated_query_parameter_returns_batch(self):
+        """GET /api/weather?city=A&city=B answers with a batch response."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": ""}, clear=False):
+            response = client.get("/api/weather?city=London&city=Tokyo")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert [item["city"] for item in data["results"]] == ["London", "Tokyo"]
+        assert all(item["status"] == 200 for item in data["results"])
+
+    
+    def test_repeated_query_parameter_validated_per_city(self):
+        """A short name fails only its own result, wherever it appears."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": ""}, clear=False):
+            for query in ("city=London&city=x", "city=x&city=London"):
+                response = client.get(f"/api/weather?{query}")
+                
+                assert response.status_code == 200
+                statuses = {item["city"]: item["status"] for item in response.json()["results"]}
+                assert statuses == {"London": 200, "x": 400}
+    
+    def test_single_short_city_rejected(self):
+        """A single invalid name is still a request error."""
+        response = client.get("/api/weather?city=x")
+        assert response.status_code == 400
+
+
+class TestStreamingBatchWeather:
+    """Tests for NDJSON/SSE streaming of batch weather lookups."""
+    
+    @staticmethod
+    async def _slow_weather_for(city):
+        import asyncio
+        
+        if city == "Atlantis":
+            raise CityNotFoundError("City 'Atlantis' not found")
+        await asyncio.sleep(0.05 if city == "Slowtown" else 0)
+        return TestBatchWeather._weather_for(city)
+    
+    def test_ndjson_streams_in_completion_order(self):
+        """Fast lookups are emitted before slow ones, one JSON line each."""
+        import json
+        
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_city',
+                new_callable=AsyncMock,
+                side_effect=self._slow_weather_for
+            ):
+                response = client.post(
+                    "/api/weather/batch?stream=ndjson",
+                    json={"cities": ["Slowtown", "Atlantis", "Paris"]}
+                )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        items = [json.loads(line) for line in response.text.splitlines()]
+        assert [item["city"] for item in items][-1] == "Slowtown"
+        by_city = {item["city"]: item for item in items}
+        assert by_city["Slowtown"]["index"] == 0
+        assert by_city["Paris"]["data"]["city"] == "Paris"
+        assert by_city["Atlantis"] == {
+            "index": 1, "city": "Atlantis", "status": 404, "error": by_city["Atlantis"]["error"]
+        }
+    
+    def test_sse_selected_by_accept_header(self):
+        """text/event-stream clients get weather events and a final done event."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": ""}, clear=False):
+            response = client.post(
+                "/api/weather/batch",
+                json={"cities": ["London", "Tokyo"]},
+                headers={"Accept": "text/event-stream"}
+            )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block for block in response.text.split("\n\n") if block]
+        assert [block.splitlines()[0] for block in events] == [
+            "event: weather", "event: weather", "event: done"
+        ]
+        assert events[-1].endswith('{"count": 2}')
+    
+    def test_unknown_stream_format_rejected(self):
+        """Only ndjson and sse are accepted."""
+        response = client.post(
+            "/api/weather/batch?stream=xml", json={"cities": ["London"]}
+        )
+        assert response.status_code == 422
+    
+    async def test_window_bounds_concurrency_and_cancels_on_close(self):
+        """At most BATCH_MAX_CONCURRENCY lookups run; closing cancels the rest."""
+        import asyncio
+        from app import main
+        
+        running = 0
+        peak = 0
+        cancelled = 0
+        
+        async def tracked(city):
+            nonlocal running, peak, cancelled
+            running += 1
+            peak = max(peak, running)
+            try:
+                await asyncio.sleep(0 if city.startswith("Fast") else 10)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            finally:
+                running -= 1
+            return {"city": city, "status": 200, "data": None}
+        
+        cities = ["Fast1", "Slow1", "Fast2", "Fast3", "Slow2", "Slow3"]
+        with patch.object(main, "BATCH_MAX_CONCURRENCY", 2), \
+                patch.object(main, "_fetch_weather_batch_item", side_effect=tracked):
+            stream = main._iter_weather_batch(cities)
+            seen = [(await stream.__anext__())["city"] for _ in range(3)]
+            await stream.aclose()
+            await asyncio.sleep(0)
+        
+        assert seen == ["Fast1", "Fast2", "Fast3"]
+        assert peak == 2
+        # Slow2 was never started: the next lookup only begins once the
+        # consumer asks for another result
+        assert cancelled == 1
+        assert running == 0
+
+
+class TestCoordinatesWeather:
+    """Tests for the coordinate weather endpoints."""
+    
+    @staticmethod
+    def _weather_at(latitude, longitude, *args):
+        return WeatherData(
+            city="Unknown", country="", country_name="",
+            temperature=int(latitude), feels_like=19, description="Clear",
+            humidity=50, wind_speed=3.0, pressure=1010, icon="01d",
+        )
+    
+    def test_single_point(self):
+        """A single lat/lng pair returns a plain weather response."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_coordinates',
+                new_callable=AsyncMock,
+                side_effect=self._weather_at
+            ) as mock_get:
+                response = client.get("/api/weather/coords?lat=51.5&lng=-0.12")
+        
+        assert response.status_code == 200
+        assert response.json()["temperature"] == 51
+        mock_get.assert_awaited_once_with(51.5, -0.12)
+    
+    def test_out_of_range_coordinates_rejected(self):
+        """Latitude outside [-90, 90] is a validation error."""
+        response = client.get("/api/weather/coords?lat=91&lng=0")
+        assert response.status_code == 422
+    
+    def test_batch_dedupes_points_in_same_cell(self):
+        """Points in one grid cell share a single lookup, in request order."""
+        points = [
+            {"latitude": 51.5074, "longitude": -0.1278},
+            {"latitude": 48.8566, "longitude": 2.3522},
+            {"latitude": 51.5071, "longitude": -0.1281},
+        ]
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_coordinates',
+                new_callable=AsyncMock,
+                side_effect=self._weather_at
+            ) as mock_get:
+                response = client.post("/api/weather/coords/batch", json={"points": points})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 3
+        assert data["cells"] == 2
+        assert mock_get.await_count == 2
+        assert [item["latitude"] for item in data["results"]] == [51.5074, 48.8566, 51.5071]
+        assert [item["data"]["temperature"] for item in data["results"]] == [51, 48, 51]
+    
+    def test_batch_reports_errors_per_point(self):
+        """An upstream failure for one cell does not fail the batch."""
+        def weather_or_timeout(latitude, longitude, *args):
+            if latitude < 0:
+                raise WeatherAPIError("Weather API timeout")
+            return self._weather_at(latitude, longitude)
+        
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_coordinates',
+                new_callable=AsyncMock,
+                side_effect=weather_or_timeout
+            ):
+                response = client.get(
+                    "/api/weather/coords?lat=40.7&lng=-74.0&lat=-33.9&lng=151.2"
+                )
+        
+        assert response.status_code == 200
+        statuses = [item["status"] for item in response.json()["results"]]
+        assert statuses == [200, 504]
+    
+    def test_batch_cells_named_from_city_index(self):
+        """Each cell is named after its nearest city, resolved up front."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_coordinates',
+                new_callable=AsyncMock,
+                side_effect=self._weather_at
+            ) as mock_get:
+                client.get("/api/weather/coords?lat=48.86&lng=2.35&lat=0&lng=-150")
+        
+        calls = sorted(call.args for call in mock_get.await_args_list)
+        assert calls == [(0.0, -150.0), (48.86, 2.35, "Paris", "FR", "France")]
+    
+    def test_mock_point_named_from_city_index(self):
+        """Without an API key the mock response still names the city."""
+        with patch.dict("os.environ", {}, clear=True):
+            data = client.get("/api/weather/coords?lat=40.42&lng=-3.70").json()
+        
+        assert (data["city"], data["country"]) == ("Madrid", "Spain")
+    
+    def test_unpaired_query_coordinates_rejected(self):
+        """Repeated lat without a matching lng is a client error."""
+        response = client.get("/api/weather/coords?lat=40.7&lng=-74.0&lat=10")
+        assert response.status_code == 400
+
+
+class TestForecastEndpoint:
+    """Tests for /api/forecast served through WeatherService."""
+    
+    def test_stale_forecast_is_flagged(self):
+        """Stale forecasts are marked in the body and headers."""
+        import time
+        
+        now = time.time()
+        stale_forecast = ForecastData(
+            city="Madrid",
+            forecasts=[{"date": "2025-01-29", "temp_max": 14, "temp_min": 5,
+                        "description": "Clear sky", "icon": "01d"}],
+            fetched_at=now - 2000, expires_at=now - 200, stale=True,
+        )
+        
+        with patch.dict("os.environ", {"OPENWEATHER_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_forecast_by_city',
+                new_callable=AsyncMock,
+                return_value=stale_forecast
+            ):
+                response = client.get("/api/forecast?city=Madrid")
+                
+                assert response.status_code == 200
+                assert response.json()["stale"] is True
+                assert response.json()["forecasts"][0]["temp_max"] == 14
+                assert "stale" in response.headers["warning"].lower()
+    
+    def test_forecast_city_not_found(self):
+        """CityNotFoundError maps to 404."""
+        with patch.dict("os.environ", {"OPENWEATHER_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_forecast_by_city',
+                new_callable=AsyncMock,
+                side_effect=CityNotFoundError("City not found: Fakeville")
+            ):
+                response = client.get("/api/forecast?city=Fakeville")
+                
+                assert response.status_code == 404
+
+
+class TestCityView:
+    """Tests for /api/city-view, weather and forecast in one response."""
+    
+    @staticmethod
+    def _view(forecast_error=None):
+        import time
+        
+        now = time.time()
+        weather = WeatherData(
+            city="Madrid", country="ES", country_name="Spain", temperature=18,
+            feels_like=17, description="Sunny", humidity=40, wind_speed=2.0,
+            pressure=1015, icon="01d", fetched_at=now - 60, expires_at=now + 240,
+        )
+        forecast = None if forecast_error else ForecastData(
+            city="Madrid",
+            forecasts=[{"date": "2025-01-29", "temp_max": 14, "temp_min": 5,
+                        "description": "Clear sky", "icon": "01d"}],
+            fetched_at=now - 60, expires_at=now + 100,
+        )
+        return CityView(weather=weather, forecast=forecast, forecast_error=forecast_error)
+    
+    def test_weather_and_forecast_in_one_response(self):
+        """Both parts are returned; caching follows the earliest expiry."""
+        env = {"GOOGLE_MAPS_API_KEY": "test_key", "OPENWEATHER_API_KEY": "test_key"}
+        with patch.dict("os.environ", env):
+            with patch.object(
+                WeatherService, 'get_city_view', new_callable=AsyncMock,
+                return_value=self._view()
+            ):
+                response = client.get("/api/city-view?city=Madrid")
+                
+                assert response.status_code == 200
+                data = response.json()
+                assert data["weather"]["temperature"] == 18
+                assert data["weather"]["country"] == "Spain"
+                assert data["forecast"]["forecasts"][0]["temp_max"] == 14
+                assert data["forecast_status"] == 200
+                max_age = int(response.headers["cache-control"].split("max-age=")[1])
+                assert 90 <= max_age <= 100
+                assert "etag" in response.headers
+    
+    def test_forecast_failure_keeps_weather(self):
+        """A failed forecast is reported with the status /api/forecast would give."""
+        env = {"GOOGLE_MAPS_API_KEY": "test_key", "OPENWEATHER_API_KEY": "test_key"}
+        with patch.dict("os.environ", env):
+            with patch.object(
+                WeatherService, 'get_city_view', new_callable=AsyncMock,
+                return_value=self._view(CityNotFoundError("City not found: Madrid"))
+            ):
+                response = client.get("/api/city-view?city=Madrid")
+                
+                assert response.status_code == 200
+                data = response.json()
+                assert data["weather"]["city"] == "Madrid"
+                assert data["forecast"] is None
+                assert data["forecast_status"] == 404
+    
+    def test_weather_failure_fails_view(self):
+        """Weather errors map like /api/weather."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService, 'get_city_view', new_callable=AsyncMock,
+                side_effect=CityNotFoundError("City not found: Fakeville")
+            ):
+                response = client.get("/api/city-view?city=Fakeville")
+                
+                assert response.status_code == 404
+    
+    def test_mock_data_without_api_keys(self):
+        """Without keys the view has mock weather and no forecast."""
+        env = {"GOOGLE_MAPS_API_KEY": "", "OPENWEATHER_API_KEY": ""}
+        with patch.dict("os.environ", env):
+            response = client.get("/api/city-view?city=London")
+            
+            assert response.status_code == 200
+            data = response.json()
+            assert "Mock Data" in data["weather"]["description"]
+            assert data["forecast"] is None
+            assert data["forecast_status"] == 503
+
+
+class TestUpstreamRateLimits:
+    """Tests for 503 responses when an upstream budget is exhausted."""
+    
+    def test_weather_returns_503_with_retry_after(self):
+        """Exhausted budgets tell clients when to retry."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_city',
+                new_callable=AsyncMock,
+                side_effect=UpstreamRateLimitedError("google_weather limited", 12.3)
+            ):
+                response = client.get("/api/weather?city=London")
+                
+                assert response.status_code == 503
+                assert response.headers["retry-after"] == "13"
+    
+    def test_forecast_returns_503_with_retry_after(self):
+        """Forecasts report the OpenWeatherMap quota reset time."""
+        with patch.dict("os.environ", {"OPENWEATHER_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_forecast_by_city',
+                new_callable=AsyncMock,
+                side_effect=UpstreamRateLimitedError("openweathermap quota", 3600)
+            ):
+                response = client.get("/api/forecast?city=Madrid")
+                
+                assert response.status_code == 503
+                assert response.headers["retry-after"] == "3600"
+
+
+class TestRequestDeadlines:
+    """Tests for the per-route request deadline."""
+    
+    def test_weather_lookup_runs_within_route_deadline(self):
+        """The service sees the weather route's budget as its deadline."""
+        seen = []
+        
+        async def lookup(city):
+            seen.append(remaining())
+            raise CityNotFoundError(city)
+        
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.dict("app.main.REQUEST_DEADLINES", {"weather": 1.5}):
+                with patch.object(
+                    WeatherService, 'get_weather_by_city', new_callable=AsyncMock,
+                    side_effect=lookup
+                ):
+                    client.get("/api/weather?city=London")
+        
+        assert 0 < seen[0] <= 1.5
+    
+    def test_deadline_exceeded_returns_504(self):
+        """A spent deadline without stale data is a gateway timeout."""
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService, 'get_weather_by_city', new_callable=AsyncMock,
+                side_effect=DeadlineExceededError("Request timeout: deadline exceeded")
+            ):
+                response = client.get("/api/weather?city=London")
+                
+                assert response.status_code == 504
+    
+    def test_autocomplete_deadline_exceeded_returns_504(self):
+        """Autocomplete reports spent deadlines as timeouts, not errors."""
+        with patch.object(
+            WeatherService, 'get_city_suggestions', new_callable=AsyncMock,
+            side_effect=DeadlineExceededError("Request timeout: deadline exceeded")
+        ):
+            response = client.get("/api/cities/autocomplete?query=Lon")
+            
+            assert response.status_code == 504
+
+
+class TestConditionalRequests:
+    """Tests for ETag/Last-Modified revalidation of cached JSON."""
+    
+    @staticmethod
+    def _cached_weather(temperature=18):
+        import time
+        
+        now = time.time()
+        return WeatherData(
+            city="Paris", country="FR", country_name="France",
+            temperature=temperature, feels_like=17, description="Partly cloudy",
+            humidity=70, wind_speed=4.5, pressure=1012, icon="02d",
+            fetched_at=now - 60, expires_at=now + 240,
+            observed_at=1738102436.0,
+        )
+    
+    def _get(self, weather, **headers):
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_weather_by_city',
+                new_callable=AsyncMock,
+                return_value=weather
+            ):
+                return client.get("/api/weather?city=Paris", headers=headers)
+    
+    def test_validators_from_upstream_observation(self):
+        """ETag and Last-Modified derive from the upstream observation."""
+        response = self._get(self._cached_weather())
+        
+        assert response.headers["last-modified"] == "Tue, 28 Jan 2025 22:13:56 GMT"
+        assert response.headers["etag"] == self._get(self._cached_weather()).headers["etag"]
+    
+    def test_if_none_match_returns_304(self):
+        """A matching ETag gets an empty 304 with the caching headers."""
+        etag = self._get(self._cached_weather()).headers["etag"]
+        response = self._get(self._cached_weather(), **{"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert "max-age" in response.headers["cache-control"]
+    
+    def test_compressed_etag_revalidates(self):
+        """ETags echoed from a gzip response still match."""
+        from app import main
+        
+        # Pad the body past the compression threshold
+        to_response = main._weather_to_response
+        with patch.object(main, "_weather_to_response", side_effect=lambda weather: {
+            **to_response(weather), "description": "x" * 2000
+        }):
+            first = self._get(self._cached_weather(), **{"Accept-Encoding": "gzip"})
+            assert first.headers["etag"].endswith('-gzip"')
+            response = self._get(
+                self._cached_weather(),
+                **{"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]}
+            )
+        
+        assert response.status_code == 304
+    
+    def test_changed_observation_returns_200(self):
+        """A new observation no longer matches the old ETag."""
+        etag = self._get(self._cached_weather()).headers["etag"]
+        response = self._get(self._cached_weather(temperature=25), **{"If-None-Match": etag})
+        
+        assert response.status_code == 200
+        assert response.json()["temperature"] == 25
+    
+    def test_if_modified_since(self):
+        """If-Modified-Since at or after the observation gets a 304."""
+        current = self._get(
+            self._cached_weather(),
+            **{"If-Modified-Since": "Tue, 28 Jan 2025 22:13:56 GMT"}
+        )
+        older = self._get(
+            self._cached_weather(),
+            **{"If-Modified-Since": "Tue, 28 Jan 2025 21:00:00 GMT"}
+        )
+        
+        assert current.status_code == 304
+        assert older.status_code == 200
+    
+    def test_forecast_revalidation(self):
+        """Forecasts carry validators too."""
+        forecast = ForecastData(
+            city="Madrid",
+            forecasts=[{"date": "2025-01-29", "temp_max": 14, "temp_min": 5,
+                        "description": "Clear sky", "icon": "01d"}],
+            fetched_at=1738102436.0, expires_at=1738102436.0 + 3600,
+        )
+        with patch.dict("os.environ", {"OPENWEATHER_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_forecast_by_city',
+                new_callable=AsyncMock,
+                return_value=forecast
+            ):
+                etag = client.get("/api/forecast?city=Madrid").headers["etag"]
+                response = client.get(
+                    "/api/forecast?city=Madrid", headers={"If-None-Match": etag}
+                )
+        
+        assert response.status_code == 304
+    
+    def test_autocomplete_revalidation(self):
+        """Autocomplete suggestions are tagged by content."""
+        suggestions = [{"city": "Madrid", "country": "Spain", "display": "Madrid, Spain"}]
+        with patch.dict("os.environ", {"GOOGLE_MAPS_API_KEY": "test_key"}):
+            with patch.object(
+                WeatherService,
+                'get_city_suggestions',
+                new_callable=AsyncMock,
+                return_value=suggestions
+            ):
+                etag = client.get("/api/cities/autocomplete?query=Mad").headers["etag"]
+                response = client.get(
+                    "/api/cities/autocomplete?query=Mad", headers={"If-None-Match": etag}
+                )
+        
+        assert response.status_code == 304
+
+
 # ============================================
 # Response Format Tests
 # ============================================
@@ -484,9 +1164,7 @@ class TestComparisonFeature:
     
     def test_comparison_section_exists_in_html(self):
         """Test that comparison section HTML is present on the homepage."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for comparison section
         assert 'id="comparisonSection"' in html_content
@@ -495,18 +1173,14 @@ class TestComparisonFeature:
     
     def test_add_to_comparison_button_exists(self):
         """Test that Add to Comparison button is present in HTML."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         assert 'id="addToComparisonBtn"' in html_content
         assert 'Add to Comparison' in html_content
     
     def test_comparison_javascript_functions_exist(self):
         """Test that comparison JavaScript functions are defined."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for JavaScript functions
         assert 'updateComparisonView' in html_content
@@ -515,9 +1189,7 @@ class TestComparisonFeature:
     
     def test_comparison_css_styles_exist(self):
         """Test that comparison CSS styles are defined."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for comparison-specific CSS classes
         assert '.comparison-section' in html_content
@@ -527,9 +1199,7 @@ class TestComparisonFeature:
     
     def test_comparison_color_variables_defined(self):
         """Test that comparison color CSS variables are defined."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         assert '--comparison-highlight' in html_content
         assert '--comparison-best' in html_content
@@ -537,9 +1207,7 @@ class TestComparisonFeature:
     
     def test_comparison_indicators_styling(self):
         """Test that visual comparison indicators have proper styling."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for warmest/coldest indicator styles
         assert '.warmest' in html_content
@@ -549,44 +1217,34 @@ class TestComparisonFeature:
     
     def test_comparison_responsive_design(self):
         """Test that comparison section has mobile responsive CSS."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for media queries affecting comparison
         assert '@media (max-width: 768px)' in html_content or '@media (max-width: 480px)' in html_content
     
     def test_comparison_empty_state_html(self):
         """Test that comparison empty state is properly defined."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         assert 'comparison-empty' in html_content
         assert 'No cities to compare' in html_content
     
     def test_clear_comparison_button_exists(self):
         """Test that Clear All comparison button exists."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         assert 'id="clearComparisonBtn"' in html_content
         assert 'Clear All' in html_content
     
     def test_comparison_count_display_exists(self):
         """Test that comparison count display element exists."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         assert 'id="comparisonCount"' in html_content
     
     def test_comparison_metrics_display(self):
         """Test that comparison cards show proper weather metrics."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for metrics structure in comparison cards
         assert 'comparison-metrics' in html_content
@@ -595,9 +1253,7 @@ class TestComparisonFeature:
     
     def test_temperature_indicators_exist(self):
         """Test that temperature up/down indicators are defined."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         assert 'comparison-temp-indicator' in html_content
         assert 'fa-arrow-up' in html_content
@@ -605,26 +1261,20 @@ class TestComparisonFeature:
     
     def test_remove_button_styling(self):
         """Test that remove from comparison button has proper styling."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         assert 'remove-comparison-btn' in html_content
     
     def test_comparison_animations_defined(self):
         """Test that comparison-specific animations are defined."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for animation classes
         assert 'scaleIn' in html_content or 'fadeSlideUp' in html_content
     
     def test_comparison_grid_layout(self):
         """Test that comparison cards use grid layout."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         assert 'comparison-container' in html_content
         assert 'grid-template-columns' in html_content
@@ -679,9 +1329,7 @@ class TestTemperatureUnitToggle:
     
     def test_temperature_toggle_button_exists(self):
         """Test that temperature toggle button is present in HTML."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for toggle button
         assert 'id="temperatureToggle"' in html_content
@@ -692,9 +1340,7 @@ class TestTemperatureUnitToggle:
     
     def test_temperature_toggle_css_styles_exist(self):
         """Test that temperature toggle CSS styles are defined."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for toggle-specific CSS classes
         assert '.temperature-toggle-container' in html_content
@@ -703,9 +1349,7 @@ class TestTemperatureUnitToggle:
     
     def test_temperature_conversion_functions_exist(self):
         """Test that temperature conversion JavaScript functions are defined."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for conversion functions
         assert 'celsiusToFahrenheit' in html_content
@@ -750,9 +1394,7 @@ class TestTemperatureUnitToggle:
     
     def test_temperature_display_includes_unit_symbol(self):
         """Test that temperature display includes unit symbol in HTML."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check that temperature display uses unit symbol
         assert 'getTemperatureUnitSymbol' in html_content
@@ -760,9 +1402,7 @@ class TestTemperatureUnitToggle:
     
     def test_temperature_toggle_localstorage_support(self):
         """Test that temperature unit preference uses localStorage."""
-        response = client.get("/")
-        assert response.status_code == 200
-        html_content = response.text
+        html_content = get_frontend_source()
         
         # Check for localStorage usage
         assert 'localStorage.getItem' in html_content
@@ -792,3 +1432,12 @@ class TestTemperatureUnitToggle:
             assert -50 <= data["temperature"] <= 50
             assert isinstance(data["feels_like"], int)
             assert -50 <= data["feels_like"] <= 50
+
+
+def test_metrics_endpoint_reports_geocode_cache():
+    """Test /api/metrics exposes cache counters"""
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    stats = response.json()["geocode_cache"]
+    for counter in ("hits", "misses", "evictions", "size"):
+        assert counter in stats
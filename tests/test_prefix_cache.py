@@ -0,0 +1,85 @@
+"""
+Test Suite for the Prefix-Aware Autocomplete Cache
+--------------------------------------------------
+Tests for answering longer prefixes from complete parent results and for
+the per-prefix-length hit counters.
+"""
+
+import pytest
+
+from app.services.cache import CacheRegion, MemoryCacheBackend
+from app.services.prefix_cache import PrefixCache, matches_prefix
+
+MAD = [
+    {"city": "Madrid", "country": "Spain", "display": "Madrid, Spain"},
+    {"city": "Madison", "country": "USA", "display": "Madison, WI, USA"},
+    {"city": "Ciudad Madero", "country": "Mexico", "display": "Ciudad Madero, Tamaulipas, Mexico"},
+]
+
+
+@pytest.fixture
+def cache():
+    return PrefixCache(CacheRegion(MemoryCacheBackend(), "autocomplete", default_ttl=60))
+
+
+class TestMatchesPrefix:
+    """Tests for the local stand-in of the Places matching rule."""
+
+    def test_start_of_any_word(self):
+        assert matches_prefix(MAD[2], "made")
+        assert matches_prefix(MAD[2], "ciudad m")
+        assert not matches_prefix(MAD[2], "adero")
+
+    def test_accents_folded(self):
+        assert matches_prefix({"display": "São Paulo, Brazil"}, "sao p")
+
+
+class TestPrefixCache:
+    """Tests for exact and derived hits."""
+
+    async def test_exact_hit(self, cache):
+        await cache.set("mad", MAD, complete=True)
+        assert await cache.get("mad") == MAD
+
+    async def test_longer_prefix_filtered_from_complete_parent(self, cache):
+        await cache.set("ma", MAD, complete=True)
+
+        assert await cache.get("madr") == MAD[:1]
+        assert await cache.get("madi") == MAD[1:2]
+        # Derived results are stored, so the next keystroke is an exact hit
+        assert await cache.get("madr") == MAD[:1]
+        assert (await cache.stats())["by_prefix_length"]["4"] == {
+            "hits": 1, "prefix_hits": 2, "misses": 0, "hit_rate": 1.0
+        }
+
+    async def test_truncated_parent_not_used(self, cache):
+        await cache.set("ma", MAD, complete=False)
+
+        assert await cache.get("madr") is None
+        assert (await cache.stats())["by_prefix_length"]["4"]["misses"] == 1
+
+    async def test_longest_parent_wins(self, cache):
+        await cache.set("ma", MAD, complete=True)
+        await cache.set("mad", MAD, complete=False)
+
+        # "mad" was truncated, so "ma" cannot be complete for "madr" either
+        assert await cache.get("madr") is None
+
+    async def test_only_nearest_parents_read(self, cache):
+        await cache.set("ma", MAD, complete=True)
+
+        assert await cache.get("madrid spa") is None
+        # Parents that were not cached are not counted as region misses
+        assert (await cache.stats())["misses"] == 1
+
+    async def test_empty_complete_parent(self, cache):
+        await cache.set("zq", [], complete=True)
+        assert await cache.get("zqx") == []
+
+    async def test_hit_rate_by_length(self, cache):
+        await cache.get("lo")
+        await cache.set("lo", MAD, complete=True)
+        await cache.get("lo")
+
+        assert (await cache.stats())["by_prefix_length"]["2"]["hit_rate"] == 0.5
+        assert (await cache.stats())["backend"] == "memory"
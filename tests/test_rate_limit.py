@@ -0,0 +1,310 @@
+"""
+Test Suite for Upstream Rate Limiting
+-------------------------------------
+Tests for the shared token buckets, daily quotas, upstream 429 backoff and
+the degrade order of the weather service (stale data, queueing, 503).
+"""
+
+import time
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.cache import MemoryCacheBackend, token_bucket_take
+from app.services.cache_backends import SQLiteCacheBackend
+from app.services.rate_limit import (
+    DAY_SECONDS, NAMESPACE, RateLimitExceeded, UpstreamLimit, UpstreamLimiter, parse_retry_after,
+)
+from app.services.weather_service import UpstreamRateLimitedError, WeatherService
+
+from tests.conftest import FakeClock
+from tests.test_weather_service import FakeUpstream, _age_weather_entry
+
+
+def _limiter(clock, rate=1.0, burst=2.0, daily_quota=0, backend=None):
+    backend = backend or MemoryCacheBackend(clock=clock)
+    return UpstreamLimiter(
+        "google_weather", UpstreamLimit(rate, burst, daily_quota), backend,
+        clock=clock, sleep=clock.sleep,
+    )
+
+
+# ============================================
+# Token Bucket Tests
+# ============================================
+
+class TestTokenBucket:
+    """Tests for the bucket arithmetic shared by all backends."""
+
+    def test_missing_state_is_full_bucket(self):
+        wait, state, _ = token_bucket_take(None, now=10.0, rate=1.0, capacity=3.0)
+        assert wait == 0.0
+        assert state == "2.0,10.0"
+
+    def test_empty_bucket_reports_wait(self):
+        wait, state, _ = token_bucket_take("0.25,10.0", now=10.0, rate=0.5, capacity=3.0)
+        assert wait == pytest.approx(1.5)
+        assert state is None
+
+    def test_refill_capped_at_capacity(self):
+        _, state, _ = token_bucket_take("0.0,0.0", now=1000.0, rate=1.0, capacity=3.0)
+        assert state == "2.0,1000.0"
+
+
+class TestUpstreamLimiter:
+    """Tests for acquiring calls from an upstream's budget."""
+
+    async def test_burst_then_rejected(self):
+        clock = FakeClock()
+        limiter = _limiter(clock)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        with pytest.raises(RateLimitExceeded) as exc:
+            await limiter.acquire()
+        assert exc.value.reason == "rate"
+        assert exc.value.retry_after == pytest.approx(1.0)
+
+    async def test_queues_within_max_wait(self):
+        clock = FakeClock()
+        limiter = _limiter(clock, rate=2.0, burst=1.0)
+        await limiter.acquire()
+
+        await limiter.acquire(max_wait=1.0)
+
+        assert clock.slept == [pytest.approx(0.5)]
+        assert limiter.stats()["queued"] == 1
+
+    async def test_on_queue_called_once_when_queueing(self):
+        clock = FakeClock()
+        limiter = _limiter(clock, rate=2.0, burst=1.0)
+        queued = []
+        await limiter.acquire(on_queue=lambda: queued.append(1))
+        assert queued == []
+
+        await limiter.acquire(max_wait=1.0, on_queue=lambda: queued.append(1))
+        assert queued == [1]
+
+    async def test_wait_beyond_max_wait_rejected_without_sleeping(self):
+        clock = FakeClock()
+        limiter = _limiter(clock, rate=0.1, burst=1.0)
+        await limiter.acquire()
+
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire(max_wait=2.0)
+        assert clock.slept == []
+
+    async def test_daily_quota(self):
+        clock = FakeClock(now=DAY_SECONDS * 100 + 3600)
+        limiter = _limiter(clock, rate=100.0, burst=100.0, daily_quota=2)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        with pytest.raises(RateLimitExceeded) as exc:
+            await limiter.acquire()
+        assert exc.value.reason == "quota"
+        assert exc.value.retry_after == pytest.approx(DAY_SECONDS - 3600)
+
+        clock.now += DAY_SECONDS
+        await limiter.acquire()
+
+    async def test_block_pauses_calls(self):
+        clock = FakeClock()
+        limiter = _limiter(clock, burst=10.0)
+        await limiter.block(30)
+
+        with pytest.raises(RateLimitExceeded) as exc:
+            await limiter.acquire(max_wait=5.0)
+        assert (exc.value.reason, exc.value.retry_after) == ("backoff", 30)
+
+        clock.now += 31
+        await limiter.acquire()
+
+    async def test_backend_failure_allows_call(self):
+        class BrokenBackend(MemoryCacheBackend):
+            async def get(self, namespace, key):
+                raise ConnectionError("backend down")
+
+        clock = FakeClock()
+        limiter = _limiter(clock, backend=BrokenBackend(clock=clock))
+
+        await limiter.acquire()
+        assert limiter.stats()["backend_errors"] == 1
+
+    async def test_workers_share_budget_through_sqlite(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        clock = FakeClock(now=time.time())
+        worker_a = _limiter(clock, rate=0.01, burst=3.0, backend=SQLiteCacheBackend(path))
+        worker_b = _limiter(clock, rate=0.01, burst=3.0, backend=SQLiteCacheBackend(path))
+
+        await worker_a.acquire()
+        await worker_b.acquire()
+        await worker_a.acquire()
+        with pytest.raises(RateLimitExceeded):
+            await worker_b.acquire()
+        assert "backend_errors" not in worker_b.stats()
+
+        await worker_a.backend.aclose()
+        await worker_b.backend.aclose()
+
+    async def test_redis_backend_buckets_and_quota(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")  # fakeredis runs the Lua bucket script with it
+        from app.services.cache_backends import RedisCacheBackend
+
+        # Redis expires the quota key by wall-clock time: stay within today
+        clock = FakeClock(now=time.time() // DAY_SECONDS * DAY_SECONDS + 60)
+        backend = RedisCacheBackend(client=fakeredis.FakeAsyncRedis())
+        limiter = _limiter(clock, rate=2.0, burst=2.0, daily_quota=3, backend=backend)
+
+        await limiter.acquire()
+        await limiter.acquire()
+        with pytest.raises(RateLimitExceeded) as exc:
+            await limiter.acquire()
+        assert exc.value.reason == "rate"
+        assert exc.value.retry_after == pytest.approx(0.5)
+
+        await limiter.acquire(max_wait=1.0)
+        assert clock.slept == [pytest.approx(0.5)]
+        clock.now += 10
+        with pytest.raises(RateLimitExceeded) as exc:
+            await limiter.acquire()
+        assert exc.value.reason == "quota"
+        assert "backend_errors" not in limiter.stats()
+        await backend.aclose()
+
+    async def test_redis_incr_expires_at_given_time(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        from app.services.cache_backends import RedisCacheBackend
+
+        client = fakeredis.FakeAsyncRedis()
+        backend = RedisCacheBackend(client=client)
+        expires_at = time.time() + 3600
+
+        assert await backend.incr(NAMESPACE, "google_weather:quota:day", 1, expires_at) == 1
+        assert await backend.incr(NAMESPACE, "google_weather:quota:day", 2, expires_at) == 3
+        ttl = await client.ttl(backend._key(NAMESPACE, "google_weather:quota:day"))
+        assert 3590 < ttl <= 3601
+        await backend.aclose()
+
+
+class TestParseRetryAfter:
+    """Tests for reading Retry-After headers."""
+
+    def test_seconds_and_dates(self):
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after("Thu, 01 Jan 1970 00:01:40 GMT", now=40.0) == 60.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+# ============================================
+# Weather Service Degrade Order Tests
+# ============================================
+
+class TestServiceRateLimiting:
+    """Tests for stale fallback, queueing and backoff in the weather service."""
+
+    def _service(self, monkeypatch, handler, burst="1"):
+        monkeypatch.setenv("UPSTREAM_GOOGLE_WEATHER_RATE", "0.001")
+        monkeypatch.setenv("UPSTREAM_GOOGLE_WEATHER_BURST", burst)
+        return WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+
+    async def test_limits_configured_from_environment(self, monkeypatch):
+        monkeypatch.setenv("UPSTREAM_OPENWEATHERMAP_DAILY_QUOTA", "1000")
+        service = WeatherService(api_key="test_key")
+
+        limits = (await service.get_metrics())["upstream_limits"]
+        assert limits["openweathermap"]["daily_quota"] == 1000
+        assert set(limits) == {
+            "google_geocoding", "google_weather", "google_places", "openweathermap"
+        }
+        await service.aclose()
+
+    async def test_stale_entry_served_when_budget_exhausted(self, monkeypatch):
+        upstream = FakeUpstream()
+        service = self._service(monkeypatch, upstream)
+        await service.get_weather_by_coordinates(51.5, -0.12)
+        await _age_weather_entry(
+            service, service.weather_cache.default_ttl + service.stale_while_revalidate + 60
+        )
+
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+        await service.aclose()
+
+        assert weather.stale is True
+        assert upstream.count("weather.googleapis.com") == 1
+        assert (await service.get_metrics())["stale_served"] == {"weather.rate_limited": 1}
+
+    async def test_stale_entry_served_while_lookup_queues(self, monkeypatch):
+        monkeypatch.setenv("UPSTREAM_GOOGLE_WEATHER_RATE", "5")
+        monkeypatch.setenv("UPSTREAM_GOOGLE_WEATHER_BURST", "1")
+        upstream = FakeUpstream()
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(upstream))
+        await service.get_weather_by_coordinates(51.5, -0.12)
+        await _age_weather_entry(
+            service, service.weather_cache.default_ttl + service.stale_while_revalidate + 60
+        )
+
+        started = time.monotonic()
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+        assert weather.stale is True
+        assert time.monotonic() - started < 0.1
+        assert (await service.get_metrics())["stale_served"] == {"weather.rate_limited": 1}
+
+        # The queued lookup goes on and refreshes the entry
+        await asyncio.sleep(0.3)
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+        assert weather.stale is False
+        assert upstream.count("weather.googleapis.com") == 2
+        await service.aclose()
+
+    async def test_joiner_of_prefetch_queues_for_token(self, monkeypatch):
+        monkeypatch.setenv("UPSTREAM_GOOGLE_WEATHER_RATE", "5")
+        monkeypatch.setenv("UPSTREAM_GOOGLE_WEATHER_BURST", "1")
+        upstream = FakeUpstream()
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(upstream))
+        await service.get_weather_by_coordinates(40.4, -3.7)
+        location = {"latitude": 51.5, "longitude": -0.12}
+
+        # The prefetch starts the lookup; the request joining it has no
+        # stale entry, so the shared lookup queues instead of failing
+        _, weather = await asyncio.gather(
+            service.prefetch("weather", "London", location),
+            service.get_weather_by_coordinates(51.5, -0.12),
+        )
+
+        assert weather.stale is False
+        assert upstream.count("weather.googleapis.com") == 2
+        assert (await service.get_metrics())["single_flight"]["coalesced"] == {"weather": 1}
+        await service.aclose()
+
+    async def test_raises_without_stale_entry(self, monkeypatch):
+        monkeypatch.setenv("UPSTREAM_QUEUE_MAX_WAIT", "0")
+        service = self._service(monkeypatch, FakeUpstream())
+        await service.get_weather_by_coordinates(51.5, -0.12)
+
+        with pytest.raises(UpstreamRateLimitedError) as exc:
+            await service.get_weather_by_coordinates(40.4, -3.7)
+        assert exc.value.retry_after > 0
+        await service.aclose()
+
+    async def test_upstream_429_pauses_calls(self, monkeypatch):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429, headers={"Retry-After": "90"})
+
+        service = self._service(monkeypatch, handler, burst="10")
+
+        with pytest.raises(UpstreamRateLimitedError) as exc:
+            await service.get_weather_by_coordinates(51.5, -0.12)
+        assert exc.value.retry_after == 90
+        with pytest.raises(UpstreamRateLimitedError):
+            await service.get_weather_by_coordinates(40.4, -3.7)
+
+        assert len(calls) == 1
+        assert (await service.get_metrics())["upstream_limits"]["google_weather"]["upstream_429"] == 1
+        await service.aclose()
@@ -0,0 +1,250 @@
+"""
+Test Suite for Inbound Rate Limiting
+------------------------------------
+Tests for GCRA decisions, per-client and per-route budgets, client
+identification, batch charging, shared budgets across workers and the
+429 response.
+"""
+
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.rate_limiting import (
+    ClientLimiter,
+    RateLimitMiddleware,
+    RateLimitStats,
+    RouteLimit,
+    gcra,
+)
+from app.services.cache_backends import SQLiteCacheBackend
+
+from tests.conftest import FakeClock
+
+
+LIMITS = [
+    RouteLimit(
+        "batch", ("/api/weather/batch",), per_minute=60, burst=5, batch_fields=("cities",)
+    ),
+    RouteLimit("weather", ("/api/weather",), per_minute=60, burst=2, batch_fields=("city",)),
+    RouteLimit("forecast", ("/api/forecast",), per_minute=60, burst=1),
+]
+
+
+def make_client(clock=None, **options):
+    """Small app wrapped in the middleware, with its stats object."""
+    stats = RateLimitStats()
+    options.setdefault("enabled", True)
+    test_app = FastAPI()
+    test_app.add_middleware(
+        RateLimitMiddleware, limits=LIMITS, stats=stats, clock=clock or FakeClock(), **options
+    )
+    handled = []
+
+    @test_app.get("/api/weather")
+    def weather(city: str):
+        handled.append(city)
+        return {"city": city}
+
+    @test_app.post("/api/weather/batch")
+    def weather_batch(batch: dict):
+        handled.extend(batch["cities"])
+        return {"count": len(batch["cities"])}
+
+    @test_app.get("/api/forecast")
+    def forecast():
+        return {"ok": True}
+
+    @test_app.get("/health")
+    def health():
+        return {"ok": True}
+
+    client = TestClient(test_app)
+    client.handled = handled
+    return client, stats
+
+
+# ============================================
+# GCRA Tests
+# ============================================
+
+class TestGCRA:
+    """Tests for single rate decisions."""
+
+    def test_burst_then_interval(self):
+        allowed, tat, _ = gcra(None, now=0.0, interval=1.0, burst=2)
+        assert allowed and tat == 1.0
+        allowed, tat, _ = gcra(tat, now=0.0, interval=1.0, burst=2)
+        assert allowed and tat == 2.0
+
+        allowed, _, retry_after = gcra(tat, now=0.0, interval=1.0, burst=2)
+        assert not allowed and retry_after == 1.0
+        assert gcra(tat, now=1.0, interval=1.0, burst=2)[0]
+
+    def test_idle_client_recovers_full_burst(self):
+        allowed, tat, _ = gcra(5.0, now=100.0, interval=1.0, burst=3)
+        assert allowed and tat == 101.0
+
+    def test_cost_counts_as_several_requests(self):
+        allowed, tat, _ = gcra(None, now=0.0, interval=1.0, burst=5, cost=3)
+        assert allowed and tat == 3.0
+
+        allowed, _, retry_after = gcra(tat, now=0.0, interval=1.0, burst=5, cost=3)
+        assert not allowed and retry_after == 1.0
+
+    async def test_entries_expire_when_budget_recovers(self):
+        clock = FakeClock()
+        limiter = ClientLimiter(clock=clock)
+        await limiter.check(LIMITS[1], "ip:1.2.3.4")
+        assert len(limiter.clients) == 1
+
+        clock.now += 1.5
+        await limiter.check(LIMITS[2], "ip:5.6.7.8")
+        assert limiter.clients.get(("weather", "ip:1.2.3.4")) is None
+
+
+# ============================================
+# Middleware Tests
+# ============================================
+
+class TestRateLimitMiddleware:
+    """Tests for per-client, per-route enforcement."""
+
+    def test_rejected_before_validation_with_retry_after(self):
+        client, stats = make_client()
+        assert client.get("/api/weather?city=a").status_code == 200
+        assert client.get("/api/weather?city=b").status_code == 200
+
+        # Missing query parameter: rejected without being validated
+        response = client.get("/api/weather")
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+        assert response.headers["x-ratelimit-limit"] == "60/min"
+        assert client.handled == ["a", "b"]
+        assert stats.to_dict()["groups"]["weather"] == {"allowed": 2, "rejected": 1}
+
+    def test_routes_have_separate_budgets(self):
+        client, _ = make_client()
+        client.get("/api/weather?city=a")
+        client.get("/api/weather?city=b")
+
+        assert client.get("/api/forecast").status_code == 200
+        assert client.get("/api/forecast").status_code == 429
+        for _ in range(5):
+            assert client.get("/health").status_code == 200
+
+    def test_clients_have_separate_budgets(self):
+        client, _ = make_client(api_keys=["alice", "bob"])
+        for _ in range(2):
+            client.get("/api/weather?city=a", headers={"X-API-Key": "alice"})
+
+        assert client.get("/api/weather?city=a", headers={"X-API-Key": "alice"}).status_code == 429
+        assert client.get("/api/weather?city=a", headers={"X-API-Key": "bob"}).status_code == 200
+        assert client.get("/api/weather?city=a").status_code == 200
+
+    def test_unknown_api_keys_share_the_ip_budget(self):
+        client, stats = make_client(api_keys=["alice"])
+        for key in ("random-1", "random-2"):
+            assert client.get("/api/weather?city=a", headers={"X-API-Key": key}).status_code == 200
+
+        assert client.get("/api/weather?city=a", headers={"X-API-Key": "random-3"}).status_code == 429
+        assert client.get("/api/weather?city=a", headers={"X-API-Key": "alice"}).status_code == 200
+        assert stats.to_dict()["tracked_clients"] == 2
+
+    def test_batch_charged_per_city(self):
+        client, stats = make_client()
+        response = client.post("/api/weather/batch", json={"cities": ["a", "b", "c"]})
+        assert response.json() == {"count": 3}
+
+        response = client.post("/api/weather/batch", json={"cities": ["d", "e", "f"]})
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+        assert client.post("/api/weather/batch", json={"cities": ["d", "e"]}).status_code == 200
+        assert client.handled == ["a", "b", "c", "d", "e"]
+        assert stats.to_dict()["groups"]["batch"] == {"allowed": 2, "rejected": 1}
+        # The batch group has its own budget
+        assert client.get("/api/weather?city=a").status_code == 200
+
+    def test_batch_larger_than_burst_charged_full_burst(self):
+        client, _ = make_client()
+        cities = [str(i) for i in range(50)]
+        assert client.post("/api/weather/batch", json={"cities": cities}).status_code == 200
+        assert client.post("/api/weather/batch", json={"cities": ["a"]}).status_code == 429
+
+    def test_repeated_query_parameters_charged_per_city(self):
+        client, _ = make_client()
+        assert client.get("/api/weather?city=a&city=b").status_code == 200
+        assert client.get("/api/weather?city=c").status_code == 429
+
+    def test_forwarded_address_only_when_trusted(self):
+        client, _ = make_client(trust_forwarded=True)
+        for ip in ("10.0.0.1", "10.0.0.1", "10.0.0.2"):
+            response = client.get("/api/weather?city=a", headers={"X-Forwarded-For": ip})
+            assert response.status_code == 200
+
+        untrusted, _ = make_client()
+        for ip in ("10.0.0.1", "10.0.0.2"):
+            untrusted.get("/api/weather?city=a", headers={"X-Forwarded-For": ip})
+        response = untrusted.get("/api/weather?city=a", headers={"X-Forwarded-For": "10.0.0.3"})
+        assert response.status_code == 429
+
+    def test_client_set_forwarded_entries_ignored(self):
+        client, _ = make_client(trust_forwarded=True)
+        # The client forges the left-most entry; the proxy appends the real one
+        for forged in ("1.1.1.1", "2.2.2.2"):
+            response = client.get(
+                "/api/weather?city=a", headers={"X-Forwarded-For": f"{forged}, 10.0.0.1"}
+            )
+            assert response.status_code == 200
+        response = client.get(
+            "/api/weather?city=a", headers={"X-Forwarded-For": "3.3.3.3, 10.0.0.1"}
+        )
+        assert response.status_code == 429
+
+    def test_forwarded_hops(self):
+        client, _ = make_client(trust_forwarded=True, forwarded_hops=2)
+        for forged in ("1.1.1.1", "2.2.2.2"):
+            client.get(
+                "/api/weather?city=a",
+                headers={"X-Forwarded-For": f"{forged}, 10.0.0.1, 172.16.0.1"},
+            )
+        response = client.get(
+            "/api/weather?city=a", headers={"X-Forwarded-For": "10.0.0.1, 172.16.0.1"}
+        )
+        assert response.status_code == 429
+
+    def test_budget_refills(self):
+        clock = FakeClock()
+        client, _ = make_client(clock)
+        client.get("/api/forecast")
+        assert client.get("/api/forecast").status_code == 429
+
+        clock.now += 1
+        assert client.get("/api/forecast").status_code == 200
+
+    def test_disabled(self):
+        client, _ = make_client(enabled=False)
+        for _ in range(5):
+            assert client.get("/api/forecast").status_code == 200
+
+    def test_workers_share_budget_through_backend(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        clock = FakeClock(time.time())
+        worker_a, _ = make_client(clock, backend=SQLiteCacheBackend(path))
+        worker_b, _ = make_client(clock, backend=SQLiteCacheBackend(path))
+
+        assert worker_a.get("/api/weather?city=a").status_code == 200
+        assert worker_b.get("/api/weather?city=a").status_code == 200
+        assert worker_a.get("/api/weather?city=a").status_code == 429
+        assert worker_b.get("/api/weather?city=a").status_code == 429
+
+
+def test_metrics_endpoint_reports_rate_limits():
+    from app.main import app
+
+    client = TestClient(app)
+    client.get("/api/forecast?city=Madrid")
+    metrics = client.get("/api/metrics").json()
+
+    assert metrics["rate_limit"]["groups"]["forecast"]["allowed"] >= 1
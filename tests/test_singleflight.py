@@ -0,0 +1,77 @@
+"""
+Test Suite for Single-Flight Module
+-----------------------------------
+Unit tests for coalescing of concurrent identical lookups.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight.do()."""
+
+    async def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def lookup():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(
+            *(flights.do(("geocode", "london"), lookup) for _ in range(5))
+        )
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert flights.stats()["coalesced"] == {"geocode": 4}
+        assert flights.stats()["in_flight"] == 0
+
+    async def test_followers_receive_leader_exception(self):
+        flights = SingleFlight()
+
+        async def lookup():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(
+            *(flights.do(("weather", 1), lookup) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    async def test_sequential_calls_not_coalesced(self):
+        flights = SingleFlight()
+
+        async def lookup():
+            return 1
+
+        await flights.do(("forecast", "madrid"), lookup)
+        await flights.do(("forecast", "madrid"), lookup)
+
+        assert flights.stats()["leaders"] == {"forecast": 2}
+        assert flights.stats()["coalesced_total"] == 0
+
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        flights = SingleFlight()
+
+        async def lookup():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        leader = asyncio.ensure_future(flights.do(("autocomplete", "mad"), lookup))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do(("autocomplete", "mad"), lookup))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
@@ -0,0 +1,802 @@
+"""
+Test Suite for WeatherService
+-----------------------------
+Unit tests for the service layer, using httpx.MockTransport in place of the
+Google and OpenWeatherMap APIs.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.cache_backends import SQLiteCacheBackend
+from app.services.weather_service import (
+    APIKeyMissingError,
+    CityNotFoundError,
+    UpstreamRateLimitedError,
+    WeatherAPIError,
+    WeatherService,
+    get_weather,
+)
+
+
+GEOCODE_OK = {
+    "status": "OK",
+    "results": [{
+        "geometry": {"location": {"lat": 51.5074, "lng": -0.1278}},
+        "address_components": [
+            {"long_name": "London", "short_name": "London", "types": ["locality"]},
+            {"long_name": "United Kingdom", "short_name": "GB", "types": ["country"]},
+        ],
+    }],
+}
+
+WEATHER_OK = {
+    "currentTime": "2025-01-28T22:13:56Z",
+    "isDaytime": True,
+    "weatherCondition": {"type": "CLEAR", "description": {"text": "Sunny"}},
+    "temperature": {"degrees": 12.4},
+    "feelsLikeTemperature": {"degrees": 11.0},
+    "relativeHumidity": 70,
+    "wind": {"speed": {"value": 10}},
+    "airPressure": {"meanSeaLevelMillibars": 1012},
+}
+
+
+class FakeUpstream:
+    """Routes requests to canned Google responses and records every call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request)
+        if request.url.host == "maps.googleapis.com":
+            return httpx.Response(200, json=GEOCODE_OK)
+        return httpx.Response(200, json=WEATHER_OK)
+
+    def count(self, host: str) -> int:
+        return sum(1 for call in self.calls if call.url.host == host)
+
+
+@pytest.fixture
+def upstream():
+    return FakeUpstream()
+
+
+@pytest.fixture
+async def service(upstream):
+    service = WeatherService(api_key="test_key", transport=httpx.MockTransport(upstream))
+    yield service
+    await service.aclose()
+
+
+# ============================================
+# Pooled HTTP Client Tests
+# ============================================
+
+class TestPooledClient:
+    """Tests for the shared, long-lived HTTP client."""
+
+    async def test_client_reused_across_requests(self, service, upstream):
+        """All upstream calls go through one client instance."""
+        first = service.http_client
+        await service.get_weather_by_city("London")
+        await service.get_weather_by_city("Paris")
+
+        assert service.http_client is first
+        assert len(upstream.calls) >= 2
+
+    async def test_aclose_releases_client(self, service):
+        """aclose() closes the pool and a later access opens a new one."""
+        first = service.http_client
+        await service.aclose()
+
+        assert first.is_closed
+        assert service.http_client is not first
+
+    async def test_get_weather_closes_its_service(self, monkeypatch):
+        """The one-shot helper closes the client it opened, even on errors."""
+        closed = []
+
+        async def fail(self, city):
+            raise CityNotFoundError(f"City not found: {city}")
+
+        async def aclose(self):
+            closed.append(self)
+
+        monkeypatch.setattr(WeatherService, "get_weather_by_city", fail)
+        monkeypatch.setattr(WeatherService, "aclose", aclose)
+        with pytest.raises(CityNotFoundError):
+            await get_weather("Atlantis", api_key="test")
+
+        assert len(closed) == 1
+
+    def test_pool_limits_from_environment(self, monkeypatch):
+        """Pool sizes can be tuned with environment variables."""
+        monkeypatch.setenv("HTTP_MAX_CONNECTIONS", "7")
+        monkeypatch.setenv("HTTP_MAX_KEEPALIVE", "3")
+        service = WeatherService(api_key="test")
+
+        assert service.limits.max_connections == 7
+        assert service.limits.max_keepalive_connections == 3
+
+
+# ============================================
+# Geocode Cache Tests
+# ============================================
+
+class TestGeocodeCache:
+    """Tests for caching of city-to-coordinates lookups."""
+
+    async def test_repeated_city_geocoded_once(self, service, upstream):
+        """Equivalent spellings of a city share one geocode call."""
+        service.geocode_policy = "prefer_remote"
+        await service._geocode_city("London")
+        await service._geocode_city("  london ")
+        await service._geocode_city("LONDON")
+
+        assert upstream.count("maps.googleapis.com") == 1
+        assert (await service.geocode_cache.stats())["hits"] == 2
+
+    async def test_city_not_found_is_cached(self):
+        """Unknown cities are negatively cached."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"status": "ZERO_RESULTS", "results": []})
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        for _ in range(2):
+            with pytest.raises(CityNotFoundError):
+                await service._geocode_city("Atlantis")
+        await service.aclose()
+
+        assert len(calls) == 1
+
+
+# ============================================
+# Current Conditions Cache Tests
+# ============================================
+
+class TestWeatherCache:
+    """Tests for the grid-keyed current conditions cache."""
+
+    async def test_city_and_coordinates_share_cache(self, service, upstream):
+        """A city lookup and a nearby coordinate lookup cost one weather call."""
+        by_city = await service.get_weather_by_city("London")
+        by_coords = await service.get_weather_by_coordinates(51.5071, -0.1281)
+
+        assert upstream.count("weather.googleapis.com") == 1
+        assert by_coords.temperature == by_city.temperature
+
+    async def test_distant_coordinates_not_shared(self, service, upstream):
+        """Points in different grid cells are fetched separately."""
+        await service.get_weather_by_coordinates(51.50, -0.12)
+        await service.get_weather_by_coordinates(48.85, 2.35)
+
+        assert upstream.count("weather.googleapis.com") == 2
+
+    async def test_weather_data_carries_freshness(self, service):
+        """Returned data is stamped with its cache timestamps."""
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+
+        assert weather.fetched_at > 0
+        assert weather.expires_at - weather.fetched_at == service.weather_cache.default_ttl
+
+    async def test_observation_time_from_upstream(self, service):
+        """currentTime of the upstream observation is exposed as observed_at."""
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+
+        assert weather.observed_at == 1738102436.0
+
+    async def test_upstream_called_for_cell_center(self, service, upstream):
+        """Coordinates are snapped to the grid before calling upstream."""
+        await service.get_weather_by_coordinates(51.50712, -0.12806)
+
+        params = upstream.calls[-1].url.params
+        assert params["location.latitude"] == "51.51"
+        assert params["location.longitude"] == "-0.13"
+
+
+# ============================================
+# Request Coalescing Tests
+# ============================================
+
+class TestRequestCoalescing:
+    """Tests for single-flight deduplication of upstream calls."""
+
+    async def test_concurrent_city_requests_share_upstream_calls(self):
+        """A burst of identical requests costs one geocode and one weather call."""
+        upstream = FakeUpstream()
+
+        async def slow_handler(request):
+            await asyncio.sleep(0.01)
+            return upstream(request)
+
+        service = WeatherService(
+            api_key="test_key",
+            transport=httpx.MockTransport(slow_handler),
+            geocode_policy="prefer_remote",
+        )
+        results = await asyncio.gather(
+            *(service.get_weather_by_city("London") for _ in range(10))
+        )
+        await service.aclose()
+
+        assert {result.city for result in results} == {"London"}
+        assert upstream.count("maps.googleapis.com") == 1
+        assert upstream.count("weather.googleapis.com") == 1
+        assert (await service.get_metrics())["single_flight"]["coalesced"]["geocode"] == 9
+
+    async def test_city_suggestions_mapped_from_predictions(self):
+        """Places predictions are mapped to suggestion dicts."""
+        def handler(request):
+            return httpx.Response(200, json={
+                "status": "OK",
+                "predictions": [
+                    {"description": "Madrid, Spain"},
+                    {"description": "Madrid"},
+                ],
+            })
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        # Not in the bundled city index, so the Places API is asked
+        suggestions = await service.get_city_suggestions("Madridejos")
+        await service.aclose()
+
+        assert suggestions == [{"city": "Madrid", "country": "Spain", "display": "Madrid, Spain"}]
+        assert (await service.get_metrics())["autocomplete_sources"] == {"google": 1}
+
+    async def test_full_page_of_predictions_is_not_complete(self):
+        """Five predictions may be truncated: longer prefixes ask Places again."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if request.url.params["input"] == "Zzx":
+                return httpx.Response(200, json={
+                    "status": "OK", "predictions": [{"description": "Zzxville, USA"}],
+                })
+            return httpx.Response(200, json={
+                "status": "OK",
+                "predictions": [{"description": f"Zz{i}, USA"} for i in range(5)],
+            })
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        service.city_index = None
+        assert len(await service.get_city_suggestions("Zz")) == 5
+        suggestions = await service.get_city_suggestions("Zzx")
+        await service.aclose()
+
+        assert [s["city"] for s in suggestions] == ["Zzxville"]
+        assert len(calls) == 2
+
+    async def test_city_suggestions_error_status_not_cached(self):
+        """A Places error status raises instead of caching an empty answer."""
+        answers = [{"status": "REQUEST_DENIED"}, {"status": "ZERO_RESULTS"}]
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json=answers[min(len(calls), len(answers)) - 1])
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        service.city_index = None
+        with pytest.raises(WeatherAPIError):
+            await service.get_city_suggestions("Zzyzx")
+
+        assert await service.get_city_suggestions("Zzyzx") == []
+        assert await service.get_city_suggestions("Zzyzx") == []
+        await service.aclose()
+        assert len(calls) == 2
+
+    async def test_city_suggestions_over_query_limit_pauses_places(self):
+        """OVER_QUERY_LIMIT is a rate limit error that pauses Places calls."""
+        def handler(request):
+            return httpx.Response(200, json={"status": "OVER_QUERY_LIMIT"})
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        service.city_index = None
+        with pytest.raises(UpstreamRateLimitedError) as exc:
+            await service.get_city_suggestions("Zzyzx")
+        await service.aclose()
+
+        assert exc.value.retry_after == 60.0
+        assert (await service.get_metrics())["upstream_limits"]["google_places"]["upstream_429"] == 1
+
+    async def test_longer_prefix_answered_from_cached_parent(self):
+        """A complete result for "Madri" answers "Madridej" without upstream."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={
+                "status": "OK",
+                "predictions": [{"description": "Madridejos, Spain"}],
+            })
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        service.city_index = None
+        await service.get_city_suggestions("Madri")
+        suggestions = await service.get_city_suggestions("Madridej")
+        await service.aclose()
+
+        assert len(calls) == 1
+        assert suggestions == [{"city": "Madridejos", "country": "Spain", "display": "Madridejos, Spain"}]
+        metrics = await service.get_metrics()
+        assert metrics["autocomplete_cache"]["by_prefix_length"]["8"]["prefix_hits"] == 1
+        assert metrics["autocomplete_sources"] == {"google": 1}
+
+    async def test_city_suggestions_answered_locally(self, service, upstream):
+        """Prefixes found in the city index never reach the Places API."""
+        suggestions = await service.get_city_suggestions("Madr")
+
+        assert suggestions[0] == {"city": "Madrid", "country": "Spain", "display": "Madrid, Spain"}
+        assert upstream.calls == []
+        assert (await service.get_metrics())["autocomplete_sources"] == {"local": 1}
+
+    async def test_city_suggestions_need_key_only_for_misses(self):
+        """Without an API key, local matches still work and misses raise."""
+        service = WeatherService(api_key=None)
+        service.api_key = None
+
+        assert (await service.get_city_suggestions("Lisb"))[0]["city"] == "Lisbon"
+        with pytest.raises(APIKeyMissingError):
+            await service.get_city_suggestions("Madridejos")
+        await service.aclose()
+
+
+# ============================================
+# Local Geocoding Tests
+# ============================================
+
+class TestLocalGeocoding:
+    """Tests for GEOCODE_POLICY and the city index in front of the Geocoding API."""
+
+    async def test_known_city_costs_one_weather_call(self, service, upstream):
+        weather = await service.get_weather_by_city("São Paulo")
+
+        assert (weather.city, weather.country) == ("São Paulo", "BR")
+        assert upstream.count("maps.googleapis.com") == 0
+        assert upstream.count("weather.googleapis.com") == 1
+        assert (await service.get_metrics())["geocode_sources"] == {"local": 1}
+
+    async def test_unknown_city_falls_through_to_google(self, service, upstream):
+        await service._geocode_city("Little Snoring")
+
+        assert upstream.count("maps.googleapis.com") == 1
+        assert (await service.get_metrics())["geocode_sources"] == {"google": 1}
+
+    async def test_ambiguous_name_goes_to_google(self, service, upstream):
+        location = await service._geocode_city("Valencia")
+
+        # Google's answer (the canned London result), not the largest namesake
+        assert location.city == "London"
+        assert upstream.count("maps.googleapis.com") == 1
+
+        location = await service._geocode_city("Valencia, Spain")
+        assert (location.city, location.country) == ("Valencia", "ES")
+        assert upstream.count("maps.googleapis.com") == 1
+
+    async def test_local_only_never_calls_google(self, service, upstream):
+        service.geocode_policy = "local_only"
+
+        assert (await service._geocode_city("portland, maine")).country == "US"
+        with pytest.raises(CityNotFoundError):
+            await service._geocode_city("Little Snoring")
+        assert upstream.calls == []
+
+    async def test_prefer_remote_falls_back_when_google_fails(self):
+        def failing(request):
+            return httpx.Response(500)
+
+        service = WeatherService(
+            api_key="test_key",
+            transport=httpx.MockTransport(failing),
+            geocode_policy="prefer_remote",
+        )
+        location = await service._geocode_city("Madrid")
+        await service.aclose()
+
+        assert (location.city, location.country_name) == ("Madrid", "Spain")
+        assert (await service.get_metrics())["geocode_sources"] == {"google": 1, "local": 1}
+
+    def test_unknown_policy_defaults_to_prefer_local(self, monkeypatch):
+        monkeypatch.setenv("GEOCODE_POLICY", "nearest")
+        assert WeatherService(api_key="test_key").geocode_policy == "prefer_local"
+
+
+# ============================================
+# Reverse Geocoding Tests
+# ============================================
+
+class TestReverseGeocoding:
+    """Tests for naming coordinate lookups from the city index."""
+
+    async def test_coordinates_named_without_geocoding(self, service, upstream):
+        """Weather by coordinates carries the nearest city, with no Google geocode."""
+        weather = await service.get_weather_by_coordinates(51.51, -0.13)
+
+        assert (weather.city, weather.country, weather.country_name) == (
+            "London", "GB", "United Kingdom"
+        )
+        assert upstream.count("maps.googleapis.com") == 0
+
+    async def test_remote_point_stays_unknown(self, service):
+        weather = await service.get_weather_by_coordinates(0.0, -150.0)
+        assert weather.city == "Unknown"
+
+    async def test_explicit_name_kept(self, service):
+        weather = await service.get_weather_by_coordinates(51.51, -0.13, "Westminster", "GB")
+        assert weather.city == "Westminster"
+
+    def test_reverse_geocode_many(self, service):
+        places = service.reverse_geocode_many([(48.86, 2.35), (0.0, -150.0)])
+        assert places[0].city == "Paris" and places[0].country_name == "France"
+        assert places[1] is None
+
+
+# ============================================
+# Stale-While-Revalidate Tests
+# ============================================
+
+async def _age_weather_entry(service, seconds, lat=51.5, lng=-0.12):
+    """Move the cached weather entry for (lat, lng) `seconds` into the past."""
+    key = service._coordinate_key(lat, lng)
+    entry = await service.weather_cache.get_entry(key)
+    entry.stored_at -= seconds
+    entry.fresh_until -= seconds
+    entry.expires_at -= seconds
+    await service.weather_cache.set_entry(key, entry)
+
+
+class TestStaleWhileRevalidate:
+    """Tests for serving expired entries while refreshing or failing."""
+
+    async def test_recently_expired_served_and_refreshed(self, service, upstream):
+        """A recently expired entry is served at once and refreshed in background."""
+        await service.get_weather_by_coordinates(51.5, -0.12)
+        await _age_weather_entry(service, service.weather_cache.default_ttl + 60)
+
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+        assert weather.stale is True
+        await asyncio.sleep(0.01)
+
+        assert upstream.count("weather.googleapis.com") == 2
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+        assert weather.stale is False
+
+    async def test_stale_served_when_upstream_fails(self):
+        """Upstream errors fall back to a stale entry instead of failing."""
+        upstream = FakeUpstream()
+        failing = {"on": False}
+
+        def handler(request):
+            if failing["on"]:
+                return httpx.Response(503)
+            return upstream(request)
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        await service.get_weather_by_coordinates(51.5, -0.12)
+        await _age_weather_entry(
+            service, service.weather_cache.default_ttl + service.stale_while_revalidate + 60
+        )
+        failing["on"] = True
+
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+        await service.aclose()
+
+        assert weather.stale is True
+        assert (await service.get_metrics())["stale_served"] == {"weather.error": 1}
+
+    async def test_entry_past_hard_max_age_fetched_synchronously(self, service, upstream):
+        """Entries older than the stale windows are not served."""
+        await service.get_weather_by_coordinates(51.5, -0.12)
+        await _age_weather_entry(
+            service, service.weather_cache.default_ttl + service.weather_cache.stale_ttl + 1
+        )
+
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+
+        assert weather.stale is False
+        assert upstream.count("weather.googleapis.com") == 2
+
+
+# ============================================
+# Forecast Engine Tests
+# ============================================
+
+FORECAST_OK = {
+    "cod": "200",
+    "city": {"name": "Madrid", "country": "ES"},
+    "list": [
+        {"dt_txt": "2025-01-29 09:00:00", "main": {"temp": 8.2},
+         "weather": [{"description": "clear sky", "icon": "01d"}]},
+        {"dt_txt": "2025-01-29 15:00:00", "main": {"temp": 14.6},
+         "weather": [{"description": "few clouds", "icon": "02d"}]},
+        {"dt_txt": "2025-01-30 00:00:00", "main": {"temp": 3.4},
+         "weather": [{"description": "clear sky", "icon": "01n"}]},
+    ],
+}
+
+
+class TestForecastEngine:
+    """Tests for the cached forecast pipeline."""
+
+    @pytest.fixture
+    async def forecast_service(self, monkeypatch):
+        monkeypatch.setenv("OPENWEATHER_API_KEY", "owm_key")
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json=FORECAST_OK)
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        service.calls = calls
+        yield service
+        await service.aclose()
+
+    async def test_forecast_parsed_and_cached(self, forecast_service):
+        """A forecast is fetched once and then served from memory."""
+        first = await forecast_service.get_forecast_by_city("madrid")
+        second = await forecast_service.get_forecast_by_city("Madrid ")
+
+        assert len(forecast_service.calls) == 1
+        assert first.city == "Madrid"
+        assert second.forecasts == first.forecasts
+        assert first.forecasts[0] == {
+            "date": "2025-01-29", "temp_max": 15, "temp_min": 8,
+            "description": "Clear sky", "icon": "01d",
+        }
+        assert first.forecasts[1]["description"] == "Clear"
+
+    async def test_forecast_expires_at_next_step(self, forecast_service):
+        """Cached forecasts expire at the next 3-hour run, not a fixed TTL."""
+        forecast = await forecast_service.get_forecast_by_city("Madrid")
+        step = WeatherService.FORECAST_STEP_SECONDS
+
+        refresh_at = forecast.expires_at - forecast_service.forecast_publish_delay
+        assert refresh_at % step == pytest.approx(0, abs=1e-3)
+        assert 0 < forecast.expires_at - forecast.fetched_at <= step + 1
+
+    def test_forecast_ttl_accounts_for_publish_delay(self):
+        """Shortly after a boundary the TTL waits for the new run to publish."""
+        service = WeatherService(api_key="test")
+        service.forecast_publish_delay = 600
+        boundary = 1_700_000_000 - (1_700_000_000 % WeatherService.FORECAST_STEP_SECONDS)
+
+        assert service._forecast_ttl(boundary + 60) == 540
+        assert service._forecast_ttl(boundary + 1200) == 3 * 3600 - 600
+
+
+# ============================================
+# Shared Cache Backend Tests
+# ============================================
+
+class TestSharedCacheBackend:
+    """Tests for caches shared between workers."""
+
+    async def test_workers_share_weather_cache(self, tmp_path, upstream):
+        """A second worker on the same host reuses the first worker's lookups."""
+        path = str(tmp_path / "cache.sqlite3")
+        workers = [
+            WeatherService(
+                api_key="test_key",
+                transport=httpx.MockTransport(upstream),
+                cache_backend=SQLiteCacheBackend(path),
+                geocode_policy="prefer_remote",
+            )
+            for _ in range(2)
+        ]
+
+        await workers[0].get_weather_by_city("London")
+        weather = await workers[1].get_weather_by_city("London")
+        for worker in workers:
+            await worker.aclose()
+
+        assert weather.city == "London"
+        assert len(upstream.calls) == 2  # one geocode + one weather call in total
+
+
+# ============================================
+# Upstream Retry Tests
+# ============================================
+
+class TestUpstreamRetries:
+    """Tests for retrying transient upstream failures."""
+
+    @pytest.fixture(autouse=True)
+    def fast_backoff(self, monkeypatch):
+        monkeypatch.setenv("UPSTREAM_RETRY_BASE_DELAY", "0.001")
+        monkeypatch.setenv("UPSTREAM_RETRY_MAX_DELAY", "0.005")
+
+    def _service(self, *failures):
+        """Service whose upstream fails with `failures` in turn, then succeeds."""
+        upstream = FakeUpstream()
+        pending = list(failures)
+
+        def handler(request):
+            if pending:
+                failure = pending.pop(0)
+                if isinstance(failure, Exception):
+                    raise failure
+                return failure
+            return upstream(request)
+
+        service = WeatherService(api_key="test_key", transport=httpx.MockTransport(handler))
+        return service, upstream
+
+    async def test_connect_error_and_5xx_retried(self):
+        service, upstream = self._service(
+            httpx.ConnectError("refused"), httpx.Response(503)
+        )
+
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+
+        assert weather.temperature == 12
+        assert (await service.get_metrics())["retries"]["google_weather"] == {
+            "connect_error": 1, "503": 1
+        }
+        await service.aclose()
+
+    async def test_gives_up_after_max_attempts(self):
+        service, upstream = self._service(*[httpx.Response(502)] * 3)
+
+        with pytest.raises(WeatherAPIError):
+            await service.get_weather_by_coordinates(51.5, -0.12)
+
+        assert (await service.get_metrics())["retries"]["google_weather"] == {"502": 2, "gave_up": 1}
+        assert upstream.calls == []
+        await service.aclose()
+
+    async def test_other_errors_not_retried(self):
+        service, _ = self._service(httpx.Response(500), httpx.Response(500))
+
+        with pytest.raises(WeatherAPIError):
+            await service.get_weather_by_coordinates(51.5, -0.12)
+        assert (await service.get_metrics())["retries"]["google_weather"] == {}
+        await service.aclose()
+
+    async def test_429_retried_after_retry_after(self):
+        service, _ = self._service(httpx.Response(429, headers={"Retry-After": "0.01"}))
+
+        weather = await service.get_weather_by_coordinates(51.5, -0.12)
+
+        assert weather.temperature == 12
+        assert (await service.get_metrics())["retries"]["google_weather"] == {"429": 1}
+        await service.aclose()
+
+    async def test_retry_after_beyond_deadline_not_awaited(self):
+        service, _ = self._service(httpx.Response(429, headers={"Retry-After": "30"}))
+
+        with pytest.raises(UpstreamRateLimitedError):
+            await service.get_weather_by_coordinates(51.5, -0.12)
+        assert (await service.get_metrics())["retries"]["google_weather"] == {"gave_up": 1}
+        await service.aclose()
+
+
+# ============================================
+# City View Tests
+# ============================================
+
+class TestCityView:
+    """Tests for weather and forecast looked up together."""
+
+    @pytest.fixture
+    async def view_service(self, monkeypatch, upstream):
+        monkeypatch.setenv("OPENWEATHER_API_KEY", "owm_key")
+        state = {"in_flight": 0, "max_in_flight": 0, "forecast_status": 200}
+
+        async def handler(request):
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            if request.url.host == "api.openweathermap.org":
+                upstream.calls.append(request)
+                return httpx.Response(state["forecast_status"], json=FORECAST_OK)
+            return upstream(request)
+
+        service = WeatherService(
+            api_key="test_key",
+            transport=httpx.MockTransport(handler),
+            geocode_policy="prefer_remote",
+        )
+        service.state = state
+        yield service
+        await service.aclose()
+
+    async def test_geocodes_once_and_fetches_concurrently(self, view_service, upstream):
+        view = await view_service.get_city_view("london")
+
+        assert view.weather.city == "London"
+        assert view.forecast.forecasts[0]["temp_max"] == 15
+        assert view.forecast_error is None
+        assert upstream.count("maps.googleapis.com") == 1
+        assert upstream.count("weather.googleapis.com") == 1
+        # The forecast is asked for the geocoded point, alongside the weather
+        params = upstream.calls[-1].url.params
+        assert "q" not in params
+        assert (float(params["lat"]), float(params["lon"])) == view_service.snap_coordinates(
+            51.5074, -0.1278
+        )
+        assert view_service.state["max_in_flight"] == 2
+
+    async def test_shares_cache_entries(self, view_service, upstream):
+        await view_service.get_city_view("London")
+        calls = len(upstream.calls)
+
+        await view_service.get_weather_by_city("london")
+        await view_service.get_forecast_by_city("London")
+        view = await view_service.get_city_view("london")
+
+        assert len(upstream.calls) == calls
+        assert view.forecast.stale is False
+        # The prefetcher watches the same forecast entry
+        [hot] = view_service.hot_cities.top(1)
+        assert await view_service.freshness_remaining("forecast", hot.city, hot.location) > 0
+
+    async def test_ambiguous_city_forecast_for_geocoded_place(self, monkeypatch):
+        """"Paris, Texas" must not get OpenWeatherMap's guess for "Paris"."""
+        monkeypatch.setenv("OPENWEATHER_API_KEY", "owm_key")
+        paris_texas = {
+            "status": "OK",
+            "results": [{
+                "geometry": {"location": {"lat": 33.6609, "lng": -95.5555}},
+                "address_components": [
+                    {"long_name": "Paris", "short_name": "Paris", "types": ["locality"]},
+                    {"long_name": "United States", "short_name": "US", "types": ["country"]},
+                ],
+            }],
+        }
+
+        def forecast_for(temp):
+            step = {"main": {"temp": temp}, "weather": [{"description": "clear sky", "icon": "01d"}]}
+            return {"cod": "200", "city": {"name": "Paris"},
+                    "list": [{**step, "dt_txt": "2025-01-29 12:00:00"}]}
+
+        forecast_calls = []
+
+        def handler(request):
+            if request.url.host == "maps.googleapis.com":
+                return httpx.Response(200, json=paris_texas)
+            if request.url.host == "api.openweathermap.org":
+                forecast_calls.append(request)
+                # By name OpenWeatherMap picks Paris, France
+                texas = "lat" in request.url.params
+                return httpx.Response(200, json=forecast_for(31.0 if texas else 9.0))
+            return httpx.Response(200, json=WEATHER_OK)
+
+        service = WeatherService(
+            api_key="test_key",
+            transport=httpx.MockTransport(handler),
+            geocode_policy="prefer_remote",
+        )
+        view = await service.get_city_view("Paris, Texas")
+        forecast = await service.get_forecast_by_city("Paris, Texas")
+        await service.aclose()
+
+        assert view.forecast.forecasts[0]["temp_max"] == 31
+        assert view.forecast.city == "Paris"
+        # /api/forecast resolves the name the same way and shares the entry
+        assert forecast.forecasts == view.forecast.forecasts
+        assert len(forecast_calls) == 1
+
+    async def test_counts_one_hot_city_request(self, view_service):
+        await view_service.get_city_view("London")
+
+        [hot] = view_service.hot_cities.top(5)
+        assert (hot.city, hot.score) == ("London", pytest.approx(1.0, rel=1e-3))
+
+    async def test_forecast_failure_reported_in_view(self, view_service):
+        view_service.state["forecast_status"] = 500
+
+        view = await view_service.get_city_view("London")
+
+        assert view.weather.temperature == 12
+        assert view.forecast is None
+        assert isinstance(view.forecast_error, WeatherAPIError)